@@ -0,0 +1,287 @@
+# ai-tools/anomaly.py
+"""
+Streaming anomaly-detectie op order- en betaal-events van verkoop.
+
+- RollingStats: per entiteit (seller / customer) een ring buffer van de
+  laatste `window` waarden plus EWMA-gemiddelde en -variantie, allemaal in
+  NumPy-arrays per metric (één rij per entiteit, verdubbelt bij groei)
+- per event O(1): z-score t.o.v. de toestand vóór het event, daarna de
+  EWMA bijwerken (incrementele formule van Finch, 2009)
+- regels:
+    discount_above_max   : korting > Seller.max_discount_percent
+    discount_zscore      : korting ongewoon hoog voor deze seller/klant
+    order_total_zscore   : ordertotaal ongewoon (hoog of laag) voor seller/klant,
+                           op log-schaal (bedragen zijn scheef verdeeld)
+    payment_failure_rate : mislukte betalingen in het venster van de seller/klant
+                           onwaarschijnlijk veel t.o.v. de globale faalratio
+                           (exacte binomiale staart, even streng als z_threshold)
+- geen z-score tijdens de opwarmfase (< min_samples waarden per entiteit)
+- geflagde items in een begrensde deque (nieuwste eerst opvraagbaar)
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, Iterable, List, Optional
+
+import numpy as np
+
+
+class RollingStats:
+    def __init__(self, window: int = 64, alpha: float = 0.05, capacity: int = 1024) -> None:
+        self.window = window
+        self.alpha = alpha
+        self._index: Dict[Hashable, int] = {}
+        self._values = np.zeros((capacity, window), dtype=np.float32)
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._mean = np.zeros(capacity, dtype=np.float64)
+        self._var = np.zeros(capacity, dtype=np.float64)
+
+    def _row(self, key: Hashable) -> int:
+        row = self._index.get(key)
+        if row is not None:
+            return row
+        row = len(self._index)
+        if row == len(self._count):
+            self._grow()
+        self._index[key] = row
+        return row
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._count)
+        for name in ("_values", "_count", "_mean", "_var"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    def update(self, key: Hashable, value: float) -> Dict[str, float]:
+        """Voegt `value` toe; geeft count/mean/std van vóór het event terug (voor de z-score).
+        Niet-eindige waarden (NaN/inf) worden genegeerd: eens in de EWMA raakt die er nooit meer uit."""
+        row = self._row(key)
+        n = int(self._count[row])
+        mean = float(self._mean[row])
+        var = float(self._var[row])
+        if not math.isfinite(value):
+            return {"count": n, "mean": mean, "std": math.sqrt(var)}
+
+        if n == 0:
+            new_mean, new_var = value, 0.0
+        else:
+            diff = value - mean
+            incr = self.alpha * diff
+            new_mean = mean + incr
+            new_var = (1 - self.alpha) * (var + diff * incr)
+        self._mean[row] = new_mean
+        self._var[row] = new_var
+        self._values[row, n % self.window] = value
+        self._count[row] = n + 1
+        return {"count": n, "mean": mean, "std": math.sqrt(var)}
+
+    def summary(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        row = self._index.get(key)
+        if row is None:
+            return None
+        n = int(self._count[row])
+        recent = self._values[row, : min(n, self.window)]
+        return {
+            "count": n,
+            "ewma_mean": round(float(self._mean[row]), 4),
+            "ewma_std": round(math.sqrt(float(self._var[row])), 4),
+            "window_mean": round(float(recent.mean()), 4),
+            "window_std": round(float(recent.std()), 4),
+            "window_p95": round(float(np.percentile(recent, 95)), 4),
+        }
+
+    def recent(self, key: Hashable) -> np.ndarray:
+        row = self._index.get(key)
+        if row is None:
+            return self._values[0, :0]
+        return self._values[row, : min(int(self._count[row]), self.window)]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def nbytes(self) -> int:
+        return self._values.nbytes + self._count.nbytes + self._mean.nbytes + self._var.nbytes
+
+
+ENTITIES = ("seller", "customer")
+
+
+def _binomial_tail(k: int, n: int, p: float) -> float:
+    """P(X >= k) voor X ~ Binomial(n, p); n is hoogstens de venstergrootte."""
+    log_p, log_q = math.log(p), math.log1p(-p)
+    total = 0.0
+    for i in range(k, n + 1):
+        total += math.exp(
+            math.lgamma(n + 1) - math.lgamma(i + 1) - math.lgamma(n - i + 1) + i * log_p + (n - i) * log_q
+        )
+    return min(total, 1.0)
+
+
+class AnomalyDetector:
+    def __init__(
+        self,
+        z_threshold: float = 3.5,
+        window: int = 64,
+        alpha: float = 0.05,
+        min_samples: int = 20,
+        max_flags: int = 10_000,
+    ) -> None:
+        self.z_threshold = z_threshold
+        # zelfde eenzijdige staartkans als z_threshold bij een normale verdeling
+        self.p_threshold = 0.5 * math.erfc(z_threshold / math.sqrt(2))
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.order_total = {e: RollingStats(window, alpha) for e in ENTITIES}
+        self.discount = {e: RollingStats(window, alpha) for e in ENTITIES}
+        self.payment_failed = {e: RollingStats(window, alpha) for e in ENTITIES}
+        # basislijn over alle betalingen: veel tragere EWMA (~2000 betalingen)
+        self._global_failed = RollingStats(window, 0.001, capacity=1)
+        self.seller_max_discount: Dict[int, float] = {}
+        self.flags: Deque[Dict[str, Any]] = deque(maxlen=max_flags)
+        self.events_seen = 0
+        self._seq = 0
+        # FastAPI draait sync endpoints in een threadpool
+        self._lock = threading.Lock()
+
+    # -------------------------------
+    # Ingest
+    # -------------------------------
+    def ingest(self, events: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        flagged: List[Dict[str, Any]] = []
+        with self._lock:
+            for event in events:
+                if event["type"] == "order":
+                    self._order(event, flagged)
+                else:
+                    self._payment(event, flagged)
+                self.events_seen += 1
+        return flagged
+
+    def _flag(self, flagged: List[Dict[str, Any]], kind: str, entity: str, entity_id: Any,
+              event: Dict[str, Any], value: float, score: float, threshold: float) -> None:
+        self._seq += 1
+        item = {
+            "id": self._seq,
+            "kind": kind,
+            "entity": entity,
+            "entity_id": entity_id,
+            "order_id": event.get("order_id"),
+            "value": round(value, 4),
+            "score": round(score, 3),
+            "threshold": threshold,
+            "ts": event.get("ts") or time.time(),
+        }
+        self.flags.append(item)
+        flagged.append(item)
+
+    def _zscore(self, stats: RollingStats, key: Any, value: float) -> Optional[float]:
+        before = stats.update(key, value)
+        if not math.isfinite(value) or before["count"] < self.min_samples or before["std"] <= 1e-9:
+            return None
+        return (value - before["mean"]) / before["std"]
+
+    def _order(self, event: Dict[str, Any], flagged: List[Dict[str, Any]]) -> None:
+        total = float(event["total"])
+        log_total = math.log1p(max(total, 0.0))
+        discount = float(event.get("discount_percent") or 0.0)
+        ids = {"seller": event.get("seller_id"), "customer": event.get("customer_id")}
+
+        seller_id = ids["seller"]
+        limit = event.get("max_discount_percent")
+        if limit is None and seller_id is not None:
+            limit = self.seller_max_discount.get(seller_id)
+        if limit is not None and discount > float(limit):
+            self._flag(flagged, "discount_above_max", "seller", seller_id, event,
+                       discount, discount - float(limit), float(limit))
+
+        for entity, entity_id in ids.items():
+            if entity_id is None:
+                continue
+            z = self._zscore(self.order_total[entity], entity_id, log_total)
+            if z is not None and abs(z) > self.z_threshold:
+                self._flag(flagged, "order_total_zscore", entity, entity_id, event, total, z, self.z_threshold)
+            z = self._zscore(self.discount[entity], entity_id, discount)
+            # enkel ongewoon hoge kortingen zijn verdacht
+            if z is not None and z > self.z_threshold:
+                self._flag(flagged, "discount_zscore", entity, entity_id, event, discount, z, self.z_threshold)
+
+    def _payment(self, event: Dict[str, Any], flagged: List[Dict[str, Any]]) -> None:
+        failed = 1.0 if event["status"] == "failed" else 0.0
+        # EWMA-faalratio van alle betalingen (vóór dit event)
+        baseline = self._global_failed.update("*", failed)
+        p_global = min(max(baseline["mean"], 1e-3), 1 - 1e-3)
+
+        for entity in ENTITIES:
+            entity_id = event.get(f"{entity}_id")
+            if entity_id is None:
+                continue
+            stats = self.payment_failed[entity]
+            before = stats.update(entity_id, failed)
+            # enkel bij een mislukte betaling kan de ratio over de grens gaan
+            if not failed or before["count"] < self.min_samples or baseline["count"] < self.min_samples:
+                continue
+            recent = stats.recent(entity_id)
+            trials, failures = len(recent), int(recent.sum())
+            p_value = _binomial_tail(failures, trials, p_global)
+            if p_value < self.p_threshold:
+                self._flag(flagged, "payment_failure_rate", entity, entity_id, event,
+                           failures / trials, -math.log10(max(p_value, 1e-300)),
+                           round(-math.log10(self.p_threshold), 3))
+
+    # -------------------------------
+    # Instellingen
+    # -------------------------------
+    def set_seller_max_discount(self, seller_id: int, max_discount_percent: Optional[float]) -> None:
+        """None = limiet weghalen (dan enkel de limiet uit het event zelf)."""
+        with self._lock:
+            if max_discount_percent is None:
+                self.seller_max_discount.pop(seller_id, None)
+            else:
+                self.seller_max_discount[seller_id] = max_discount_percent
+
+    # -------------------------------
+    # Query
+    # -------------------------------
+    def query(
+        self,
+        kind: Optional[str] = None,
+        entity: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        after_id: int = 0,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        result = []
+        with self._lock:
+            for item in reversed(self.flags):
+                if item["id"] <= after_id:
+                    break
+                if kind and item["kind"] != kind:
+                    continue
+                if entity and item["entity"] != entity:
+                    continue
+                if entity_id is not None and str(item["entity_id"]) != entity_id:
+                    continue
+                result.append(item)
+                if len(result) >= limit:
+                    break
+        return result
+
+    def stats(self, entity: str, entity_id: Any) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                # log1p(total), zelfde schaal als de z-score
+                "order_total_log1p": self.order_total[entity].summary(entity_id),
+                "discount_percent": self.discount[entity].summary(entity_id),
+                "payment_failed": self.payment_failed[entity].summary(entity_id),
+            }
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            tracked = {e: len(self.order_total[e]) for e in ENTITIES}
+            nbytes = sum(s.nbytes for group in (self.order_total, self.discount, self.payment_failed) for s in group.values())
+            return {"events_seen": self.events_seen, "flags": len(self.flags), "tracked": tracked, "state_bytes": nbytes}
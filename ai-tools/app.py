@@ -1,6 +1,95 @@
-from fastapi import FastAPI
+import os
+from typing import Annotated, List, Literal, Optional, Union
+
+from fastapi import FastAPI, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from anomaly import ENTITIES, AnomalyDetector
+
 app = FastAPI(title="casuse-hp ai-tools")
 
+detector = AnomalyDetector(
+    z_threshold=float(os.getenv("ANOMALY_Z_THRESHOLD", "3.5")),
+    window=int(os.getenv("ANOMALY_WINDOW", "64")),
+    alpha=float(os.getenv("ANOMALY_EWMA_ALPHA", "0.05")),
+    min_samples=int(os.getenv("ANOMALY_MIN_SAMPLES", "20")),
+    max_flags=int(os.getenv("ANOMALY_MAX_FLAGS", "10000")),
+)
+
+
+class OrderEvent(BaseModel):
+    type: Literal["order"]
+    order_id: Optional[int] = None
+    seller_id: Optional[int] = None
+    customer_id: Optional[int] = None
+    # NaN/inf zouden de EWMA van de entiteit voorgoed vergiftigen
+    total: float = Field(ge=0, allow_inf_nan=False)
+    # hoogste regelkorting van de order
+    discount_percent: float = Field(0.0, ge=0, allow_inf_nan=False)
+    # Seller.max_discount_percent op het moment van de order (optioneel)
+    max_discount_percent: Optional[float] = Field(None, ge=0, allow_inf_nan=False)
+    ts: Optional[float] = None
+
+
+class PaymentEvent(BaseModel):
+    type: Literal["payment"]
+    order_id: Optional[int] = None
+    seller_id: Optional[int] = None
+    customer_id: Optional[int] = None
+    amount: float = Field(0.0, ge=0, allow_inf_nan=False)
+    status: Literal["succeeded", "failed"]
+    ts: Optional[float] = None
+
+
+Event = Annotated[Union[OrderEvent, PaymentEvent], Field(discriminator="type")]
+
+
+class EventBatch(BaseModel):
+    events: List[Event]
+
+
+class SellerLimits(BaseModel):
+    max_discount_percent: Optional[float] = Field(None, ge=0, allow_inf_nan=False)
+
+
 @app.get("/healthz")
 def healthz():
     return {"status": "ok", "service": "ai-tools"}
+
+
+@app.get("/readyz")
+def readyz():
+    return {"status": "ready", "service": "ai-tools", **detector.status()}
+
+
+@app.post("/anomalies/events")
+def ingest(batch: EventBatch):
+    """Batch order-/betaal-events (bv. uit de verkoop-outbox); geeft de nieuwe flags terug."""
+    flagged = detector.ingest(event.model_dump() for event in batch.events)
+    return {"accepted": len(batch.events), "flagged": flagged}
+
+
+@app.get("/anomalies")
+def list_anomalies(
+    kind: Optional[str] = None,
+    entity: Optional[Literal["seller", "customer"]] = None,
+    entity_id: Optional[str] = None,
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Geflagde items, nieuwste eerst; `after_id` om enkel nieuwe op te halen."""
+    return detector.query(kind=kind, entity=entity, entity_id=entity_id, after_id=after_id, limit=limit)
+
+
+@app.get("/anomalies/stats/{entity}/{entity_id}")
+def entity_stats(entity: str, entity_id: int):
+    if entity not in ENTITIES:
+        raise HTTPException(status_code=404, detail="Unknown entity")
+    return detector.stats(entity, entity_id)
+
+
+@app.put("/anomalies/sellers/{seller_id}/limits")
+def set_seller_limits(seller_id: int, limits: SellerLimits):
+    """Seller.max_discount_percent voor events die de limiet zelf niet meesturen."""
+    detector.set_seller_max_discount(seller_id, limits.max_discount_percent)
+    return {"seller_id": seller_id, **limits.model_dump()}
@@ -0,0 +1,62 @@
+"""
+Micro-benchmark voor de anomaly-detector (één core, zonder HTTP).
+
+    python bench_anomaly.py [--events 200000] [--sellers 200] [--customers 20000]
+
+Meet events/s voor detector.ingest() met een mix van 80% orders en 20% betalingen.
+"""
+
+import argparse
+import random
+import time
+
+from anomaly import AnomalyDetector
+
+
+def _events(n: int, sellers: int, customers: int, seed: int = 42):
+    rng = random.Random(seed)
+    events = []
+    for i in range(n):
+        seller_id = rng.randrange(sellers)
+        customer_id = rng.randrange(customers)
+        if rng.random() < 0.8:
+            events.append({
+                "type": "order",
+                "order_id": i,
+                "seller_id": seller_id,
+                "customer_id": customer_id,
+                "total": rng.lognormvariate(7, 0.5),
+                "discount_percent": max(0.0, rng.gauss(5, 2)),
+                "max_discount_percent": 15.0,
+            })
+        else:
+            events.append({
+                "type": "payment",
+                "order_id": i,
+                "seller_id": seller_id,
+                "customer_id": customer_id,
+                "status": "failed" if rng.random() < 0.05 else "succeeded",
+            })
+    return events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--sellers", type=int, default=200)
+    parser.add_argument("--customers", type=int, default=20_000)
+    args = parser.parse_args()
+
+    events = _events(args.events, args.sellers, args.customers)
+    detector = AnomalyDetector()
+    started = time.perf_counter()
+    for offset in range(0, len(events), 500):
+        detector.ingest(events[offset:offset + 500])
+    elapsed = time.perf_counter() - started
+    status = detector.status()
+    print(f"{args.events} events in {elapsed:.2f}s → {args.events / elapsed:,.0f} events/s")
+    print(f"flags: {status['flags']}, tracked: {status['tracked']}, state: {status['state_bytes'] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import math
+
+import numpy as np
+import pytest
+
+from anomaly import AnomalyDetector, RollingStats, _binomial_tail
+
+
+def test_rolling_stats_returns_state_before_the_event():
+    stats = RollingStats(window=4, alpha=0.5, capacity=2)
+
+    assert stats.update("a", 10.0) == {"count": 0, "mean": 0.0, "std": 0.0}
+    before = stats.update("a", 20.0)
+    assert before == {"count": 1, "mean": 10.0, "std": 0.0}
+
+    # EWMA (Finch): mean += a*diff, var = (1-a)*(var + diff*a*diff)
+    after = stats.update("a", 20.0)
+    assert after["mean"] == pytest.approx(15.0)
+    assert after["std"] == pytest.approx(math.sqrt(0.5 * (10.0 * 5.0)))
+
+
+def test_rolling_stats_ring_buffer_keeps_the_last_window_values():
+    stats = RollingStats(window=3, capacity=1)
+    for value in range(1, 6):
+        stats.update("a", float(value))
+
+    assert sorted(stats.recent("a").tolist()) == [3.0, 4.0, 5.0]
+    summary = stats.summary("a")
+    assert summary["count"] == 5
+    assert summary["window_mean"] == pytest.approx(4.0)
+    assert stats.summary("onbekend") is None
+    assert len(stats.recent("onbekend")) == 0
+
+
+def test_rolling_stats_grows_without_losing_rows():
+    stats = RollingStats(window=2, capacity=1)
+    for key in range(5):
+        stats.update(key, float(key))
+
+    assert len(stats) == 5
+    assert len(stats._count) == 8  # 1 → 2 → 4 → 8
+    assert [stats.recent(key).tolist() for key in range(5)] == [[float(k)] for k in range(5)]
+
+
+def test_binomial_tail_matches_the_exact_sum():
+    for k, n, p in [(0, 10, 0.3), (3, 10, 0.1), (10, 10, 0.5), (20, 64, 0.05)]:
+        expected = sum(math.comb(n, i) * p**i * (1 - p) ** (n - i) for i in range(k, n + 1))
+        assert _binomial_tail(k, n, p) == pytest.approx(expected, rel=1e-9)
+    assert _binomial_tail(0, 64, 0.2) == pytest.approx(1.0)
+    assert _binomial_tail(65, 64, 0.2) == 0.0
+
+
+def test_seller_limit_setter_flags_and_clears():
+    detector = AnomalyDetector()
+    order = {"type": "order", "seller_id": 1, "customer_id": 9, "total": 100.0, "discount_percent": 15.0}
+
+    detector.set_seller_max_discount(1, 10.0)
+    assert [f["kind"] for f in detector.ingest([order])] == ["discount_above_max"]
+
+    detector.set_seller_max_discount(1, None)
+    assert detector.ingest([order]) == []
+    assert detector.seller_max_discount == {}
+
+
+def test_payment_failure_burst_is_flagged_after_warmup():
+    detector = AnomalyDetector(min_samples=20)
+    rng = np.random.default_rng(1)
+    baseline = [
+        {"type": "payment", "seller_id": int(s), "status": "ok"}
+        for s in rng.integers(100, 110, size=400)
+    ]
+    detector.ingest(baseline)
+    burst = [{"type": "payment", "seller_id": 1, "status": "ok"}] * 20
+    burst += [{"type": "payment", "seller_id": 1, "status": "failed"}] * 10
+
+    kinds = {(f["kind"], f["entity"]) for f in detector.ingest(burst)}
+    assert ("payment_failure_rate", "seller") in kinds
+
+
+def test_non_finite_values_do_not_poison_the_ewma():
+    stats = RollingStats(window=4, capacity=1)
+    stats.update("a", 10.0)
+    for value in (float("nan"), float("inf")):
+        assert stats.update("a", value)["count"] == 1
+    summary = stats.summary("a")
+    assert (summary["count"], summary["ewma_mean"]) == (1, 10.0)
+
+
+def test_api_rejects_nan_and_negative_amounts():
+    from fastapi.testclient import TestClient
+
+    from app import app
+
+    client = TestClient(app)
+    for total in ("NaN", "inf", -1):
+        response = client.post("/anomalies/events", json={"events": [{"type": "order", "seller_id": 1, "total": total}]})
+        assert response.status_code == 422
+    response = client.put("/anomalies/sellers/1/limits", json={"max_discount_percent": "NaN"})
+    assert response.status_code == 422
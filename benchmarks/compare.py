@@ -0,0 +1,108 @@
+# benchmarks/compare.py
+"""
+Vergelijk een resultaat-JSON met een baseline.
+
+    python -m benchmarks.compare results/run.json baseline.json [--p95-tolerance 0.2]
+
+Een stap is een regressie als p95 meer dan de tolerantie stijgt of de
+throughput meer dan de tolerantie daalt, of als er fouten bijkomen.
+Exit code 1 bij minstens één regressie. Serverconnecties (max/gemiddeld per
+scenario) worden ter info naast elkaar getoond, bv. om runs met en zonder
+PgBouncer te vergelijken.
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    p95_tolerance: float = 0.20,
+    throughput_tolerance: float = 0.20,
+) -> List[Dict[str, Any]]:
+    rows = []
+    for scenario, base_result in baseline.get("scenarios", {}).items():
+        cur_result = current.get("scenarios", {}).get(scenario)
+        if cur_result is None:
+            continue
+        for step, base in base_result["steps"].items():
+            cur = cur_result["steps"].get(step)
+            if cur is None:
+                continue
+            p95_change = (cur["p95_ms"] - base["p95_ms"]) / base["p95_ms"] if base["p95_ms"] else 0.0
+            rps_change = (
+                (cur["throughput_rps"] - base["throughput_rps"]) / base["throughput_rps"]
+                if base["throughput_rps"]
+                else 0.0
+            )
+            reasons = []
+            if p95_change > p95_tolerance:
+                reasons.append(f"p95 +{p95_change:.0%}")
+            if rps_change < -throughput_tolerance:
+                reasons.append(f"throughput {rps_change:.0%}")
+            if cur["errors"] > base["errors"]:
+                reasons.append(f"errors {base['errors']} -> {cur['errors']}")
+            rows.append(
+                {
+                    "scenario": scenario,
+                    "step": step,
+                    "p95_ms": (base["p95_ms"], cur["p95_ms"]),
+                    "throughput_rps": (base["throughput_rps"], cur["throughput_rps"]),
+                    "regression": reasons,
+                }
+            )
+    return rows
+
+
+def print_report(rows: List[Dict[str, Any]]) -> None:
+    print(f"{'scenario/step':45} {'p95 base':>10} {'p95 nu':>10} {'rps base':>10} {'rps nu':>10}  status")
+    for row in rows:
+        label = f"{row['scenario']}/{row['step']}"
+        status = "REGRESSIE: " + ", ".join(row["regression"]) if row["regression"] else "ok"
+        print(
+            f"{label:45} {row['p95_ms'][0]:>10.1f} {row['p95_ms'][1]:>10.1f} "
+            f"{row['throughput_rps'][0]:>10.1f} {row['throughput_rps'][1]:>10.1f}  {status}"
+        )
+
+
+def print_connections(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    rows = []
+    for scenario, base_result in baseline.get("scenarios", {}).items():
+        base = base_result.get("connections", {})
+        cur = current.get("scenarios", {}).get(scenario, {}).get("connections", {})
+        if base.get("samples") and cur.get("samples"):
+            rows.append((scenario, base, cur))
+    if not rows:
+        return
+    print(f"\n{'serverconnecties':45} {'max base':>10} {'max nu':>10} {'gem base':>10} {'gem nu':>10}")
+    for scenario, base, cur in rows:
+        print(
+            f"{scenario:45} {base['total_max']:>10} {cur['total_max']:>10} "
+            f"{base['total_mean']:>10.1f} {cur['total_mean']:>10.1f}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("current")
+    parser.add_argument("baseline")
+    parser.add_argument("--p95-tolerance", type=float, default=0.20)
+    parser.add_argument("--throughput-tolerance", type=float, default=0.20)
+    args = parser.parse_args()
+
+    with open(args.current) as fh:
+        current = json.load(fh)
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+
+    rows = compare(current, baseline, args.p95_tolerance, args.throughput_tolerance)
+    print_report(rows)
+    print_connections(current, baseline)
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+# benchmarks/connections.py
+"""
+Serverconnecties tellen tijdens een scenario.
+
+ConnectionSampler peilt in een achtergrondthread pg_stat_activity (rechtstreeks
+op BENCH_PG_DSN, dus ook achter PgBouncer de echte Postgres-connecties) voor
+de bench-databases en houdt per database max / gemiddelde bij, plus het totaal.
+"""
+
+import threading
+from typing import Any, Dict, List
+
+import psycopg
+
+_SQL = """
+SELECT datname, count(*) FROM pg_stat_activity
+WHERE datname = ANY(%s) AND pid <> pg_backend_pid()
+GROUP BY datname
+"""
+
+
+class ConnectionSampler:
+    def __init__(self, dsn: str, databases: List[str], interval: float = 0.5) -> None:
+        self.dsn = dsn
+        self.databases = databases
+        self.interval = interval
+        self._samples: List[Dict[str, int]] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="connection-sampler", daemon=True)
+
+    def _run(self) -> None:
+        with psycopg.connect(self.dsn, autocommit=True) as conn:
+            while not self._stop.is_set():
+                rows = conn.execute(_SQL, (self.databases,)).fetchall()
+                self._samples.append({name: count for name, count in rows})
+                self._stop.wait(self.interval)
+
+    def __enter__(self) -> "ConnectionSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def summary(self) -> Dict[str, Any]:
+        if not self._samples:
+            return {"samples": 0}
+        per_db = {}
+        for name in self.databases:
+            counts = [sample.get(name, 0) for sample in self._samples]
+            per_db[name] = {"max": max(counts), "mean": round(sum(counts) / len(counts), 1)}
+        totals = [sum(sample.values()) for sample in self._samples]
+        return {
+            "samples": len(self._samples),
+            "total_max": max(totals),
+            "total_mean": round(sum(totals) / len(totals), 1),
+            "databases": per_db,
+        }
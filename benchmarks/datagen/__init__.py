@@ -0,0 +1 @@
+"""Deterministische generator voor datasets op productieschaal (10k – 10M klanten)."""
@@ -0,0 +1,101 @@
+# benchmarks/datagen/__main__.py
+"""
+Synthetische datasets genereren en bulk-laden.
+
+    python -m benchmarks.datagen --scale 100k --seed 1
+    python -m benchmarks.datagen --scale 10m --targets verkoop --out /data/ds10m --no-load
+    python -m benchmarks.datagen --load-only --out /data/ds10m --truncate
+
+Zonder --*-dsn wordt geladen in de bench-databases uit BenchConfig
+(BENCH_PG_DSN + bench_core / bench_website / bench_verkoop).
+"""
+
+import argparse
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from benchmarks.config import BenchConfig
+from benchmarks.datagen.generators import Scale, generate, parse_scale
+from benchmarks.datagen.loader import load_all, target_dsns
+from benchmarks.datagen.spool import read_manifest
+
+TARGETS = ("website", "verkoop", "core")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.datagen")
+    parser.add_argument("--scale", default="10k", help="aantal klanten: 10k, 250k, 1m, 10m ...")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--targets", default="website,verkoop", help=f"komma-lijst uit {', '.join(TARGETS)}")
+    parser.add_argument("--anchor", default="2026-01-01", help="einddatum van het tijdvenster (ISO)")
+    parser.add_argument("--months", type=int, default=24, help="lengte van het tijdvenster in maanden")
+    parser.add_argument("--quotes-per-customer", type=float, default=1.5)
+    parser.add_argument("--sellers", type=int, default=0, help="0 = afgeleid van --scale")
+    parser.add_argument("--products", type=int, default=0, help="0 = afgeleid van --scale")
+    parser.add_argument("--jobs", type=int, default=0, help="processen voor het genereren (0 = aantal CPU's)")
+    parser.add_argument("--out", help="map voor de spoolbestanden (default: tijdelijke map, nadien gewist)")
+    parser.add_argument("--no-load", action="store_true", help="enkel genereren")
+    parser.add_argument("--load-only", action="store_true", help="bestaande --out laden zonder te genereren")
+    parser.add_argument("--truncate", action="store_true", help="doeltabellen eerst leegmaken (core.users niet)")
+    for target in TARGETS:
+        parser.add_argument(f"--{target}-dsn", help=f"DSN van de {target}-database")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        print(f"Onbekende targets: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+    if args.load_only and not args.out:
+        print("--load-only vereist --out", file=sys.stderr)
+        return 2
+
+    out_dir = Path(args.out) if args.out else Path(tempfile.mkdtemp(prefix="datagen-"))
+    try:
+        if args.load_only:
+            manifest = read_manifest(out_dir)
+        else:
+            scale = Scale(
+                customers=parse_scale(args.scale),
+                quotes_per_customer=args.quotes_per_customer,
+                sellers=args.sellers,
+                products=args.products,
+            )
+            started = time.perf_counter()
+            manifest = generate(
+                out_dir, args.seed, scale, targets, date.fromisoformat(args.anchor), args.months, args.jobs
+            )
+            rows = sum(t["rows"] for tables in manifest["databases"].values() for t in tables)
+            print(f"[datagen] {rows} rijen gegenereerd in {time.perf_counter() - started:.1f}s → {out_dir}")
+
+        if args.no_load:
+            return 0
+
+        cfg = BenchConfig(seed=args.seed)
+        dsns = target_dsns(
+            [t for t in targets if t in manifest["databases"]],
+            {t: getattr(args, f"{t}_dsn") for t in TARGETS},
+            cfg.db_dsn,
+        )
+        started = time.perf_counter()
+        loaded = load_all(manifest, out_dir, dsns, truncate=args.truncate)
+        for database, tables in loaded.items():
+            print(f"[datagen] {database}: " + ", ".join(f"{t}={n}" for t, n in tables.items()))
+        print(f"[datagen] geladen in {time.perf_counter() - started:.1f}s")
+        return 0
+    finally:
+        if not args.out:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
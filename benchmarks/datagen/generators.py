@@ -0,0 +1,638 @@
+# benchmarks/datagen/generators.py
+"""
+Deterministische rijgeneratoren voor website, verkoop en core.
+
+Alles hangt af van (seed, schaal, anker-datum): dezelfde argumenten geven
+byte-identieke spoolbestanden, ongeacht het aantal --jobs. Daarvoor wordt het
+werk opgedeeld in chunks van vaste grootte (CHUNK_CUSTOMERS klanten); elke
+chunk heeft eigen random-streams (seed + stroom + chunk) en eigen id-bereiken.
+Chunk c beslaat ook het c-de tijdsegment van het venster, zodat ids en
+tijdstempels globaal samen oplopen (zoals in productie).
+
+Verhoudingen per klant (te overschrijven via Scale):
+  - 1 website-customer + 1 customer_shadow (de sync spiegelt iedereen)
+  - 0–3 registratietokens (historiek: vervallen, gebruikt, openstaand)
+  - 1 actieve verkoper-assignment, 15% met een eerdere (afgesloten) assignment
+  - ~1,5 offertes met 1–5 lijnen; ~35% wordt order, ~90% daarvan heeft een betaling
+  - domain events: quote.created / quote.converted / order.created (audittrail;
+    seller_sales_aggregates volgt via triggers uit quotes / sales_orders)
+
+Bedragen worden in centen (int) berekend en pas bij het schrijven geformatteerd.
+"""
+
+import base64
+import hashlib
+import os
+import random
+import re
+import unicodedata
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from benchmarks.datagen import reference as ref
+from benchmarks.datagen.spool import PartSpool, TableSpec, write_manifest
+
+CHUNK_CUSTOMERS = 50_000
+MAX_LINES_PER_QUOTE = 5
+VAT_PERCENT = 16
+# (min_qty, korting %) – prijsstaffels per product
+PRICE_TIERS = ((1, 0), (5, 5), (10, 8), (25, 12))
+BENCH_PASSWORD = "Bench1234!xyz"
+
+_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_scale(value: str) -> int:
+    """"10k" → 10000, "2.5m" → 2500000, "1234" → 1234."""
+    text = value.strip().lower().replace("_", "")
+    factor = _SUFFIXES.get(text[-1:], 1)
+    number = text[:-1] if factor > 1 else text
+    return int(float(number) * factor)
+
+
+@dataclass
+class Scale:
+    customers: int
+    quotes_per_customer: float = 1.5
+    order_ratio: float = 0.35
+    payment_ratio: float = 0.9
+    sellers: int = 0
+    products: int = 0
+    core_users: int = 0
+
+    def __post_init__(self) -> None:
+        self.sellers = self.sellers or max(10, min(5000, self.customers // 500))
+        self.products = self.products or max(50, min(5000, self.customers // 200))
+        self.core_users = self.core_users or max(10, min(2000, self.customers // 5000))
+
+    @property
+    def chunks(self) -> int:
+        return max(1, -(-self.customers // CHUNK_CUSTOMERS))
+
+    @property
+    def quotes_per_chunk(self) -> int:
+        """Vast id-bereik per chunk voor offertes (en afgeleid: orders, lijnen, events)."""
+        return int(CHUNK_CUSTOMERS * self.quotes_per_customer)
+
+    def customer_range(self, chunk: int) -> range:
+        return range(chunk * CHUNK_CUSTOMERS, min(self.customers, (chunk + 1) * CHUNK_CUSTOMERS))
+
+
+# -----------------------------------------------------
+# Tabellen (in laadvolgorde)
+# -----------------------------------------------------
+WEBSITE_CUSTOMERS = TableSpec("website", "customers", (
+    "id", "customer_uuid", "email", "hashed_password", "first_name", "last_name", "phone_number",
+    "customer_type", "description", "is_active", "is_admin", "company_name", "tax_id",
+    "address_street", "address_ext_number", "address_int_number", "address_neighborhood",
+    "address_city", "address_state", "address_postal_code", "address_country",
+    "created_at", "updated_at",
+))
+REGISTRATION_TOKENS = TableSpec("website", "registration_tokens", (
+    "id", "customer_id", "token", "expires_at", "used", "created_at",
+))
+SELLERS = TableSpec("verkoop", "sellers", (
+    "id", "seller_code", "internal_number", "first_name", "last_name", "email_work", "phone_mobile",
+    "address_line1", "postal_code", "city", "country", "region_code", "employment_type",
+    "max_discount_percent", "default_margin_target_percent", "is_active", "role",
+))
+CUSTOMER_SHADOWS = TableSpec("verkoop", "customer_shadows", (
+    "id", "website_customer_id", "email", "first_name", "last_name", "phone_number",
+    "customer_type", "description", "company_name", "tax_id",
+    "address_street", "address_ext_number", "address_int_number", "address_neighborhood",
+    "address_city", "address_state", "address_postal_code", "address_country",
+    "is_active", "source", "created_at", "updated_at",
+))
+ASSIGNMENTS = TableSpec("verkoop", "customer_seller_assignments", (
+    "id", "customer_id", "seller_id", "assigned_at", "assigned_by", "unassigned_at",
+))
+PRODUCTS = TableSpec("verkoop", "product_catalog", ("id", "sku", "name", "base_price", "vat_rate"))
+PRICE_RULES = TableSpec("verkoop", "price_rules", ("id", "product_id", "min_qty", "discount_percent"))
+QUOTES = TableSpec("verkoop", "quotes", (
+    "id", "quote_no", "version", "customer_id", "seller_id", "currency", "subtotal", "vat", "total", "status",
+    "created_at",
+))
+QUOTE_LINES = TableSpec("verkoop", "quote_lines", (
+    "id", "quote_id", "product_id", "qty", "unit_price", "discount_percent", "line_total",
+))
+ORDERS = TableSpec("verkoop", "sales_orders", (
+    "id", "order_no", "customer_id", "seller_id", "seller_book_no", "currency",
+    "subtotal", "vat", "total", "status", "created_at",
+))
+ORDER_LINES = TableSpec("verkoop", "sales_order_lines", (
+    "id", "order_id", "product_id", "qty", "unit_price", "discount_percent", "line_total",
+))
+PAYMENTS = TableSpec("verkoop", "payment_intents", (
+    "id", "order_id", "provider", "intent_id", "amount", "currency", "status", "metadata",
+))
+DOMAIN_EVENTS = TableSpec("verkoop", "domain_events", (
+    "id", "event_type", "entity_type", "entity_id", "payload_json", "created_at",
+))
+# Geen expliciete ids en niet truncaten: de seed-gebruikers uit alembic 0001 bestaan al
+CORE_USERS = TableSpec("core", "users", (
+    "email", "full_name", "hashed_password", "role", "is_active", "twofa_enabled", "twofa_secret",
+), truncate=False)
+
+TABLES: Tuple[TableSpec, ...] = (
+    WEBSITE_CUSTOMERS, REGISTRATION_TOKENS,
+    SELLERS, CUSTOMER_SHADOWS, ASSIGNMENTS, PRODUCTS, PRICE_RULES,
+    QUOTES, QUOTE_LINES, ORDERS, ORDER_LINES, PAYMENTS, DOMAIN_EVENTS,
+    CORE_USERS,
+)
+
+
+# -----------------------------------------------------
+# Hulpfuncties
+# -----------------------------------------------------
+def _rng(seed: int, stream: str, chunk: int = 0) -> random.Random:
+    digest = hashlib.sha256(f"{seed}:{stream}:{chunk}".encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _slug(value: str) -> str:
+    ascii_value = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "", ascii_value.lower())
+
+
+def _money(cents: int) -> str:
+    return f"{cents // 100}.{cents % 100:02d}"
+
+
+def _percent_of(cents: int, percent: int) -> int:
+    """Afgerond (half-up) percentage van een bedrag in centen."""
+    return (cents * percent + 50) // 100
+
+
+# Steden met gewichten (grote steden vaker)
+_CITY_TABLE: List[Tuple[str, str, str, str]] = []
+_CITY_WEIGHTS: List[int] = []
+for _state, _region, _cities in ref.STATES:
+    for _city, _prefix, _weight in _cities:
+        _CITY_TABLE.append((_state, _region, _city, _prefix))
+        _CITY_WEIGHTS.append(_weight)
+
+
+class Address(NamedTuple):
+    street: str
+    ext_number: str
+    int_number: Optional[str]
+    neighborhood: str
+    city: str
+    state: str
+    region_code: str
+    postal_code: str
+
+
+def _address(rng: random.Random) -> Address:
+    state, region, city, prefix = rng.choices(_CITY_TABLE, _CITY_WEIGHTS)[0]
+    return Address(
+        street=rng.choice(ref.STREETS),
+        ext_number=str(rng.randint(1, 3999)),
+        int_number=f"{rng.randint(1, 20)}{rng.choice('ABCD')}" if rng.random() < 0.25 else None,
+        neighborhood=rng.choice(ref.NEIGHBORHOODS),
+        city=city,
+        state=state,
+        region_code=region,
+        postal_code=(prefix + f"{rng.randrange(100000):05d}")[:5],
+    )
+
+
+def _phone(rng: random.Random) -> str:
+    return f"+52 {rng.randint(22, 99)} {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}"
+
+
+def _rfc(rng: random.Random, company: bool) -> str:
+    """RFC-achtige fiscale id (3 letters voor bedrijven, 4 voor personen)."""
+    letters = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(3 if company else 4))
+    birth = f"{rng.randint(50, 99):02d}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+    return f"{letters}{birth}{rng.choice('ABCDEFGH')}{rng.randint(1, 9)}{rng.choice('ABCDEFGH')}"
+
+
+def window_for(anchor: date, months: int) -> Tuple[datetime, datetime]:
+    """[anker − months (eerste van de maand), anker) als tz-aware UTC-datums."""
+    end = datetime(anchor.year, anchor.month, anchor.day, tzinfo=timezone.utc)
+    index = anchor.year * 12 + (anchor.month - 1) - months
+    start = datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+    return start, end
+
+
+def _segment(window: Tuple[datetime, datetime], scale: Scale, chunk: int) -> Tuple[datetime, int]:
+    """Begin en lengte (seconden) van het tijdsegment van een chunk."""
+    start, end = window
+    total = int((end - start).total_seconds())
+    seg_start = total * chunk // scale.chunks
+    seg_end = total * (chunk + 1) // scale.chunks
+    return start + timedelta(seconds=seg_start), max(1, seg_end - seg_start)
+
+
+# -----------------------------------------------------
+# Wachtwoord-hashes (één keer berekend, gedeeld door alle rijen)
+# -----------------------------------------------------
+def _ab64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode().rstrip("=").replace("+", ".")
+
+
+def pbkdf2_sha256_hash(password: str, seed: int, rounds: int = 29000) -> str:
+    """passlib-compatibele pbkdf2_sha256-hash (core accepteert dit schema naast bcrypt)."""
+    salt = hashlib.sha256(f"{seed}:salt".encode()).digest()[:16]
+    checksum = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, rounds, 32)
+    return f"$pbkdf2-sha256${rounds}${_ab64(salt)}${_ab64(checksum)}"
+
+
+def bcrypt_hash(password: str, seed: int) -> Optional[str]:
+    """bcrypt-hash voor de website (die enkel bcrypt kent); None zonder bcrypt-package."""
+    try:
+        import bcrypt
+    except ImportError:
+        return None
+    rng = _rng(seed, "bcrypt")
+    alphabet = "./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+    # vaste salt → deterministische output; laatste teken heeft nul-padding-bits
+    salt = "".join(rng.choice(alphabet) for _ in range(21)) + rng.choice(".Oeu")
+    return bcrypt.hashpw(password.encode(), f"$2b$12${salt}".encode()).decode()
+
+
+# -----------------------------------------------------
+# Klanten (website + shadow in verkoop)
+# -----------------------------------------------------
+class Customer(NamedTuple):
+    index: int
+    id: uuid.UUID
+    customer_uuid: uuid.UUID
+    email: str
+    first_name: str
+    last_name: str
+    phone: str
+    company_name: Optional[str]
+    tax_id: Optional[str]
+    address: Address
+    is_active: bool
+    created_at: datetime
+
+
+def iter_customers(seed: int, scale: Scale, window, chunk: int) -> Iterator[Customer]:
+    rng = _rng(seed, "customers", chunk)
+    seg_start, seg_seconds = _segment(window, scale, chunk)
+    indexes = scale.customer_range(chunk)
+    for n, i in enumerate(indexes):
+        first = rng.choice(ref.FIRST_NAMES)
+        last = f"{rng.choice(ref.LAST_NAMES)} {rng.choice(ref.LAST_NAMES)}"
+        company = rng.random() < 0.3
+        company_name = (
+            f"{rng.choice(ref.COMPANY_WORDS)} {last.split()[0]} {rng.choice(ref.COMPANY_SUFFIXES)}"
+            if company
+            else None
+        )
+        yield Customer(
+            index=i,
+            id=uuid.UUID(int=rng.getrandbits(128), version=4),
+            customer_uuid=uuid.UUID(int=rng.getrandbits(128), version=4),
+            # "bench<index>" houdt e-mails uniek en vindbaar voor de scenario's
+            email=f"bench{i:07d}.{_slug(first)}.{_slug(last.split()[0])}@{rng.choice(ref.EMAIL_DOMAINS)}",
+            first_name=first,
+            last_name=last,
+            phone=_phone(rng),
+            company_name=company_name,
+            tax_id=_rfc(rng, company) if company or rng.random() < 0.2 else None,
+            address=_address(rng),
+            is_active=rng.random() < 0.85,
+            # oplopend in de tijd, met wat jitter binnen het segment
+            created_at=seg_start + timedelta(seconds=seg_seconds * n // len(indexes) + rng.randrange(60)),
+        )
+
+
+def _customer_type(c: Customer) -> str:
+    return "bedrijf" if c.company_name else "particulier"
+
+
+def write_website(spool: PartSpool, seed: int, scale: Scale, window, chunk: int, password_hash: Optional[str]) -> None:
+    customers = spool.table(WEBSITE_CUSTOMERS)
+    tokens = spool.table(REGISTRATION_TOKENS)
+    rng = _rng(seed, "registration_tokens", chunk)
+    for c in iter_customers(seed, scale, window, chunk):
+        a = c.address
+        customers.write((
+            c.id, c.customer_uuid, c.email, password_hash if c.is_active else None,
+            c.first_name, c.last_name, c.phone, _customer_type(c), None, c.is_active, False,
+            c.company_name, c.tax_id, a.street, a.ext_number, a.int_number, a.neighborhood,
+            a.city, a.state, a.postal_code, "Mexico", c.created_at, c.created_at,
+        ))
+        # Tokenhistoriek: actieve klanten hebben hun laatste token gebruikt;
+        # oudere tokens zijn vervallen, inactieve klanten hebben (soms) een open token.
+        issued = c.created_at
+        for n in range(rng.choice((0, 1, 1, 1, 2, 3))):
+            tokens.write((
+                uuid.UUID(int=rng.getrandbits(128), version=4),
+                c.id,
+                f"{rng.getrandbits(192):048x}",
+                issued + timedelta(hours=48),
+                c.is_active and n == 0,
+                issued,
+            ))
+            issued -= timedelta(days=rng.randint(3, 60))
+
+
+def seller_for(seed: int, customer_no: int, sellers: int) -> int:
+    """Actieve verkoper (sellers.id) van klant `customer_no` (1-based), zonder opslag."""
+    return (customer_no * 2654435761 + seed * 40503) % sellers + 1
+
+
+def write_verkoop_customers(spool: PartSpool, seed: int, scale: Scale, window, chunk: int) -> None:
+    shadows = spool.table(CUSTOMER_SHADOWS)
+    assignments = spool.table(ASSIGNMENTS)
+    rng = _rng(seed, "assignments", chunk)
+    # max. twee assignments per klant → vast id-bereik per chunk
+    assignment_id = chunk * CHUNK_CUSTOMERS * 2
+    for c in iter_customers(seed, scale, window, chunk):
+        a = c.address
+        shadow_id = c.index + 1
+        synced_at = c.created_at + timedelta(minutes=rng.randint(1, 600))
+        shadows.write((
+            shadow_id, str(c.id), c.email, c.first_name, c.last_name, c.phone,
+            _customer_type(c), None, c.company_name, c.tax_id,
+            a.street, a.ext_number, a.int_number, a.neighborhood, a.city, a.state,
+            a.postal_code, "Mexico", c.is_active, "website_form", synced_at, synced_at,
+        ))
+        active_seller = seller_for(seed, shadow_id, scale.sellers)
+        assigned_at = synced_at
+        if rng.random() < 0.15:
+            moved_at = synced_at + timedelta(days=rng.randint(10, 200))
+            assignment_id += 1
+            assignments.write((
+                assignment_id, shadow_id, active_seller % scale.sellers + 1, synced_at, "sync", moved_at,
+            ))
+            assigned_at = moved_at
+        assignment_id += 1
+        assignments.write((assignment_id, shadow_id, active_seller, assigned_at, "sync", None))
+
+
+# -----------------------------------------------------
+# Verkopers en catalogus
+# -----------------------------------------------------
+class Seller(NamedTuple):
+    id: int
+    max_discount: int
+
+
+class Product(NamedTuple):
+    id: int
+    price_cents: int
+
+
+def build_sellers(seed: int, scale: Scale, spool: Optional[PartSpool] = None) -> List[Seller]:
+    """Verkopers; schrijft ze weg als er een spool is (de chunks hebben enkel de lijst nodig)."""
+    table = spool.table(SELLERS) if spool else None
+    rng = _rng(seed, "sellers")
+    sellers = []
+    for i in range(1, scale.sellers + 1):
+        first = rng.choice(ref.FIRST_NAMES)
+        last = rng.choice(ref.LAST_NAMES)
+        a = _address(rng)
+        max_discount = rng.choice((5, 10, 10, 15, 20))
+        row = (
+            i, f"BENCH-{i:05d}", f"V{i:05d}", first, last,
+            f"seller{i:05d}.{_slug(last)}@casuse.mx", _phone(rng),
+            f"{a.street} {a.ext_number}", a.postal_code, a.city, "MX", a.region_code,
+            rng.choice(("internal", "external")), max_discount, rng.choice((20, 25, 30)),
+            rng.random() < 0.95, "manager" if i % 25 == 0 else "seller",
+        )
+        if table:
+            table.write(row)
+        sellers.append(Seller(i, max_discount))
+    return sellers
+
+
+def build_catalog(seed: int, scale: Scale, spool: Optional[PartSpool] = None) -> List[Product]:
+    products = spool.table(PRODUCTS) if spool else None
+    rules = spool.table(PRICE_RULES) if spool else None
+    rng = _rng(seed, "catalog")
+    result = []
+    for i in range(1, scale.products + 1):
+        code, family, base = rng.choice(ref.PRODUCT_FAMILIES)
+        finish = rng.choice(ref.PRODUCT_FINISHES)
+        size = rng.choice(ref.PRODUCT_SIZES)
+        price_cents = int(base * 100 * rng.uniform(0.7, 1.8))
+        if products:
+            products.write((i, f"{code}-{i:05d}", f"{family} {size} {finish}", _money(price_cents), f"{VAT_PERCENT}.00"))
+            for n, (min_qty, discount) in enumerate(PRICE_TIERS):
+                rules.write(((i - 1) * len(PRICE_TIERS) + n + 1, i, min_qty, discount))
+        result.append(Product(i, price_cents))
+    return result
+
+
+def _tier_discount(qty: int) -> int:
+    discount = 0
+    for min_qty, tier in PRICE_TIERS:
+        if qty >= min_qty:
+            discount = tier
+    return discount
+
+
+# -----------------------------------------------------
+# Offertes, orders, betalingen en domain events
+# -----------------------------------------------------
+# "accepted" enkel voor offertes die een order worden
+QUOTE_STATUSES = ("draft", "sent", "sent", "rejected", "expired")
+PAYMENT_PROVIDERS = ("stripe", "conekta", "openpay")
+
+
+def write_sales(
+    spool: PartSpool,
+    seed: int,
+    scale: Scale,
+    window,
+    chunk: int,
+    sellers: List[Seller],
+    products: List[Product],
+) -> None:
+    quotes = spool.table(QUOTES)
+    quote_lines = spool.table(QUOTE_LINES)
+    orders = spool.table(ORDERS)
+    order_lines = spool.table(ORDER_LINES)
+    payments = spool.table(PAYMENTS)
+    events = spool.table(DOMAIN_EVENTS)
+
+    rng = _rng(seed, "sales", chunk)
+    seg_start, seg_seconds = _segment(window, scale, chunk)
+    window_end = window[1]
+
+    # Vaste id-bereiken per chunk (gaten zijn toegestaan)
+    per_chunk = scale.quotes_per_chunk
+    quote_id = order_id = payment_id = chunk * per_chunk
+    quote_line_id = order_line_id = chunk * per_chunk * MAX_LINES_PER_QUOTE
+    event_id = chunk * per_chunk * 3
+
+    # Offertes enkel voor klanten die op dat moment al bestaan
+    known_customers = scale.customer_range(chunk).stop
+    count = int(len(scale.customer_range(chunk)) * scale.quotes_per_customer)
+    product_count = len(products)
+
+    for n in range(count):
+        quote_id += 1
+        customer_id = rng.randrange(known_customers) + 1
+        seller = sellers[seller_for(seed, customer_id, scale.sellers) - 1]
+        created_at = seg_start + timedelta(seconds=seg_seconds * n // count + rng.randrange(60))
+
+        lines = []
+        subtotal = 0
+        max_discount = 0
+        for _ in range(rng.choice((1, 1, 2, 2, 3, 4, MAX_LINES_PER_QUOTE))):
+            # paretoverdeling: een kleine groep producten domineert de verkoop
+            product = products[int(rng.paretovariate(1.2)) % product_count]
+            qty = rng.choice((1, 1, 2, 3, 4, 6, 10, 12, 25, 40))
+            discount = min(_tier_discount(qty) + rng.choice((0, 0, 0, 2, 5)), seller.max_discount)
+            gross = product.price_cents * qty
+            line_total = gross - _percent_of(gross, discount)
+            lines.append((product.id, qty, _money(product.price_cents), discount, _money(line_total)))
+            subtotal += line_total
+            max_discount = max(max_discount, discount)
+        vat = _percent_of(subtotal, VAT_PERCENT)
+        total = _money(subtotal + vat)
+
+        converted = rng.random() < scale.order_ratio
+        quotes.write((
+            quote_id, f"Q-{created_at.year}-{quote_id:08d}", 1, customer_id, seller.id, "MXN",
+            _money(subtotal), _money(vat), total, "accepted" if converted else rng.choice(QUOTE_STATUSES),
+            created_at,
+        ))
+        for product_id, qty, unit_price, discount, line_total in lines:
+            quote_line_id += 1
+            quote_lines.write((quote_line_id, quote_id, product_id, qty, unit_price, discount, line_total))
+        event_id += 1
+        events.write((
+            event_id, "quote.created", "quote", str(quote_id),
+            {"seller_id": seller.id, "total": total, "discount_percent": str(max_discount)},
+            created_at,
+        ))
+
+        if not converted:
+            continue
+
+        order_id += 1
+        ordered_at = min(window_end, created_at + timedelta(days=rng.randint(0, 20), seconds=rng.randrange(86400)))
+        order_no = f"SO-{ordered_at.year}-{order_id:08d}"
+        paid = rng.random() < scale.payment_ratio
+        orders.write((
+            order_id, order_no, customer_id, seller.id, f"B{seller.id:05d}-{order_id:08d}", "MXN",
+            _money(subtotal), _money(vat), total,
+            rng.choice(("paid", "in_production", "delivered")) if paid else "created",
+            ordered_at,
+        ))
+        for product_id, qty, unit_price, discount, line_total in lines:
+            order_line_id += 1
+            order_lines.write((order_line_id, order_id, product_id, qty, unit_price, discount, line_total))
+        events.write((event_id + 1, "quote.converted", "quote", str(quote_id), {"seller_id": seller.id}, ordered_at))
+        events.write((
+            event_id + 2, "order.created", "sales_order", str(order_id),
+            {"seller_id": seller.id, "total": total, "discount_percent": str(max_discount)},
+            ordered_at,
+        ))
+        event_id += 2
+
+        if paid or rng.random() < 0.5:
+            payment_id += 1
+            provider = rng.choice(PAYMENT_PROVIDERS)
+            payments.write((
+                payment_id, order_id, provider, f"{provider[:2]}_{rng.getrandbits(96):024x}", total, "MXN",
+                "succeeded" if paid else rng.choice(("requires_payment_method", "processing", "canceled")),
+                {"order_no": order_no, "channel": rng.choice(("web", "store", "phone"))},
+            ))
+
+
+# -----------------------------------------------------
+# Core
+# -----------------------------------------------------
+CORE_ROLES = ("seller", "seller", "seller", "warehouse", "manager", "website")
+
+
+def write_core(spool: PartSpool, seed: int, scale: Scale, password_hash: str) -> None:
+    table = spool.table(CORE_USERS)
+    rng = _rng(seed, "core_users")
+    for i in range(scale.core_users):
+        first = rng.choice(ref.FIRST_NAMES)
+        last = rng.choice(ref.LAST_NAMES)
+        table.write((
+            f"bench.user{i:05d}@casuse.mx", f"{first} {last}", password_hash,
+            rng.choice(CORE_ROLES), rng.random() < 0.95, False, None,
+        ))
+
+
+# -----------------------------------------------------
+# Orkestratie
+# -----------------------------------------------------
+BASE_PART = "base"
+
+
+def _generate_part(
+    out_dir: Path,
+    part: str,
+    seed: int,
+    scale: Scale,
+    targets: Sequence[str],
+    window,
+    hashes: Dict[str, Optional[str]],
+) -> Tuple[str, Dict[Tuple[str, str], int]]:
+    spool = PartSpool(out_dir, part)
+    if part == BASE_PART:
+        # kleine referentietabellen: één keer
+        if "verkoop" in targets:
+            build_sellers(seed, scale, spool)
+            build_catalog(seed, scale, spool)
+        if "core" in targets:
+            write_core(spool, seed, scale, hashes["core"])
+    else:
+        chunk = int(part)
+        if "website" in targets:
+            write_website(spool, seed, scale, window, chunk, hashes["website"])
+        if "verkoop" in targets:
+            write_verkoop_customers(spool, seed, scale, window, chunk)
+            write_sales(
+                spool, seed, scale, window, chunk, build_sellers(seed, scale), build_catalog(seed, scale)
+            )
+    return part, spool.close()
+
+
+def generate(
+    out_dir: Path,
+    seed: int,
+    scale: Scale,
+    targets: Sequence[str],
+    anchor: date,
+    months: int = 24,
+    jobs: int = 0,
+) -> Dict:
+    """Schrijf alle spoolbestanden + manifest.json voor de gevraagde databases.
+
+    Chunks worden over `jobs` processen verdeeld (0 = aantal CPU's); het
+    resultaat hangt daar niet van af.
+    """
+    window = window_for(anchor, months)
+    hashes = {
+        "website": bcrypt_hash(BENCH_PASSWORD, seed) if "website" in targets else None,
+        "core": pbkdf2_sha256_hash(BENCH_PASSWORD, seed) if "core" in targets else None,
+    }
+    parts = [BASE_PART] + [f"{chunk:05d}" for chunk in range(scale.chunks)]
+    args = [(out_dir, part, seed, scale, targets, window, hashes) for part in parts]
+
+    jobs = min(jobs or os.cpu_count() or 1, len(parts))
+    if jobs <= 1:
+        results = [_generate_part(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_generate_part, *zip(*args)))
+
+    return write_manifest(
+        out_dir,
+        TABLES,
+        results,
+        {
+            "seed": seed,
+            "scale": asdict(scale),
+            "targets": list(targets),
+            "window": {"start": window[0].isoformat(), "end": window[1].isoformat()},
+        },
+    )
@@ -0,0 +1,194 @@
+# benchmarks/datagen/loader.py
+"""
+Bulk-load van de spoolbestanden met `COPY ... FROM STDIN` (psycopg 3).
+
+Per database één transactie, databases parallel (één thread per database):
+  - tabellen die niet bestaan worden overgeslagen (waarschuwing), kolommen die
+    het schema niet kent worden uit de stroom gefilterd
+  - partitioned tables (domain_events): maandpartities <tabel>_pYYYYMM voor het
+    gegenereerde tijdvenster worden eerst aangemaakt
+  - met truncate=True: TRUNCATE + COPY FREEZE in dezelfde transactie (geen
+    aparte VACUUM/hint-bit-pass nadien); niet voor partitioned tables
+  - sequences worden nadien op max(id) gezet, gevolgd door ANALYZE
+"""
+
+import logging
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+import psycopg
+from psycopg import sql
+
+logger = logging.getLogger("benchmarks.datagen")
+
+CHUNK_BYTES = 1 << 20
+
+
+def _schema(cur) -> Dict[str, Set[str]]:
+    cur.execute(
+        "SELECT table_name, column_name FROM information_schema.columns WHERE table_schema = 'public'"
+    )
+    tables: Dict[str, Set[str]] = {}
+    for table, column in cur.fetchall():
+        tables.setdefault(table, set()).add(column)
+    return tables
+
+
+def _partitioned(cur) -> Set[str]:
+    cur.execute(
+        """
+        SELECT c.relname FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relnamespace = 'public'::regnamespace
+        """
+    )
+    return {row[0] for row in cur.fetchall()}
+
+
+def _months(start: date, end: date) -> List[date]:
+    months = []
+    month = date(start.year, start.month, 1)
+    while month <= end:
+        months.append(month)
+        month = date(month.year + (month.month == 12), month.month % 12 + 1, 1)
+    return months
+
+
+def _ensure_partitions(cur, table: str, start: date, end: date) -> None:
+    for month in _months(start, end):
+        following = date(month.year + (month.month == 12), month.month % 12 + 1, 1)
+        cur.execute(
+            sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM ({}) TO ({})").format(
+                sql.Identifier(f"{table}_p{month.year:04d}{month.month:02d}"),
+                sql.Identifier(table),
+                sql.Literal(month.isoformat()),
+                sql.Literal(following.isoformat()),
+            )
+        )
+
+
+def _copy_file(cur, table: str, columns: List[str], keep: List[int], path: Path, freeze: bool) -> None:
+    statement = sql.SQL("COPY {} ({}) FROM STDIN{}").format(
+        sql.Identifier(table),
+        sql.SQL(", ").join(sql.Identifier(columns[i]) for i in keep),
+        sql.SQL(" WITH (FREEZE)") if freeze else sql.SQL(""),
+    )
+    with cur.copy(statement) as copy, open(path, "r", encoding="utf-8") as fh:
+        if len(keep) == len(columns):
+            while chunk := fh.read(CHUNK_BYTES):
+                copy.write(chunk)
+            return
+        # kolommen filteren: tabs in waarden zijn ge-escaped, split is dus veilig
+        for line in fh:
+            fields = line.rstrip("\n").split("\t")
+            copy.write("\t".join(fields[i] for i in keep) + "\n")
+
+
+def _reset_sequence(cur, table: str) -> None:
+    cur.execute("SELECT pg_get_serial_sequence(%s, 'id')", (table,))
+    sequence = cur.fetchone()[0]
+    if sequence is None:
+        return
+    cur.execute(
+        sql.SQL("SELECT setval(%s, GREATEST((SELECT max(id) FROM {}), 1))").format(sql.Identifier(table)),
+        (sequence,),
+    )
+
+
+def load_database(
+    dsn: str,
+    database: str,
+    out_dir: Path,
+    tables: List[Dict[str, Any]],
+    window: Dict[str, str],
+    truncate: bool = False,
+) -> Dict[str, int]:
+    """Laad de spoolbestanden van één database; geeft geladen rijen per tabel terug."""
+    loaded: Dict[str, int] = {}
+    start = datetime.fromisoformat(window["start"]).date()
+    end = datetime.fromisoformat(window["end"]).date()
+
+    with psycopg.connect(dsn) as conn, conn.cursor() as cur:
+        cur.execute("SET LOCAL synchronous_commit = off")
+        schema = _schema(cur)
+        partitioned = _partitioned(cur)
+
+        present = []
+        for entry in tables:
+            table = entry["table"]
+            if table not in schema:
+                logger.warning("[%s] tabel %s bestaat niet, overgeslagen", database, table)
+                continue
+            present.append(entry)
+
+        to_truncate = [e["table"] for e in present if truncate and e.get("truncate", True)]
+        if to_truncate:
+            cur.execute(
+                sql.SQL("TRUNCATE {} RESTART IDENTITY CASCADE").format(
+                    sql.SQL(", ").join(sql.Identifier(t) for t in to_truncate)
+                )
+            )
+
+        for entry in present:
+            table, columns = entry["table"], entry["columns"]
+            keep = [i for i, col in enumerate(columns) if col in schema[table]]
+            dropped = [col for col in columns if col not in schema[table]]
+            if dropped:
+                logger.warning("[%s] %s: kolommen %s ontbreken, gefilterd", database, table, ", ".join(dropped))
+            if table in partitioned:
+                _ensure_partitions(cur, table, start, end)
+
+            started = time.perf_counter()
+            freeze = table in to_truncate and table not in partitioned
+            for name in entry["files"]:
+                _copy_file(cur, table, columns, keep, out_dir / name, freeze)
+            if "id" in columns and "id" in schema[table]:
+                _reset_sequence(cur, table)
+            loaded[table] = entry["rows"]
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "[%s] %s: %d rijen in %.1fs (%.0f rijen/s)",
+                database, table, entry["rows"], elapsed, entry["rows"] / elapsed if elapsed else 0,
+            )
+        conn.commit()
+
+        # ANALYZE buiten de load-transactie: planner-statistieken voor de benchmarks
+        conn.autocommit = True
+        for entry in present:
+            cur.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(entry["table"])))
+    return loaded
+
+
+def load_all(manifest: Dict[str, Any], out_dir: Path, dsns: Dict[str, str], truncate: bool = False) -> Dict[str, Any]:
+    """Laad alle databases uit het manifest parallel; enkel die met een DSN."""
+    results: Dict[str, Any] = {}
+    errors: Dict[str, BaseException] = {}
+
+    def _run(database: str, tables: List[Dict[str, Any]]) -> None:
+        try:
+            results[database] = load_database(
+                dsns[database], database, out_dir, tables, manifest["window"], truncate
+            )
+        except BaseException as exc:  # doorgeven aan de hoofdthread
+            errors[database] = exc
+
+    threads = [
+        threading.Thread(target=_run, args=(database, tables), name=f"load-{database}")
+        for database, tables in manifest["databases"].items()
+        if dsns.get(database)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        database, exc = next(iter(errors.items()))
+        raise RuntimeError(f"laden van {database} mislukt: {exc}") from exc
+    return results
+
+
+def target_dsns(targets: List[str], overrides: Dict[str, Optional[str]], default) -> Dict[str, str]:
+    return {target: overrides.get(target) or default(target) for target in targets}
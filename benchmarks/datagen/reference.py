@@ -0,0 +1,55 @@
+# benchmarks/datagen/reference.py
+"""Referentiedata: Mexicaanse namen, staten, steden, postcodes en producten."""
+
+FIRST_NAMES = [
+    "José", "Juan", "Luis", "Carlos", "Miguel", "Jorge", "Francisco", "Alejandro", "Fernando", "Ricardo",
+    "Eduardo", "Roberto", "Daniel", "Javier", "Sergio", "Antonio", "Manuel", "Arturo", "Raúl", "Héctor",
+    "María", "Guadalupe", "Ana", "Sofía", "Lucía", "Fernanda", "Gabriela", "Verónica", "Patricia", "Laura",
+    "Alejandra", "Claudia", "Mariana", "Elena", "Daniela", "Adriana", "Rosa", "Leticia", "Isabel", "Valeria",
+]
+LAST_NAMES = [
+    "Hernández", "García", "Martínez", "López", "González", "Pérez", "Rodríguez", "Sánchez", "Ramírez",
+    "Cruz", "Flores", "Gómez", "Morales", "Vázquez", "Reyes", "Jiménez", "Torres", "Díaz", "Gutiérrez",
+    "Ruiz", "Mendoza", "Aguilar", "Ortiz", "Moreno", "Castillo", "Romero", "Álvarez", "Méndez", "Chávez",
+    "Rivera", "Juárez", "Ramos", "Domínguez", "Herrera", "Medina", "Castro", "Vargas", "Guzmán", "Velázquez",
+]
+
+# (staat, regiocode, [(stad, postcode-prefix van 2 cijfers, gewicht)])
+STATES = [
+    ("Ciudad de México", "MX-CMX", [("Ciudad de México", "06", 30)]),
+    ("Jalisco", "MX-JAL", [("Guadalajara", "44", 12), ("Zapopan", "45", 8), ("Puerto Vallarta", "48", 2)]),
+    ("Nuevo León", "MX-NLE", [("Monterrey", "64", 12), ("San Pedro Garza García", "66", 4)]),
+    ("Estado de México", "MX-MEX", [("Toluca", "50", 6), ("Naucalpan", "53", 6), ("Ecatepec", "55", 6)]),
+    ("Puebla", "MX-PUE", [("Puebla", "72", 6)]),
+    ("Querétaro", "MX-QUE", [("Querétaro", "76", 5)]),
+    ("Guanajuato", "MX-GUA", [("León", "37", 5), ("Irapuato", "36", 2)]),
+    ("Yucatán", "MX-YUC", [("Mérida", "97", 4)]),
+    ("Baja California", "MX-BCN", [("Tijuana", "22", 5), ("Mexicali", "21", 2)]),
+    ("Quintana Roo", "MX-ROO", [("Cancún", "77", 4)]),
+    ("Veracruz", "MX-VER", [("Veracruz", "91", 3), ("Xalapa", "91", 2)]),
+    ("Chihuahua", "MX-CHH", [("Chihuahua", "31", 2), ("Ciudad Juárez", "32", 3)]),
+]
+
+NEIGHBORHOODS = [
+    "Centro", "Del Valle", "Roma Norte", "Condesa", "Polanco", "Jardines del Bosque", "Providencia",
+    "Chapultepec", "Las Águilas", "San Ángel", "Coyoacán", "Narvarte", "Lomas", "Industrial", "Santa Fe",
+]
+STREETS = [
+    "Av. Insurgentes", "Av. Reforma", "Calle Hidalgo", "Calle Morelos", "Av. Juárez", "Calle Allende",
+    "Av. López Mateos", "Calle Independencia", "Av. Vallarta", "Calle Zaragoza", "Av. Universidad",
+]
+COMPANY_SUFFIXES = ["S.A. de C.V.", "S. de R.L. de C.V.", "S.C."]
+COMPANY_WORDS = ["Aluminios", "Ventanas", "Construcciones", "Vidrios", "Desarrollos", "Inmobiliaria", "Cancelería"]
+EMAIL_DOMAINS = ["gmail.com", "hotmail.com", "outlook.com", "yahoo.com.mx", "prodigy.net.mx"]
+
+PRODUCT_FAMILIES = [
+    ("VEN", "Ventana corrediza", 2800),
+    ("VAB", "Ventana abatible", 3400),
+    ("PUE", "Puerta de aluminio", 6900),
+    ("CAN", "Cancel de baño", 4200),
+    ("FAC", "Fachada de cristal", 18500),
+    ("MOS", "Mosquitero", 650),
+    ("DOM", "Domo acrílico", 2300),
+]
+PRODUCT_FINISHES = ["blanco", "natural", "negro", "champagne", "madera"]
+PRODUCT_SIZES = ["60x60", "80x100", "100x120", "120x150", "150x180", "200x220"]
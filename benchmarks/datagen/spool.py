@@ -0,0 +1,143 @@
+# benchmarks/datagen/spool.py
+"""
+Spoolbestanden in COPY-tekstformaat.
+
+De generator schrijft elke tabel in delen naar `<out>/<database>/<tabel>/<deel>.copy`
+(één deel per chunk van CHUNK_CUSTOMERS klanten, zodat chunks parallel gegenereerd
+kunnen worden); de loader streamt die bestanden ongewijzigd naar
+`COPY <tabel> (kolommen) FROM STDIN`.
+
+manifest.json beschrijft per database de tabellen in laadvolgorde (FK-volgorde),
+met hun kolommen, delen, aantal rijen en of ze bij --truncate geleegd mogen worden.
+"""
+
+import json
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+NULL = "\\N"
+_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+class TableSpec(NamedTuple):
+    database: str
+    table: str
+    columns: Tuple[str, ...]
+    # False: tabel bevat ook niet-gegenereerde rijen (bv. core.users)
+    truncate: bool = True
+
+
+def _text(value: str) -> str:
+    # escapen enkel als nodig (\t \n \r zijn niet printable); translate is relatief duur
+    if "\\" in value or not value.isprintable():
+        return value.translate(_ESCAPES)
+    return value
+
+
+def _json(value: Any) -> str:
+    return _text(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+
+
+# Opzoeking op exact type i.p.v. een isinstance-keten: dit is de hot path
+_FORMATTERS = {
+    str: _text,
+    int: str,
+    float: repr,
+    bool: lambda value: "t" if value else "f",
+    type(None): lambda value: NULL,
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+    dict: _json,
+    list: _json,
+}
+
+
+def copy_field(value: Any) -> str:
+    formatter = _FORMATTERS.get(type(value))
+    if formatter is None:
+        return _text(str(value))
+    return formatter(value)
+
+
+class PartWriter:
+    """Buffered writer voor één deel van één tabel."""
+
+    def __init__(self, path: Path, buffer_rows: int = 5000) -> None:
+        self.path = path
+        self.rows = 0
+        self._buffer: List[str] = []
+        self._buffer_rows = buffer_rows
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(path, "w", encoding="utf-8", newline="\n")
+
+    def write(self, row: Sequence[Any]) -> None:
+        self._buffer.append("\t".join(map(copy_field, row)))
+        self.rows += 1
+        if len(self._buffer) >= self._buffer_rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            self._fh.write("\n".join(self._buffer))
+            self._fh.write("\n")
+            self._buffer.clear()
+
+    def close(self) -> None:
+        self._flush()
+        self._fh.close()
+
+
+class PartSpool:
+    """De writers van één deel (chunk) over alle tabellen heen."""
+
+    def __init__(self, out_dir: Path, part: str) -> None:
+        self.out_dir = out_dir
+        self.part = part
+        self._writers: Dict[Tuple[str, str], PartWriter] = {}
+
+    def table(self, spec: TableSpec) -> PartWriter:
+        path = self.out_dir / spec.database / spec.table / f"{self.part}.copy"
+        writer = self._writers[(spec.database, spec.table)] = PartWriter(path)
+        return writer
+
+    def close(self) -> Dict[Tuple[str, str], int]:
+        rows = {}
+        for key, writer in self._writers.items():
+            writer.close()
+            rows[key] = writer.rows
+        return rows
+
+
+def write_manifest(
+    out_dir: Path,
+    specs: Iterable[TableSpec],
+    parts: Sequence[Tuple[str, Dict[Tuple[str, str], int]]],
+    meta: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Voeg de delen samen tot manifest.json (tabellen in de volgorde van `specs`)."""
+    manifest: Dict[str, Any] = {**meta, "databases": {}}
+    for spec in specs:
+        key = (spec.database, spec.table)
+        files = [
+            f"{spec.database}/{spec.table}/{part}.copy"
+            for part, rows in sorted(parts)
+            if key in rows
+        ]
+        if not files:
+            continue
+        manifest["databases"].setdefault(spec.database, []).append(
+            {
+                "table": spec.table,
+                "columns": list(spec.columns),
+                "files": files,
+                "rows": sum(rows.get(key, 0) for _, rows in parts),
+                "truncate": spec.truncate,
+            }
+        )
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def read_manifest(out_dir: Path) -> Dict[str, Any]:
+    return json.loads((out_dir / "manifest.json").read_text(encoding="utf-8"))
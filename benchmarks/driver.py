@@ -0,0 +1,103 @@
+# benchmarks/driver.py
+"""
+Closed-loop async load driver.
+
+`concurrency` workers voeren elk een scenario-iteratie na de andere uit tot
+de duur verstreken is. Metingen tijdens de warmup tellen niet mee.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+import httpx
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.recording = False
+        self.started_at = 0.0
+        self.stopped_at = 0.0
+
+    def start(self) -> None:
+        self.recording = True
+        self.started_at = time.perf_counter()
+
+    def stop(self) -> None:
+        self.recording = False
+        self.stopped_at = time.perf_counter()
+
+    async def call(self, step: str, coro) -> httpx.Response | None:
+        """Meet één HTTP-call; status >= 400 of een exception telt als fout."""
+        started = time.perf_counter()
+        try:
+            response = await coro
+        except httpx.HTTPError:
+            if self.recording:
+                self.errors[step] += 1
+            return None
+        elapsed = time.perf_counter() - started
+        if self.recording:
+            if response.status_code >= 400:
+                self.errors[step] += 1
+            else:
+                self.latencies[step].append(elapsed)
+        return response
+
+    def summary(self) -> Dict[str, Any]:
+        duration = max(self.stopped_at - self.started_at, 1e-9)
+        steps = {}
+        for step in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies.get(step, []))
+            count = len(values)
+            steps[step] = {
+                "count": count,
+                "errors": self.errors.get(step, 0),
+                "throughput_rps": round(count / duration, 2),
+                "mean_ms": round(sum(values) / count * 1000, 3) if count else 0.0,
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p90_ms": round(percentile(values, 90) * 1000, 3),
+                "p95_ms": round(percentile(values, 95) * 1000, 3),
+                "p99_ms": round(percentile(values, 99) * 1000, 3),
+                "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+            }
+        return {"duration_s": round(duration, 3), "steps": steps}
+
+
+async def run_scenario(scenario, concurrency: int, duration: float, warmup: float) -> Dict[str, Any]:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+    async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+        await scenario.setup(client)
+        loop_deadline = time.perf_counter() + warmup + duration
+
+        async def worker(worker_id: int) -> None:
+            iteration = 0
+            while time.perf_counter() < loop_deadline:
+                await scenario.iteration(client, recorder, worker_id, iteration)
+                iteration += 1
+
+        async def clock() -> None:
+            await asyncio.sleep(warmup)
+            recorder.start()
+            await asyncio.sleep(duration)
+            recorder.stop()
+
+        await asyncio.gather(clock(), *(worker(i) for i in range(concurrency)))
+        await scenario.teardown()
+
+    result = recorder.summary()
+    result["concurrency"] = concurrency
+    return result
@@ -0,0 +1,101 @@
+# benchmarks/plans.py
+"""
+Query-plan-regressietests voor de hot paths van website en verkoop.
+
+    python -m benchmarks.plans --volume medium
+    python -m benchmarks.plans --volume medium --update-baseline
+
+Per module: verse database, schema aanmaken (incl. indexen), seeden met
+datagen en daarna de plan-check van de module zelf draaien
+(website: plan_check.py, verkoop: app.scripts.check_query_plans). Die voert
+de hot paths uit in een teruggedraaide transactie, plant elke statement met
+EXPLAIN (FORMAT JSON) en faalt bij onverwachte Seq Scans of kostsprongen
+t.o.v. benchmarks/plan_baselines/<module>.json. Exit 1 bij een regressie.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+from benchmarks import servers
+from benchmarks.config import REPO_ROOT, BenchConfig, Volumes
+from benchmarks.seed import seed_all
+
+BASELINE_DIR = REPO_ROOT / "benchmarks" / "plan_baselines"
+
+# module → (schema aanmaken, plan-check)
+COMMANDS: Dict[str, Dict[str, List[str]]] = {
+    "website": {
+        "schema": ["plan_check.py", "--create-schema"],
+        "check": ["plan_check.py"],
+    },
+    "verkoop": {
+        "schema": ["-m", "app.scripts.init_db"],
+        "check": ["-m", "app.scripts.check_query_plans"],
+    },
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default="website,verkoop")
+    # onder ~5000 rijen kiest de planner terecht vaak een seq scan: minstens medium
+    parser.add_argument("--volume", default="medium", choices=["small", "medium", "large"])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--min-rows", type=int, default=5000)
+    parser.add_argument("--cost-factor", type=float, default=2.0)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    modules = [m.strip() for m in args.modules.split(",") if m.strip()]
+    unknown = [m for m in modules if m not in COMMANDS]
+    if unknown:
+        print(f"Onbekende modules: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    cfg = BenchConfig(seed=args.seed, volumes=Volumes.preset(args.volume))
+    registry = servers.backends(cfg)
+    BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+
+    for name in modules:
+        backend = registry[name]
+        print(f"[plans] schema {name} ...")
+        servers.recreate_database(cfg, cfg.databases[name])
+        subprocess.run(
+            [cfg.python, *COMMANDS[name]["schema"]],
+            cwd=backend.cwd, env={**os.environ, **backend.env}, check=True,
+        )
+
+    seeded = seed_all(cfg, modules)
+    print("[plans] geseed: " + ", ".join(f"{table}={rows}" for table, rows in seeded.items()))
+
+    failed = []
+    for name in modules:
+        backend = registry[name]
+        command = [
+            cfg.python, *COMMANDS[name]["check"],
+            "--baseline", str(BASELINE_DIR / f"{name}.json"),
+            "--min-rows", str(args.min_rows),
+            "--cost-factor", str(args.cost_factor),
+        ]
+        if args.update_baseline:
+            command.append("--update-baseline")
+        print(f"[plans] {name}")
+        result = subprocess.run(command, cwd=backend.cwd, env={**os.environ, **backend.env})
+        if result.returncode != 0:
+            failed.append(name)
+
+    if failed:
+        print(f"[plans] REGRESSIE in: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    print("[plans] OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# benchmarks/run.py
+"""
+Load-benchmark voor core, website en verkoop.
+
+    python -m benchmarks.run --scenarios all --volume small --duration 30 \
+        --output benchmarks/results/$(date +%Y%m%d-%H%M).json \
+        --baseline benchmarks/baseline.json
+
+Start de nodige backends tegen BENCH_PG_DSN (verse databases), seedt data,
+draait de scenario's en schrijft throughput + latency-percentielen naar JSON.
+Met --baseline wordt het resultaat meteen vergeleken (exit 1 bij regressie).
+Met --pgbouncer verbinden de backends via PgBouncer (BENCH_PGBOUNCER_DSN) in
+transaction-pooler-modus; per scenario worden de serverconnecties geteld.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.compare import compare, print_connections, print_report
+from benchmarks.config import REPO_ROOT, BenchConfig, Volumes
+from benchmarks.connections import ConnectionSampler
+from benchmarks.driver import run_scenario
+from benchmarks.scenarios import SCENARIOS, required_backends
+from benchmarks.seed import seed_all
+from benchmarks import servers
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default="all", help=f"komma-lijst of 'all' ({', '.join(SCENARIOS)})")
+    parser.add_argument("--volume", default="small", choices=["small", "medium", "large"])
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers per backend")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--pgbouncer", action="store_true", help="backends via PgBouncer (transaction pooling)")
+    parser.add_argument("--pooler-pool-size", type=int, default=0, help="pool per worker achter PgBouncer (0 = NullPool)")
+    parser.add_argument("--p95-tolerance", type=float, default=0.20)
+    parser.add_argument("--throughput-tolerance", type=float, default=0.20)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    names = list(SCENARIOS) if args.scenarios == "all" else [s.strip() for s in args.scenarios.split(",")]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        print(f"Onbekende scenario's: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    cfg = BenchConfig(
+        duration=args.duration,
+        warmup=args.warmup,
+        concurrency=args.concurrency,
+        workers=args.workers,
+        seed=args.seed,
+        volumes=Volumes.preset(args.volume),
+        use_pgbouncer=args.pgbouncer,
+        pooler_pool_size=args.pooler_pool_size,
+    )
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    output = args.output or REPO_ROOT / "benchmarks" / "results" / f"{stamp}.json"
+
+    registry = servers.backends(cfg)
+    running = []
+    seeded = {}
+    try:
+        for name in required_backends(names):
+            print(f"[bench] start {name} ...")
+            servers.start(cfg, registry[name], output.parent / "logs" / stamp)
+            running.append(registry[name])
+
+        seeded = seed_all(cfg, [backend.name for backend in running]) if running else {}
+        print(f"[bench] seed: {seeded}")
+
+        results = {}
+        for name in names:
+            scenario = SCENARIOS[name](cfg)
+            concurrency = scenario.concurrency or cfg.concurrency
+            print(f"[bench] {name} (concurrency {concurrency}, {cfg.duration:.0f}s) ...")
+            with ConnectionSampler(cfg.pg_dsn, list(cfg.databases.values())) as sampler:
+                results[name] = asyncio.run(run_scenario(scenario, concurrency, cfg.duration, cfg.warmup))
+            results[name]["connections"] = sampler.summary()
+    finally:
+        servers.stop_all(running)
+
+    report = {
+        "meta": {
+            "timestamp": stamp,
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "volume": args.volume,
+            "seeded": seeded,
+            "duration_s": cfg.duration,
+            "concurrency": cfg.concurrency,
+            "workers": cfg.workers,
+            "seed": cfg.seed,
+            "pgbouncer": cfg.use_pgbouncer,
+            "pooler_pool_size": cfg.pooler_pool_size if cfg.use_pgbouncer else None,
+        },
+        "scenarios": results,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"[bench] resultaat: {output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        rows = compare(report, baseline, args.p95_tolerance, args.throughput_tolerance)
+        print_report(rows)
+        print_connections(report, baseline)
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
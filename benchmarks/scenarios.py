@@ -0,0 +1,244 @@
+# benchmarks/scenarios.py
+"""
+Realistische scenario's per backend.
+
+Elke klasse: setup() eenmalig, iteration() per loop van een worker
+(alle HTTP-calls via recorder.call zodat ze per stap gemeten worden).
+"""
+
+import asyncio
+import random
+from typing import Dict, List, Optional, Type
+
+import httpx
+import psycopg
+
+from benchmarks.config import BenchConfig
+from benchmarks.seed import CITIES, LAST_NAMES
+
+WEBSITE_ADMIN = {"email": "admin@casuse.mx", "password": "Test1234!"}
+CORE_USERS = [
+    "admin@casuse-hp.local",
+    "manager@casuse-hp.local",
+    "sales@casuse-hp.local",
+    "website@casuse-hp.local",
+    "logistics@casuse-hp.local",
+]
+CORE_PASSWORD = "Casuse!2025"
+
+
+class Scenario:
+    name = ""
+    backends: tuple = ()
+    # None = --concurrency van de run
+    concurrency: Optional[int] = None
+
+    def __init__(self, cfg: BenchConfig) -> None:
+        self.cfg = cfg
+        self.rng = random.Random(cfg.seed)
+
+    async def setup(self, client: httpx.AsyncClient) -> None:
+        pass
+
+    async def iteration(self, client, recorder, worker_id: int, iteration: int) -> None:
+        raise NotImplementedError
+
+    async def teardown(self) -> None:
+        pass
+
+
+async def _website_admin_token(cfg: BenchConfig, client: httpx.AsyncClient) -> str:
+    response = await client.post(f"{cfg.base_url('website')}/api/admin/login", json=WEBSITE_ADMIN)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+class WebsiteAdminCustomers(Scenario):
+    """Admin-klantenlijst: zoeken, filteren en pagineren."""
+
+    name = "website_admin_customers"
+    backends = ("website",)
+
+    async def setup(self, client) -> None:
+        token = await _website_admin_token(self.cfg, client)
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.url = f"{self.cfg.base_url('website')}/api/admin/customers/"
+        self.pages = max(1, self.cfg.volumes.website_customers // 50)
+
+    async def iteration(self, client, recorder, worker_id, iteration) -> None:
+        rng = self.rng
+        await recorder.call(
+            "list_page",
+            client.get(
+                self.url,
+                params={"skip": rng.randrange(self.pages) * 50, "limit": 50, "sort_by": "created_at"},
+                headers=self.headers,
+            ),
+        )
+        await recorder.call(
+            "search",
+            client.get(
+                self.url,
+                params={"search": rng.choice(LAST_NAMES)[:4].lower(), "limit": 50, "sort_by": "name", "sort_dir": "asc"},
+                headers=self.headers,
+            ),
+        )
+        await recorder.call(
+            "search_email",
+            client.get(
+                self.url,
+                params={"search": f"bench{rng.randrange(self.cfg.volumes.website_customers):07d}", "limit": 20},
+                headers=self.headers,
+            ),
+        )
+
+
+class WebsiteRegistration(Scenario):
+    """Publieke registratie + password setup (token uit de database gelezen)."""
+
+    name = "website_registration"
+    backends = ("website",)
+
+    async def setup(self, client) -> None:
+        self.base = self.cfg.base_url("website")
+        self.conn = await psycopg.AsyncConnection.connect(self.cfg.db_dsn("website"), autocommit=True)
+        self.lock = asyncio.Lock()
+        self.run_id = self.rng.randrange(1_000_000)
+
+    async def _token_for(self, email: str) -> Optional[str]:
+        async with self.lock:
+            cur = await self.conn.execute(
+                """
+                SELECT t.token FROM registration_tokens t
+                JOIN customers c ON c.id = t.customer_id
+                WHERE c.email = %s
+                ORDER BY t.created_at DESC LIMIT 1
+                """,
+                (email,),
+            )
+            row = await cur.fetchone()
+        return row[0] if row else None
+
+    async def iteration(self, client, recorder, worker_id, iteration) -> None:
+        city, state, prefix = self.rng.choice(CITIES)
+        email = f"reg{self.run_id}.{worker_id}.{iteration}@example.mx"
+        response = await recorder.call(
+            "register",
+            client.post(
+                f"{self.base}/api/public/register",
+                json={
+                    "email": email,
+                    "first_name": "Bench",
+                    "last_name": "Registratie",
+                    "phone_number": "+52 33 0000 0000",
+                    "customer_type": "particulier",
+                    "description": "benchmark",
+                    "address_street": "Calle 1",
+                    "address_ext_number": "1",
+                    "address_neighborhood": "Centro",
+                    "address_city": city,
+                    "address_state": state,
+                    "address_postal_code": f"{prefix}000",
+                    "address_country": "Mexico",
+                },
+            ),
+        )
+        if response is None or response.status_code >= 400:
+            return
+
+        token = await self._token_for(email)
+        if token is None:
+            return
+        await recorder.call("token_validate", client.get(f"{self.base}/api/public/password-setup/{token}"))
+        await recorder.call(
+            "password_setup",
+            client.post(
+                f"{self.base}/api/public/password-setup/{token}",
+                json={"password": "Bench1234!xyz", "password_confirm": "Bench1234!xyz"},
+            ),
+        )
+
+    async def teardown(self) -> None:
+        await self.conn.close()
+
+
+class VerkoopSync(Scenario):
+    """Volledige klanten-sync website → verkoop (zwaar, één tegelijk)."""
+
+    name = "verkoop_sync"
+    backends = ("website", "verkoop")
+    concurrency = 1
+
+    async def iteration(self, client, recorder, worker_id, iteration) -> None:
+        await recorder.call("sync_run", client.post(f"{self.cfg.base_url('verkoop')}/api/v1/customers-sync/run"))
+
+
+class VerkoopSellerCrud(Scenario):
+    """Verkoper aanmaken, opvragen, wijzigen, lijst en verwijderen."""
+
+    name = "verkoop_seller_crud"
+    backends = ("verkoop",)
+
+    async def setup(self, client) -> None:
+        self.url = f"{self.cfg.base_url('verkoop')}/api/v1/sellers"
+        self.run_id = self.rng.randrange(1_000_000)
+
+    async def iteration(self, client, recorder, worker_id, iteration) -> None:
+        code = f"B{self.run_id}-{worker_id}-{iteration}"
+        response = await recorder.call(
+            "create",
+            client.post(
+                self.url,
+                json={
+                    "seller_code": code,
+                    "first_name": "Bench",
+                    "last_name": "Seller",
+                    "email_work": f"{code.lower()}@casuse.mx",
+                    "phone_mobile": "+52 33 0000 0000",
+                    "address_line1": "Calle 1",
+                    "postal_code": "44100",
+                    "city": "Guadalajara",
+                    "country": "MX",
+                    "region_code": "MX-JAL",
+                },
+            ),
+        )
+        if response is None or response.status_code >= 400:
+            return
+        seller_id = response.json()["id"]
+        await recorder.call("get", client.get(f"{self.url}/{seller_id}"))
+        await recorder.call("patch", client.patch(f"{self.url}/{seller_id}", json={"city": "Zapopan"}))
+        await recorder.call("list", client.get(self.url))
+        await recorder.call("delete", client.delete(f"{self.url}/{seller_id}"))
+
+
+class LoginBurst(Scenario):
+    """Login-pieken op core en website-admin (bcrypt/pbkdf2-bound)."""
+
+    name = "login_burst"
+    backends = ("core", "website")
+
+    async def iteration(self, client, recorder, worker_id, iteration) -> None:
+        await recorder.call(
+            "core_login",
+            client.post(
+                f"{self.cfg.base_url('core')}/auth/login",
+                json={"username": CORE_USERS[(worker_id + iteration) % len(CORE_USERS)], "password": CORE_PASSWORD},
+            ),
+        )
+        await recorder.call(
+            "website_admin_login",
+            client.post(f"{self.cfg.base_url('website')}/api/admin/login", json=WEBSITE_ADMIN),
+        )
+
+
+SCENARIOS: Dict[str, Type[Scenario]] = {
+    cls.name: cls
+    for cls in (WebsiteAdminCustomers, WebsiteRegistration, VerkoopSync, VerkoopSellerCrud, LoginBurst)
+}
+
+
+def required_backends(names: List[str]) -> List[str]:
+    order = ["core", "website", "verkoop"]
+    needed = {backend for name in names for backend in SCENARIOS[name].backends}
+    return [backend for backend in order if backend in needed]
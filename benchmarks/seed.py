@@ -0,0 +1,46 @@
+# benchmarks/seed.py
+"""
+Deterministische seed-data voor de benchmarks (zelfde --seed = zelfde data).
+
+Gebruikt de datagen-generator (benchmarks/datagen): genereren naar een
+tijdelijke map en met COPY laden in de bench-databases, nadat de backends
+hun schema aangemaakt hebben.
+"""
+
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Optional
+
+from benchmarks.config import BenchConfig
+from benchmarks.datagen import reference as ref
+from benchmarks.datagen.generators import Scale, generate
+from benchmarks.datagen.loader import load_all
+
+FIRST_NAMES = ref.FIRST_NAMES
+LAST_NAMES = ref.LAST_NAMES
+# (stad, staat, postcode-prefix) voor de registratie-scenario's
+CITIES = [(city, state, prefix) for state, _region, cities in ref.STATES for city, prefix, _w in cities]
+
+# Vast tijdvenster: het anker mag niet van de huidige datum afhangen
+ANCHOR = date(2026, 1, 1)
+SEEDED_DATABASES = ("website", "verkoop")
+
+
+def seed_all(cfg: BenchConfig, backends: Optional[Iterable[str]] = None) -> dict:
+    """Seed de databases van de (gestarte) backends; geeft rijen per tabel terug."""
+    targets = [name for name in (backends or SEEDED_DATABASES) if name in SEEDED_DATABASES]
+    if not targets:
+        return {}
+    scale = Scale(
+        customers=cfg.volumes.website_customers,
+        sellers=cfg.volumes.verkoop_sellers,
+    )
+    out_dir = Path(tempfile.mkdtemp(prefix="bench-seed-"))
+    try:
+        manifest = generate(out_dir, cfg.seed, scale, targets, ANCHOR)
+        loaded = load_all(manifest, out_dir, {name: cfg.db_dsn(name) for name in targets})
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return {f"{database}.{table}": rows for database, tables in loaded.items() for table, rows in tables.items()}
@@ -0,0 +1,143 @@
+# benchmarks/servers.py
+"""
+Backends opstarten tegen een lokale Postgres.
+
+Per backend: verse database, schema aanmaken zoals in de eigen deploy
+(alembic voor core, init_db voor verkoop, create_all bij startup voor website)
+en daarna uvicorn als subprocess. stop_all() ruimt alles op. Met
+cfg.use_pgbouncer verbinden de backends via PgBouncer in transaction-pooler-modus.
+"""
+
+import os
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import psycopg
+from psycopg import sql
+from psycopg.conninfo import conninfo_to_dict
+
+from benchmarks.config import REPO_ROOT, BenchConfig
+
+
+@dataclass
+class Backend:
+    name: str
+    cwd: Path
+    app: str
+    health_path: str
+    env: Dict[str, str]
+    prepare: Optional[List[str]] = None
+    process: Optional[subprocess.Popen] = None
+
+
+def recreate_database(cfg: BenchConfig, name: str) -> None:
+    with psycopg.connect(cfg.pg_dsn, autocommit=True) as conn:
+        conn.execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(sql.Identifier(name)))
+        conn.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(name)))
+
+
+def backends(cfg: BenchConfig) -> Dict[str, Backend]:
+    website_db = conninfo_to_dict(cfg.app_dsn("website"))
+    common = {"PYTHONUNBUFFERED": "1", "LOG_LEVEL": "WARNING"}
+    pooler: Dict[str, str] = {}
+    website_pooler: Dict[str, str] = {}
+    if cfg.use_pgbouncer:
+        pooler = {"DB_TRANSACTION_POOLER": "true", "DB_POOL_SIZE": str(cfg.pooler_pool_size)}
+        website_pooler = {
+            "WEBSITE_DB_TRANSACTION_POOLER": "true",
+            "WEBSITE_DB_POOL_SIZE": str(cfg.pooler_pool_size),
+        }
+    return {
+        "core": Backend(
+            name="core",
+            cwd=REPO_ROOT / "core-backend",
+            app="app.main:app",
+            health_path="/healthz",
+            env={**common, **pooler, "DATABASE_URL": cfg.app_dsn("core", "psycopg")},
+            prepare=[cfg.python, "-m", "alembic", "upgrade", "head"],
+        ),
+        "website": Backend(
+            name="website",
+            cwd=REPO_ROOT / "modules" / "website" / "backend",
+            app="app:app",
+            health_path="/health",
+            env={
+                **common,
+                **website_pooler,
+                "WEBSITE_DB_HOST": website_db.get("host", "localhost"),
+                "WEBSITE_DB_PORT": str(website_db.get("port", 5432)),
+                "WEBSITE_DB_NAME": website_db["dbname"],
+                "WEBSITE_DB_USER": website_db.get("user", "postgres"),
+                "WEBSITE_DB_PASSWORD": website_db.get("password", ""),
+                "WEBSITE_EMAIL_ENABLED": "false",
+            },
+        ),
+        "verkoop": Backend(
+            name="verkoop",
+            cwd=REPO_ROOT / "modules" / "verkoop" / "backend",
+            app="app.main:app",
+            health_path="/healthz",
+            env={
+                **common,
+                **pooler,
+                "DATABASE_URL": cfg.app_dsn("verkoop", "psycopg"),
+                "WEBSITE_API_BASE_URL": cfg.base_url("website"),
+            },
+            prepare=[cfg.python, "-m", "app.scripts.init_db"],
+        ),
+    }
+
+
+def start(cfg: BenchConfig, backend: Backend, log_dir: Path) -> None:
+    recreate_database(cfg, cfg.databases[backend.name])
+    env = {**os.environ, **backend.env}
+
+    if backend.prepare:
+        subprocess.run(backend.prepare, cwd=backend.cwd, env=env, check=True)
+
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log_file = open(log_dir / f"{backend.name}.log", "w")
+    backend.process = subprocess.Popen(
+        [
+            cfg.python, "-m", "uvicorn", backend.app,
+            "--host", "127.0.0.1",
+            "--port", str(cfg.ports[backend.name]),
+            "--workers", str(cfg.workers),
+            "--no-access-log",
+        ],
+        cwd=backend.cwd,
+        env=env,
+        stdout=log_file,
+        stderr=subprocess.STDOUT,
+    )
+    wait_healthy(cfg.base_url(backend.name) + backend.health_path, backend)
+
+
+def wait_healthy(url: str, backend: Backend, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if backend.process is not None and backend.process.poll() is not None:
+            raise RuntimeError(f"{backend.name} stopte tijdens opstart (zie log)")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"{backend.name} niet gezond binnen {timeout:.0f}s: {url}")
+
+
+def stop_all(running: List[Backend]) -> None:
+    for backend in running:
+        if backend.process is not None and backend.process.poll() is None:
+            backend.process.terminate()
+    for backend in running:
+        if backend.process is not None:
+            try:
+                backend.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                backend.process.kill()
@@ -0,0 +1,50 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_refresh_tokens"
+down_revision = "0001_create_users"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # roterende refresh tokens (app/services/refresh_tokens.py)
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("jti", sa.String(32), primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("family_id", sa.String(32), nullable=False),
+        sa.Column("parent_jti", sa.String(32), nullable=True),
+        sa.Column("issued_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("used_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("revoke_reason", sa.String(32), nullable=True),
+    )
+    op.create_index("ix_refresh_tokens_user_id", "refresh_tokens", ["user_id"])
+    op.create_index("ix_refresh_tokens_family_id", "refresh_tokens", ["family_id"])
+
+    # exacte intrekkingslijst achter de bloom filter (app/core/revocation.py)
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("id", sa.BigInteger, primary_key=True),
+        sa.Column("jti", sa.String(32), nullable=True),
+        sa.Column("family_id", sa.String(32), nullable=True),
+        sa.Column("user_id", sa.Integer, nullable=True),
+        sa.Column("reason", sa.String(32), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.CheckConstraint(
+            "num_nonnulls(jti, family_id, user_id) = 1",
+            name="ck_revoked_tokens_one_subject",
+        ),
+    )
+    op.create_index("ix_revoked_tokens_jti", "revoked_tokens", ["jti"])
+    op.create_index("ix_revoked_tokens_family_id", "revoked_tokens", ["family_id"])
+    # sync-poll van de workers: range-scan op revoked_at
+    op.create_index("ix_revoked_tokens_revoked_at", "revoked_tokens", ["revoked_at"])
+
+
+def downgrade():
+    op.drop_table("revoked_tokens")
+    op.drop_table("refresh_tokens")
@@ -1,4 +1,3 @@
-from datetime import timedelta
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Header
 from pydantic import BaseModel
@@ -7,8 +6,10 @@ import pyotp
 from jose import jwt, JWTError
 from app.db import get_db
 from app.models.user import User
-from app.core.security import create_access_token, create_refresh_token, verify_password
+from app.core.revocation import revocations
+from app.core.security import verify_password
 from app.config import get_settings
+from app.services import refresh_tokens
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 settings = get_settings()
@@ -43,41 +44,72 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
         totp = pyotp.TOTP(user.twofa_secret)
         if not totp.verify(data.totp, valid_window=1):
             raise HTTPException(status_code=400, detail="Invalid TOTP code")
-    access_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    refresh_expires = timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token({"sub": str(user.id), "email": user.email, "role": user.role}, access_expires)
-    refresh_token = create_refresh_token({"sub": str(user.id), "email": user.email, "role": user.role}, refresh_expires)
-    return TokenResponse(access_token=access_token, refresh_token=refresh_token)
+    pair = refresh_tokens.start_session(db, user)
+    return TokenResponse(access_token=pair.access_token, refresh_token=pair.refresh_token)
 
 class RefreshRequest(BaseModel):
     refresh_token: str
 
-@router.post("/refresh", response_model=TokenResponse)
-def refresh_token(data: RefreshRequest, db: Session = Depends(get_db)):
+def _decode_refresh(token: str) -> dict:
     try:
-        payload = jwt.decode(data.refresh_token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        if payload.get("type") != "refresh":
-            raise HTTPException(status_code=401, detail="Invalid token type")
+        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
-    user_id = int(payload.get("sub"))
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-    access_token = create_access_token({"sub": str(user.id), "email": user.email, "role": user.role})
-    refresh_token = create_refresh_token({"sub": str(user.id), "email": user.email, "role": user.role})
-    return TokenResponse(access_token=access_token, refresh_token=refresh_token)
+    if payload.get("type") != "refresh":
+        raise HTTPException(status_code=401, detail="Invalid token type")
+    return payload
 
-@router.get("/me", response_model=MeResponse)
-def me(authorization: str = Header(None), db: Session = Depends(get_db)):
+def _bearer_payload(authorization: Optional[str], db: Session) -> dict:
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(status_code=401, detail="Missing token")
     token = authorization.split(" ", 1)[1]
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        user_id = int(payload.get("sub"))
-    except JWTError:
+        int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
         raise HTTPException(status_code=401, detail="Invalid token")
+    if revocations.is_revoked(db, payload):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return payload
+
+@router.post("/refresh", response_model=TokenResponse)
+def refresh_token(data: RefreshRequest, db: Session = Depends(get_db)):
+    payload = _decode_refresh(data.refresh_token)
+    try:
+        pair = refresh_tokens.rotate(db, payload)
+    except refresh_tokens.RefreshTokenError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    return TokenResponse(access_token=pair.access_token, refresh_token=pair.refresh_token)
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+@router.post("/logout", status_code=204)
+def logout(data: LogoutRequest, authorization: str = Header(None), db: Session = Depends(get_db)):
+    # refresh token en/of access token; beide dragen de family van de login
+    if data.refresh_token:
+        payload = _decode_refresh(data.refresh_token)
+    else:
+        payload = _bearer_payload(authorization, db)
+    family_id = payload.get("fam")
+    if not family_id:
+        raise HTTPException(status_code=400, detail="Token has no session")
+    refresh_tokens.revoke_family(db, family_id, reason="logout")
+
+class RevokeRequest(BaseModel):
+    user_id: int
+
+@router.post("/revoke", status_code=204)
+def revoke(data: RevokeRequest, authorization: str = Header(None), db: Session = Depends(get_db)):
+    """Alle tokens van een gebruiker intrekken (compromise, rolwijziging, deactivatie)."""
+    payload = _bearer_payload(authorization, db)
+    if payload.get("role") != "admin" and payload.get("sub") != str(data.user_id):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    refresh_tokens.revoke_user(db, data.user_id, reason="revoke")
+
+@router.get("/me", response_model=MeResponse)
+def me(authorization: str = Header(None), db: Session = Depends(get_db)):
+    user_id = int(_bearer_payload(authorization, db)["sub"])
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
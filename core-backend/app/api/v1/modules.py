@@ -1,17 +1,20 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from app.conditional import conditional_response
+from app.services.module_health import get_monitor
 
 router = APIRouter(prefix="/modules", tags=["modules"])
 
-MODULES = [
-    {"key": "verkoop", "name": "Verkoop", "url": "http://localhost:20040", "status": "online"},
-    {"key": "website", "name": "Website", "url": "http://localhost:20060", "status": "online"},
-    {"key": "inventaries", "name": "Inventaries", "url": "http://localhost:20080", "status": "online"},
-    {"key": "facturatie", "name": "Facturatie", "url": "http://localhost:20110", "status": "online"},
-    {"key": "magazijn", "name": "Magazijn", "url": "http://localhost:20130", "status": "online"},
-    {"key": "productie", "name": "Productie", "url": "http://localhost:20150", "status": "online"},
-    {"key": "overzicht-modules", "name": "Overzicht modules", "url": "http://localhost:20162", "status": "online"}
-]
 
 @router.get("")
-def list_modules():
-    return MODULES
+def list_modules(request: Request):
+    # Snapshot van de achtergrond-probes: nooit wachten op een trage module.
+    # De versie wijzigt bij elke refresh; max-age volgt het probe-interval.
+    monitor = get_monitor()
+    return conditional_response(
+        request,
+        monitor.version,
+        lambda: JSONResponse(monitor.snapshot()),
+        cache_control=f"public, max-age={max(int(monitor.interval), 1)}",
+    )
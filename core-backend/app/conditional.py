@@ -0,0 +1,61 @@
+# core-backend/app/conditional.py
+"""
+Conditional GET (ETag / If-None-Match) voor read-endpoints.
+
+- de ETag komt uit een goedkope versiebron (bv. een inhoudshash) plus pad
+  en query-string; de payload wordt pas opgebouwd (en geserialiseerd) als
+  de client geen geldige kopie heeft
+- 304 zonder body, met dezelfde ETag en Cache-Control
+- zwakke ETags: de bytes verschillen per Content-Encoding, de inhoud niet
+- geen versie beschikbaar → gewoon een volledige response zonder ETag
+"""
+
+import hashlib
+from typing import Callable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# Verhogen als de vorm van de responses wijzigt, zodat oude ETags vervallen
+ETAG_FORMAT = "1"
+
+NO_CACHE = "private, no-cache"
+
+
+def make_etag(*parts: object) -> str:
+    digest = hashlib.blake2b(
+        "\x1f".join(str(part) for part in (ETAG_FORMAT, *parts)).encode("utf-8"),
+        digest_size=12,
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Zwakke vergelijking zoals RFC 9110 voorschrijft voor If-None-Match."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def conditional_response(
+    request: Request,
+    version: Optional[str],
+    build: Callable[[], Response],
+    cache_control: str = NO_CACHE,
+) -> Response:
+    """
+    304 als If-None-Match de huidige ETag bevat, anders build() met ETag en
+    Cache-Control erbij. build() moet een Response teruggeven.
+    """
+    headers = {"Cache-Control": cache_control}
+    if version is not None:
+        headers["ETag"] = make_etag(request.url.path, request.url.query, version)
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+    response = build()
+    response.headers.update(headers)
+    return response
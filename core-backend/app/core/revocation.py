@@ -0,0 +1,197 @@
+# core-backend/app/core/revocation.py
+"""
+In-process intrekkingscheck voor JWT's (access én refresh).
+
+- bloom filter met de keys "jti:<jti>" en "fam:<family_id>" van alle
+  lopende intrekkingen; een negatief antwoord (de normale case) kost geen DB
+- positief → exacte bevestiging in revoked_tokens (false positives ~0,1%)
+- intrekkingen per gebruiker ("alles uitgegeven vóór X") als kleine dict;
+  iat heeft seconde-precisie, dus X wordt afgerond naar de volle seconde en
+  een token uit die seconde zelf (bv. de nieuwe login) blijft geldig
+- intrekkingen in dit proces gelden meteen; andere workers halen nieuwe
+  rijen op via een poll elke REVOCATION_SYNC_SECONDS (range-scan op
+  revoked_at, met terugblik zodat laat gecommitte rijen niet wegvallen)
+- periodieke rebuild uit de tabel: verlopen rijen verdwijnen dan ook uit de
+  filter (een bloom filter kan niets verwijderen) en uit de tabellen
+- refresh-rotatie controleert daarnaast revoked_at in refresh_tokens in
+  hetzelfde statement: voor refresh tokens geldt intrekking dus altijd
+  onmiddellijk, over alle workers heen
+"""
+
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.core.bloom import BloomFilter
+from app.db import SessionLocal
+from app.models.refresh_token import RefreshToken
+from app.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# rijen die tijdens de vorige poll nog niet gecommit waren
+LOOKBACK = timedelta(seconds=30)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def user_cutoff(revoked_at: datetime) -> int:
+    """Tokens met iat < deze waarde zijn ingetrokken (iat is in hele seconden)."""
+    return math.floor(revoked_at.timestamp())
+
+
+class RevocationCache:
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+        sync_interval: float = 1.0,
+        rebuild_interval: float = 3600.0,
+    ) -> None:
+        self._session_factory = session_factory
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self._filter = BloomFilter(capacity, error_rate)
+        self._user_cutoffs: Dict[int, int] = {}
+        self._synced_until: Optional[datetime] = None
+        self._rebuilt_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    # -------------------------------
+    # Toevoegen (na commit van de rij in revoked_tokens)
+    # -------------------------------
+    def add_jti(self, jti: str) -> None:
+        self._filter.add(f"jti:{jti}")
+
+    def add_family(self, family_id: str) -> None:
+        self._filter.add(f"fam:{family_id}")
+
+    def add_user_cutoff(self, user_id: int, revoked_at: datetime) -> None:
+        cutoff = user_cutoff(revoked_at)
+        if cutoff > self._user_cutoffs.get(user_id, 0):
+            self._user_cutoffs[user_id] = cutoff
+
+    def _apply(self, rows: Iterable[RevokedToken], bloom: BloomFilter, cutoffs: Dict[int, int]) -> None:
+        for row in rows:
+            if row.jti:
+                bloom.add(f"jti:{row.jti}")
+            if row.family_id:
+                bloom.add(f"fam:{row.family_id}")
+            if row.user_id is not None:
+                cutoff = user_cutoff(row.revoked_at)
+                if cutoff > cutoffs.get(row.user_id, 0):
+                    cutoffs[row.user_id] = cutoff
+
+    # -------------------------------
+    # Controleren
+    # -------------------------------
+    def is_revoked(self, db: Session, claims: Dict[str, Any]) -> bool:
+        try:
+            user_id = int(claims.get("sub"))
+        except (TypeError, ValueError):
+            user_id = None
+        cutoff = self._user_cutoffs.get(user_id)
+        if cutoff is not None and claims.get("iat", 0) < cutoff:
+            return True
+
+        jti, family_id = claims.get("jti"), claims.get("fam")
+        conditions = []
+        if jti and f"jti:{jti}" in self._filter:
+            conditions.append(RevokedToken.jti == jti)
+        if family_id and f"fam:{family_id}" in self._filter:
+            conditions.append(RevokedToken.family_id == family_id)
+        if not conditions:
+            return False
+
+        # bloom-positief: exact bevestigen
+        hit = db.execute(
+            select(RevokedToken.id)
+            .where(or_(*conditions), RevokedToken.expires_at > _utcnow())
+            .limit(1)
+        ).first()
+        return hit is not None
+
+    # -------------------------------
+    # Sync met de tabel
+    # -------------------------------
+    def rebuild(self) -> None:
+        """Filter en cutoffs opnieuw uit de nog geldige rijen; verlopen rijen opruimen."""
+        started = _utcnow()
+        with self._session_factory() as db:
+            db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= started))
+            db.execute(delete(RefreshToken).where(RefreshToken.expires_at <= started))
+            db.commit()
+            rows = db.execute(select(RevokedToken)).scalars().all()
+
+        # meer rijen dan voorzien → ruimer dimensioneren i.p.v. hogere fp-rate
+        bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+        cutoffs: Dict[int, int] = {}
+        self._apply(rows, bloom, cutoffs)
+        self._filter, self._user_cutoffs = bloom, cutoffs
+        self._synced_until = started
+        self._rebuilt_at = time.monotonic()
+        logger.info("Revocation filter opgebouwd: %d rijen, %d bytes", len(rows), bloom.nbytes)
+
+    def sync(self) -> None:
+        """Nieuwe intrekkingen van andere workers (idempotent: dubbel toevoegen kan geen kwaad)."""
+        if self._synced_until is None or time.monotonic() - self._rebuilt_at > self.rebuild_interval:
+            self.rebuild()
+            return
+        started = _utcnow()
+        with self._session_factory() as db:
+            rows = db.execute(
+                select(RevokedToken).where(RevokedToken.revoked_at >= self._synced_until - LOOKBACK)
+            ).scalars().all()
+        self._apply(rows, self._filter, self._user_cutoffs)
+        self._synced_until = started
+
+    # -------------------------------
+    # Levenscyclus
+    # -------------------------------
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        try:
+            await asyncio.to_thread(self.rebuild)
+        except Exception:
+            # zonder DB bij opstart: de lus probeert het opnieuw
+            logger.exception("Revocation filter niet opgebouwd bij opstart")
+        self._task = asyncio.create_task(self._run(), name="revocation-sync")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await asyncio.to_thread(self.sync)
+            except Exception:  # pragma: no cover - de lus mag nooit stoppen
+                logger.exception("Revocation sync mislukt")
+
+
+_settings = get_settings()
+revocations = RevocationCache(
+    capacity=_settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=_settings.REVOCATION_BLOOM_ERROR_RATE,
+    sync_interval=_settings.REVOCATION_SYNC_SECONDS,
+)
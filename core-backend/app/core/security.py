@@ -1,10 +1,14 @@
+import hmac
 from datetime import datetime, timedelta
 from typing import Optional
+from uuid import uuid4
 
+from fastapi import HTTPException, Request
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
 from app.config import get_settings
+from app.metrics import track_password_hash
 
 settings = get_settings()
 
@@ -22,8 +26,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     expire = datetime.utcnow() + (
         expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
-    to_encode.update({"exp": expire, "type": "access"})
-    return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    # jti / iat: nodig voor intrekking (app/core/revocation.py)
+    to_encode.setdefault("jti", uuid4().hex)
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "type": "access"})
+    return jwt.encode(
+        to_encode,
+        settings.JWT_SECRET,
+        algorithm=settings.JWT_ALGORITHM,
+        headers={"kid": settings.JWT_KID} if settings.JWT_KID else None,
+    )
 
 
 def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -31,16 +42,19 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
     expire = datetime.utcnow() + (
         expires_delta or timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
     )
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.setdefault("jti", uuid4().hex)
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "type": "refresh"})
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    with track_password_hash("verify"):
+        return pwd_context.verify(plain, hashed)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    with track_password_hash("hash"):
+        return pwd_context.hash(password)
     
 
 def decode_token(token: str):
@@ -52,3 +66,14 @@ def decode_token(token: str):
         )
     except JWTError:
         return None
+
+
+def require_debug_key(request: Request) -> None:
+    """Dependency voor /debug/*: 404 zolang DEBUG_ENDPOINTS_KEY leeg is,
+    anders 401 zonder de juiste X-Debug-Key header."""
+    expected = settings.DEBUG_ENDPOINTS_KEY
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    given = request.headers.get("X-Debug-Key", "")
+    if not hmac.compare_digest(given.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid debug key")
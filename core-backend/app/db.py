@@ -1,9 +1,17 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import get_settings
+from app.db_engine import build_engine
 
 settings = get_settings()
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+engine = build_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
+    transaction_pooler=settings.DB_TRANSACTION_POOLER,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
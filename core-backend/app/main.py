@@ -1,14 +1,23 @@
+import asyncio
 import logging
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 from app.config import get_settings
-from app.db import engine, SessionLocal
+from app.db import engine
+from app.db_engine import ping_check, pool_stats
+from app.metrics import PrometheusMiddleware, instrument_engine, metrics_response
+from app import query_stats, tracing
+from app.readiness import Readiness
 from app.api.v1 import auth, modules
-from app.services.ai_agent import AIAgentService
+from app.core.revocation import revocations
+from app.core.security import require_debug_key
+from app.services.ai_agent import get_agent
+from app.services.module_health import get_monitor
 
 settings = get_settings()
-logging.basicConfig(level=logging.INFO)
+tracing.configure_logging(settings.LOG_LEVEL)
+tracing.configure_tracing("core", settings.TRACE_EXPORT_FILE, settings.TRACE_OTLP_ENDPOINT)
 logger = logging.getLogger("casuse-hp-core")
 
 app = FastAPI(title=settings.APP_NAME)
@@ -20,6 +29,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PrometheusMiddleware)
+app.add_middleware(query_stats.QueryStatsMiddleware)
+app.add_middleware(tracing.TracingMiddleware)
+instrument_engine(engine)
+tracing.instrument_engine(engine)
+query_stats.instrument_engine(engine, slow_ms=settings.SLOW_QUERY_MS, explain=settings.SLOW_QUERY_EXPLAIN)
 
 @app.on_event("startup")
 def startup():
@@ -27,6 +42,37 @@ def startup():
     with engine.connect() as conn:
         conn.execute(text("SELECT 1"))
 
+readiness = Readiness(
+    interval=settings.READINESS_INTERVAL_SECONDS,
+    timeout=settings.READINESS_TIMEOUT_SECONDS,
+    stale_after=settings.READINESS_STALE_AFTER_SECONDS,
+)
+readiness.register("database", ping_check(engine))
+
+async def _modules_check():
+    # leest de snapshot van de module-probes; core blijft bruikbaar zonder modules
+    down = [m["key"] for m in get_monitor().snapshot() if m["status"] != "online"]
+    if down:
+        raise RuntimeError("niet online: " + ", ".join(down))
+
+readiness.register("modules", _modules_check, critical=False)
+
+@app.on_event("startup")
+async def warm_ai_index():
+    await asyncio.to_thread(get_agent().warm)
+
+@app.on_event("startup")
+async def start_background_checks():
+    await get_monitor().start()
+    await revocations.start()
+    await readiness.start()
+
+@app.on_event("shutdown")
+async def stop_background_checks():
+    await readiness.stop()
+    await revocations.stop()
+    await get_monitor().stop()
+
 @app.middleware("http")
 async def global_error_handler(request: Request, call_next):
     try:
@@ -42,19 +88,27 @@ def healthz():
 
 @app.get("/readyz")
 def readyz():
-    try:
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        db.close()
-        return {"status": "ready"}
-    except Exception as e:
-        return {"status": "not-ready", "error": str(e)}
+    return readiness.response()
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
+@app.get("/debug/pool", dependencies=[Depends(require_debug_key)])
+def debug_pool():
+    return pool_stats(engine)
+
+@app.get("/debug/queries", dependencies=[Depends(require_debug_key)])
+def debug_queries(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: str = Query("total_ms", pattern="^(total_ms|count|mean_ms|max_ms|p95_ms|p99_ms)$"),
+):
+    return query_stats.stats.snapshot(limit=limit, order_by=order_by)
 
 @app.post("/ai/ask")
 def ai_ask(payload: dict):
     q = payload.get("question", "")
-    svc = AIAgentService()
-    return svc.answer(q)
+    return get_agent().answer(q)
 
 app.include_router(auth.router)
 app.include_router(modules.router)
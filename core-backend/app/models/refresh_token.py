@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from app.db import Base
+
+class RefreshToken(Base):
+    """
+    Eén uitgegeven refresh token (jti). Alle rotaties van één login delen
+    family_id; hergebruik van een al geroteerde token trekt de hele
+    family in (zie app/services/refresh_tokens.py).
+    """
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    parent_jti = Column(String(32), nullable=True)
+    issued_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True), nullable=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    revoke_reason = Column(String(32), nullable=True)
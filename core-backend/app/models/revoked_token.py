@@ -0,0 +1,24 @@
+from sqlalchemy import BigInteger, CheckConstraint, Column, DateTime, Integer, String, func
+from app.db import Base
+
+class RevokedToken(Base):
+    """
+    Exacte intrekkingslijst achter de bloom filter (app/core/revocation.py).
+    Per rij precies één van:
+    - jti       : één token
+    - family_id : alle tokens van één login (access + refresh)
+    - user_id   : alle tokens van de gebruiker uitgegeven vóór revoked_at
+    Rijen zijn overbodig na expires_at (dan is elke betrokken token verlopen).
+    """
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        CheckConstraint("num_nonnulls(jti, family_id, user_id) = 1", name="ck_revoked_tokens_one_subject"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    jti = Column(String(32), nullable=True, index=True)
+    family_id = Column(String(32), nullable=True, index=True)
+    user_id = Column(Integer, nullable=True)
+    reason = Column(String(32), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
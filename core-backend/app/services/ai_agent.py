@@ -1,50 +1,72 @@
+import os
+import time
+from functools import lru_cache
 from typing import Dict, Any
 
+from app.config import get_settings
+from app.services.retrieval import SearchIndex, snippet
+
+# core-backend/app/services/ai_agent.py → repo-root (lokaal); in docker via AI_DOCS_ROOT
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+
+def _csv(value: str) -> list:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
 class AIAgentService:
-    def explain_routes(self) -> Dict[str, Any]:
-        return {
-            "title": "Beschikbare routes",
-            "steps": [
-                "GET /healthz",
-                "GET /readyz",
-                "POST /auth/login",
-                "GET /auth/me",
-                "POST /auth/refresh",
-                "POST /auth/2fa/setup",
-                "POST /auth/2fa/verify",
-                "GET /modules",
-                "POST /ai/ask"
-            ]
-        }
+    """Beantwoordt vragen uit de docs en de routecatalogus (zie app/services/retrieval.py)."""
 
-    def how_to_add_module(self) -> Dict[str, Any]:
-        return {
-            "title": "Module toevoegen",
-            "steps": [
-                "Nieuwe module in ./modules/<naam>/",
-                "Voeg db, backend, frontend toe in docker-compose.yml",
-                "Zet JWT check in module-backend",
-                "Voeg module toe aan /modules endpoint"
-            ]
-        }
+    def __init__(self, index: SearchIndex, limit: int = 5) -> None:
+        self.index = index
+        self.limit = limit
+
+    def warm(self) -> None:
+        """Bij opstart: voorgebouwde index laden en enkel verschillen herindexeren."""
+        self.index.load()
+        self.index.refresh(force=True)
 
-    def debug_hints(self) -> Dict[str, Any]:
+    def answer(self, question: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        hits = self.index.search(question, limit=self.limit)
+        if not hits:
+            return {
+                "title": "Onbekend",
+                "steps": ["Stel je vraag concreter."],
+                "sources": [],
+                "took_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+        top, _ = hits[0]
         return {
-            "title": "Debug login / modules",
-            "steps": [
-                "Check core-db",
-                "Check alembic upgrade",
-                "Check JWT_SECRET in core en modules",
-                "docker compose logs core-backend --tail=200"
-            ]
+            "title": top.title,
+            "steps": snippet(top, question),
+            "sources": [
+                {
+                    "source": chunk.source,
+                    "title": chunk.title,
+                    "score": round(score, 3),
+                    "snippet": " ".join(snippet(chunk, question, max_lines=2)),
+                }
+                for chunk, score in hits
+            ],
+            "took_ms": round((time.perf_counter() - started) * 1000, 2),
         }
 
-    def answer(self, question: str) -> Dict[str, Any]:
-        q = question.lower()
-        if "endpoint" in q or "route" in q:
-            return self.explain_routes()
-        if "module" in q:
-            return self.how_to_add_module()
-        if "debug" in q or "login" in q:
-            return self.debug_hints()
-        return {"title": "Onbekend", "steps": ["Stel je vraag concreter."]}
+
+@lru_cache()
+def get_agent() -> AIAgentService:
+    settings = get_settings()
+    return AIAgentService(SearchIndex(
+        root=settings.AI_DOCS_ROOT or _REPO_ROOT,
+        doc_globs=_csv(settings.AI_DOCS_GLOBS),
+        openapi_files=_csv(settings.AI_OPENAPI_FILES),
+        index_path=settings.AI_INDEX_PATH,
+        check_interval=settings.AI_INDEX_CHECK_SECONDS,
+    ))
+
+
+if __name__ == "__main__":
+    # index vooraf bouwen (bv. in de image): AI_INDEX_PATH=... python -m app.services.ai_agent
+    agent = get_agent()
+    agent.warm()
+    print(f"{len(agent.index)} stukken geïndexeerd → {agent.index.index_path or '(enkel geheugen)'}")
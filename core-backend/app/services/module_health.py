@@ -0,0 +1,254 @@
+# core-backend/app/services/module_health.py
+"""
+Live status van de modules voor GET /modules.
+
+- ModuleHealthMonitor peilt elke `interval` seconden /healthz en /readyz van
+  alle modules tegelijk, met één gedeelde httpx.AsyncClient en een timeout
+  per probe
+- /modules leest enkel de laatste snapshot (O(1)) en wacht dus nooit op een
+  trage of onbereikbare module
+- status per module:
+    online   : health én ready ok
+    degraded : health ok, ready niet (bv. database weg)
+    offline  : health faalt of timeout
+    unknown  : nog niet gepeild
+- per module: latency per probe, checked_at en last_seen (laatste geslaagde
+  health-probe); `stale` als de monitor langer dan stale_after niet ververste
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from app.config import get_settings
+from app.metrics import MODULE_UP, track_outbound
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModuleTarget:
+    key: str
+    name: str
+    # frontend-URL (tegel in het dashboard)
+    url: str
+    # backend die gepeild wordt
+    backend_url: str
+    health_path: str = "/healthz"
+    ready_path: Optional[str] = "/readyz"
+
+
+DEFAULT_TARGETS: Tuple[ModuleTarget, ...] = (
+    ModuleTarget("verkoop", "Verkoop", "http://localhost:20040", "http://localhost:20030"),
+    ModuleTarget("website", "Website", "http://localhost:20060", "http://localhost:20052", "/health"),
+    ModuleTarget("inventaries", "Inventaries", "http://localhost:20080", "http://localhost:20070"),
+    ModuleTarget("facturatie", "Facturatie", "http://localhost:20110", "http://localhost:20100"),
+    ModuleTarget("magazijn", "Magazijn", "http://localhost:20130", "http://localhost:20120"),
+    ModuleTarget("productie", "Productie", "http://localhost:20150", "http://localhost:20140"),
+    ModuleTarget("overzicht-modules", "Overzicht modules", "http://localhost:20162", "http://localhost:20160"),
+)
+
+
+def targets_with_overrides(overrides: str, targets: Sequence[ModuleTarget] = DEFAULT_TARGETS) -> Tuple[ModuleTarget, ...]:
+    """
+    MODULE_BACKEND_URLS="verkoop=http://verkoop-backend:20030,website=http://website-backend:8000"
+    overschrijft de backend-URL per module (bv. binnen het docker-netwerk).
+    """
+    urls: Dict[str, str] = {}
+    for item in overrides.split(","):
+        key, sep, url = item.strip().partition("=")
+        if sep and url.strip():
+            urls[key.strip()] = url.strip().rstrip("/")
+    return tuple(replace(t, backend_url=urls[t.key]) if t.key in urls else t for t in targets)
+
+
+@dataclass(frozen=True)
+class Probe:
+    ok: bool
+    status_code: Optional[int]
+    latency_ms: float
+    error: Optional[str] = None
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _ready_from_body(response: httpx.Response) -> bool:
+    """readyz antwoordt soms 200 met {"status": "not-ready"} of {"ready": false}."""
+    try:
+        body = response.json()
+    except ValueError:
+        return True
+    if not isinstance(body, dict):
+        return True
+    if "ready" in body:
+        return bool(body["ready"])
+    return body.get("status") not in ("not-ready", "not_ready", "error", "down")
+
+
+class ModuleHealthMonitor:
+    def __init__(
+        self,
+        targets: Sequence[ModuleTarget],
+        interval: float = 10.0,
+        timeout: float = 2.0,
+        stale_after: float = 30.0,
+        clock=time.monotonic,
+    ) -> None:
+        self.targets = tuple(targets)
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self._clock = clock
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._refreshed_at: Optional[float] = None
+        self._checked_at: Optional[datetime] = None
+        self._last_seen: Dict[str, datetime] = {}
+        self._items: List[Dict[str, Any]] = [self._item(t, None, None, None) for t in self.targets]
+
+    # -------------------------------
+    # Levenscyclus
+    # -------------------------------
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout),
+            limits=httpx.Limits(max_connections=2 * len(self.targets), max_keepalive_connections=len(self.targets)),
+        )
+        self._task = asyncio.create_task(self._run(), name="module-health")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:  # pragma: no cover - de lus mag nooit stoppen
+                logger.exception("Module health refresh mislukt")
+            await asyncio.sleep(self.interval)
+
+    # -------------------------------
+    # Peilen
+    # -------------------------------
+    async def refresh(self) -> None:
+        results = await asyncio.gather(*(self._check(target) for target in self.targets))
+        checked_at = _utcnow()
+        items = []
+        for target, (health, ready) in zip(self.targets, results):
+            if health.ok:
+                self._last_seen[target.key] = checked_at
+            items.append(self._item(target, health, ready, checked_at))
+        self._items = items
+        self._checked_at = checked_at
+        self._refreshed_at = self._clock()
+
+    async def _check(self, target: ModuleTarget) -> Tuple[Probe, Optional[Probe]]:
+        if target.ready_path is None:
+            return await self._probe(target, target.health_path, ready=False), None
+        health, ready = await asyncio.gather(
+            self._probe(target, target.health_path, ready=False),
+            self._probe(target, target.ready_path, ready=True),
+        )
+        return health, ready
+
+    async def _probe(self, target: ModuleTarget, path: str, ready: bool) -> Probe:
+        started = time.perf_counter()
+        try:
+            with track_outbound(target.key, "GET") as call:
+                # wait_for als vangnet bovenop de httpx-timeouts (bv. trage DNS)
+                response = await asyncio.wait_for(
+                    self._client.get(target.backend_url + path),
+                    timeout=self.timeout,
+                )
+                call.status = response.status_code
+        except (httpx.HTTPError, asyncio.TimeoutError, OSError) as exc:
+            latency_ms = (time.perf_counter() - started) * 1000
+            return Probe(False, None, round(latency_ms, 1), type(exc).__name__)
+
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        if not 200 <= response.status_code < 300:
+            return Probe(False, response.status_code, latency_ms, f"HTTP {response.status_code}")
+        if ready and not _ready_from_body(response):
+            return Probe(False, response.status_code, latency_ms, "not ready")
+        return Probe(True, response.status_code, latency_ms)
+
+    # -------------------------------
+    # Snapshot
+    # -------------------------------
+    def _item(
+        self,
+        target: ModuleTarget,
+        health: Optional[Probe],
+        ready: Optional[Probe],
+        checked_at: Optional[datetime],
+    ) -> Dict[str, Any]:
+        if health is None:
+            status = "unknown"
+        elif not health.ok:
+            status = "offline"
+        elif ready is not None and not ready.ok:
+            status = "degraded"
+        else:
+            status = "online"
+        MODULE_UP.labels(target.key).set(1 if status == "online" else 0)
+
+        last_seen = self._last_seen.get(target.key)
+        return {
+            "key": target.key,
+            "name": target.name,
+            "url": target.url,
+            "status": status,
+            "latency_ms": health.latency_ms if health else None,
+            "ready_latency_ms": ready.latency_ms if ready else None,
+            "error": (health and health.error) or (ready and ready.error) or None,
+            "checked_at": checked_at.isoformat() if checked_at else None,
+            "last_seen": last_seen.isoformat() if last_seen else None,
+        }
+
+    def is_stale(self) -> bool:
+        return self._refreshed_at is None or self._clock() - self._refreshed_at > self.stale_after
+
+    @property
+    def version(self) -> str:
+        """
+        Wijzigt bij elke refresh (ETag van /modules). Afgeleid van het tijdstip
+        i.p.v. een teller, zodat workers met elk hun eigen monitor nooit
+        dezelfde versie voor verschillende inhoud geven.
+        """
+        checked_at = self._checked_at.isoformat() if self._checked_at else "-"
+        return f"{checked_at}:{int(self.is_stale())}"
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Laatste resultaat, zonder te wachten op probes."""
+        stale = self.is_stale()
+        return [{**item, "stale": stale} for item in self._items]
+
+
+@lru_cache()
+def get_monitor() -> ModuleHealthMonitor:
+    settings = get_settings()
+    return ModuleHealthMonitor(
+        targets_with_overrides(settings.MODULE_BACKEND_URLS),
+        interval=settings.MODULE_PROBE_INTERVAL_SECONDS,
+        timeout=settings.MODULE_PROBE_TIMEOUT_SECONDS,
+        stale_after=settings.MODULE_STALE_AFTER_SECONDS,
+    )
@@ -0,0 +1,155 @@
+# core-backend/app/services/refresh_tokens.py
+"""
+Roterende refresh tokens.
+
+- login start een family; elke refresh geeft een nieuwe refresh token (nieuwe
+  jti, zelfde family) en markeert de oude als gebruikt
+- rotatie = één statement (UPDATE ... RETURNING + INSERT in een CTE): de
+  oude token moet ongebruikt, niet ingetrokken en niet verlopen zijn; geen
+  aparte SELECT en geen herladen van de gebruiker (claims komen uit de token)
+- hergebruik van een al geroteerde token (gestolen kopie of replay) → de
+  hele family wordt ingetrokken, dus ook de access tokens van die login
+- logout trekt de family in, /auth/revoke alle tokens van een gebruiker
+  (bv. bij compromise of rolwijziging)
+- de intrekking geldt meteen in core; modules (verkoop) verifiëren access
+  tokens lokaal en zien ze pas niet meer na `exp`, dus hoogstens
+  ACCESS_TOKEN_EXPIRE_MINUTES later
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+from uuid import uuid4
+
+from sqlalchemy import text, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.core.revocation import revocations
+from app.core.security import create_access_token, create_refresh_token
+from app.models.refresh_token import RefreshToken
+from app.models.revoked_token import RevokedToken
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_ROTATE = text(
+    """
+    WITH old AS (
+        UPDATE refresh_tokens
+        SET used_at = :now
+        WHERE jti = :jti
+          AND used_at IS NULL
+          AND revoked_at IS NULL
+          AND expires_at > :now
+        RETURNING user_id, family_id
+    )
+    INSERT INTO refresh_tokens (jti, user_id, family_id, parent_jti, issued_at, expires_at)
+    SELECT :new_jti, user_id, family_id, :jti, :now, :expires_at FROM old
+    RETURNING family_id
+    """
+)
+
+
+class RefreshTokenError(Exception):
+    """Refresh token ongeldig, al gebruikt of ingetrokken (→ 401)."""
+
+
+@dataclass(frozen=True)
+class TokenPair:
+    access_token: str
+    refresh_token: str
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _refresh_ttl() -> timedelta:
+    return timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+
+
+def _pair(claims: Dict[str, Any], family_id: str, refresh_jti: str) -> TokenPair:
+    claims = {**claims, "fam": family_id}
+    return TokenPair(
+        access_token=create_access_token(claims, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)),
+        refresh_token=create_refresh_token({**claims, "jti": refresh_jti}, _refresh_ttl()),
+    )
+
+
+def start_session(db: Session, user: User) -> TokenPair:
+    now = _utcnow()
+    family_id, jti = uuid4().hex, uuid4().hex
+    db.add(RefreshToken(
+        jti=jti,
+        user_id=user.id,
+        family_id=family_id,
+        issued_at=now,
+        expires_at=now + _refresh_ttl(),
+    ))
+    db.commit()
+    claims = {"sub": str(user.id), "email": user.email, "role": user.role}
+    return _pair(claims, family_id, jti)
+
+
+def rotate(db: Session, payload: Dict[str, Any]) -> TokenPair:
+    jti, family_id = payload.get("jti"), payload.get("fam")
+    if not jti or not family_id:
+        # token van vóór de rotatie: opnieuw inloggen
+        raise RefreshTokenError("Refresh token zonder jti")
+    if revocations.is_revoked(db, payload):
+        raise RefreshTokenError("Refresh token ingetrokken")
+
+    now = _utcnow()
+    new_jti = uuid4().hex
+    rotated = db.execute(_ROTATE, {
+        "jti": jti,
+        "new_jti": new_jti,
+        "now": now,
+        "expires_at": now + _refresh_ttl(),
+    }).first()
+    if rotated is None:
+        db.rollback()
+        _handle_rejected(db, jti)
+        raise RefreshTokenError("Refresh token ongeldig")
+    db.commit()
+
+    claims = {key: payload[key] for key in ("sub", "email", "role") if key in payload}
+    return _pair(claims, rotated.family_id, new_jti)
+
+
+def _handle_rejected(db: Session, jti: str) -> None:
+    """Enkel op het trage pad: onderscheid hergebruik van onbekend/verlopen."""
+    token = db.get(RefreshToken, jti)
+    if token is not None and token.used_at is not None and token.revoked_at is None:
+        logger.warning(
+            "Hergebruik van refresh token %s voor user %s: family %s ingetrokken",
+            jti, token.user_id, token.family_id,
+        )
+        revoke_family(db, token.family_id, reason="reuse")
+
+
+def revoke_family(db: Session, family_id: str, reason: str) -> None:
+    now = _utcnow()
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now, revoke_reason=reason)
+    )
+    db.add(RevokedToken(family_id=family_id, reason=reason, revoked_at=now, expires_at=now + _refresh_ttl()))
+    db.commit()
+    revocations.add_family(family_id)
+
+
+def revoke_user(db: Session, user_id: int, reason: str) -> None:
+    now = _utcnow()
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now, revoke_reason=reason)
+    )
+    db.add(RevokedToken(user_id=user_id, reason=reason, revoked_at=now, expires_at=now + _refresh_ttl()))
+    db.commit()
+    revocations.add_user_cutoff(user_id, now)
@@ -0,0 +1,342 @@
+# core-backend/app/services/retrieval.py
+"""
+Offline zoekindex (BM25) voor de AI-helper (POST /ai/ask).
+
+- bronnen: markdown-docs (per kop opgesplitst in stukken van ~800 tekens)
+  en de routecatalogus uit openapi.json (één stuk per pad + methode)
+- inverted index: term → {chunk_id: tf}; df, documentlengtes (per chunk,
+  eenmaal berekend bij toevoegen) en avgdl worden bijgehouden, zodat een zoekvraag enkel de postings van de
+  zoektermen overloopt
+- incrementeel: per bestand een fingerprint (mtime_ns, size); gewijzigde
+  bestanden worden opnieuw geïndexeerd, verwijderde eruit gehaald, de rest
+  blijft staan. Controle hoogstens elke `check_interval` seconden, lazy
+  bij een zoekvraag
+- optioneel op schijf (JSON, `index_path`): bij opstart laden en enkel de
+  gewijzigde bestanden opnieuw tokenizen
+- geen netwerk, geen externe dependencies
+"""
+
+import glob
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 1
+MAX_CHUNK_CHARS = 800
+
+# BM25-parameters (Robertson/Zaragoza-defaults)
+K1 = 1.5
+B = 0.75
+
+_TOKEN = re.compile(r"[0-9a-zà-ÿ]+")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+
+STOPWORDS = frozenset(
+    """
+    de het een en of in op van voor met naar te is zijn er die dat dit wat hoe
+    ik je jij we wij u ze als bij om aan uit door over ook niet wel nog maar dan
+    kan moet wordt worden hebben heeft mijn onze deze welke waar wanneer
+    the a an and or to of in on for with is are be how what which i do does
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+@dataclass
+class Chunk:
+    id: str
+    source: str
+    title: str
+    text: str
+    terms: Dict[str, int] = field(default_factory=dict)
+
+
+# -------------------------------
+# Bronnen → chunks
+# -------------------------------
+def _paragraphs(lines: Sequence[str]) -> Iterable[str]:
+    """Blokken gescheiden door lege regels; ingesprongen blokken en code fences blijven bij hun lijst-item."""
+    block: List[str] = []
+    in_fence = False
+    for line in lines:
+        if line.strip().startswith("```"):
+            in_fence = not in_fence
+        if not line.strip() and not in_fence:
+            if block:
+                yield "\n".join(block)
+                block = []
+            continue
+        block.append(line)
+    if block:
+        yield "\n".join(block)
+
+
+def _merge_paragraphs(paragraphs: Iterable[str]) -> List[str]:
+    parts: List[str] = []
+    for paragraph in paragraphs:
+        continuation = paragraph[:1].isspace() and parts
+        if parts and (continuation or len(parts[-1]) + len(paragraph) < MAX_CHUNK_CHARS):
+            parts[-1] = f"{parts[-1]}\n\n{paragraph}"
+        else:
+            parts.append(paragraph)
+    return parts
+
+
+def markdown_chunks(rel_path: str, content: str) -> List[Chunk]:
+    sections: List[Tuple[str, List[str]]] = []
+    title, lines = os.path.basename(rel_path), []
+    for line in content.splitlines():
+        heading = _HEADING.match(line)
+        if heading:
+            if any(l.strip() for l in lines):
+                sections.append((title, lines))
+            title, lines = heading.group(2).strip(), []
+        else:
+            lines.append(line)
+    if any(l.strip() for l in lines):
+        sections.append((title, lines))
+
+    chunks = []
+    for s_idx, (section_title, section_lines) in enumerate(sections):
+        for p_idx, text in enumerate(_merge_paragraphs(_paragraphs(section_lines))):
+            chunks.append(Chunk(
+                id=f"{rel_path}#{s_idx}.{p_idx}",
+                source=f"{rel_path}#{section_title}",
+                title=section_title,
+                text=text.strip(),
+            ))
+    return chunks
+
+
+def _openapi_documents(content: str) -> Iterable[Dict[str, Any]]:
+    """Ook bij aan elkaar geplakte JSON-documenten (bv. een foutbody voor de spec)."""
+    decoder = json.JSONDecoder()
+    pos = 0
+    while pos < len(content):
+        while pos < len(content) and content[pos].isspace():
+            pos += 1
+        if pos >= len(content):
+            break
+        try:
+            document, pos = decoder.raw_decode(content, pos)
+        except ValueError:
+            break
+        if isinstance(document, dict) and "paths" in document:
+            yield document
+
+
+def openapi_chunks(rel_path: str, content: str) -> List[Chunk]:
+    chunks = []
+    for spec in _openapi_documents(content):
+        api_title = spec.get("info", {}).get("title", rel_path)
+        for route, operations in spec.get("paths", {}).items():
+            for method, operation in operations.items():
+                if not isinstance(operation, dict):
+                    continue
+                params = ", ".join(p.get("name", "") for p in operation.get("parameters", []))
+                text = "\n".join(filter(None, [
+                    f"{method.upper()} {route}",
+                    operation.get("summary"),
+                    (operation.get("description") or "").strip(),
+                    f"Parameters: {params}" if params else "",
+                    f"Tags: {', '.join(operation.get('tags', []))}" if operation.get("tags") else "",
+                ]))
+                chunks.append(Chunk(
+                    id=f"{rel_path}#{method.upper()} {route}",
+                    source=f"{rel_path}#{method.upper()} {route}",
+                    title=f"{api_title}: {method.upper()} {route}",
+                    text=text,
+                ))
+    return chunks
+
+
+# -------------------------------
+# Index
+# -------------------------------
+class SearchIndex:
+    def __init__(
+        self,
+        root: str,
+        doc_globs: Sequence[str],
+        openapi_files: Sequence[str] = (),
+        index_path: Optional[str] = None,
+        check_interval: float = 5.0,
+    ) -> None:
+        self.root = os.path.abspath(root)
+        self.doc_globs = list(doc_globs)
+        self.openapi_files = list(openapi_files)
+        self.index_path = index_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        # per bestand: fingerprint + chunk-ids
+        self._files: Dict[str, Tuple[Tuple[int, int], List[str]]] = {}
+        self._chunks: Dict[str, Chunk] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # chunk_id → aantal termen (documentlengte voor BM25)
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    # -------------------------------
+    # Opbouw
+    # -------------------------------
+    def _sources(self) -> Dict[str, str]:
+        """rel_path → soort ("markdown" / "openapi")."""
+        found = {}
+        for pattern in self.doc_globs:
+            for path in glob.glob(os.path.join(self.root, pattern)):
+                found[os.path.relpath(path, self.root)] = "markdown"
+        for rel in self.openapi_files:
+            if os.path.isfile(os.path.join(self.root, rel)):
+                found[os.path.normpath(rel)] = "openapi"
+        return found
+
+    def _add_chunk(self, chunk: Chunk) -> None:
+        if not chunk.terms:
+            chunk.terms = dict(Counter(tokenize(f"{chunk.title}\n{chunk.text}")))
+        self._chunks[chunk.id] = chunk
+        length = 0
+        for term, tf in chunk.terms.items():
+            self._postings.setdefault(term, {})[chunk.id] = tf
+            length += tf
+        self._lengths[chunk.id] = length
+        self._total_length += length
+
+    def _remove_file(self, rel_path: str) -> None:
+        _, chunk_ids = self._files.pop(rel_path, (None, []))
+        for chunk_id in chunk_ids:
+            chunk = self._chunks.pop(chunk_id)
+            self._total_length -= self._lengths.pop(chunk_id)
+            for term in chunk.terms:
+                postings = self._postings[term]
+                postings.pop(chunk_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def refresh(self, force: bool = False) -> int:
+        """Herindexeert gewijzigde bestanden; geeft het aantal herindexeerde bestanden terug."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return 0
+        with self._lock:
+            self._checked_at = now
+            sources = self._sources()
+            changed = 0
+            for rel_path in set(self._files) - set(sources):
+                self._remove_file(rel_path)
+                changed += 1
+            for rel_path, kind in sources.items():
+                stat = os.stat(os.path.join(self.root, rel_path))
+                fingerprint = (stat.st_mtime_ns, stat.st_size)
+                known = self._files.get(rel_path)
+                if known is not None and known[0] == fingerprint:
+                    continue
+                self._remove_file(rel_path)
+                with open(os.path.join(self.root, rel_path), encoding="utf-8", errors="replace") as fh:
+                    content = fh.read()
+                chunks = openapi_chunks(rel_path, content) if kind == "openapi" else markdown_chunks(rel_path, content)
+                for chunk in chunks:
+                    self._add_chunk(chunk)
+                self._files[rel_path] = (fingerprint, [c.id for c in chunks])
+                changed += 1
+            if changed:
+                logger.info("Zoekindex bijgewerkt: %d bestand(en), %d stukken", changed, len(self._chunks))
+                self._save()
+            return changed
+
+    # -------------------------------
+    # Persistentie
+    # -------------------------------
+    def _save(self) -> None:
+        if not self.index_path:
+            return
+        data = {
+            "format": INDEX_FORMAT,
+            "root": self.root,
+            "files": {
+                rel_path: {
+                    "fingerprint": list(fingerprint),
+                    "chunks": [
+                        {**{k: getattr(self._chunks[cid], k) for k in ("id", "source", "title", "text")},
+                         "terms": self._chunks[cid].terms}
+                        for cid in chunk_ids
+                    ],
+                }
+                for rel_path, (fingerprint, chunk_ids) in self._files.items()
+            },
+        }
+        tmp = f"{self.index_path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, ensure_ascii=False)
+            os.replace(tmp, self.index_path)
+        except OSError:
+            logger.warning("Zoekindex niet weggeschreven naar %s", self.index_path, exc_info=True)
+
+    def load(self) -> bool:
+        """Voorgebouwde index inladen (zonder tokenizen); refresh() vult verschillen aan."""
+        if not self.index_path or not os.path.isfile(self.index_path):
+            return False
+        try:
+            with open(self.index_path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            logger.warning("Zoekindex %s onleesbaar; volledige opbouw", self.index_path)
+            return False
+        if data.get("format") != INDEX_FORMAT or data.get("root") != self.root:
+            return False
+        with self._lock:
+            for rel_path, entry in data["files"].items():
+                chunks = [Chunk(**c) for c in entry["chunks"]]
+                for chunk in chunks:
+                    self._add_chunk(chunk)
+                self._files[rel_path] = (tuple(entry["fingerprint"]), [c.id for c in chunks])
+        return True
+
+    # -------------------------------
+    # Zoeken
+    # -------------------------------
+    def search(self, query: str, limit: int = 5) -> List[Tuple[Chunk, float]]:
+        self.refresh()
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self._chunks)
+            if not n or not terms:
+                return []
+            avgdl = self._total_length / n
+            lengths = self._lengths
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings.items():
+                    norm = tf + K1 * (1 - B + B * lengths[chunk_id] / avgdl)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (K1 + 1) / norm
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            return [(self._chunks[chunk_id], score) for chunk_id, score in best]
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+
+def snippet(chunk: Chunk, query: str, max_lines: int = 8) -> List[str]:
+    """De regels van het stuk met de meeste zoektermen, in documentvolgorde."""
+    terms = set(tokenize(query))
+    lines = [line.strip() for line in chunk.text.splitlines() if line.strip() and not line.strip().startswith("```")]
+    ranked = sorted(range(len(lines)), key=lambda i: -len(terms.intersection(tokenize(lines[i]))))
+    keep = sorted(ranked[:max_lines])
+    return [lines[i] for i in keep]
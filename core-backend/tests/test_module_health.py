@@ -0,0 +1,128 @@
+import asyncio
+
+import httpx
+
+from app.services.module_health import ModuleHealthMonitor, ModuleTarget, _ready_from_body, targets_with_overrides
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _target(key: str, ready_path="/readyz") -> ModuleTarget:
+    return ModuleTarget(key, key.title(), f"http://{key}.front", f"http://{key}", ready_path=ready_path)
+
+
+async def _handler(request: httpx.Request) -> httpx.Response:
+    host, path = request.url.host, request.url.path
+    if host == "down":
+        raise httpx.ConnectError("geweigerd", request=request)
+    if host == "broken":
+        return httpx.Response(500)
+    if host == "slow":
+        await asyncio.sleep(5)
+    if host == "degraded" and path == "/readyz":
+        return httpx.Response(200, json={"status": "not-ready"})
+    return httpx.Response(200, json={"status": "ok"})
+
+
+def _refresh(monitor: ModuleHealthMonitor, handler=_handler) -> None:
+    async def scenario():
+        monitor._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            await monitor.refresh()
+        finally:
+            await monitor._client.aclose()
+            monitor._client = None
+
+    asyncio.run(scenario())
+
+
+def test_status_per_module_and_timeouts():
+    keys = ["up", "degraded", "down", "broken", "slow"]
+    monitor = ModuleHealthMonitor([_target(k) for k in keys] + [_target("plain", ready_path=None)], timeout=0.05)
+    assert {item["status"] for item in monitor.snapshot()} == {"unknown"}
+
+    _refresh(monitor)
+    items = {item["key"]: item for item in monitor.snapshot()}
+
+    assert {key: item["status"] for key, item in items.items()} == {
+        "up": "online",
+        "degraded": "degraded",
+        "down": "offline",
+        "broken": "offline",
+        "slow": "offline",
+        "plain": "online",
+    }
+    assert items["degraded"]["error"] == "not ready"
+    assert items["down"]["error"] == "ConnectError"
+    assert items["broken"]["error"] == "HTTP 500"
+    # trage module: afgebroken op de timeout, niet na 5 s
+    assert items["slow"]["error"] is not None
+    assert items["slow"]["latency_ms"] < 1000
+    assert items["plain"]["ready_latency_ms"] is None
+    assert items["up"]["url"] == "http://up.front"
+    assert items["up"]["last_seen"] == items["up"]["checked_at"]
+    assert items["down"]["last_seen"] is None
+
+
+def test_last_seen_survives_a_later_outage():
+    monitor = ModuleHealthMonitor([_target("up")])
+    _refresh(monitor)
+    seen = monitor.snapshot()[0]["last_seen"]
+
+    async def down(request):
+        raise httpx.ConnectError("weg", request=request)
+
+    _refresh(monitor, down)
+    item = monitor.snapshot()[0]
+    assert (item["status"], item["last_seen"]) == ("offline", seen)
+    assert item["checked_at"] != seen
+
+
+def test_ready_from_body():
+    def response(**kwargs):
+        return httpx.Response(200, **kwargs)
+
+    assert _ready_from_body(response(json={"ready": True}))
+    assert not _ready_from_body(response(json={"ready": False, "status": "ok"}))
+    for status in ("not-ready", "not_ready", "error", "down"):
+        assert not _ready_from_body(response(json={"status": status}))
+    assert _ready_from_body(response(json={"status": "ok"}))
+    # geen (dict-)JSON: de statuscode beslist
+    assert _ready_from_body(response(text="OK"))
+    assert _ready_from_body(response(json=["ready"]))
+
+
+def test_targets_with_overrides():
+    targets = (_target("verkoop"), _target("website"))
+    result = targets_with_overrides(" verkoop = http://verkoop-backend:20030/ ,onbekend=http://x,website=,kapot", targets)
+
+    assert [t.backend_url for t in result] == ["http://verkoop-backend:20030", "http://website"]
+    assert result[0].url == targets[0].url
+    assert targets_with_overrides("", targets) == targets
+
+
+def test_stale_flag_and_version():
+    clock = _Clock()
+    monitor = ModuleHealthMonitor([_target("up")], stale_after=30, clock=clock)
+    assert monitor.is_stale()
+    assert monitor.version == "-:1"
+
+    _refresh(monitor)
+    assert not monitor.snapshot()[0]["stale"]
+    fresh = monitor.version
+    assert fresh.endswith(":0")
+
+    clock.now = 31
+    assert monitor.snapshot()[0]["stale"]
+    # zelfde inhoud, maar stale: andere ETag
+    assert monitor.version != fresh and monitor.version.endswith(":1")
+
+    _refresh(monitor)
+    assert not monitor.is_stale()
+    assert monitor.version.endswith(":0")
@@ -0,0 +1,118 @@
+import os
+import uuid
+
+import pytest
+
+jwt = pytest.importorskip("jose.jwt")
+pytest.importorskip("pyotp")
+
+from app.config import get_settings  # noqa: E402
+from app.core.revocation import RevocationCache  # noqa: E402
+from app.services import refresh_tokens  # noqa: E402
+
+settings = get_settings()
+
+
+def _claims(token: str) -> dict:
+    return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = RevocationCache(session_factory=None, capacity=1000)
+    monkeypatch.setattr(refresh_tokens, "revocations", cache)
+    return cache
+
+
+def test_refresh_token_without_jti_is_rejected_before_any_query(cache):
+    # token van vóór de rotatie: geen DB nodig om te weigeren
+    with pytest.raises(refresh_tokens.RefreshTokenError):
+        refresh_tokens.rotate(None, {"sub": "1", "type": "refresh"})
+
+
+# -------------------------------
+# Tegen PostgreSQL
+# -------------------------------
+needs_postgres = pytest.mark.skipif(
+    not os.getenv("CORE_TEST_DATABASE_URL"),
+    reason="CORE_TEST_DATABASE_URL (PostgreSQL) niet gezet",
+)
+
+
+@pytest.fixture
+def db():
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session
+
+    from app.db import Base
+    from app.models.refresh_token import RefreshToken
+    from app.models.revoked_token import RevokedToken
+    from app.models.user import User
+
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    engine = create_engine(
+        os.environ["CORE_TEST_DATABASE_URL"], connect_args={"options": f"-csearch_path={schema}"}
+    )
+    with engine.begin() as conn:
+        conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+        Base.metadata.create_all(conn, tables=[User.__table__, RefreshToken.__table__, RevokedToken.__table__])
+    try:
+        with Session(engine) as session:
+            user = User(email=f"{schema}@example.com", hashed_password="x", role="seller")
+            session.add(user)
+            session.commit()
+            session.info["user"] = user
+            yield session
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+        engine.dispose()
+
+
+@needs_postgres
+def test_rotation_issues_a_new_token_in_the_same_family(db, cache):
+    first = refresh_tokens.start_session(db, db.info["user"])
+    second = refresh_tokens.rotate(db, _claims(first.refresh_token))
+
+    old, new = _claims(first.refresh_token), _claims(second.refresh_token)
+    assert new["fam"] == old["fam"] and new["jti"] != old["jti"]
+    assert (new["sub"], new["role"]) == (str(db.info["user"].id), "seller")
+    assert _claims(second.access_token)["fam"] == old["fam"]
+
+    # en de nieuwe token roteert op zijn beurt
+    refresh_tokens.rotate(db, new)
+
+
+@needs_postgres
+def test_reuse_of_a_rotated_token_revokes_the_family(db, cache):
+    from app.models.refresh_token import RefreshToken
+
+    first = refresh_tokens.start_session(db, db.info["user"])
+    second = refresh_tokens.rotate(db, _claims(first.refresh_token))
+
+    with pytest.raises(refresh_tokens.RefreshTokenError):
+        refresh_tokens.rotate(db, _claims(first.refresh_token))
+
+    # ook de legitieme opvolger en de access tokens van die login zijn ingetrokken
+    with pytest.raises(refresh_tokens.RefreshTokenError):
+        refresh_tokens.rotate(db, _claims(second.refresh_token))
+    assert cache.is_revoked(db, _claims(second.access_token))
+    family = _claims(first.refresh_token)["fam"]
+    reasons = {token.revoke_reason for token in db.query(RefreshToken).filter_by(family_id=family)}
+    assert reasons == {"reuse"}
+
+
+@needs_postgres
+def test_logout_revokes_only_that_login(db, cache):
+    from app.api.v1 import auth
+
+    user = db.info["user"]
+    session, other = refresh_tokens.start_session(db, user), refresh_tokens.start_session(db, user)
+
+    auth.logout(auth.LogoutRequest(refresh_token=session.refresh_token), None, db)
+
+    assert cache.is_revoked(db, _claims(session.access_token))
+    with pytest.raises(refresh_tokens.RefreshTokenError):
+        refresh_tokens.rotate(db, _claims(session.refresh_token))
+    assert not cache.is_revoked(db, _claims(other.access_token))
+    refresh_tokens.rotate(db, _claims(other.refresh_token))
@@ -0,0 +1,32 @@
+import os
+
+from app.services.retrieval import SearchIndex
+
+
+def _write(path, content: str) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(content)
+    # mtime verschuiven: binnen dezelfde klok-tick zou de fingerprint gelijk kunnen blijven
+    mtime = os.stat(path).st_mtime_ns + 1_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_document_lengths_follow_incremental_updates(tmp_path):
+    _write(tmp_path / "a.md", "# Facturen\n\nfactuur betaling herinnering\n")
+    _write(tmp_path / "b.md", "# Magazijn\n\nvoorraad reservatie picking picking\n")
+    index = SearchIndex(str(tmp_path), ["*.md"])
+    index.refresh(force=True)
+
+    # titel + tekst: 4 en 5 termen
+    assert sorted(index._lengths.values()) == [4, 5]
+    assert index._total_length == 9
+    assert index.search("picking")[0][0].title == "Magazijn"
+
+    _write(tmp_path / "a.md", "# Facturen\n\nfactuur\n")
+    os.remove(tmp_path / "b.md")
+    assert index.refresh(force=True) == 2
+
+    assert list(index._lengths.values()) == [2]
+    assert index._total_length == 2
+    assert index.search("picking") == []
+    assert [chunk.title for chunk, _ in index.search("factuur")] == ["Facturen"]
@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.core.bloom import BloomFilter
+from app.core.revocation import RevocationCache, user_cutoff
+
+
+class _FakeResult:
+    def __init__(self, hit) -> None:
+        self._hit = hit
+
+    def first(self):
+        return self._hit
+
+
+class _FakeDb:
+    """Telt de bevestigingsqueries; `revoked` bepaalt of de tabel een rij heeft."""
+
+    def __init__(self, revoked: bool = True) -> None:
+        self.revoked = revoked
+        self.queries = 0
+
+    def execute(self, statement):
+        self.queries += 1
+        return _FakeResult((1,) if self.revoked else None)
+
+
+def _cache() -> RevocationCache:
+    return RevocationCache(session_factory=None, capacity=1000)
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [f"jti:{i}" for i in range(1000)]
+    bloom.update(keys)
+
+    assert bloom.count == 1000
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"fam:{i}" in bloom for i in range(10_000))
+    assert false_positives < 300  # ~1% verwacht, ruime marge
+
+
+def test_bloom_filter_sizing():
+    bloom = BloomFilter(100_000, 0.001)
+    # ~1,44 * log2(1/p) bits per key, ~10 hashes
+    assert 170_000 < bloom.nbytes < 190_000
+    assert bloom.hashes == 10
+    assert BloomFilter(0).capacity == 1
+
+
+def test_user_cutoff_is_floored_to_whole_seconds():
+    revoked_at = datetime(2026, 1, 1, 12, 0, 0, 700_000, tzinfo=timezone.utc)
+    assert user_cutoff(revoked_at) == int(datetime(2026, 1, 1, 12, tzinfo=timezone.utc).timestamp())
+
+
+def test_user_cutoff_revokes_older_tokens_but_not_the_same_second():
+    cache = _cache()
+    db = _FakeDb()
+    revoked_at = datetime(2026, 1, 1, 12, 0, 0, 700_000, tzinfo=timezone.utc)
+    cutoff = user_cutoff(revoked_at)
+    cache.add_user_cutoff(7, revoked_at)
+
+    assert cache.is_revoked(db, {"sub": "7", "iat": cutoff - 1})
+    # iat wordt afgekapt: een login in dezelfde seconde na de intrekking blijft geldig
+    assert not cache.is_revoked(db, {"sub": "7", "iat": cutoff})
+    assert not cache.is_revoked(db, {"sub": "8", "iat": cutoff - 1})
+
+    # een oudere intrekking verschuift de cutoff niet terug
+    cache.add_user_cutoff(7, datetime(2025, 1, 1, tzinfo=timezone.utc))
+    assert cache.is_revoked(db, {"sub": "7", "iat": cutoff - 1})
+    assert db.queries == 0
+
+
+def test_is_revoked_only_queries_on_a_bloom_hit():
+    cache = _cache()
+    db = _FakeDb(revoked=True)
+
+    assert not cache.is_revoked(db, {"sub": "1", "jti": "a", "fam": "f"})
+    assert db.queries == 0
+
+    cache.add_jti("a")
+    assert cache.is_revoked(db, {"sub": "1", "jti": "a", "fam": "f"})
+    assert db.queries == 1
+
+    cache.add_family("g")
+    assert cache.is_revoked(db, {"sub": "1", "jti": "b", "fam": "g"})
+    assert db.queries == 2
+
+
+def test_is_revoked_confirms_bloom_hits_against_the_table():
+    cache = _cache()
+    cache.add_jti("a")
+    # bloom-positief maar geen (geldige) rij meer: niet ingetrokken
+    db = _FakeDb(revoked=False)
+    assert not cache.is_revoked(db, {"sub": "1", "jti": "a"})
+    assert db.queries == 1
+
+
+def test_apply_rows_fills_filter_and_cutoffs():
+    cache = _cache()
+    revoked_at = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+    rows = [
+        SimpleNamespace(jti="a", family_id=None, user_id=None, revoked_at=revoked_at),
+        SimpleNamespace(jti=None, family_id="f", user_id=None, revoked_at=revoked_at),
+        SimpleNamespace(jti=None, family_id=None, user_id=3, revoked_at=revoked_at),
+    ]
+    bloom = BloomFilter(100)
+    cutoffs = {}
+    cache._apply(rows, bloom, cutoffs)
+
+    assert "jti:a" in bloom and "fam:f" in bloom
+    assert cutoffs == {3: user_cutoff(revoked_at)}
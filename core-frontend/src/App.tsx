@@ -2,7 +2,7 @@
 import React, { useEffect, useState } from "react";
 import Login from "./components/Login";
 import Dashboard from "./components/Dashboard";
-import { getModules } from "./api";
+import { getModules, logout } from "./api";
 import AIHelper from "./components/AIHelper";
 
 // Sleutel waaronder we het core-token in localStorage bewaren
@@ -55,6 +55,10 @@ const App: React.FC = () => {
 
   // 4) Logout in core: token resetten (localStorage wordt via useEffect hierboven ook gewist)
   const handleLogout = () => {
+    if (token) {
+      // best effort: lokaal uitloggen gaat altijd door
+      logout(token).catch(() => undefined);
+    }
     setToken(null);
   };
 
@@ -23,6 +23,16 @@ const AIHelper: React.FC = () => {
           <h3>{a.title}</h3>
           {a.steps && <ul>{a.steps.map((s: string, i: number) => <li key={i}>{s}</li>)}</ul>}
           {a.code_example && <pre>{a.code_example}</pre>}
+          {a.sources && a.sources.length > 0 && (
+            <ol className="ai-sources">
+              {a.sources.map((src: any) => (
+                <li key={src.source}>
+                  <strong>{src.title}</strong> <small>{src.source}</small>
+                  <div>{src.snippet}</div>
+                </li>
+              ))}
+            </ol>
+          )}
         </div>
       )}
     </div>
@@ -0,0 +1,99 @@
+# facturatie/backend/metrics.py
+"""
+Prometheus-metrics voor de facturatie-backend.
+
+- PrometheusMiddleware : pure ASGI-middleware; request count, latency per
+                         route-template en in-flight requests
+- metrics_response     : exposition voor GET /metrics
+
+Meerdere uvicorn-workers: zet PROMETHEUS_MULTIPROC_DIR (leeg bij opstart);
+elke worker schrijft dan naar die map en /metrics aggregeert alle processen.
+"""
+
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from starlette.responses import Response
+
+NAMESPACE = "facturatie"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests per route en status",
+    ["method", "route", "status"],
+    namespace=NAMESPACE,
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latency van HTTP requests per route",
+    ["method", "route"],
+    namespace=NAMESPACE,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests die momenteel verwerkt worden",
+    namespace=NAMESPACE,
+    multiprocess_mode="livesum",
+)
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        return getattr(endpoint, "__name__", "<endpoint>")
+    return "<unmatched>"
+
+
+class PrometheusMiddleware:
+    """Pure ASGI-middleware (geen BaseHTTPMiddleware → geen extra task per request)."""
+
+    def __init__(self, app, skip_paths: tuple = ("/metrics",)) -> None:
+        self.app = app
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route_label = _route_label(scope)
+            method = scope["method"]
+            HTTP_LATENCY.labels(method, route_label).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route_label, str(status_code)).inc()
+
+
+def metrics_response() -> Response:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -1,8 +1,19 @@
+import asyncio
 import os
-from fastapi import FastAPI
+from typing import Literal, Optional
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.orm import Session
 import uvicorn
 
+import stocktake
+from database import SessionLocal, engine, get_db, init_schema, ping_check
+from metrics import PrometheusMiddleware, metrics_response
+from readiness import Readiness
+from schemas import StocktakeIn
+
 MODULE_NAME = os.getenv("MODULE_NAME", "inventaries")
 MODULE_PORT = int(os.getenv("MODULE_PORT", 20070))
 ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "*").split(",")
@@ -16,6 +27,27 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PrometheusMiddleware)
+
+# /readyz leest enkel het laatste resultaat van de achtergrond-checks
+readiness = Readiness(
+    interval=float(os.getenv("READINESS_INTERVAL_SECONDS", "5")),
+    timeout=float(os.getenv("READINESS_TIMEOUT_SECONDS", "2")),
+    stale_after=float(os.getenv("READINESS_STALE_AFTER_SECONDS", "30")),
+)
+readiness.register("database", ping_check(engine))
+
+# verwachte standen voor de diff komen uit magazijn
+MAGAZIJN_URL = os.getenv("MAGAZIJN_URL", "http://magazijn-backend:20120")
+
+@app.on_event("startup")
+async def startup():
+    await asyncio.to_thread(init_schema)
+    await readiness.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await readiness.stop()
 
 @app.get("/healthz")
 def healthz():
@@ -23,7 +55,11 @@ def healthz():
 
 @app.get("/readyz")
 def readyz():
-    return {"status": "ready", "module": MODULE_NAME}
+    return readiness.response(module=MODULE_NAME)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
 
 @app.get("/info")
 def info():
@@ -34,5 +70,70 @@ def info():
         "openapi": "/openapi.json",
     }
 
+# -------------------------------
+# Inventaris (telling)
+# -------------------------------
+@app.post("/stocktakes", status_code=201)
+def create_stocktake(body: StocktakeIn, db: Session = Depends(get_db)):
+    return stocktake.create(db, body.name, body.scope)
+
+@app.get("/stocktakes/{stocktake_id}")
+def get_stocktake(stocktake_id: int, db: Session = Depends(get_db)):
+    try:
+        return stocktake.get(db, stocktake_id)
+    except stocktake.StocktakeNotFound:
+        raise HTTPException(status_code=404, detail="Telling niet gevonden")
+
+@app.post("/stocktakes/{stocktake_id}/imports", status_code=201)
+async def import_counts(
+    stocktake_id: int,
+    request: Request,
+    fmt: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format", description="Standaard afgeleid uit Content-Type"),
+    filename: Optional[str] = Query(None, max_length=255),
+):
+    """Ruwe body (CSV of NDJSON), gestreamd verwerkt; hetzelfde bestand opnieuw geeft duplicate=true."""
+    if fmt is None:
+        fmt = "ndjson" if "json" in request.headers.get("content-type", "") else "csv"
+    db = SessionLocal()
+    try:
+        importer = await asyncio.to_thread(stocktake.StocktakeImporter, db, stocktake_id, fmt, filename)
+        async for chunk in request.stream():
+            if chunk:
+                await asyncio.to_thread(importer.feed, chunk)
+        return await asyncio.to_thread(importer.finish)
+    except stocktake.StocktakeNotFound:
+        raise HTTPException(status_code=404, detail="Telling niet gevonden")
+    except stocktake.ImportFormatError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    finally:
+        # niet gecommit (fout of duplicate) → rollback bij close
+        await asyncio.to_thread(db.close)
+
+@app.delete("/stocktakes/{stocktake_id}/imports/{import_id}", status_code=204)
+def delete_import(stocktake_id: int, import_id: int, db: Session = Depends(get_db)):
+    if not stocktake.delete_import(db, stocktake_id, import_id):
+        raise HTTPException(status_code=404, detail="Import niet gevonden")
+
+@app.post("/stocktakes/{stocktake_id}/diff")
+def diff_stocktake(stocktake_id: int, db: Session = Depends(get_db)):
+    try:
+        return stocktake.diff(db, stocktake_id, stocktake.magazijn_balances(MAGAZIJN_URL))
+    except stocktake.StocktakeNotFound:
+        raise HTTPException(status_code=404, detail="Telling niet gevonden")
+    except httpx.HTTPError as exc:
+        raise HTTPException(status_code=502, detail=f"Magazijn niet bereikbaar: {exc}")
+
+@app.get("/stocktakes/{stocktake_id}/adjustments")
+def list_adjustments(
+    stocktake_id: int,
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    try:
+        return stocktake.adjustments(db, stocktake_id, after_id=after_id, limit=limit)
+    except stocktake.StocktakeNotFound:
+        raise HTTPException(status_code=404, detail="Telling niet gevonden")
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=MODULE_PORT)
@@ -0,0 +1,72 @@
+"""
+Micro-benchmark voor het parsen en aggregeren van scannerexports (zonder database).
+
+    python bench_stocktake.py [--lines 1000000] [--keys 50000] [--format csv|ndjson]
+
+Genereert de export on the fly in chunks van 64 KB (zoals een upload binnenkomt)
+en meet regels/s en het piekgeheugen van het proces (max RSS). Flushes
+worden enkel geteld i.p.v. naar de database geschreven.
+"""
+
+import argparse
+import json
+import random
+import resource
+import time
+from typing import Iterator
+
+from stocktake import CountAggregator
+
+CHUNK = 64 * 1024
+
+
+def _export(lines: int, keys: int, fmt: str, seed: int = 42) -> Iterator[bytes]:
+    rng = random.Random(seed)
+    buffer = ["sku;locatie;lot;aantal\n"] if fmt == "csv" else []
+    size = sum(map(len, buffer))
+    for _ in range(lines):
+        k = rng.randrange(keys)
+        sku, location, lot = f"SKU-{k % 5000:05d}", f"A{k % 40:02d}-{k % 97:02d}", f"L{k % 3}"
+        qty = rng.randint(1, 3)
+        if fmt == "csv":
+            line = f"{sku};{location};{lot};{qty}\n"
+        else:
+            line = json.dumps({"sku": sku, "location": location, "lot_no": lot, "qty": qty}) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--keys", type=int, default=50_000)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    args = parser.parse_args()
+
+    flushed = {"flushes": 0, "keys": 0}
+
+    def flush(counts) -> None:
+        flushed["flushes"] += 1
+        flushed["keys"] += len(counts)
+
+    aggregator = CountAggregator(args.format, flush)
+    started = time.perf_counter()
+    for chunk in _export(args.lines, args.keys, args.format):
+        aggregator.feed(chunk)
+    digest = aggregator.finish()
+    elapsed = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"{aggregator.lines:,} regels ({aggregator.rejected} afgewezen) in {elapsed:.2f}s "
+          f"→ {aggregator.lines / elapsed:,.0f} regels/s")
+    print(f"{flushed['flushes']} flushes, {flushed['keys']:,} sleutels; max RSS {peak_kb / 1024:.0f} MB")
+    print(f"sha256 {digest[:16]}…")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# inventaries/backend/models.py
+"""
+Tabellen voor de inventaris (telling).
+
+- stocktakes            : één telling (bv. jaarinventaris), scope bepaalt welke
+                          locaties meedoen in de vergelijking
+- stocktake_imports     : één geïmporteerde scannerexport; content_hash maakt
+                          een herimport van hetzelfde bestand idempotent
+- stocktake_counts      : getelde aantallen per import, al geaggregeerd per
+                          (sku, locatie, lot)
+- stocktake_expected    : verwachte standen uit magazijn op het moment van de diff
+- stocktake_adjustments : voorstellen (geteld - verwacht), klaar om als
+                          adjustment-boekingen in magazijn te posten
+"""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    CheckConstraint,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database import Base
+
+SCOPES = ("counted_locations", "all")
+
+
+class Stocktake(Base):
+    __tablename__ = "stocktakes"
+    __table_args__ = (
+        CheckConstraint(f"scope IN {SCOPES}", name="ck_stocktakes_scope"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(120))
+    # counted_locations: enkel locaties waar iets geteld is; all: ook niet-getelde (→ naar 0)
+    scope: Mapped[str] = mapped_column(String(20), default="counted_locations")
+    status: Mapped[str] = mapped_column(String(20), default="open")
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    diffed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+class StocktakeImport(Base):
+    __tablename__ = "stocktake_imports"
+    __table_args__ = (
+        UniqueConstraint("stocktake_id", "content_hash", name="uq_stocktake_imports_hash"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    stocktake_id: Mapped[int] = mapped_column(ForeignKey("stocktakes.id", ondelete="CASCADE"))
+    filename: Mapped[str | None] = mapped_column(String(255))
+    format: Mapped[str] = mapped_column(String(10))
+    # sha256 van de ruwe bytes; NULL zolang de import loopt (niet gecommit)
+    content_hash: Mapped[str | None] = mapped_column(String(64))
+    lines: Mapped[int] = mapped_column(Integer, default=0)
+    rejected: Mapped[int] = mapped_column(Integer, default=0)
+    keys: Mapped[int] = mapped_column(Integer, default=0)
+    errors: Mapped[Any] = mapped_column(JSON, default=list)
+    imported_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class StocktakeCount(Base):
+    __tablename__ = "stocktake_counts"
+    __table_args__ = (
+        # optellen over alle imports van een telling
+        Index("ix_stocktake_counts_stocktake", "stocktake_id", "sku", "location", "lot_no"),
+    )
+
+    import_id: Mapped[int] = mapped_column(ForeignKey("stocktake_imports.id", ondelete="CASCADE"), primary_key=True)
+    sku: Mapped[str] = mapped_column(String(64), primary_key=True)
+    location: Mapped[str] = mapped_column(String(32), primary_key=True)
+    lot_no: Mapped[str] = mapped_column(String(64), primary_key=True)
+    stocktake_id: Mapped[int] = mapped_column(ForeignKey("stocktakes.id", ondelete="CASCADE"))
+    qty: Mapped[int] = mapped_column(BigInteger)
+
+
+class StocktakeExpected(Base):
+    __tablename__ = "stocktake_expected"
+
+    stocktake_id: Mapped[int] = mapped_column(ForeignKey("stocktakes.id", ondelete="CASCADE"), primary_key=True)
+    sku: Mapped[str] = mapped_column(String(64), primary_key=True)
+    location: Mapped[str] = mapped_column(String(32), primary_key=True)
+    lot_no: Mapped[str] = mapped_column(String(64), primary_key=True)
+    qty: Mapped[int] = mapped_column(BigInteger)
+
+
+class StocktakeAdjustment(Base):
+    __tablename__ = "stocktake_adjustments"
+    __table_args__ = (
+        Index("ix_stocktake_adjustments_stocktake", "stocktake_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    stocktake_id: Mapped[int] = mapped_column(ForeignKey("stocktakes.id", ondelete="CASCADE"))
+    sku: Mapped[str] = mapped_column(String(64))
+    location: Mapped[str] = mapped_column(String(32))
+    lot_no: Mapped[str] = mapped_column(String(64))
+    expected_qty: Mapped[int] = mapped_column(BigInteger)
+    counted_qty: Mapped[int] = mapped_column(BigInteger)
+    delta: Mapped[int] = mapped_column(BigInteger)
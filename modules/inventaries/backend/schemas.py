@@ -0,0 +1,10 @@
+# inventaries/backend/schemas.py
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class StocktakeIn(BaseModel):
+    name: str = Field(min_length=1, max_length=120)
+    # counted_locations: niet-getelde locaties blijven buiten de diff; all: die gaan naar 0
+    scope: Literal["counted_locations", "all"] = "counted_locations"
@@ -0,0 +1,507 @@
+# inventaries/backend/stocktake.py
+"""
+Import van scannerexports en vergelijking met de magazijnstanden.
+
+Import (StocktakeImporter):
+- de body wordt in chunks verwerkt (nooit volledig in het geheugen): een
+  incrementele UTF-8-decoder, regels splitsen, CSV of NDJSON parsen
+- aggregatie per (sku, locatie, lot) in een dict; bij FLUSH_KEYS sleutels
+  gaat die met één upsert (qty = qty + nieuw) naar stocktake_counts en
+  begint een nieuwe dict → geheugen begrensd, ook bij miljoenen regels
+- sha256 over de ruwe bytes; hetzelfde bestand opnieuw importeren geeft de
+  bestaande import terug (unieke (stocktake_id, content_hash); de nieuwe
+  rijen worden teruggedraaid, ook bij twee gelijktijdige uploads)
+- ongeldige regels worden geteld (de eerste MAX_ERRORS met regelnummer
+  bewaard), de rest van het bestand gaat door
+
+Diff (diff):
+- verwachte standen streamen uit magazijn (GET /stock/balances, NDJSON) naar
+  stocktake_expected; bij scope counted_locations enkel de getelde locaties
+- één set-based query: FULL JOIN van (som van de tellingen) met de
+  verwachte standen → stocktake_adjustments met delta = geteld - verwacht
+- opnieuw uitvoeren vervangt de vorige voorstellen
+"""
+
+import codecs
+import csv
+import hashlib
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, str, str]  # (sku, locatie, lot)
+
+FLUSH_KEYS = 20_000
+INSERT_BATCH = 10_000
+MAX_ERRORS = 20
+
+# kolomnamen zoals ze in scannerexports voorkomen
+COLUMNS = {
+    "sku": ("sku", "artikel", "article", "item", "itemcode"),
+    "location": ("location", "locatie", "bin", "plaats"),
+    "lot_no": ("lot_no", "lot", "lotnummer", "batch"),
+    "qty": ("qty", "aantal", "quantity", "count"),
+}
+MAX_LENGTHS = {"sku": 64, "location": 32, "lot_no": 64}
+# aantal per regel: integer in magazijn (stock_balances / stock_movements)
+MAX_QTY = 2_147_483_647
+
+
+class StocktakeNotFound(LookupError):
+    pass
+
+
+class ImportFormatError(ValueError):
+    """Het bestand zelf is onbruikbaar (geen header, verkeerde codering ...) → 400."""
+
+
+# -------------------------------
+# Parsen + aggregeren (zonder database)
+# -------------------------------
+def _quantity(value: Any) -> Optional[int]:
+    """Geheel aantal of None; zoals "1.5" in CSV worden 2.7 en true in NDJSON afgewezen."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return None
+
+
+class CountAggregator:
+    def __init__(self, fmt: str, flush: Callable[[Dict[Key, int]], None], flush_keys: int = FLUSH_KEYS) -> None:
+        if fmt not in ("csv", "ndjson"):
+            raise ImportFormatError(f"Onbekend formaat: {fmt}")
+        self.fmt = fmt
+        self.flush_keys = flush_keys
+        self._flush = flush
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._hash = hashlib.sha256()
+        self._pending = ""
+        self._header: Optional[Dict[str, int]] = None
+        self._delimiter = ","
+        self._counts: Dict[Key, int] = {}
+        self.lines = 0
+        self.rejected = 0
+        self.qty = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def feed(self, chunk: bytes) -> None:
+        self._hash.update(chunk)
+        try:
+            data = self._pending + self._decoder.decode(chunk)
+        except UnicodeDecodeError as exc:
+            raise ImportFormatError("Bestand is geen geldige UTF-8") from exc
+        lines = data.split("\n")
+        self._pending = lines.pop()
+        self._parse(lines)
+
+    def finish(self) -> str:
+        """Laatste (onafgewerkte) regel verwerken en alles flushen; geeft de sha256 terug."""
+        try:
+            data = self._pending + self._decoder.decode(b"", final=True)
+        except UnicodeDecodeError as exc:
+            raise ImportFormatError("Bestand is geen geldige UTF-8") from exc
+        self._pending = ""
+        self._parse([data])
+        if self.fmt == "csv" and self._header is None:
+            raise ImportFormatError("CSV zonder header")
+        self._flush_counts()
+        return self._hash.hexdigest()
+
+    # -------------------------------
+    def _flush_counts(self) -> None:
+        if self._counts:
+            self._flush(self._counts)
+            self._counts = {}
+
+    def _reject(self, reason: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"line": self.lines, "error": reason})
+
+    def _add(self, sku: Any, location: Any, lot_no: Any, qty: Any) -> None:
+        sku = str(sku or "").strip()
+        location = str(location or "").strip()
+        lot_no = str(lot_no or "").strip()
+        if not sku or not location:
+            self._reject("sku of locatie ontbreekt")
+            return
+        if len(sku) > MAX_LENGTHS["sku"] or len(location) > MAX_LENGTHS["location"] or len(lot_no) > MAX_LENGTHS["lot_no"]:
+            self._reject("waarde te lang")
+            return
+        if qty is None or qty == "":
+            qty = 1  # één scan = één stuk
+        count = _quantity(qty)
+        if count is None:
+            self._reject(f"ongeldig aantal: {qty!r}")
+            return
+        qty = count
+        if qty < 0:
+            self._reject("negatief aantal")
+            return
+        if qty > MAX_QTY:
+            self._reject("aantal te groot")
+            return
+        key = (sku, location, lot_no)
+        self._counts[key] = self._counts.get(key, 0) + qty
+        self.qty += qty
+        if len(self._counts) >= self.flush_keys:
+            self._flush_counts()
+
+    def _parse(self, lines: List[str]) -> None:
+        if self.fmt == "ndjson":
+            self._parse_ndjson(lines)
+        else:
+            self._parse_csv(lines)
+
+    def _parse_ndjson(self, lines: List[str]) -> None:
+        for line in lines:
+            if not line.strip():
+                continue
+            self.lines += 1
+            try:
+                row = json.loads(line)
+            except ValueError:
+                self._reject("ongeldige JSON")
+                continue
+            if not isinstance(row, dict):
+                self._reject("geen JSON-object")
+                continue
+            self._add(*(self._field(row, name) for name in ("sku", "location", "lot_no", "qty")))
+
+    @staticmethod
+    def _field(row: Dict[str, Any], name: str) -> Any:
+        for alias in COLUMNS[name]:
+            if alias in row:
+                return row[alias]
+        return None
+
+    def _parse_csv(self, lines: List[str]) -> None:
+        lines = [line.rstrip("\r") for line in lines if line.strip()]
+        if not lines:
+            return
+        if self._header is None:
+            header_line = lines.pop(0)
+            self._delimiter = max((";", ",", "\t"), key=header_line.count)
+            names = [name.strip().lower() for name in next(csv.reader([header_line], delimiter=self._delimiter))]
+            self._header = {}
+            for column, aliases in COLUMNS.items():
+                for alias in aliases:
+                    if alias in names:
+                        self._header[column] = names.index(alias)
+                        break
+            if "sku" not in self._header or "location" not in self._header:
+                raise ImportFormatError(f"CSV-header mist sku/locatie: {header_line[:200]}")
+        header = self._header
+        sku_i, loc_i = header["sku"], header["location"]
+        lot_i, qty_i = header.get("lot_no"), header.get("qty")
+        width = max(header.values()) + 1
+        for row in csv.reader(lines, delimiter=self._delimiter):
+            self.lines += 1
+            if len(row) < width:
+                self._reject("te weinig kolommen")
+                continue
+            self._add(
+                row[sku_i],
+                row[loc_i],
+                row[lot_i] if lot_i is not None else "",
+                row[qty_i] if qty_i is not None else None,
+            )
+
+
+# -------------------------------
+# Import naar de database
+# -------------------------------
+_UPSERT_COUNTS = text(
+    """
+    INSERT INTO stocktake_counts (import_id, stocktake_id, sku, location, lot_no, qty)
+    SELECT :import_id, :stocktake_id, sku, location, lot_no, qty
+    FROM unnest(
+        CAST(:skus AS text[]), CAST(:locations AS text[]), CAST(:lots AS text[]), CAST(:qtys AS bigint[])
+    ) AS c(sku, location, lot_no, qty)
+    ON CONFLICT (import_id, sku, location, lot_no) DO UPDATE
+    SET qty = stocktake_counts.qty + EXCLUDED.qty
+    """
+)
+
+
+def _columns(rows: Iterable[Tuple[Key, int]]) -> Dict[str, List[Any]]:
+    columns: Dict[str, List[Any]] = {"skus": [], "locations": [], "lots": [], "qtys": []}
+    for (sku, location, lot_no), qty in rows:
+        columns["skus"].append(sku)
+        columns["locations"].append(location)
+        columns["lots"].append(lot_no)
+        columns["qtys"].append(qty)
+    return columns
+
+
+def _stocktake(db: Session, stocktake_id: int):
+    row = db.execute(
+        text("SELECT id, name, scope, status, created_at, diffed_at FROM stocktakes WHERE id = :id"),
+        {"id": stocktake_id},
+    ).mappings().first()
+    if row is None:
+        raise StocktakeNotFound(stocktake_id)
+    return row
+
+
+class StocktakeImporter:
+    """Eén upload in één transactie; feed() per chunk, finish() aan het einde."""
+
+    def __init__(self, db: Session, stocktake_id: int, fmt: str, filename: Optional[str] = None) -> None:
+        _stocktake(db, stocktake_id)
+        self.db = db
+        self.stocktake_id = stocktake_id
+        self.import_id = db.execute(
+            text(
+                "INSERT INTO stocktake_imports (stocktake_id, filename, format, lines, rejected, keys, errors) "
+                "VALUES (:stocktake_id, :filename, :format, 0, 0, 0, '[]') RETURNING id"
+            ),
+            {"stocktake_id": stocktake_id, "filename": filename, "format": fmt},
+        ).scalar_one()
+        self.aggregator = CountAggregator(fmt, self._write)
+
+    def _write(self, counts: Dict[Key, int]) -> None:
+        self.db.execute(_UPSERT_COUNTS, {
+            "import_id": self.import_id,
+            "stocktake_id": self.stocktake_id,
+            **_columns(counts.items()),
+        })
+
+    def feed(self, chunk: bytes) -> None:
+        self.aggregator.feed(chunk)
+
+    def finish(self) -> Dict[str, Any]:
+        digest = self.aggregator.finish()
+        agg = self.aggregator
+        existing = self._existing(digest)
+        if existing is not None:
+            self.db.rollback()
+            return {**existing, "duplicate": True}
+        keys = self.db.execute(
+            text("SELECT count(*) FROM stocktake_counts WHERE import_id = :import_id"),
+            {"import_id": self.import_id},
+        ).scalar_one()
+        self.db.execute(
+            text(
+                "UPDATE stocktake_imports SET content_hash = :hash, lines = :lines, rejected = :rejected, "
+                "keys = :keys, errors = CAST(:errors AS json) WHERE id = :import_id"
+            ),
+            {
+                "hash": digest,
+                "lines": agg.lines,
+                "rejected": agg.rejected,
+                "keys": keys,
+                "errors": json.dumps(agg.errors),
+                "import_id": self.import_id,
+            },
+        )
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # zelfde bestand gelijktijdig geüpload: de andere import won
+            self.db.rollback()
+            existing = self._existing(digest)
+            if existing is None:
+                raise
+            return {**existing, "duplicate": True}
+        logger.info(
+            "Telling %s: import %s met %d regels (%d afgewezen), %d sleutels",
+            self.stocktake_id, self.import_id, agg.lines, agg.rejected, keys,
+        )
+        return {
+            "id": self.import_id,
+            "content_hash": digest,
+            "lines": agg.lines,
+            "rejected": agg.rejected,
+            "keys": keys,
+            "qty": agg.qty,
+            "errors": agg.errors,
+            "duplicate": False,
+        }
+
+    def _existing(self, digest: str) -> Optional[Dict[str, Any]]:
+        row = self.db.execute(
+            text(
+                "SELECT id, content_hash, lines, rejected, keys, errors FROM stocktake_imports "
+                "WHERE stocktake_id = :stocktake_id AND content_hash = :hash"
+            ),
+            {"stocktake_id": self.stocktake_id, "hash": digest},
+        ).mappings().first()
+        return dict(row) if row is not None else None
+
+
+# -------------------------------
+# Diff met magazijn
+# -------------------------------
+_DIFF = text(
+    """
+    INSERT INTO stocktake_adjustments (stocktake_id, sku, location, lot_no, expected_qty, counted_qty, delta)
+    SELECT :stocktake_id, sku, location, lot_no,
+           COALESCE(e.qty, 0), COALESCE(c.qty, 0), COALESCE(c.qty, 0) - COALESCE(e.qty, 0)
+    FROM (
+        SELECT sku, location, lot_no, sum(qty) AS qty
+        FROM stocktake_counts
+        WHERE stocktake_id = :stocktake_id
+        GROUP BY sku, location, lot_no
+    ) AS c
+    FULL JOIN (
+        SELECT sku, location, lot_no, qty FROM stocktake_expected WHERE stocktake_id = :stocktake_id
+    ) AS e USING (sku, location, lot_no)
+    WHERE COALESCE(c.qty, 0) <> COALESCE(e.qty, 0)
+    ORDER BY sku, location, lot_no
+    """
+)
+
+_INSERT_EXPECTED = text(
+    """
+    INSERT INTO stocktake_expected (stocktake_id, sku, location, lot_no, qty)
+    SELECT :stocktake_id, sku, location, lot_no, qty
+    FROM unnest(
+        CAST(:skus AS text[]), CAST(:locations AS text[]), CAST(:lots AS text[]), CAST(:qtys AS bigint[])
+    ) AS e(sku, location, lot_no, qty)
+    """
+)
+
+
+def magazijn_balances(base_url: str, timeout: float = 30.0) -> Iterator[Dict[str, Any]]:
+    """Alle standen uit magazijn, gestreamd (NDJSON)."""
+    with httpx.Client(timeout=timeout) as client:
+        with client.stream("GET", f"{base_url.rstrip('/')}/stock/balances") as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+
+def diff(db: Session, stocktake_id: int, expected: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    stocktake = _stocktake(db, stocktake_id)
+    params = {"stocktake_id": stocktake_id}
+    db.execute(text("DELETE FROM stocktake_adjustments WHERE stocktake_id = :stocktake_id"), params)
+    db.execute(text("DELETE FROM stocktake_expected WHERE stocktake_id = :stocktake_id"), params)
+
+    counted_locations = None
+    if stocktake["scope"] == "counted_locations":
+        counted_locations = set(db.execute(
+            text("SELECT DISTINCT location FROM stocktake_counts WHERE stocktake_id = :stocktake_id"), params
+        ).scalars())
+
+    loaded = 0
+    batch: List[Tuple[Key, int]] = []
+    for row in expected:
+        if counted_locations is not None and row["location"] not in counted_locations:
+            continue
+        batch.append(((row["sku"], row["location"], row.get("lot_no") or ""), int(row["qty_on_hand"])))
+        if len(batch) >= INSERT_BATCH:
+            db.execute(_INSERT_EXPECTED, {**params, **_columns(batch)})
+            loaded += len(batch)
+            batch = []
+    if batch:
+        db.execute(_INSERT_EXPECTED, {**params, **_columns(batch)})
+        loaded += len(batch)
+
+    db.execute(_DIFF, params)
+    db.execute(text("UPDATE stocktakes SET status = 'diffed', diffed_at = now() WHERE id = :stocktake_id"), params)
+    db.commit()
+    return {"stocktake_id": stocktake_id, "expected_keys": loaded, **summary(db, stocktake_id)}
+
+
+# -------------------------------
+# Opvragen
+# -------------------------------
+def summary(db: Session, stocktake_id: int) -> Dict[str, Any]:
+    params = {"stocktake_id": stocktake_id}
+    counts = db.execute(
+        text(
+            "SELECT count(DISTINCT (sku, location, lot_no)) AS counted_keys, COALESCE(sum(qty), 0) AS counted_qty "
+            "FROM stocktake_counts WHERE stocktake_id = :stocktake_id"
+        ),
+        params,
+    ).one()
+    totals = db.execute(
+        text(
+            "SELECT count(*) AS adjustments, "
+            "COALESCE(sum(delta) FILTER (WHERE delta > 0), 0) AS qty_plus, "
+            "COALESCE(-sum(delta) FILTER (WHERE delta < 0), 0) AS qty_minus "
+            "FROM stocktake_adjustments WHERE stocktake_id = :stocktake_id"
+        ),
+        params,
+    ).one()
+    return {
+        "counted_keys": counts.counted_keys,
+        "counted_qty": int(counts.counted_qty),
+        "adjustments": totals.adjustments,
+        "adjustment_qty_plus": int(totals.qty_plus),
+        "adjustment_qty_minus": int(totals.qty_minus),
+    }
+
+
+def get(db: Session, stocktake_id: int) -> Dict[str, Any]:
+    stocktake = dict(_stocktake(db, stocktake_id))
+    imports = db.execute(
+        text(
+            "SELECT id, filename, format, content_hash, lines, rejected, keys, imported_at "
+            "FROM stocktake_imports WHERE stocktake_id = :stocktake_id AND content_hash IS NOT NULL ORDER BY id"
+        ),
+        {"stocktake_id": stocktake_id},
+    ).mappings().all()
+    return {**stocktake, "imports": [dict(row) for row in imports], **summary(db, stocktake_id)}
+
+
+def create(db: Session, name: str, scope: str) -> Dict[str, Any]:
+    stocktake_id = db.execute(
+        text("INSERT INTO stocktakes (name, scope, status) VALUES (:name, :scope, 'open') RETURNING id"),
+        {"name": name, "scope": scope},
+    ).scalar_one()
+    db.commit()
+    return get(db, stocktake_id)
+
+
+def delete_import(db: Session, stocktake_id: int, import_id: int) -> bool:
+    deleted = db.execute(
+        text("DELETE FROM stocktake_imports WHERE id = :import_id AND stocktake_id = :stocktake_id"),
+        {"import_id": import_id, "stocktake_id": stocktake_id},
+    ).rowcount
+    db.commit()
+    return bool(deleted)
+
+
+def adjustments(db: Session, stocktake_id: int, after_id: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+    """Keyset-paginatie; `movement` kan zo in een batch naar magazijn POST /stock/movements."""
+    _stocktake(db, stocktake_id)
+    rows = db.execute(
+        text(
+            "SELECT id, sku, location, lot_no, expected_qty, counted_qty, delta "
+            "FROM stocktake_adjustments WHERE stocktake_id = :stocktake_id AND id > :after_id "
+            "ORDER BY id LIMIT :limit"
+        ),
+        {"stocktake_id": stocktake_id, "after_id": after_id, "limit": limit},
+    ).mappings()
+    return [
+        {
+            **row,
+            "movement": {
+                "kind": "adjustment",
+                "sku": row["sku"],
+                "location": row["location"],
+                "lot_no": row["lot_no"],
+                "qty": row["delta"],
+                "reference": f"stocktake-{stocktake_id}",
+            },
+        }
+        for row in rows
+    ]
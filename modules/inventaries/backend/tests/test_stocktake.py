@@ -0,0 +1,155 @@
+import pytest
+
+from stocktake import CountAggregator, ImportFormatError, StocktakeImporter
+
+
+def _run(fmt, chunks, flush_keys=1000):
+    flushed = []
+    agg = CountAggregator(fmt, lambda counts: flushed.append(dict(counts)), flush_keys=flush_keys)
+    for chunk in chunks:
+        agg.feed(chunk)
+    digest = agg.finish()
+    totals = {}
+    for counts in flushed:
+        for key, qty in counts.items():
+            totals[key] = totals.get(key, 0) + qty
+    return agg, totals, flushed, digest
+
+
+def _bytewise(data: bytes):
+    return [data[i:i + 1] for i in range(len(data))]
+
+
+CSV = "\ufeffartikel;locatie;lot;aantal\r\nÄPFEL;R1;L1;2\r\nÄPFEL;R1;L1;3\r\nPEER;R2;;\r\n".encode("utf-8")
+
+
+def test_chunk_boundaries_do_not_change_the_result():
+    # elke byte apart: BOM, multibyte-tekens en CRLF worden over chunks gesplitst
+    whole, whole_totals, _, whole_digest = _run("csv", [CSV])
+    split, split_totals, _, split_digest = _run("csv", _bytewise(CSV))
+
+    assert whole_totals == split_totals == {("ÄPFEL", "R1", "L1"): 5, ("PEER", "R2", ""): 1}
+    assert (split.lines, split.rejected, split.qty) == (whole.lines, whole.rejected, whole.qty) == (3, 0, 6)
+    # zelfde bytes → zelfde hash (basis voor de duplicaatdetectie)
+    assert split_digest == whole_digest
+
+
+def test_last_line_without_newline_is_processed():
+    agg, totals, _, _ = _run("ndjson", [b'{"sku": "A", "location": "R1", "qty": 2}\n{"sku": "A", "loc', b'ation": "R1"}'])
+    assert totals == {("A", "R1", ""): 3}
+    assert agg.lines == 2
+
+
+@pytest.mark.parametrize(
+    "header, row",
+    [("sku,location,qty", "A,R1,4"), ("sku\tlocation\tqty", "A\tR1\t4"), ("\ufeffSKU;Bin;Count", "A;R1;4")],
+)
+def test_csv_delimiter_and_header_aliases_are_sniffed(header, row):
+    _, totals, _, _ = _run("csv", [f"{header}\n{row}\n".encode("utf-8")])
+    assert totals == {("A", "R1", ""): 4}
+
+
+def test_csv_without_usable_header_is_a_format_error():
+    with pytest.raises(ImportFormatError):
+        _run("csv", [b"foo,bar\n1,2\n"])
+    with pytest.raises(ImportFormatError):
+        _run("csv", [b""])
+    with pytest.raises(ImportFormatError):
+        _run("csv", [b"sku,location\n\xff\n"])
+
+
+def test_flush_threshold_bounds_the_pending_keys():
+    rows = "".join(f"S{i},R1,1\n" for i in range(5)) + "S0,R1,1\n"
+    _, totals, flushed, _ = _run("csv", [f"sku,location,qty\n{rows}".encode()], flush_keys=2)
+
+    assert [len(counts) for counts in flushed] == [2, 2, 2]
+    # een sleutel kan over meerdere flushes verspreid zitten; de upsert telt op
+    assert totals[("S0", "R1", "")] == 2
+    assert sum(totals.values()) == 6
+
+
+def test_quantities_must_be_whole_non_negative_numbers():
+    lines = [
+        '{"sku": "A", "location": "R1", "qty": 2}',
+        '{"sku": "A", "location": "R1", "qty": 2.0}',
+        '{"sku": "A", "location": "R1", "qty": "3"}',
+        '{"sku": "A", "location": "R1", "qty": 2.7}',
+        '{"sku": "A", "location": "R1", "qty": true}',
+        '{"sku": "A", "location": "R1", "qty": [1]}',
+        '{"sku": "A", "location": "R1", "qty": -1}',
+        '{"sku": "A", "location": ""}',
+        "[1, 2]",
+        "{kapot",
+    ]
+    agg, totals, _, _ = _run("ndjson", ["\n".join(lines).encode()])
+    assert totals == {("A", "R1", ""): 7}
+    assert (agg.lines, agg.rejected) == (10, 7)
+    assert [e["line"] for e in agg.errors] == [4, 5, 6, 7, 8, 9, 10]
+
+    agg, totals, _, _ = _run("csv", [b"sku,location,qty\nA,R1,1.5\nA,R1,true\nA,R1,2\n"])
+    assert totals == {("A", "R1", ""): 2}
+    assert agg.rejected == 2
+
+
+def test_quantities_must_fit_in_an_int32():
+    lines = [
+        '{"sku": "A", "location": "R1", "qty": 2147483647}',
+        '{"sku": "A", "location": "R1", "qty": 2147483648}',
+        '{"sku": "A", "location": "R1", "qty": 1e300}',
+        '{"sku": "A", "location": "R1", "qty": "99999999999999999999"}',
+    ]
+    agg, totals, _, _ = _run("ndjson", ["\n".join(lines).encode()])
+    assert totals == {("A", "R1", ""): 2147483647}
+    assert (agg.rejected, [e["line"] for e in agg.errors]) == (3, [2, 3, 4])
+
+
+# -------------------------------
+# Duplicaat: zelfde bestand opnieuw importeren
+# -------------------------------
+class _Result:
+    def __init__(self, value=None) -> None:
+        self._value = value
+
+    def scalar_one(self):
+        return self._value
+
+    def mappings(self):
+        return self
+
+    def first(self):
+        return self._value
+
+
+class _FakeDb:
+    def __init__(self, existing) -> None:
+        self.existing = existing
+        self.statements = []
+        self.rolled_back = self.committed = False
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if "FROM stocktakes WHERE id" in sql:
+            return _Result({"id": params["id"]})
+        if "INSERT INTO stocktake_imports" in sql:
+            return _Result(99)
+        if "content_hash = :hash" in sql:
+            return _Result(self.existing)
+        return _Result()
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def commit(self):
+        self.committed = True
+
+
+def test_duplicate_import_returns_the_existing_one_and_rolls_back():
+    existing = {"id": 7, "content_hash": "x", "lines": 3, "rejected": 0, "keys": 2, "errors": []}
+    db = _FakeDb(existing)
+    importer = StocktakeImporter(db, 1, "csv")
+    importer.feed(CSV)
+
+    assert importer.finish() == {**existing, "duplicate": True}
+    assert db.rolled_back and not db.committed
+    assert not any("UPDATE stocktake_imports" in sql for sql in db.statements)
@@ -1,8 +1,33 @@
+import asyncio
 import os
-from fastapi import FastAPI
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import Depends, FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 import uvicorn
 
+import ledger
+import picking
+import reservations
+from database import engine, get_db, init_schema, ping_check
+from metrics import PrometheusMiddleware, metrics_response
+from jobs import PeriodicJob
+from readiness import Readiness
+from schemas import (
+    BulkReservationIn,
+    LayoutIn,
+    MovementBatch,
+    OrderReservationIn,
+    OrderReservationOut,
+    PostedOut,
+    ReservationChangeOut,
+    SnapshotOut,
+    WavePlanIn,
+)
+
 MODULE_NAME = os.getenv("MODULE_NAME", "magazijn")
 MODULE_PORT = int(os.getenv("MODULE_PORT", 20120))
 ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "*").split(",")
@@ -16,6 +41,50 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PrometheusMiddleware)
+
+# /readyz leest enkel het laatste resultaat van de achtergrond-checks
+readiness = Readiness(
+    interval=float(os.getenv("READINESS_INTERVAL_SECONDS", "5")),
+    timeout=float(os.getenv("READINESS_TIMEOUT_SECONDS", "2")),
+    stale_after=float(os.getenv("READINESS_STALE_AFTER_SECONDS", "30")),
+)
+readiness.register("database", ping_check(engine))
+
+# momentopnames van stock_balances voor point-in-time standen
+SNAPSHOT_INTERVAL = float(os.getenv("STOCK_SNAPSHOT_INTERVAL_SECONDS", "3600"))
+# oudere snapshots opruimen (0 = alles bewaren); de recentste blijft altijd
+SNAPSHOT_RETENTION_DAYS = float(os.getenv("STOCK_SNAPSHOT_RETENTION_DAYS", "30"))
+# niet-bevestigde reservaties vervallen na RESERVATION_TTL_SECONDS
+RESERVATION_TTL = int(os.getenv("RESERVATION_TTL_SECONDS", "900"))
+# looproutes: depot op PICK_DEPOT_X meter langs de voorste dwarsgang
+layouts = picking.LayoutCache(depot_x=float(os.getenv("PICK_DEPOT_X", "0")))
+PICK_BATCH_SIZE = int(os.getenv("PICK_BATCH_SIZE", "10"))
+jobs = [
+    PeriodicJob(
+        "stock-snapshots",
+        SNAPSHOT_INTERVAL,
+        lambda: ledger.scheduled_snapshot(SNAPSHOT_INTERVAL * 0.9, SNAPSHOT_RETENTION_DAYS),
+    ),
+    PeriodicJob(
+        "reservation-expiry",
+        float(os.getenv("RESERVATION_EXPIRY_SWEEP_SECONDS", "30")),
+        reservations.scheduled_expiry,
+    ),
+]
+
+@app.on_event("startup")
+async def startup():
+    await asyncio.to_thread(init_schema)
+    await readiness.start()
+    for job in jobs:
+        await job.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    for job in jobs:
+        await job.stop()
+    await readiness.stop()
 
 @app.get("/healthz")
 def healthz():
@@ -23,7 +92,11 @@ def healthz():
 
 @app.get("/readyz")
 def readyz():
-    return {"status": "ready", "module": MODULE_NAME}
+    return readiness.response(module=MODULE_NAME)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
 
 @app.get("/info")
 def info():
@@ -34,5 +107,98 @@ def info():
         "openapi": "/openapi.json",
     }
 
+# -------------------------------
+# Voorraad
+# -------------------------------
+@app.post("/stock/movements", response_model=PostedOut, status_code=201)
+def post_movements(batch: MovementBatch, db: Session = Depends(get_db)):
+    try:
+        balances = ledger.post_movements(db, [m.model_dump() for m in batch.movements])
+    except ledger.InsufficientStock as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return {"posted": len(batch.movements), "balances": balances}
+
+@app.get("/stock/movements")
+def list_movements(
+    sku: Optional[str] = None,
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    return ledger.movements(db, sku=sku, after_id=after_id, limit=limit)
+
+@app.get("/stock/balances")
+def export_balances():
+    """Alle standen ≠ 0, gestreamd als NDJSON (o.a. voor de inventaris-diff)."""
+    return StreamingResponse(ledger.iter_balances(), media_type="application/x-ndjson")
+
+@app.get("/stock/balances/{sku}")
+def get_balances(
+    sku: str,
+    location: Optional[str] = None,
+    at: Optional[datetime] = Query(None, description="Stand op dit tijdstip (vanaf de laatste snapshot ervoor)"),
+    db: Session = Depends(get_db),
+):
+    if at is not None:
+        return ledger.balances_at(db, sku, at)
+    return {"sku": sku, "balances": ledger.balances(db, sku, location)}
+
+@app.post("/stock/snapshots", response_model=SnapshotOut, status_code=201)
+def create_snapshot(db: Session = Depends(get_db)):
+    snapshot = ledger.take_snapshot(db)
+    if snapshot is None:
+        raise HTTPException(status_code=409, detail="Er loopt al een snapshot")
+    return snapshot
+
+# -------------------------------
+# Reservaties
+# -------------------------------
+@app.post("/reservations", response_model=OrderReservationOut, status_code=201)
+def reserve(body: OrderReservationIn, db: Session = Depends(get_db)):
+    return reservations.reserve_order(db, body.model_dump(), body.ttl_seconds or RESERVATION_TTL)
+
+@app.post("/reservations/bulk", response_model=List[OrderReservationOut], status_code=201)
+def reserve_bulk(body: BulkReservationIn, db: Session = Depends(get_db)):
+    orders = [order.model_dump() for order in body.orders]
+    return reservations.reserve_bulk(db, orders, body.ttl_seconds or RESERVATION_TTL)
+
+@app.get("/reservations/{order_ref}")
+def get_reservations(order_ref: str, db: Session = Depends(get_db)):
+    return reservations.list_order(db, order_ref)
+
+@app.post("/reservations/{order_ref}/confirm", response_model=ReservationChangeOut)
+def confirm_reservations(order_ref: str, db: Session = Depends(get_db)):
+    return reservations.confirm(db, order_ref)
+
+@app.post("/reservations/{order_ref}/release", response_model=ReservationChangeOut)
+def release_reservations(order_ref: str, db: Session = Depends(get_db)):
+    return reservations.release(db, order_ref)
+
+@app.post("/reservations/{order_ref}/pick", response_model=ReservationChangeOut)
+def pick_reservations(order_ref: str, db: Session = Depends(get_db)):
+    return reservations.pick(db, order_ref)
+
+# -------------------------------
+# Picking
+# -------------------------------
+@app.put("/layout", status_code=204)
+def put_layout(body: LayoutIn, db: Session = Depends(get_db)):
+    picking.save_layout(db, [aisle.model_dump() for aisle in body.aisles])
+    layouts.invalidate()
+
+@app.get("/layout")
+def get_layout(db: Session = Depends(get_db)):
+    layout = layouts.get(db)
+    return {
+        "depot_x": layout.depot_x,
+        "aisles": [{"aisle": code, "x": x, "length": length} for code, x, length in layout.aisles],
+        "bins": len(layout.bins),
+    }
+
+@app.post("/waves/plan")
+def plan_waves(body: WavePlanIn, db: Session = Depends(get_db)):
+    lines = picking.open_lines(db, include_held=body.include_held, max_orders=body.max_orders)
+    return picking.plan_waves(layouts.get(db), lines, body.pickers, body.batch_size or PICK_BATCH_SIZE)
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=MODULE_PORT)
@@ -0,0 +1,102 @@
+"""
+Belastingtest voor het voorraadgrootboek (tegen een echte PostgreSQL).
+
+    DATABASE_URL=postgresql+psycopg://... python bench_ledger.py [--threads 8] [--batches 200] [--batch-size 50]
+
+Elke thread boekt batches met receipts, picks en transfers op een handvol
+sku's/locaties (bewust veel contentie op dezelfde standen). Meet boekingen/s
+en controleert achteraf dat stock_balances exact gelijk is aan de som van
+het grootboek.
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from sqlalchemy import text
+
+import ledger
+from database import SessionLocal, init_schema
+
+_CHECK = text(
+    """
+    SELECT count(*) FROM (
+        SELECT sku, location, lot_no, sum(delta) AS qty
+        FROM (
+            SELECT sku, to_location AS location, lot_no, qty AS delta FROM stock_movements WHERE to_location IS NOT NULL
+            UNION ALL
+            SELECT sku, from_location, lot_no, -qty FROM stock_movements WHERE from_location IS NOT NULL
+        ) AS legs
+        GROUP BY sku, location, lot_no
+    ) AS expected
+    FULL JOIN stock_balances b USING (sku, location, lot_no)
+    WHERE COALESCE(expected.qty, 0) <> COALESCE(b.qty_on_hand, 0)
+    """
+)
+
+
+def _batch(rng: random.Random, size: int, skus: int, locations: int):
+    batch = []
+    for _ in range(size):
+        sku = f"BENCH-{rng.randrange(skus)}"
+        location = f"B{rng.randrange(locations):02d}"
+        roll = rng.random()
+        if roll < 0.5:
+            batch.append({"kind": "receipt", "sku": sku, "location": location, "qty": rng.randint(1, 20)})
+        elif roll < 0.8:
+            batch.append({"kind": "pick", "sku": sku, "location": location, "qty": rng.randint(1, 5)})
+        else:
+            to_location = f"B{(int(location[1:]) + 1) % locations:02d}"
+            batch.append({"kind": "transfer", "sku": sku, "location": location, "to_location": to_location, "qty": 1})
+    return batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--batches", type=int, default=200, help="batches per thread")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--skus", type=int, default=5)
+    parser.add_argument("--locations", type=int, default=4)
+    args = parser.parse_args()
+
+    init_schema()
+    counts = {"posted": 0, "rejected": 0}
+    lock = threading.Lock()
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        posted = rejected = 0
+        with SessionLocal() as db:
+            for _ in range(args.batches):
+                batch = _batch(rng, args.batch_size, args.skus, args.locations)
+                try:
+                    ledger.post_movements(db, batch)
+                    posted += len(batch)
+                except ledger.InsufficientStock:
+                    rejected += len(batch)
+        with lock:
+            counts["posted"] += posted
+            counts["rejected"] += rejected
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with SessionLocal() as db:
+        mismatches = db.execute(_CHECK).scalar()
+        snapshot = ledger.take_snapshot(db)
+
+    print(f"{counts['posted']} boekingen in {elapsed:.2f}s → {counts['posted'] / elapsed:,.0f}/s "
+          f"({counts['rejected']} afgewezen wegens onvoldoende voorraad)")
+    print(f"afwijkende standen: {mismatches}")
+    print(f"snapshot: {snapshot}")
+
+
+if __name__ == "__main__":
+    main()
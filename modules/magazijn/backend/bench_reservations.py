@@ -0,0 +1,135 @@
+"""
+Contentie-benchmark voor reservaties (tegen een echte PostgreSQL).
+
+    DATABASE_URL=postgresql+psycopg://... python bench_reservations.py [--threads 16] [--orders 500] [--skus 3]
+
+- een paar "hot" sku's, elk op 4 locaties × 3 lots, met net niet genoeg
+  voorraad voor alle orders (zodat ook het schaarste-pad getest wordt)
+- elke thread reserveert orders van 1-2 lijnen op die sku's; gemeten:
+  orders/s, latency p50/p99 en hoe vaak SKIP LOCKED volstond
+- daarna één bulk-run van --bulk orders in één transactie
+- controle: qty_reserved == som van de actieve reservaties en nooit meer dan
+  qty_on_hand (geen oversell)
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import Counter
+
+from sqlalchemy import text
+
+import ledger
+import reservations
+from database import SessionLocal, init_schema
+
+_CHECK = text(
+    """
+    SELECT
+        count(*) FILTER (WHERE b.qty_reserved <> COALESCE(r.qty, 0)) AS mismatched,
+        count(*) FILTER (WHERE b.qty_reserved > b.qty_on_hand) AS oversold,
+        COALESCE(sum(b.qty_reserved), 0) AS reserved,
+        COALESCE(sum(b.qty_on_hand), 0) AS on_hand
+    FROM stock_balances b
+    LEFT JOIN (
+        SELECT sku, location, lot_no, sum(qty) AS qty
+        FROM stock_reservations
+        WHERE status IN ('held', 'confirmed')
+        GROUP BY sku, location, lot_no
+    ) r USING (sku, location, lot_no)
+    WHERE b.sku LIKE :prefix
+    """
+)
+
+
+def _seed(prefix: str, skus: int, qty_per_row: int) -> list:
+    names = [f"{prefix}{i}" for i in range(skus)]
+    movements = [
+        {"kind": "receipt", "sku": sku, "location": f"R{loc}", "lot_no": f"LOT{lot}", "qty": qty_per_row}
+        for sku in names
+        for loc in range(4)
+        for lot in range(3)
+    ]
+    with SessionLocal() as db:
+        ledger.post_movements(db, movements)
+    return names
+
+
+def _order(rng: random.Random, skus: list) -> dict:
+    lines = [
+        {"line_ref": str(n), "sku": rng.choice(skus), "qty": rng.randint(1, 3)}
+        for n in range(rng.randint(1, 2))
+    ]
+    return {"order_ref": uuid.uuid4().hex, "lines": lines}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--orders", type=int, default=500, help="orders per thread")
+    parser.add_argument("--skus", type=int, default=3)
+    parser.add_argument("--bulk", type=int, default=2000, help="orders in de bulk-run")
+    args = parser.parse_args()
+
+    init_schema()
+    prefix = f"HOT-{uuid.uuid4().hex[:6]}-"
+    # gemiddeld 3 stuks per order; ~90% van de vraag is gedekt
+    demand = args.threads * args.orders * 3
+    skus = _seed(prefix, args.skus, max(1, int(demand * 0.9 / (args.skus * 12))))
+
+    latencies: list = []
+    paths: Counter = Counter()
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        local_latencies, local_paths, local_statuses = [], Counter(), Counter()
+        with SessionLocal() as db:
+            for _ in range(args.orders):
+                started = time.perf_counter()
+                result = reservations.reserve_order(db, _order(rng, skus), ttl_seconds=600)
+                local_latencies.append(time.perf_counter() - started)
+                local_paths[result["path"]] += 1
+                local_statuses.update(line["status"] for line in result["lines"])
+        with lock:
+            latencies.extend(local_latencies)
+            paths.update(local_paths)
+            statuses.update(local_statuses)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{len(latencies)} orders in {elapsed:.2f}s → {len(latencies) / elapsed:,.0f}/s "
+          f"(p50 {statistics.median(latencies) * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms)")
+    print(f"paden: {dict(paths)}  lijnen: {dict(statuses)}")
+
+    # bulk: voorraad aanvullen en een dag orders in één keer toewijzen
+    _seed(prefix, args.skus, max(1, args.bulk * 3 // (args.skus * 12)))
+    rng = random.Random(1)
+    orders = [_order(rng, skus) for _ in range(args.bulk)]
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        results = reservations.reserve_bulk(db, orders, ttl_seconds=600)
+    elapsed = time.perf_counter() - started
+    bulk_statuses = Counter(line["status"] for result in results for line in result["lines"])
+    print(f"bulk: {len(orders)} orders in {elapsed * 1000:.0f} ms  lijnen: {dict(bulk_statuses)}")
+
+    with SessionLocal() as db:
+        check = db.execute(_CHECK, {"prefix": f"{prefix}%"}).one()
+    print(f"controle: {check.mismatched} afwijkende standen, {check.oversold} oversold, "
+          f"{check.reserved}/{check.on_hand} gereserveerd")
+
+
+if __name__ == "__main__":
+    main()
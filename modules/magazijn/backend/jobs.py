@@ -0,0 +1,45 @@
+# magazijn/backend/jobs.py
+"""
+Periodieke achtergrondtaken (snapshots, verlopen reservaties).
+
+- de sync functie draait in een thread, zodat de event loop vrij blijft
+- een fout wordt gelogd; de lus loopt door
+- meerdere workers: de functie zelf zorgt voor uitsluiting (advisory lock,
+  SKIP LOCKED ...)
+"""
+
+import asyncio
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    def __init__(self, name: str, interval: float, func: Callable[[], object]) -> None:
+        self.name = name
+        self.interval = interval
+        self._func = func
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self._func)
+            except Exception:  # pragma: no cover - de lus mag nooit stoppen
+                logger.exception("Achtergrondtaak %s mislukt", self.name)
@@ -0,0 +1,306 @@
+# magazijn/backend/ledger.py
+"""
+Voorraadgrootboek: boeken, standen en point-in-time.
+
+- post_movements(): een batch boekingen in één statement (data-modifying CTE):
+  INSERT in stock_movements, de regels per (sku, locatie, lot) optellen en
+  met INSERT ... ON CONFLICT DO UPDATE in stock_balances verwerken. Eén
+  round trip, één rij-update per stand per batch, ongeacht de batchgrootte
+- de standen worden in vaste volgorde (sku, locatie, lot) bijgewerkt: twee
+  gelijktijdige batches op dezelfde standen wachten op elkaar i.p.v. te
+  deadlocken
+- negatieve voorraad, of minder voorraad dan gereserveerd (zie
+  reservations.py) → CHECK-fout → de hele batch wordt teruggedraaid
+  (InsufficientStock)
+- take_snapshot(): kopie van stock_balances + het hoogste movement-id uit
+  één REPEATABLE READ-snapshot. Elke boeking neemt een gedeelde advisory
+  lock (de "poort"); de snapshot neemt die exclusief enkel tot zijn
+  snapshot vastligt: lopende boekingen zijn dan allemaal gecommit, dus de
+  kopie is exact "alle boekingen t.e.m. up_to_movement_id". Tijdens de
+  kopie zelf wordt er gewoon verder geboekt. Eén worker tegelijk
+- prune_snapshots(): snapshots ouder dan de retentie weg (de recentste
+  blijft); oudere tijdstippen rekenen dan verder vanaf een vroegere
+  snapshot of vanaf de eerste boeking
+- balances_at(): laatste snapshot vóór het tijdstip + de boekingen daarna
+  (index op (sku, id)), dus nooit de volledige historiek
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_SNAPSHOT_LOCK = 20120002
+# gedeeld door elke boeking, kort exclusief door take_snapshot
+_BOOKING_GATE = 20120003
+
+
+class InsufficientStock(Exception):
+    """Een boeking zou een stand negatief maken (→ 409)."""
+
+
+_POST = text(
+    """
+    WITH batch AS (
+        SELECT *
+        FROM unnest(
+            CAST(:kinds AS text[]), CAST(:skus AS text[]), CAST(:lots AS text[]),
+            CAST(:froms AS text[]), CAST(:tos AS text[]), CAST(:qtys AS integer[]),
+            CAST(:refs AS text[])
+        ) AS t(kind, sku, lot_no, from_location, to_location, qty, reference)
+    ),
+    moved AS (
+        INSERT INTO stock_movements (kind, sku, lot_no, from_location, to_location, qty, reference)
+        SELECT kind, sku, lot_no, from_location, to_location, qty, reference FROM batch
+        RETURNING id, sku, lot_no, from_location, to_location, qty
+    ),
+    legs AS (
+        SELECT id, sku, to_location AS location, lot_no, qty AS delta FROM moved WHERE to_location IS NOT NULL
+        UNION ALL
+        SELECT id, sku, from_location, lot_no, -qty FROM moved WHERE from_location IS NOT NULL
+    )
+    INSERT INTO stock_balances (sku, location, lot_no, qty_on_hand, last_movement_id, updated_at)
+    SELECT sku, location, lot_no, sum(delta), max(id), now()
+    FROM legs
+    GROUP BY sku, location, lot_no
+    ORDER BY sku, location, lot_no
+    ON CONFLICT (sku, location, lot_no) DO UPDATE
+    SET qty_on_hand = stock_balances.qty_on_hand + EXCLUDED.qty_on_hand,
+        last_movement_id = GREATEST(stock_balances.last_movement_id, EXCLUDED.last_movement_id),
+        updated_at = EXCLUDED.updated_at
+    RETURNING sku, location, lot_no, qty_on_hand, last_movement_id
+    """
+)
+
+_BALANCES_AT = text(
+    """
+    SELECT location, lot_no, sum(qty) AS qty
+    FROM (
+        SELECT location, lot_no, qty
+        FROM stock_snapshot_lines
+        WHERE snapshot_id = :snapshot_id AND sku = :sku
+        UNION ALL
+        SELECT to_location, lot_no, qty
+        FROM stock_movements
+        WHERE sku = :sku AND id > :after_id AND created_at <= :at AND to_location IS NOT NULL
+        UNION ALL
+        SELECT from_location, lot_no, -qty
+        FROM stock_movements
+        WHERE sku = :sku AND id > :after_id AND created_at <= :at AND from_location IS NOT NULL
+    ) AS legs
+    GROUP BY location, lot_no
+    HAVING sum(qty) <> 0
+    ORDER BY location, lot_no
+    """
+)
+
+
+def _legs(movement: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    kind, location = movement["kind"], movement["location"]
+    if kind == "pick":
+        return {"from": location, "to": None}
+    if kind == "transfer":
+        return {"from": location, "to": movement["to_location"]}
+    return {"from": None, "to": location}
+
+
+def book(db: Session, movements: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Boekt in de lopende transactie (zonder commit); geeft de nieuwe standen terug."""
+    # tot de commit: een snapshot wacht deze batch af (zie take_snapshot)
+    db.execute(text("SELECT pg_advisory_xact_lock_shared(:key)"), {"key": _BOOKING_GATE})
+    legs = [_legs(m) for m in movements]
+    params = {
+        "kinds": [m["kind"] for m in movements],
+        "skus": [m["sku"] for m in movements],
+        "lots": [m.get("lot_no") or "" for m in movements],
+        "froms": [leg["from"] for leg in legs],
+        "tos": [leg["to"] for leg in legs],
+        "qtys": [m["qty"] for m in movements],
+        "refs": [m.get("reference") for m in movements],
+    }
+    return [dict(row) for row in db.execute(_POST, params).mappings()]
+
+
+def is_stock_violation(exc: IntegrityError) -> bool:
+    # negatieve stand, of minder voorraad dan er gereserveerd is
+    message = str(exc.orig)
+    return "ck_stock_balances_non_negative" in message or "ck_stock_balances_reserved" in message
+
+
+def post_movements(db: Session, movements: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Boekt alles of niets; geeft de nieuwe standen van de geraakte (sku, locatie, lot) terug."""
+    try:
+        rows = book(db, movements)
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        if is_stock_violation(exc):
+            raise InsufficientStock("Onvoldoende vrije voorraad voor minstens één boeking") from exc
+        raise
+    return rows
+
+
+def balances(db: Session, sku: str, location: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Actuele standen: lookup op de primary key (sku, locatie, lot)."""
+    query = "SELECT location, lot_no, qty_on_hand, last_movement_id, updated_at FROM stock_balances WHERE sku = :sku"
+    params: Dict[str, Any] = {"sku": sku}
+    if location is not None:
+        query += " AND location = :location"
+        params["location"] = location
+    query += " AND qty_on_hand <> 0 ORDER BY location, lot_no"
+    return [dict(row) for row in db.execute(text(query), params).mappings()]
+
+
+def iter_balances() -> Iterator[bytes]:
+    """Alle standen als NDJSON (server-side cursor; voor de inventaris-diff). Eigen sessie: loopt na de request."""
+    query = text(
+        "SELECT sku, location, lot_no, qty_on_hand FROM stock_balances "
+        "WHERE qty_on_hand <> 0 ORDER BY sku, location, lot_no"
+    ).execution_options(stream_results=True, yield_per=5000)
+    with SessionLocal() as db:
+        for rows in db.execute(query).mappings().partitions():
+            yield "".join(json.dumps(dict(row)) + "\n" for row in rows).encode()
+
+
+def balances_at(db: Session, sku: str, at: datetime) -> Dict[str, Any]:
+    snapshot = db.execute(
+        text(
+            "SELECT id, up_to_movement_id, taken_at FROM stock_snapshots "
+            "WHERE taken_at <= :at ORDER BY taken_at DESC LIMIT 1"
+        ),
+        {"at": at},
+    ).first()
+    params = {
+        "sku": sku,
+        "at": at,
+        "snapshot_id": snapshot.id if snapshot else 0,
+        "after_id": snapshot.up_to_movement_id if snapshot else 0,
+    }
+    rows = db.execute(_BALANCES_AT, params).mappings().all()
+    return {
+        "sku": sku,
+        "at": at,
+        "snapshot_id": snapshot.id if snapshot else None,
+        "snapshot_taken_at": snapshot.taken_at if snapshot else None,
+        "balances": [dict(row) for row in rows],
+    }
+
+
+def movements(db: Session, sku: Optional[str] = None, after_id: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    """Keyset-paginatie op id (oplopend)."""
+    query = (
+        "SELECT id, kind, sku, lot_no, from_location, to_location, qty, reference, created_at "
+        "FROM stock_movements WHERE id > :after_id"
+    )
+    params: Dict[str, Any] = {"after_id": after_id, "limit": limit}
+    if sku is not None:
+        query += " AND sku = :sku"
+        params["sku"] = sku
+    query += " ORDER BY id LIMIT :limit"
+    return [dict(row) for row in db.execute(text(query), params).mappings()]
+
+
+def take_snapshot(db: Session, min_age_seconds: float = 0.0) -> Optional[Dict[str, Any]]:
+    """
+    Geeft None als een andere worker al bezig is of de laatste snapshot
+    jonger is dan min_age_seconds.
+
+    Werkt op een eigen connectie van dezelfde engine: de locks zijn
+    session-level, zodat de poort al open kan terwijl de kopie nog loopt.
+    """
+    with db.get_bind().connect() as conn:
+        try:
+            return _take_snapshot(conn, min_age_seconds)
+        finally:
+            conn.rollback()
+            conn.execute(text("SELECT pg_advisory_unlock_all()"))
+            conn.commit()
+
+
+def _take_snapshot(conn: Connection, min_age_seconds: float) -> Optional[Dict[str, Any]]:
+    if not conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": _SNAPSHOT_LOCK}).scalar():
+        return None
+    if min_age_seconds > 0:
+        recent = conn.execute(
+            text(
+                "SELECT 1 FROM stock_snapshots "
+                "WHERE taken_at > clock_timestamp() - make_interval(secs => :age) LIMIT 1"
+            ),
+            {"age": min_age_seconds},
+        ).first()
+        if recent is not None:
+            return None
+
+    # poort dicht: lopende boekingen afwachten, boekers niet langer dan 2s
+    # laten wachten; anders later opnieuw
+    conn.execute(text("SET LOCAL lock_timeout = '2s'"))
+    conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _BOOKING_GATE})
+    conn.commit()
+
+    # de eerste query legt de snapshot vast; daarna mag er weer geboekt worden
+    conn.execution_options(isolation_level="REPEATABLE READ")
+    up_to = conn.execute(text("SELECT COALESCE(max(id), 0) FROM stock_movements")).scalar()
+    conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _BOOKING_GATE})
+
+    snapshot = conn.execute(
+        text(
+            "INSERT INTO stock_snapshots (taken_at, up_to_movement_id, line_count) "
+            "VALUES (clock_timestamp(), :up_to, 0) "
+            "RETURNING id, taken_at, up_to_movement_id"
+        ),
+        {"up_to": up_to},
+    ).one()
+    lines = conn.execute(
+        text(
+            "INSERT INTO stock_snapshot_lines (snapshot_id, sku, location, lot_no, qty) "
+            "SELECT :snapshot_id, sku, location, lot_no, qty_on_hand FROM stock_balances "
+            "WHERE qty_on_hand <> 0"
+        ),
+        {"snapshot_id": snapshot.id},
+    ).rowcount
+    conn.execute(
+        text("UPDATE stock_snapshots SET line_count = :lines WHERE id = :snapshot_id"),
+        {"lines": lines, "snapshot_id": snapshot.id},
+    )
+    conn.commit()
+    logger.info("Voorraadsnapshot %s: %d standen t.e.m. boeking %s", snapshot.id, lines, snapshot.up_to_movement_id)
+    return {
+        "id": snapshot.id,
+        "taken_at": snapshot.taken_at,
+        "up_to_movement_id": snapshot.up_to_movement_id,
+        "line_count": lines,
+    }
+
+
+def prune_snapshots(db: Session, retention_days: float) -> int:
+    """Snapshots ouder dan retention_days weg (lijnen via ON DELETE CASCADE); 0 = alles bewaren."""
+    if retention_days <= 0:
+        return 0
+    deleted = db.execute(
+        text(
+            "DELETE FROM stock_snapshots "
+            "WHERE taken_at < now() - make_interval(secs => :age) "
+            "AND id <> (SELECT max(id) FROM stock_snapshots)"
+        ),
+        {"age": retention_days * 86400},
+    ).rowcount
+    db.commit()
+    if deleted:
+        logger.info("Voorraadsnapshots: %d ouder dan %s dagen verwijderd", deleted, retention_days)
+    return deleted
+
+
+def scheduled_snapshot(min_age_seconds: float, retention_days: float = 0.0) -> None:
+    """Voor jobs.PeriodicJob: eigen sessie, overslaan als er recent al een snapshot is; daarna opruimen."""
+    with SessionLocal() as db:
+        take_snapshot(db, min_age_seconds=min_age_seconds)
+        prune_snapshots(db, retention_days)
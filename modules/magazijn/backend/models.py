@@ -0,0 +1,161 @@
+# magazijn/backend/models.py
+"""
+Voorraadtabellen.
+
+- stock_movements      : append-only grootboek (één rij per boeking)
+- stock_balances       : actuele stand per (sku, locatie, lot), in dezelfde
+                         transactie bijgewerkt als de boeking; qty_reserved =
+                         deel dat aan orders toegewezen is (reservations.py)
+- stock_reservations   : toewijzing van voorraad aan een verkooporderlijn
+- warehouse_aisles /   : layout voor looproutes (picking.py)
+  warehouse_bins
+- stock_snapshots      : periodieke momentopnames van stock_balances, met het
+  stock_snapshot_lines   hoogste movement-id dat erin verwerkt is
+"""
+
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    CheckConstraint,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+    text,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database import Base
+
+MOVEMENT_KINDS = ("receipt", "pick", "transfer", "adjustment")
+RESERVATION_STATUSES = ("held", "confirmed", "picked", "released", "expired")
+
+
+class StockMovement(Base):
+    """
+    receipt    : +qty op to_location
+    pick       : -qty op from_location
+    transfer   : -qty op from_location, +qty op to_location
+    adjustment : qty (met teken) op to_location
+    """
+
+    __tablename__ = "stock_movements"
+    __table_args__ = (
+        CheckConstraint(f"kind IN {MOVEMENT_KINDS}", name="ck_stock_movements_kind"),
+        CheckConstraint("from_location IS NOT NULL OR to_location IS NOT NULL", name="ck_stock_movements_location"),
+        CheckConstraint("qty <> 0", name="ck_stock_movements_qty"),
+        # historiek per artikel en point-in-time vanaf een snapshot
+        Index("ix_stock_movements_sku_id", "sku", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(20))
+    sku: Mapped[str] = mapped_column(String(64))
+    lot_no: Mapped[str] = mapped_column(String(64), default="")
+    from_location: Mapped[str | None] = mapped_column(String(32))
+    to_location: Mapped[str | None] = mapped_column(String(32))
+    qty: Mapped[int] = mapped_column(Integer)
+    reference: Mapped[str | None] = mapped_column(String(64))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class StockBalance(Base):
+    __tablename__ = "stock_balances"
+    __table_args__ = (
+        # geen negatieve voorraad: een pick/transfer zonder dekking faalt de hele batch
+        CheckConstraint("qty_on_hand >= 0", name="ck_stock_balances_non_negative"),
+        # geen oversell: een pick mag niet in gereserveerde voorraad snijden
+        CheckConstraint("qty_reserved >= 0 AND qty_reserved <= qty_on_hand", name="ck_stock_balances_reserved"),
+    )
+
+    sku: Mapped[str] = mapped_column(String(64), primary_key=True)
+    location: Mapped[str] = mapped_column(String(32), primary_key=True)
+    lot_no: Mapped[str] = mapped_column(String(64), primary_key=True, default="")
+    qty_on_hand: Mapped[int] = mapped_column(Integer, default=0)
+    # server_default: het grootboek-upsert vult deze kolom niet in
+    qty_reserved: Mapped[int] = mapped_column(Integer, server_default=text("0"))
+    last_movement_id: Mapped[int] = mapped_column(BigInteger)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class StockSnapshot(Base):
+    __tablename__ = "stock_snapshots"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    taken_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    # alle boekingen met id <= up_to_movement_id zitten in de lines
+    up_to_movement_id: Mapped[int] = mapped_column(BigInteger)
+    line_count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class StockSnapshotLine(Base):
+    __tablename__ = "stock_snapshot_lines"
+
+    snapshot_id: Mapped[int] = mapped_column(ForeignKey("stock_snapshots.id", ondelete="CASCADE"), primary_key=True)
+    sku: Mapped[str] = mapped_column(String(64), primary_key=True)
+    location: Mapped[str] = mapped_column(String(32), primary_key=True)
+    lot_no: Mapped[str] = mapped_column(String(64), primary_key=True)
+    qty: Mapped[int] = mapped_column(Integer)
+
+
+class StockReservation(Base):
+    """
+    Eén rij per (orderlijn, locatie, lot) waaruit toegewezen werd.
+
+    order_ref / line_ref: SalesOrder.order_no (of id) en SalesOrderLine.id in verkoop
+    held      → telt mee in qty_reserved tot expires_at
+    confirmed → blijft staan tot de pick (geen vervaldatum)
+    picked / released / expired → afgesloten, qty_reserved weer vrijgegeven
+    """
+
+    __tablename__ = "stock_reservations"
+    __table_args__ = (
+        CheckConstraint(f"status IN {RESERVATION_STATUSES}", name="ck_stock_reservations_status"),
+        CheckConstraint("qty > 0", name="ck_stock_reservations_qty"),
+        Index("ix_stock_reservations_order", "order_ref", "line_ref"),
+        # expiry-sweep: enkel de openstaande held-rijen
+        Index("ix_stock_reservations_expiry", "expires_at", postgresql_where=text("status = 'held'")),
+        # open orders voor de wave-planning (picking.py)
+        Index(
+            "ix_stock_reservations_open",
+            "order_ref",
+            "created_at",
+            postgresql_where=text("status IN ('held', 'confirmed')"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    order_ref: Mapped[str] = mapped_column(String(64))
+    line_ref: Mapped[str] = mapped_column(String(64), default="")
+    sku: Mapped[str] = mapped_column(String(64))
+    location: Mapped[str] = mapped_column(String(32))
+    lot_no: Mapped[str] = mapped_column(String(64))
+    qty: Mapped[int] = mapped_column(Integer)
+    status: Mapped[str] = mapped_column(String(20), default="held")
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    closed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+class WarehouseAisle(Base):
+    """x: positie langs de voorste dwarsgang (m); length: lengte van de gang (m)."""
+
+    __tablename__ = "warehouse_aisles"
+
+    aisle: Mapped[str] = mapped_column(String(32), primary_key=True)
+    x: Mapped[float] = mapped_column(Float)
+    length: Mapped[float] = mapped_column(Float)
+
+
+class WarehouseBin(Base):
+    """location = de locatiecode uit het grootboek; position: meter vanaf de voorkant van de gang."""
+
+    __tablename__ = "warehouse_bins"
+
+    location: Mapped[str] = mapped_column(String(32), primary_key=True)
+    aisle: Mapped[str] = mapped_column(ForeignKey("warehouse_aisles.aisle", ondelete="CASCADE"), index=True)
+    position: Mapped[float] = mapped_column(Float)
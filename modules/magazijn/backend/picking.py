@@ -0,0 +1,310 @@
+# magazijn/backend/picking.py
+"""
+Pick-waves en looproutes.
+
+Layout (warehouse_aisles / warehouse_bins):
+- gangen met een x-positie langs de voorste dwarsgang en een lengte; elke
+  bin ligt in een gang op `position` meter van de voorkant
+- graaf: depot + per gang een knoop vooraan en achteraan. Voorkanten liggen
+  aan elkaar via de voorste dwarsgang, achterkanten via de achterste, en
+  elke gang verbindt zijn voor- en achterkant
+- all-pairs kortste afstanden tussen die knopen (Floyd–Warshall) worden één
+  keer berekend per layout; de afstand tussen twee bins is dan O(1): in
+  dezelfde gang rechtstreeks, anders het minimum over de 4 combinaties
+  van gang-uiteinden
+
+Planning:
+- open orders = orders met actieve reservaties (confirmed, optioneel held);
+  de pick-lijnen zijn de reservaties zelf (locatie + lot liggen vast)
+- batching: orders sorteren op hun "zwaartepunt" in de layout (gang, dan
+  positie, slangvormig) en in batches van batch_size orders (één kar per
+  picker) opdelen; een wave = één batch per picker
+- route per batch: depot → alle bins → depot; nearest neighbour als start,
+  daarna 2-opt tot er geen verbetering meer is (of de tijd op is)
+"""
+
+import math
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert, text
+from sqlalchemy.orm import Session
+
+from models import WarehouseAisle, WarehouseBin
+
+DEPOT = "__depot__"
+
+
+@dataclass(frozen=True)
+class Bin:
+    aisle: int  # index in Layout.aisles
+    position: float
+
+
+class Layout:
+    def __init__(self, aisles: Sequence[Tuple[str, float, float]], bins: Dict[str, Tuple[str, float]], depot_x: float = 0.0) -> None:
+        """aisles: (code, x, length); bins: locatie → (gang, positie)."""
+        self.aisles = sorted(aisles, key=lambda a: a[1])
+        index = {code: i for i, (code, _, _) in enumerate(self.aisles)}
+        self.lengths = [length for _, _, length in self.aisles]
+        self.bins = {
+            location: Bin(index[aisle], min(max(position, 0.0), self.lengths[index[aisle]]))
+            for location, (aisle, position) in bins.items()
+            if aisle in index
+        }
+        self.depot_x = depot_x
+        self._dist = self._all_pairs()
+
+    # knopen: 0 = depot, 1 + 2i = voorkant gang i, 2 + 2i = achterkant gang i
+    @staticmethod
+    def _front(i: int) -> int:
+        return 1 + 2 * i
+
+    @staticmethod
+    def _back(i: int) -> int:
+        return 2 + 2 * i
+
+    def _all_pairs(self) -> List[List[float]]:
+        n = 1 + 2 * len(self.aisles)
+        dist = [[math.inf] * n for _ in range(n)]
+        for k in range(n):
+            dist[k][k] = 0.0
+
+        def edge(a: int, b: int, weight: float) -> None:
+            if weight < dist[a][b]:
+                dist[a][b] = dist[b][a] = weight
+
+        for i, (_, x, length) in enumerate(self.aisles):
+            edge(self._front(i), self._back(i), length)
+            edge(0, self._front(i), abs(x - self.depot_x))
+            if i:
+                _, prev_x, prev_length = self.aisles[i - 1]
+                edge(self._front(i - 1), self._front(i), x - prev_x)
+                edge(self._back(i - 1), self._back(i), x - prev_x + abs(length - prev_length))
+
+        # Floyd–Warshall; klein (2 knopen per gang)
+        for k in range(n):
+            dk = dist[k]
+            for i in range(n):
+                di = dist[i]
+                via = di[k]
+                if via == math.inf:
+                    continue
+                for j in range(n):
+                    if via + dk[j] < di[j]:
+                        di[j] = via + dk[j]
+        return dist
+
+    def _ends(self, location: str) -> List[Tuple[int, float]]:
+        """(knoop, afstand tot die knoop) voor een bin of het depot."""
+        if location == DEPOT or location not in self.bins:
+            return [(0, 0.0)]
+        b = self.bins[location]
+        return [(self._front(b.aisle), b.position), (self._back(b.aisle), self.lengths[b.aisle] - b.position)]
+
+    def distance(self, a: str, b: str) -> float:
+        if a == b:
+            return 0.0
+        bin_a, bin_b = self.bins.get(a), self.bins.get(b)
+        if bin_a is not None and bin_b is not None and bin_a.aisle == bin_b.aisle:
+            return abs(bin_a.position - bin_b.position)
+        return min(
+            off_a + self._dist[node_a][node_b] + off_b
+            for node_a, off_a in self._ends(a)
+            for node_b, off_b in self._ends(b)
+        )
+
+    def matrix(self, locations: Sequence[str]) -> List[List[float]]:
+        n = len(locations)
+        matrix = [[0.0] * n for _ in range(n)]
+        for i in range(n):
+            for j in range(i + 1, n):
+                matrix[i][j] = matrix[j][i] = self.distance(locations[i], locations[j])
+        return matrix
+
+    def sort_key(self, locations: Sequence[str]) -> Tuple[float, float]:
+        """Zwaartepunt van een order: gemiddelde gang, dan positie (slangvormig over de gangen)."""
+        placed = [self.bins[loc] for loc in locations if loc in self.bins]
+        if not placed:
+            return (-1.0, 0.0)
+        aisle = sum(b.aisle for b in placed) / len(placed)
+        position = sum(b.position for b in placed) / len(placed)
+        return (round(aisle), position if round(aisle) % 2 == 0 else -position)
+
+
+# -------------------------------
+# Routering
+# -------------------------------
+def route_length(route: Sequence[int], dist: List[List[float]]) -> float:
+    return sum(dist[route[i]][route[i + 1]] for i in range(len(route) - 1))
+
+
+def nearest_neighbour(dist: List[List[float]]) -> List[int]:
+    """Rondrit vanaf knoop 0 (depot) en terug."""
+    n = len(dist)
+    route, unvisited = [0], set(range(1, n))
+    while unvisited:
+        last = dist[route[-1]]
+        nxt = min(unvisited, key=last.__getitem__)
+        route.append(nxt)
+        unvisited.remove(nxt)
+    route.append(0)
+    return route
+
+
+def two_opt(route: List[int], dist: List[List[float]], deadline: Optional[float] = None) -> List[int]:
+    """Segmenten omkeren zolang dat de rit korter maakt; depot blijft begin en eind."""
+    route = list(route)
+    n = len(route)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 2):
+            for j in range(i + 1, n - 1):
+                a, b, c, d = route[i - 1], route[i], route[j], route[j + 1]
+                if dist[a][c] + dist[b][d] < dist[a][b] + dist[c][d] - 1e-9:
+                    route[i:j + 1] = route[i:j + 1][::-1]
+                    improved = True
+            if deadline is not None and time.perf_counter() > deadline:
+                return route
+    return route
+
+
+def plan_route(layout: Layout, locations: Sequence[str], deadline: Optional[float] = None) -> Tuple[List[str], float]:
+    stops = [DEPOT] + sorted(set(locations))
+    dist = layout.matrix(stops)
+    route = two_opt(nearest_neighbour(dist), dist, deadline)
+    return [stops[i] for i in route[1:-1]], route_length(route, dist)
+
+
+# -------------------------------
+# Waves
+# -------------------------------
+def plan_waves(
+    layout: Layout,
+    lines: Sequence[Dict[str, Any]],
+    pickers: int,
+    batch_size: int,
+    time_budget: float = 0.8,
+) -> Dict[str, Any]:
+    """lines: reservaties (order_ref, line_ref, sku, location, lot_no, qty) in prioriteitsvolgorde."""
+    started = time.perf_counter()
+    deadline = started + time_budget
+
+    orders: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for line in lines:
+        orders[line["order_ref"]].append(line)
+    # stabiele sortering: bij gelijke sleutel blijft de prioriteit (oudste eerst)
+    refs = sorted(orders, key=lambda ref: layout.sort_key([l["location"] for l in orders[ref]]))
+    batches = [refs[i:i + batch_size] for i in range(0, len(refs), batch_size)]
+
+    waves: List[Dict[str, Any]] = []
+    total = single = 0.0
+    for b_idx, batch in enumerate(batches):
+        wave_no, picker = divmod(b_idx, pickers)
+        if picker == 0:
+            waves.append({"wave": wave_no + 1, "pickers": []})
+        batch_lines = [line for ref in batch for line in orders[ref]]
+        order, distance = plan_route(layout, [l["location"] for l in batch_lines], deadline)
+        seq = {location: i for i, location in enumerate(order)}
+        picks = sorted(batch_lines, key=lambda l: (seq[l["location"]], l["order_ref"], l["line_ref"]))
+        waves[-1]["pickers"].append({
+            "picker": picker + 1,
+            "orders": batch,
+            "stops": len(order),
+            "distance_m": round(distance, 1),
+            "picks": [{**line, "seq": seq[line["location"]] + 1} for line in picks],
+        })
+        total += distance
+        # vergelijking: elke order apart lopen (enkel nearest neighbour, goedkoop)
+        for ref in batch:
+            stops = [DEPOT] + sorted({l["location"] for l in orders[ref]})
+            dist = layout.matrix(stops)
+            single += route_length(nearest_neighbour(dist), dist)
+
+    unmapped = sorted({line["location"] for line in lines} - set(layout.bins))
+    return {
+        "orders": len(orders),
+        "lines": len(lines),
+        "waves": waves,
+        "distance_m": round(total, 1),
+        "distance_order_by_order_m": round(single, 1),
+        "unmapped_locations": unmapped,
+        "took_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+# -------------------------------
+# Database
+# -------------------------------
+_OPEN_LINES = text(
+    """
+    WITH open_orders AS (
+        SELECT order_ref, min(created_at) AS first_at
+        FROM stock_reservations
+        WHERE status = ANY(CAST(:statuses AS text[]))
+        GROUP BY order_ref
+        ORDER BY first_at, order_ref
+        LIMIT :max_orders
+    )
+    SELECT r.order_ref, r.line_ref, r.sku, r.location, r.lot_no, r.qty
+    FROM stock_reservations r
+    JOIN open_orders o USING (order_ref)
+    WHERE r.status = ANY(CAST(:statuses AS text[]))
+    ORDER BY o.first_at, r.order_ref, r.id
+    """
+)
+
+
+def open_lines(db: Session, include_held: bool, max_orders: int) -> List[Dict[str, Any]]:
+    statuses = ["confirmed", "held"] if include_held else ["confirmed"]
+    rows = db.execute(_OPEN_LINES, {"statuses": statuses, "max_orders": max_orders}).mappings()
+    return [dict(row) for row in rows]
+
+
+def save_layout(db: Session, aisles: Sequence[Dict[str, Any]]) -> None:
+    """Vervangt de volledige layout."""
+    db.execute(delete(WarehouseBin))
+    db.execute(delete(WarehouseAisle))
+    db.execute(insert(WarehouseAisle), [
+        {"aisle": a["aisle"], "x": a["x"], "length": a["length"]} for a in aisles
+    ])
+    bins = [
+        {"location": b["location"], "aisle": a["aisle"], "position": b["position"]}
+        for a in aisles
+        for b in a["bins"]
+    ]
+    if bins:
+        db.execute(insert(WarehouseBin), bins)
+    db.commit()
+
+
+def load_layout(db: Session, depot_x: float) -> Layout:
+    aisles = [(a.aisle, a.x, a.length) for a in db.query(WarehouseAisle)]
+    bins = {b.location: (b.aisle, b.position) for b in db.query(WarehouseBin)}
+    return Layout(aisles, bins, depot_x)
+
+
+class LayoutCache:
+    """Layout + afstandsmatrix per proces; herladen na `ttl` seconden of na save_layout."""
+
+    def __init__(self, depot_x: float = 0.0, ttl: float = 60.0) -> None:
+        self.depot_x = depot_x
+        self.ttl = ttl
+        self._layout: Optional[Layout] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> Layout:
+        with self._lock:
+            if self._layout is None or time.monotonic() - self._loaded_at > self.ttl:
+                self._layout = load_layout(db, self.depot_x)
+                self._loaded_at = time.monotonic()
+            return self._layout
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._layout = None
@@ -0,0 +1,219 @@
+# magazijn/backend/readiness.py
+"""
+Readiness (/readyz) uit gecachte dependency-checks.
+
+- de app registreert checks (DB-pool, downstream modules, SMTP ...)
+- een achtergrondtaak draait ze elke `interval` seconden tegelijk, elk met
+  een eigen timeout; sync checks lopen in een thread
+- /readyz leest enkel het laatste resultaat (O(1)): probes van de
+  orchestrator veroorzaken dus geen DB-load
+- ready = alle kritieke checks ok en het resultaat is niet verouderd;
+  niet-kritieke checks (bv. SMTP) worden gerapporteerd maar blokkeren niet
+- 503 als niet ready, met per check ok / duration_ms / error
+
+Een check geeft niets (of een dict met details) terug als alles ok is en
+raise't anders.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class _Check:
+    name: str
+    check: Callable[[], Any]
+    critical: bool
+    timeout: Optional[float]
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    ok: bool
+    critical: bool
+    duration_ms: float
+    error: Optional[str] = None
+    detail: Optional[Dict[str, Any]] = None
+
+
+class Readiness:
+    def __init__(
+        self,
+        interval: float = 5.0,
+        timeout: float = 2.0,
+        stale_after: float = 30.0,
+        clock=time.monotonic,
+    ) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self._clock = clock
+        self._checks: List[_Check] = []
+        self._results: Dict[str, CheckResult] = {}
+        # sync checks die hun timeout overschreden: de thread loopt nog
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._refreshed_at: Optional[float] = None
+        self._checked_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def register(
+        self,
+        name: str,
+        check: Callable[[], Any],
+        critical: bool = True,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self._checks.append(_Check(name, check, critical, timeout))
+
+    # -------------------------------
+    # Levenscyclus
+    # -------------------------------
+    async def start(self) -> None:
+        """Eerste ronde meteen (begrensd door de timeouts), daarna op de achtergrond."""
+        if self._task is not None:
+            return
+        await self.refresh()
+        self._task = asyncio.create_task(self._run(), name="readiness")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception:  # pragma: no cover - de lus mag nooit stoppen
+                logger.exception("Readiness refresh mislukt")
+
+    # -------------------------------
+    # Checks
+    # -------------------------------
+    async def refresh(self) -> None:
+        results = await asyncio.gather(*(self._run_check(check) for check in self._checks))
+        self._results = {check.name: result for check, result in zip(self._checks, results)}
+        self._checked_at = datetime.now(timezone.utc)
+        self._refreshed_at = self._clock()
+        for name, result in self._results.items():
+            if not result.ok:
+                logger.warning("Readiness-check %s faalt: %s", name, result.error)
+
+    async def _run_check(self, check: _Check) -> CheckResult:
+        timeout = check.timeout or self.timeout
+        pending = self._pending.get(check.name)
+        if pending is not None:
+            if not pending.done():
+                # geen tweede thread starten zolang de vorige hangt
+                return CheckResult(False, check.critical, 0.0, "vorige check loopt nog")
+            del self._pending[check.name]
+
+        is_async = asyncio.iscoroutinefunction(check.check)
+        started = time.perf_counter()
+        future = asyncio.ensure_future(check.check() if is_async else asyncio.to_thread(check.check))
+        done, _ = await asyncio.wait({future}, timeout=timeout)
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        if not done:
+            if is_async:
+                future.cancel()
+            else:
+                # een thread is niet te onderbreken: resultaat later weggooien
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                self._pending[check.name] = future
+            return CheckResult(False, check.critical, duration_ms, f"timeout na {timeout:g}s")
+
+        exc = future.exception()
+        if exc is not None:
+            message = str(exc).strip().splitlines()[0] if str(exc).strip() else ""
+            return CheckResult(False, check.critical, duration_ms, f"{type(exc).__name__}: {message}"[:300])
+        detail = future.result()
+        return CheckResult(True, check.critical, duration_ms, detail=detail if isinstance(detail, dict) else None)
+
+    # -------------------------------
+    # Resultaat
+    # -------------------------------
+    def is_stale(self) -> bool:
+        return self._refreshed_at is None or self._clock() - self._refreshed_at > self.stale_after
+
+    def status(self) -> Tuple[bool, Dict[str, Any]]:
+        stale = self.is_stale()
+        ready = not stale and all(r.ok for r in self._results.values() if r.critical)
+        checks = {}
+        for name, result in self._results.items():
+            item: Dict[str, Any] = {
+                "ok": result.ok,
+                "critical": result.critical,
+                "duration_ms": result.duration_ms,
+            }
+            if result.error:
+                item["error"] = result.error
+            if result.detail:
+                item["detail"] = result.detail
+            checks[name] = item
+        return ready, {
+            "status": "ready" if ready else "not-ready",
+            "ready": ready,
+            "stale": stale,
+            "checked_at": self._checked_at.isoformat() if self._checked_at else None,
+            "checks": checks,
+        }
+
+    def response(self, **extra: Any) -> JSONResponse:
+        ready, body = self.status()
+        return JSONResponse({**body, **extra}, status_code=200 if ready else 503)
+
+
+# -------------------------------
+# Herbruikbare checks
+# -------------------------------
+def tcp_check(host: str, port: int) -> Callable[[], Any]:
+    """Enkel bereikbaarheid (connect + close), zonder protocol."""
+
+    async def check() -> None:
+        _, writer = await asyncio.open_connection(host, port)
+        writer.close()
+        await writer.wait_closed()
+
+    return check
+
+
+def smtp_check(host: str, port: int) -> Callable[[], Any]:
+    """Leest de 220-groet van de server; geen login, geen mail."""
+
+    async def check() -> None:
+        reader, writer = await asyncio.open_connection(host, port, ssl=True if port == 465 else None)
+        try:
+            greeting = await reader.readline()
+            if not greeting.startswith(b"220"):
+                raise ConnectionError(f"onverwachte SMTP-groet: {greeting[:60]!r}")
+            writer.write(b"QUIT\r\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return check
+
+
+def http_check(client, url: str) -> Callable[[], Any]:
+    """GET op een health-endpoint van een andere module via een gedeelde httpx.AsyncClient."""
+
+    async def check() -> None:
+        response = await client.get(url)
+        response.raise_for_status()
+
+    return check
@@ -0,0 +1,408 @@
+# magazijn/backend/reservations.py
+"""
+Reservatie van voorraad voor verkooporders (zonder oversell).
+
+- vrije voorraad per (sku, locatie, lot) = qty_on_hand - qty_reserved in
+  stock_balances; een CHECK (qty_reserved <= qty_on_hand) maakt oversell
+  onmogelijk, ook voor picks die via het grootboek lopen
+- één order (reserve_order): per sku de rijen met vrije voorraad in
+  voorkeursvolgorde (oudste lot eerst) ophalen met FOR UPDATE SKIP LOCKED,
+  telkens zoveel als nodig (1, 2, 4 ... rijen). Gelijktijdige orders op
+  dezelfde sku pakken zo elk een ander lot/locatie i.p.v. op één rij te
+  wachten
+- komt SKIP LOCKED te kort terwijl er elders nog vrije voorraad is (rijen
+  die een andere transactie vasthoudt), dan terug naar het savepoint en
+  alle rijen van de sku blokkerend locken. Blokkerend locken gebeurt overal
+  (ook in het grootboek) in de volgorde (sku, locatie, lot) → geen deadlocks
+- gedeeltelijke toewijzing: wat er is wordt gereserveerd; een nieuwe
+  aanvraag voor dezelfde orderlijn vult enkel het verschil aan (idempotent)
+- held-reservaties vervallen na ttl_seconds (sweep in expire_due), confirm
+  haalt de vervaldatum weg, pick boekt de pick in het grootboek en geeft de
+  reservatie vrij in één transactie
+- bulk (reserve_bulk): alle orders van een dag in één transactie; de rijen
+  van alle betrokken sku's één keer locken, toewijzen in het geheugen (in de
+  volgorde van de aanvraag = prioriteit) en alles in twee statements wegschrijven
+"""
+
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import ledger
+from database import SessionLocal
+from metrics import RESERVATION_ALLOCATIONS
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, str, str]  # (sku, locatie, lot)
+
+ACTIVE = ("held", "confirmed")
+MAX_SKIP_LOCKED_ROWS = 16
+_ORDER_LOCK = 20120003
+
+_LOCK_SKIP = text(
+    """
+    SELECT location, lot_no, qty_on_hand - qty_reserved AS available
+    FROM stock_balances
+    WHERE sku = :sku
+      AND qty_on_hand > qty_reserved
+      AND (location, lot_no) NOT IN (
+          SELECT * FROM unnest(CAST(:seen_locations AS text[]), CAST(:seen_lots AS text[]))
+      )
+    ORDER BY lot_no, location
+    LIMIT :limit
+    FOR UPDATE SKIP LOCKED
+    """
+)
+
+_LOCK_ALL = text(
+    """
+    SELECT sku, location, lot_no, qty_on_hand - qty_reserved AS available
+    FROM stock_balances
+    WHERE sku = ANY(CAST(:skus AS text[])) AND qty_on_hand > qty_reserved
+    ORDER BY sku, location, lot_no
+    FOR UPDATE
+    """
+)
+
+_FREE_ELSEWHERE = text(
+    """
+    SELECT EXISTS (
+        SELECT 1 FROM stock_balances
+        WHERE sku = :sku
+          AND qty_on_hand > qty_reserved
+          AND (location, lot_no) NOT IN (
+              SELECT * FROM unnest(CAST(:seen_locations AS text[]), CAST(:seen_lots AS text[]))
+          )
+    )
+    """
+)
+
+_LOCK_KEYS = text(
+    """
+    SELECT 1
+    FROM stock_balances b
+    JOIN unnest(CAST(:skus AS text[]), CAST(:locations AS text[]), CAST(:lots AS text[]))
+         AS d(sku, location, lot_no) USING (sku, location, lot_no)
+    ORDER BY b.sku, b.location, b.lot_no
+    FOR UPDATE OF b
+    """
+)
+
+_ADJUST_RESERVED = text(
+    """
+    UPDATE stock_balances AS b
+    SET qty_reserved = b.qty_reserved + d.delta
+    FROM unnest(
+        CAST(:skus AS text[]), CAST(:locations AS text[]), CAST(:lots AS text[]), CAST(:deltas AS integer[])
+    ) AS d(sku, location, lot_no, delta)
+    WHERE b.sku = d.sku AND b.location = d.location AND b.lot_no = d.lot_no
+    """
+)
+
+_INSERT = text(
+    """
+    INSERT INTO stock_reservations (order_ref, line_ref, sku, location, lot_no, qty, status, expires_at)
+    SELECT order_ref, line_ref, sku, location, lot_no, qty, 'held', now() + make_interval(secs => :ttl)
+    FROM unnest(
+        CAST(:order_refs AS text[]), CAST(:line_refs AS text[]), CAST(:skus AS text[]),
+        CAST(:locations AS text[]), CAST(:lots AS text[]), CAST(:qtys AS integer[])
+    ) AS r(order_ref, line_ref, sku, location, lot_no, qty)
+    """
+)
+
+_EXISTING = text(
+    """
+    SELECT order_ref, line_ref, sum(qty) AS qty
+    FROM stock_reservations
+    WHERE order_ref = ANY(CAST(:order_refs AS text[])) AND status IN ('held', 'confirmed')
+    GROUP BY order_ref, line_ref
+    """
+)
+
+_CLOSE_ORDER = text(
+    """
+    UPDATE stock_reservations
+    SET status = :status, closed_at = now()
+    WHERE order_ref = :order_ref AND status = ANY(CAST(:from_statuses AS text[]))
+    RETURNING sku, location, lot_no, qty
+    """
+)
+
+_EXPIRE = text(
+    """
+    UPDATE stock_reservations
+    SET status = 'expired', closed_at = now()
+    WHERE id IN (
+        SELECT id FROM stock_reservations
+        WHERE status = 'held' AND expires_at <= now()
+        ORDER BY expires_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING sku, location, lot_no, qty
+    """
+)
+
+
+# -------------------------------
+# Hulpfuncties
+# -------------------------------
+def _lock_orders(db: Session, order_refs: Iterable[str]) -> None:
+    """Eén aanvraag per order tegelijk (vaste volgorde → geen deadlocks tussen bulk-aanvragen)."""
+    db.execute(
+        text(
+            "SELECT pg_advisory_xact_lock(:ns, hashtext(ref)) "
+            "FROM (SELECT ref FROM unnest(CAST(:refs AS text[])) AS ref ORDER BY ref) AS ordered"
+        ),
+        {"ns": _ORDER_LOCK, "refs": sorted(set(order_refs))},
+    )
+
+
+def _existing(db: Session, order_refs: Sequence[str]) -> Dict[Tuple[str, str], int]:
+    rows = db.execute(_EXISTING, {"order_refs": list(order_refs)}).all()
+    return {(row.order_ref, row.line_ref): int(row.qty) for row in rows}
+
+
+def _seen(pool: Sequence[List[Any]]) -> Dict[str, List[str]]:
+    return {"seen_locations": [row[0] for row in pool], "seen_lots": [row[1] for row in pool]}
+
+
+def _lock_skip_locked(db: Session, sku: str, need: int) -> List[List[Any]]:
+    """Rijen [locatie, lot, vrij] in voorkeursvolgorde tot `need` gedekt is; gelockte rijen van anderen overslaan."""
+    pool: List[List[Any]] = []
+    total, limit = 0, 1
+    while total < need:
+        rows = db.execute(_LOCK_SKIP, {"sku": sku, "limit": limit, **_seen(pool)}).all()
+        for row in rows:
+            pool.append([row.location, row.lot_no, int(row.available)])
+            total += int(row.available)
+        if len(rows) < limit:
+            break
+        limit = min(limit * 2, MAX_SKIP_LOCKED_ROWS)
+    return pool
+
+
+def _lock_blocking(db: Session, skus: Sequence[str]) -> Dict[str, List[List[Any]]]:
+    """Alle rijen met vrije voorraad, gelockt in (sku, locatie, lot)-volgorde; per sku in voorkeursvolgorde."""
+    pools: Dict[str, List[List[Any]]] = defaultdict(list)
+    for row in db.execute(_LOCK_ALL, {"skus": sorted(set(skus))}):
+        pools[row.sku].append([row.location, row.lot_no, int(row.available)])
+    for pool in pools.values():
+        pool.sort(key=lambda row: (row[1], row[0]))
+    return pools
+
+
+def _take(pool: List[List[Any]], wanted: int) -> List[Dict[str, Any]]:
+    allocations = []
+    for row in pool:
+        if wanted <= 0:
+            break
+        qty = min(row[2], wanted)
+        if qty <= 0:
+            continue
+        row[2] -= qty
+        wanted -= qty
+        allocations.append({"location": row[0], "lot_no": row[1], "qty": qty})
+    return allocations
+
+
+def _adjust_reserved(db: Session, deltas: Dict[Key, int], lock: bool) -> None:
+    keys = sorted(key for key, delta in deltas.items() if delta)
+    if not keys:
+        return
+    columns = {
+        "skus": [k[0] for k in keys],
+        "locations": [k[1] for k in keys],
+        "lots": [k[2] for k in keys],
+    }
+    if lock:
+        db.execute(_LOCK_KEYS, columns)
+    db.execute(_ADJUST_RESERVED, {**columns, "deltas": [deltas[k] for k in keys]})
+
+
+def _write(db: Session, results: Sequence[Dict[str, Any]], ttl_seconds: int) -> None:
+    """Nieuwe reservaties + qty_reserved (rijen zijn al gelockt door de allocatie)."""
+    rows = [
+        (order["order_ref"], line["line_ref"], line["sku"], a["location"], a["lot_no"], a["qty"])
+        for order in results
+        for line in order["lines"]
+        for a in line["allocations"]
+    ]
+    if not rows:
+        return
+    deltas: Dict[Key, int] = defaultdict(int)
+    for _, _, sku, location, lot_no, qty in rows:
+        deltas[(sku, location, lot_no)] += qty
+    _adjust_reserved(db, deltas, lock=False)
+    columns = list(zip(*rows))
+    db.execute(_INSERT, {
+        "ttl": ttl_seconds,
+        "order_refs": list(columns[0]),
+        "line_refs": list(columns[1]),
+        "skus": list(columns[2]),
+        "locations": list(columns[3]),
+        "lots": list(columns[4]),
+        "qtys": list(columns[5]),
+    })
+
+
+def _line_result(line: Dict[str, Any], already: int, allocations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    reserved = already + sum(a["qty"] for a in allocations)
+    status = "full" if reserved >= line["qty"] else ("partial" if reserved else "none")
+    return {
+        "line_ref": line["line_ref"],
+        "sku": line["sku"],
+        "requested": line["qty"],
+        "reserved": reserved,
+        "allocations": allocations,
+        "status": status,
+    }
+
+
+def _allocate_order(
+    order: Dict[str, Any],
+    existing: Dict[Tuple[str, str], int],
+    pools: Dict[str, List[List[Any]]],
+) -> Dict[str, Any]:
+    lines = []
+    for line in order["lines"]:
+        already = existing.get((order["order_ref"], line["line_ref"]), 0)
+        allocations = _take(pools.get(line["sku"], []), line["qty"] - already)
+        lines.append(_line_result(line, already, allocations))
+    return {"order_ref": order["order_ref"], "lines": lines}
+
+
+# -------------------------------
+# Reserveren
+# -------------------------------
+def reserve_order(db: Session, order: Dict[str, Any], ttl_seconds: int) -> Dict[str, Any]:
+    _lock_orders(db, [order["order_ref"]])
+    existing = _existing(db, [order["order_ref"]])
+
+    needs: Dict[str, int] = defaultdict(int)
+    for line in order["lines"]:
+        needs[line["sku"]] += max(line["qty"] - existing.get((order["order_ref"], line["line_ref"]), 0), 0)
+
+    pools: Dict[str, List[List[Any]]] = {}
+    path = "skip_locked"
+    for sku in sorted(sku for sku, need in needs.items() if need > 0):
+        savepoint = db.begin_nested()
+        pool = _lock_skip_locked(db, sku, needs[sku])
+        short = sum(row[2] for row in pool) < needs[sku]
+        if short and db.execute(_FREE_ELSEWHERE, {"sku": sku, **_seen(pool)}).scalar():
+            # vrije voorraad zit achter locks van andere transacties: wachten i.p.v. te weinig toewijzen
+            savepoint.rollback()
+            pool = _lock_blocking(db, [sku]).get(sku, [])
+            path = "blocking"
+        else:
+            savepoint.commit()
+        pools[sku] = pool
+
+    result = _allocate_order(order, existing, pools)
+    _write(db, [result], ttl_seconds)
+    db.commit()
+    RESERVATION_ALLOCATIONS.labels(path).inc()
+    return {**result, "path": path}
+
+
+def reserve_bulk(db: Session, orders: Sequence[Dict[str, Any]], ttl_seconds: int) -> List[Dict[str, Any]]:
+    """Orders in prioriteitsvolgorde; alles of niets in één transactie."""
+    order_refs = [order["order_ref"] for order in orders]
+    _lock_orders(db, order_refs)
+    existing = _existing(db, order_refs)
+    pools = _lock_blocking(db, [line["sku"] for order in orders for line in order["lines"]])
+
+    results = [_allocate_order(order, existing, pools) for order in orders]
+    _write(db, results, ttl_seconds)
+    db.commit()
+    RESERVATION_ALLOCATIONS.labels("bulk").inc(len(orders))
+    return results
+
+
+# -------------------------------
+# Levenscyclus
+# -------------------------------
+def list_order(db: Session, order_ref: str) -> List[Dict[str, Any]]:
+    rows = db.execute(
+        text(
+            "SELECT id, line_ref, sku, location, lot_no, qty, status, expires_at, created_at, closed_at "
+            "FROM stock_reservations WHERE order_ref = :order_ref ORDER BY id"
+        ),
+        {"order_ref": order_ref},
+    ).mappings()
+    return [dict(row) for row in rows]
+
+
+def _released(db: Session, rows: Sequence[Any]) -> Dict[str, int]:
+    deltas: Dict[Key, int] = defaultdict(int)
+    for row in rows:
+        deltas[(row.sku, row.location, row.lot_no)] -= int(row.qty)
+    _adjust_reserved(db, deltas, lock=True)
+    return {"reservations": len(rows), "qty": sum(int(row.qty) for row in rows)}
+
+
+def confirm(db: Session, order_ref: str) -> Dict[str, Any]:
+    """Held → confirmed (vervalt niet meer); al vervallen reservaties blijven buiten."""
+    _lock_orders(db, [order_ref])
+    rows = db.execute(
+        text(
+            "UPDATE stock_reservations SET status = 'confirmed', expires_at = NULL "
+            "WHERE order_ref = :order_ref AND status = 'held' AND expires_at > now() "
+            "RETURNING qty"
+        ),
+        {"order_ref": order_ref},
+    ).all()
+    db.commit()
+    return {"order_ref": order_ref, "reservations": len(rows), "qty": sum(int(row.qty) for row in rows)}
+
+
+def release(db: Session, order_ref: str) -> Dict[str, Any]:
+    _lock_orders(db, [order_ref])
+    rows = db.execute(
+        _CLOSE_ORDER, {"order_ref": order_ref, "status": "released", "from_statuses": list(ACTIVE)}
+    ).all()
+    summary = _released(db, rows)
+    db.commit()
+    return {"order_ref": order_ref, **summary}
+
+
+def pick(db: Session, order_ref: str) -> Dict[str, Any]:
+    """Gereserveerde voorraad uitboeken (pick in het grootboek) en de reservatie afsluiten."""
+    _lock_orders(db, [order_ref])
+    rows = db.execute(
+        _CLOSE_ORDER, {"order_ref": order_ref, "status": "picked", "from_statuses": list(ACTIVE)}
+    ).all()
+    summary = _released(db, rows)
+    if rows:
+        ledger.book(db, [
+            {"kind": "pick", "sku": row.sku, "location": row.location, "lot_no": row.lot_no,
+             "qty": int(row.qty), "reference": order_ref}
+            for row in rows
+        ])
+    db.commit()
+    return {"order_ref": order_ref, **summary}
+
+
+def expire_due(db: Session, batch_size: int = 1000) -> int:
+    """Vervallen held-reservaties vrijgeven; SKIP LOCKED zodat meerdere workers elkaar niet hinderen."""
+    total = 0
+    while True:
+        rows = db.execute(_EXPIRE, {"limit": batch_size}).all()
+        _released(db, rows)
+        db.commit()
+        total += len(rows)
+        if len(rows) < batch_size:
+            break
+    if total:
+        logger.info("%d vervallen reservaties vrijgegeven", total)
+    return total
+
+
+def scheduled_expiry() -> None:
+    """Voor jobs.PeriodicJob."""
+    with SessionLocal() as db:
+        expire_due(db)
@@ -0,0 +1,135 @@
+# magazijn/backend/schemas.py
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+MAX_BATCH = 5000
+
+
+class MovementIn(BaseModel):
+    """
+    location    : bestemming bij receipt/adjustment, bron bij pick/transfer
+    to_location : enkel bij transfer
+    qty         : > 0, behalve bij adjustment (met teken, != 0)
+    """
+
+    kind: Literal["receipt", "pick", "transfer", "adjustment"]
+    sku: str = Field(min_length=1, max_length=64)
+    location: str = Field(min_length=1, max_length=32)
+    to_location: Optional[str] = Field(default=None, min_length=1, max_length=32)
+    lot_no: str = Field(default="", max_length=64)
+    qty: int
+    reference: Optional[str] = Field(default=None, max_length=64)
+
+    @model_validator(mode="after")
+    def _check(self) -> "MovementIn":
+        if self.kind == "adjustment":
+            if self.qty == 0:
+                raise ValueError("adjustment met qty 0")
+        elif self.qty <= 0:
+            raise ValueError(f"{self.kind} vereist qty > 0")
+        if self.kind == "transfer":
+            if not self.to_location or self.to_location == self.location:
+                raise ValueError("transfer vereist een andere to_location")
+        elif self.to_location is not None:
+            raise ValueError("to_location enkel bij transfer")
+        return self
+
+
+class MovementBatch(BaseModel):
+    movements: List[MovementIn] = Field(min_length=1, max_length=MAX_BATCH)
+
+
+class BalanceOut(BaseModel):
+    sku: str
+    location: str
+    lot_no: str
+    qty_on_hand: int
+    last_movement_id: int
+
+
+class PostedOut(BaseModel):
+    posted: int
+    balances: List[BalanceOut]
+
+
+class SnapshotOut(BaseModel):
+    id: int
+    taken_at: datetime
+    up_to_movement_id: int
+    line_count: int
+
+
+MAX_BULK_ORDERS = 10_000
+
+
+class ReservationLineIn(BaseModel):
+    line_ref: str = Field(default="", max_length=64)
+    sku: str = Field(min_length=1, max_length=64)
+    qty: int = Field(gt=0)
+
+
+class OrderReservationIn(BaseModel):
+    """order_ref: SalesOrder.order_no (of id) in verkoop; line_ref: SalesOrderLine.id."""
+
+    order_ref: str = Field(min_length=1, max_length=64)
+    lines: List[ReservationLineIn] = Field(min_length=1)
+    ttl_seconds: Optional[int] = Field(default=None, ge=1)
+
+
+class BulkReservationIn(BaseModel):
+    # volgorde = prioriteit bij schaarste
+    orders: List[OrderReservationIn] = Field(min_length=1, max_length=MAX_BULK_ORDERS)
+    ttl_seconds: Optional[int] = Field(default=None, ge=1)
+
+
+class AllocationOut(BaseModel):
+    location: str
+    lot_no: str
+    qty: int
+
+
+class ReservationLineOut(BaseModel):
+    line_ref: str
+    sku: str
+    requested: int
+    reserved: int
+    allocations: List[AllocationOut]
+    status: Literal["full", "partial", "none"]
+
+
+class OrderReservationOut(BaseModel):
+    order_ref: str
+    lines: List[ReservationLineOut]
+    path: Optional[str] = None
+
+
+class ReservationChangeOut(BaseModel):
+    order_ref: str
+    reservations: int
+    qty: int
+
+
+class BinIn(BaseModel):
+    location: str = Field(min_length=1, max_length=32)
+    position: float = Field(ge=0)
+
+
+class AisleIn(BaseModel):
+    aisle: str = Field(min_length=1, max_length=32)
+    x: float
+    length: float = Field(gt=0)
+    bins: List[BinIn] = Field(default_factory=list)
+
+
+class LayoutIn(BaseModel):
+    aisles: List[AisleIn] = Field(min_length=1)
+
+
+class WavePlanIn(BaseModel):
+    pickers: int = Field(default=1, ge=1, le=100)
+    # orders per kar/picker
+    batch_size: Optional[int] = Field(default=None, ge=1, le=100)
+    max_orders: int = Field(default=500, ge=1, le=5000)
+    include_held: bool = False
@@ -0,0 +1,6 @@
+import os
+
+# Integratietests (reservaties tegen een echte PostgreSQL) enkel met
+# MAGAZIJN_TEST_DATABASE_URL; database.py leest DATABASE_URL bij import.
+if os.getenv("MAGAZIJN_TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["MAGAZIJN_TEST_DATABASE_URL"]
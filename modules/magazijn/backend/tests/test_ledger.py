@@ -0,0 +1,134 @@
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from ledger import _legs
+
+
+def test_legs_per_movement_kind():
+    assert _legs({"kind": "receipt", "location": "R1"}) == {"from": None, "to": "R1"}
+    assert _legs({"kind": "pick", "location": "R1"}) == {"from": "R1", "to": None}
+    assert _legs({"kind": "transfer", "location": "R1", "to_location": "R2"}) == {"from": "R1", "to": "R2"}
+
+
+# -------------------------------
+# Tegen PostgreSQL
+# -------------------------------
+needs_postgres = pytest.mark.skipif(
+    not os.getenv("MAGAZIJN_TEST_DATABASE_URL"),
+    reason="MAGAZIJN_TEST_DATABASE_URL (lege PostgreSQL) niet gezet",
+)
+
+
+@pytest.fixture
+def db():
+    from database import SessionLocal, init_schema
+
+    init_schema()
+    with SessionLocal() as session:
+        session.info["sku"] = f"T-{uuid.uuid4().hex[:8]}"
+        yield session
+
+
+def _qty(rows):
+    return {(row["location"], row["lot_no"]): row["qty_on_hand"] for row in rows}
+
+
+@needs_postgres
+def test_batch_is_summed_per_balance(db):
+    import ledger
+
+    sku = db.info["sku"]
+    rows = ledger.post_movements(db, [
+        {"kind": "receipt", "sku": sku, "location": "R1", "lot_no": "L1", "qty": 5},
+        {"kind": "receipt", "sku": sku, "location": "R1", "lot_no": "L1", "qty": 2},
+        {"kind": "transfer", "sku": sku, "location": "R1", "to_location": "R2", "lot_no": "L1", "qty": 3},
+    ])
+
+    # één rij per geraakte stand, met de stand na de hele batch
+    assert _qty(rows) == {("R1", "L1"): 4, ("R2", "L1"): 3}
+    assert _qty(ledger.balances(db, sku)) == {("R1", "L1"): 4, ("R2", "L1"): 3}
+    assert len(ledger.movements(db, sku=sku)) == 3
+
+
+@needs_postgres
+def test_negative_stock_rejects_the_whole_batch(db):
+    from fastapi.testclient import TestClient
+
+    import ledger
+    from app import app
+
+    sku = db.info["sku"]
+    ledger.post_movements(db, [{"kind": "receipt", "sku": sku, "location": "R1", "qty": 2}])
+
+    with pytest.raises(ledger.InsufficientStock):
+        ledger.post_movements(db, [
+            {"kind": "receipt", "sku": sku, "location": "R2", "qty": 10},
+            {"kind": "pick", "sku": sku, "location": "R1", "qty": 3},
+        ])
+    response = TestClient(app).post(
+        "/stock/movements", json={"movements": [{"kind": "pick", "sku": sku, "location": "R1", "qty": 3}]}
+    )
+    assert response.status_code == 409
+
+    assert _qty(ledger.balances(db, sku)) == {("R1", ""): 2}
+    assert len(ledger.movements(db, sku=sku)) == 1
+
+
+@needs_postgres
+def test_movements_are_append_only(db):
+    from sqlalchemy import text
+    from sqlalchemy.exc import DBAPIError
+
+    import ledger
+
+    sku = db.info["sku"]
+    ledger.post_movements(db, [{"kind": "receipt", "sku": sku, "location": "R1", "qty": 1}])
+    for statement in ("UPDATE stock_movements SET qty = 5 WHERE sku = :sku", "DELETE FROM stock_movements WHERE sku = :sku"):
+        with pytest.raises(DBAPIError, match="append-only"):
+            db.execute(text(statement), {"sku": sku})
+        db.rollback()
+
+
+@needs_postgres
+def test_balances_at_starts_from_the_snapshot(db):
+    import ledger
+
+    sku = db.info["sku"]
+    ledger.post_movements(db, [{"kind": "receipt", "sku": sku, "location": "R1", "qty": 5}])
+    snapshot = ledger.take_snapshot(db)
+    assert snapshot is not None
+    between = datetime.now(timezone.utc)
+    ledger.post_movements(db, [{"kind": "pick", "sku": sku, "location": "R1", "qty": 2}])
+
+    before = ledger.balances_at(db, sku, between)
+    assert before["snapshot_id"] == snapshot["id"]
+    assert [(b["location"], b["qty"]) for b in before["balances"]] == [("R1", 5)]
+
+    now = ledger.balances_at(db, sku, datetime.now(timezone.utc))
+    assert [(b["location"], b["qty"]) for b in now["balances"]] == [("R1", 3)]
+
+
+@needs_postgres
+def test_prune_keeps_the_newest_snapshot(db):
+    from sqlalchemy import text
+
+    import ledger
+
+    ledger.post_movements(db, [{"kind": "receipt", "sku": db.info["sku"], "location": "R1", "qty": 1}])
+    old = ledger.take_snapshot(db)
+    newest = ledger.take_snapshot(db)
+    db.execute(
+        text("UPDATE stock_snapshots SET taken_at = taken_at - interval '40 days' WHERE id IN (:old, :newest)"),
+        {"old": old["id"], "newest": newest["id"]},
+    )
+    db.commit()
+
+    assert ledger.prune_snapshots(db, retention_days=0) == 0
+    assert ledger.prune_snapshots(db, retention_days=30) >= 1
+    remaining = set(db.execute(text("SELECT id FROM stock_snapshots")).scalars())
+    assert old["id"] not in remaining and newest["id"] in remaining
+    lines = db.execute(text("SELECT count(*) FROM stock_snapshot_lines WHERE snapshot_id = :id"), {"id": old["id"]})
+    assert lines.scalar() == 0
@@ -0,0 +1,104 @@
+import math
+
+import pytest
+
+from picking import DEPOT, Layout, nearest_neighbour, plan_route, plan_waves, route_length, two_opt
+
+
+def _layout():
+    # drie gangen; C is dubbel zo lang (achterste dwarsgang loopt schuin)
+    return Layout(
+        [("C", 10.0, 20.0), ("A", 0.0, 10.0), ("B", 5.0, 10.0)],
+        {
+            "a2": ("A", 2.0), "a9": ("A", 9.0),
+            "b3": ("B", 3.0), "b8": ("B", 8.0),
+            "c18": ("C", 18.0), "x1": ("Z", 1.0),
+        },
+    )
+
+
+def test_same_aisle_distance_is_direct():
+    layout = _layout()
+    assert layout.distance("a2", "a9") == 7.0
+    assert layout.distance("a9", "a9") == 0.0
+
+
+def test_cross_aisle_distance_takes_the_shorter_cross_aisle():
+    layout = _layout()
+    # vooraan: 2 + 5 + 3
+    assert layout.distance("a2", "b3") == 10.0
+    # achteraan: 1 + 5 + 2
+    assert layout.distance("a9", "b8") == 8.0
+    # achteraan naar de langere gang: 2 + (5 + 10) + 2
+    assert layout.distance("b8", "c18") == 19.0
+    assert layout.distance("c18", "b8") == layout.distance("b8", "c18")
+
+
+def test_depot_and_unknown_locations():
+    layout = _layout()
+    assert layout.distance(DEPOT, "a2") == 2.0
+    assert layout.distance(DEPOT, "c18") == 28.0
+    assert "x1" not in layout.bins  # gang Z bestaat niet
+    assert layout.distance(DEPOT, "x1") == 0.0
+
+
+def _square():
+    # depot (0,0) en de hoeken (0,1), (1,1), (1,0)
+    points = [(0, 0), (0, 1), (1, 1), (1, 0)]
+    return [[math.dist(p, q) for q in points] for p in points]
+
+
+def test_nearest_neighbour_is_a_round_trip_from_the_depot():
+    dist = _square()
+    route = nearest_neighbour(dist)
+    assert route[0] == route[-1] == 0
+    assert sorted(route[1:-1]) == [1, 2, 3]
+    assert route[1] in (1, 3)  # dichtstbijzijnde eerst
+
+
+def test_two_opt_removes_crossings_and_keeps_the_depot():
+    dist = _square()
+    crossing = [0, 2, 1, 3, 0]
+    assert route_length(crossing, dist) == pytest.approx(2 + 2 * math.sqrt(2))
+
+    route = two_opt(crossing, dist)
+    assert route[0] == route[-1] == 0
+    assert route_length(route, dist) == pytest.approx(4.0)
+
+
+def test_plan_route_includes_the_way_back_to_the_depot():
+    layout = _layout()
+    stops, distance = plan_route(layout, ["a2", "a2"])
+    assert (stops, distance) == (["a2"], 4.0)
+
+    stops, distance = plan_route(layout, ["b8", "a2", "a9"])
+    assert sorted(stops) == ["a2", "a9", "b8"]
+    # depot → a2 → a9 → (achteraan) b8 → vooraan terug: 2 + 7 + 8 + 13
+    assert distance == pytest.approx(30.0)
+
+
+def test_plan_waves_batches_orders_per_picker():
+    layout = _layout()
+    locations = ["a2", "a9", "b3", "b8", "c18"]
+    lines = [
+        {"order_ref": f"O{i}", "line_ref": "1", "sku": "S", "location": loc, "lot_no": "", "qty": 1}
+        for i, loc in enumerate(locations)
+    ]
+    lines.append({"order_ref": "O0", "line_ref": "2", "sku": "S", "location": "x1", "lot_no": "", "qty": 1})
+
+    plan = plan_waves(layout, lines, pickers=2, batch_size=2)
+
+    assert (plan["orders"], plan["lines"]) == (5, 6)
+    assert [w["wave"] for w in plan["waves"]] == [1, 2]
+    assert [[p["picker"] for p in w["pickers"]] for w in plan["waves"]] == [[1, 2], [1]]
+    batches = [p["orders"] for w in plan["waves"] for p in w["pickers"]]
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert sorted(ref for b in batches for ref in b) == [f"O{i}" for i in range(5)]
+
+    for wave in plan["waves"]:
+        for picker in wave["pickers"]:
+            assert [p["seq"] for p in picker["picks"]] == sorted(p["seq"] for p in picker["picks"])
+            assert {p["order_ref"] for p in picker["picks"]} == set(picker["orders"])
+
+    assert plan["distance_m"] <= plan["distance_order_by_order_m"]
+    assert plan["unmapped_locations"] == ["x1"]
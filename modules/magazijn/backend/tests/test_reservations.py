@@ -0,0 +1,138 @@
+import os
+import uuid
+
+import pytest
+
+from reservations import _allocate_order, _line_result, _take
+
+
+def _pool():
+    # [locatie, lot, vrij] in voorkeursvolgorde (oudste lot eerst)
+    return [["R1", "LOT1", 2], ["R2", "LOT1", 0], ["R1", "LOT2", 5]]
+
+
+def _order(ref, *lines):
+    return {"order_ref": ref, "lines": [{"line_ref": str(n), "sku": sku, "qty": qty} for n, (sku, qty) in enumerate(lines)]}
+
+
+def test_take_follows_pool_order_and_consumes_it():
+    pool = _pool()
+    assert _take(pool, 4) == [
+        {"location": "R1", "lot_no": "LOT1", "qty": 2},
+        {"location": "R1", "lot_no": "LOT2", "qty": 2},
+    ]
+    assert [row[2] for row in pool] == [0, 0, 3]
+    assert _take(pool, 0) == []
+    assert _take(pool, -1) == []
+
+
+def test_line_result_statuses():
+    line = {"line_ref": "1", "sku": "A", "qty": 5}
+    allocation = [{"location": "R1", "lot_no": "LOT1", "qty": 2}]
+    assert _line_result(line, 0, [])["status"] == "none"
+    assert _line_result(line, 0, allocation)["status"] == "partial"
+    assert _line_result(line, 3, allocation) == {
+        "line_ref": "1", "sku": "A", "requested": 5, "reserved": 5, "allocations": allocation, "status": "full",
+    }
+
+
+def test_allocation_never_exceeds_free_stock():
+    pools = {"A": _pool()}
+    orders = [_order(f"O{i}", ("A", 3)) for i in range(4)]
+    results = [_allocate_order(order, {}, pools) for order in orders]
+
+    reserved = [line["reserved"] for result in results for line in result["lines"]]
+    # 7 vrij: 3 + 3 + 1 (gedeeltelijk) + 0, in prioriteitsvolgorde
+    assert reserved == [3, 3, 1, 0]
+    assert [line["status"] for result in results for line in result["lines"]] == ["full", "full", "partial", "none"]
+    assert all(row[2] >= 0 for row in pools["A"])
+
+
+def test_partial_allocation_and_unknown_sku():
+    result = _allocate_order(_order("O1", ("A", 10), ("B", 1)), {}, {"A": _pool()})
+    a, b = result["lines"]
+    assert (a["reserved"], a["status"]) == (7, "partial")
+    assert (b["reserved"], b["allocations"], b["status"]) == (0, [], "none")
+
+
+def test_top_up_only_reserves_the_difference():
+    order = _order("O1", ("A", 5))
+
+    # al volledig gereserveerd: een herhaalde aanvraag wijst niets meer toe
+    pools = {"A": _pool()}
+    line = _allocate_order(order, {("O1", "0"): 5}, pools)["lines"][0]
+    assert (line["allocations"], line["reserved"], line["status"]) == ([], 5, "full")
+    assert [row[2] for row in pools["A"]] == [2, 0, 5]
+
+    # gedeeltelijk: enkel het verschil
+    line = _allocate_order(order, {("O1", "0"): 2}, pools)["lines"][0]
+    assert sum(a["qty"] for a in line["allocations"]) == 3
+    assert (line["reserved"], line["status"]) == (5, "full")
+
+
+# -------------------------------
+# Tegen PostgreSQL
+# -------------------------------
+needs_postgres = pytest.mark.skipif(
+    not os.getenv("MAGAZIJN_TEST_DATABASE_URL"),
+    reason="MAGAZIJN_TEST_DATABASE_URL (lege PostgreSQL) niet gezet",
+)
+
+
+@pytest.fixture
+def db():
+    import ledger
+    from database import SessionLocal, init_schema
+
+    init_schema()
+    with SessionLocal() as session:
+        sku = f"T-{uuid.uuid4().hex[:8]}"
+        ledger.post_movements(session, [
+            {"kind": "receipt", "sku": sku, "location": "R1", "lot_no": "LOT1", "qty": 3},
+            {"kind": "receipt", "sku": sku, "location": "R2", "lot_no": "LOT2", "qty": 2},
+        ])
+        session.info["sku"] = sku
+        yield session
+
+
+def _reserved(db, sku):
+    from sqlalchemy import text
+
+    return db.execute(
+        text("SELECT COALESCE(sum(qty_reserved), 0) FROM stock_balances WHERE sku = :sku"), {"sku": sku}
+    ).scalar()
+
+
+@needs_postgres
+def test_reserve_order_is_idempotent_and_never_oversells(db):
+    import reservations
+
+    sku = db.info["sku"]
+    first = reservations.reserve_order(db, _order("O-" + sku, (sku, 4)), ttl_seconds=600)
+    again = reservations.reserve_order(db, _order("O-" + sku, (sku, 4)), ttl_seconds=600)
+    assert first["lines"][0]["status"] == again["lines"][0]["status"] == "full"
+    assert again["lines"][0]["allocations"] == []
+
+    other = reservations.reserve_order(db, _order("P-" + sku, (sku, 4)), ttl_seconds=600)
+    assert (other["lines"][0]["reserved"], other["lines"][0]["status"]) == (1, "partial")
+    assert _reserved(db, sku) == 5
+
+
+@needs_postgres
+def test_expired_hold_cannot_be_confirmed_and_confirmed_hold_does_not_expire(db):
+    import reservations
+
+    sku = db.info["sku"]
+    # ttl 0: vervallen zodra de volgende transactie begint
+    reservations.reserve_order(db, _order("E-" + sku, (sku, 2)), ttl_seconds=0)
+    reservations.reserve_order(db, _order("C-" + sku, (sku, 2)), ttl_seconds=600)
+
+    assert reservations.confirm(db, "E-" + sku)["reservations"] == 0
+    assert reservations.confirm(db, "C-" + sku)["reservations"] == 1
+
+    reservations.expire_due(db)
+    statuses = {
+        ref: {row["status"] for row in reservations.list_order(db, ref + sku)} for ref in ("E-", "C-")
+    }
+    assert statuses == {"E-": {"expired"}, "C-": {"confirmed"}}
+    assert _reserved(db, sku) == 2
@@ -1,8 +1,13 @@
 import os
+from urllib.parse import urlsplit
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
+from metrics import PrometheusMiddleware, metrics_response
+from readiness import Readiness, tcp_check
+
 MODULE_NAME = os.getenv("MODULE_NAME", "productie")
 MODULE_PORT = int(os.getenv("MODULE_PORT", 20140))
 ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "*").split(",")
@@ -16,6 +21,26 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PrometheusMiddleware)
+
+# /readyz leest enkel het laatste resultaat van de achtergrond-checks
+readiness = Readiness(
+    interval=float(os.getenv("READINESS_INTERVAL_SECONDS", "5")),
+    timeout=float(os.getenv("READINESS_TIMEOUT_SECONDS", "2")),
+    stale_after=float(os.getenv("READINESS_STALE_AFTER_SECONDS", "30")),
+)
+DATABASE_URL = os.getenv("DATABASE_URL")
+if DATABASE_URL:
+    _db = urlsplit(DATABASE_URL)
+    readiness.register("database", tcp_check(_db.hostname, _db.port or 5432))
+
+@app.on_event("startup")
+async def start_readiness():
+    await readiness.start()
+
+@app.on_event("shutdown")
+async def stop_readiness():
+    await readiness.stop()
 
 @app.get("/healthz")
 def healthz():
@@ -23,7 +48,11 @@ def healthz():
 
 @app.get("/readyz")
 def readyz():
-    return {"status": "ready", "module": MODULE_NAME}
+    return readiness.response(module=MODULE_NAME)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
 
 @app.get("/info")
 def info():
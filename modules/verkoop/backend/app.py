@@ -5,6 +5,7 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from app.api.v1 import public, sellers, customers
+from app.core.metrics import metrics_response
 
 MODULE_NAME = os.getenv("MODULE_NAME", "verkoop")
 MODULE_PORT = int(os.getenv("MODULE_PORT", 20030))
@@ -34,10 +35,10 @@ def readyz():
     return {"status": "ready", "module": MODULE_NAME}
 
 
-@app.get("/metrics")
+@app.get("/metrics", include_in_schema=False)
 def metrics():
-    """Placeholder voor metrics-endpoint."""
-    return {"status": "metrics-not-implemented", "module": MODULE_NAME}
+    """Prometheus-metrics (zie app.core.metrics)."""
+    return metrics_response()
 
 
 @app.get("/info")
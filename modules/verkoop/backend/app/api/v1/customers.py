@@ -1,38 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
 
-from app.db.session import get_session
-from app.models.customer import CustomerShadow
+from app.core.conditional import conditional_response
+from app.core.serialization import columns_for, iter_dump_rows
+from app.core.streaming import YIELD_PER, stream_json_list
+from app.db.session import get_read_session, open_read_session
+from app.db.versions import table_version
+from app.models.customer import CustomerSellerAssignment, CustomerShadow
+from app.models.seller import Seller
+from app.schemas.customer import CustomerListItem, CustomerListResponse
 
 router = APIRouter(
     prefix="/customers",
     tags=["Customers"],
 )
 
+# lijst en detail tonen ook de actieve verkoper
+_VERSION_TABLES = ["customer_shadows", "customer_seller_assignments", "sellers"]
 
-@router.get("")
-def list_customers(db: Session = Depends(get_session)):
-    items = (
-        db.query(CustomerShadow)
-        .order_by(CustomerShadow.created_at.desc())
-        .all()
-    )
 
-    return {
-        "items": items,
-        "total": len(items),
-    }
+@router.get("", response_model=CustomerListResponse)
+def list_customers(request: Request):
+    # Gestreamd uit een server-side cursor; rijen (met de actieve verkoper)
+    # rechtstreeks naar CustomerListItem, zonder ORM-objecten
+    def produce(db: Session):
+        columns = columns_for(
+            CustomerListItem,
+            CustomerShadow,
+            current_seller_id=Seller.id,
+            current_seller_code=Seller.seller_code,
+            current_seller_name=Seller.first_name + " " + Seller.last_name,
+        )
+        rows = db.execute(
+            select(*columns)
+            .outerjoin(
+                CustomerSellerAssignment,
+                and_(
+                    CustomerSellerAssignment.customer_id == CustomerShadow.id,
+                    CustomerSellerAssignment.unassigned_at.is_(None),
+                ),
+            )
+            .outerjoin(Seller, Seller.id == CustomerSellerAssignment.seller_id)
+            .order_by(CustomerShadow.created_at.desc())
+            .execution_options(yield_per=YIELD_PER)
+        )
+        return None, iter_dump_rows(CustomerListItem, rows)
 
+    with open_read_session(request) as db:
+        version = table_version(db, _VERSION_TABLES)
 
-@router.get("/{customer_id}")
-def get_customer(customer_id: int, db: Session = Depends(get_session)):
-    customer = (
-        db.query(CustomerShadow)
-        .filter(CustomerShadow.id == customer_id)
-        .first()
+    return conditional_response(
+        request,
+        version,
+        lambda: stream_json_list(lambda: open_read_session(request), produce),
     )
 
-    if not customer:
-        raise HTTPException(status_code=404, detail="Customer not found")
 
-    return customer
+@router.get("/{customer_id}")
+def get_customer(customer_id: int, request: Request, db: Session = Depends(get_read_session)):
+    def build():
+        customer = (
+            db.query(CustomerShadow)
+            .filter(CustomerShadow.id == customer_id)
+            .first()
+        )
+
+        if not customer:
+            raise HTTPException(status_code=404, detail="Customer not found")
+
+        return JSONResponse(jsonable_encoder(customer))
+
+    return conditional_response(request, table_version(db, _VERSION_TABLES), build)
@@ -0,0 +1,44 @@
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.orm import Session
+
+from app.core.security import require_scope
+from app.db.session import get_read_session
+from app.services.sales_aggregates import period_start_for, seller_dashboard
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+def _parse_period(period: Optional[str]) -> date:
+    if not period:
+        return period_start_for(datetime.now(timezone.utc))
+    try:
+        parsed = datetime.strptime(period, "%Y-%m")
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="period moet het formaat YYYY-MM hebben",
+        )
+    return date(parsed.year, parsed.month, 1)
+
+
+@router.get("/sellers")
+def sellers_dashboard(
+    request: Request,
+    period: Optional[str] = Query(None, description="Maand als YYYY-MM (default: huidige maand)"),
+    db: Session = Depends(get_read_session),
+) -> dict:
+    """
+    Verkoopcijfers per verkoper voor één maand, gelezen uit de
+    voorberekende seller_sales_aggregates (onafhankelijk van het ordervolume).
+    """
+    _ = require_scope(request, "verkoop:read")
+
+    period_start = _parse_period(period)
+    items = seller_dashboard(db, period_start)
+    return {
+        "period": period_start.strftime("%Y-%m"),
+        "items": items,
+    }
@@ -4,11 +4,15 @@ from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, Field, EmailStr
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.conditional import conditional_response
 from app.core.security import require_scope
 from app.core.seller_auth import hash_seller_password
-from app.db.session import get_session
+from app.core.serialization import columns_for, rows_response
+from app.db.session import get_read_session, get_session
+from app.db.versions import table_version
 from app.models.seller import Seller
 from app.schemas.seller import SellerCreate, SellerUpdate, SellerOut
 from app.services.email_service import EmailService  # voor toekomstige mailflow
@@ -41,15 +45,19 @@ def _generate_internal_number(db: Session) -> str:
 @router.get("", response_model=List[SellerOut])
 def list_sellers(
     request: Request,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
 ) -> List[SellerOut]:
     _ = require_scope(request, "verkoop:read")
-    sellers = (
-        db.query(Seller)
-        .order_by(Seller.seller_code.asc())
-        .all()
-    )
-    return sellers
+
+    def build():
+        # Rijen i.p.v. ORM-objecten, één validatie + orjson (zie app/core/serialization.py)
+        rows = db.execute(
+            select(*columns_for(SellerOut, Seller)).order_by(Seller.seller_code.asc())
+        )
+        return rows_response(SellerOut, rows)
+
+    # Ongewijzigd sinds de vorige poll → 304 na één PK-lookup
+    return conditional_response(request, table_version(db, ["sellers"]), build)
 
 
 @router.post(
@@ -8,6 +8,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
+from app.core.metrics import track_password_hash
 from app.db.session import get_engine, get_session  # jouw eigen helpers
 from app.models.admin_user import AdminUser
 
@@ -34,7 +35,8 @@ def hash_password(plain: str) -> str:
     if not plain:
         raise ValueError("Password cannot be empty")
     salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(plain.encode("utf-8"), salt)
+    with track_password_hash("hash"):
+        hashed = bcrypt.hashpw(plain.encode("utf-8"), salt)
     return hashed.decode("utf-8")
 
 
@@ -43,7 +45,8 @@ def verify_password(plain: str, hashed: str) -> bool:
     Verifieer een plain password tegen een bcrypt hash.
     """
     try:
-        return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+        with track_password_hash("verify"):
+            return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
     except ValueError:
         # Als de hash corrupt is of een vreemd formaat heeft
         return False
@@ -0,0 +1,237 @@
+# verkoop/backend/app/core/metrics.py
+"""
+Prometheus-metrics voor de verkoop-backend.
+
+- PrometheusMiddleware : pure ASGI-middleware; request count, latency per
+                         route-template en in-flight requests
+- instrument_engine    : pool in-use / overflow en checkout-wachttijd,
+                         routering van read-only sessies (replica/primary)
+- track_outbound       : latency van uitgaande HTTP-calls (bv. website-fetch)
+- track_password_hash  : duur van bcrypt hash/verify (+ tracing-span)
+- metrics_response     : exposition voor GET /metrics
+
+Meerdere uvicorn-workers: zet PROMETHEUS_MULTIPROC_DIR (leeg bij opstart);
+elke worker schrijft dan naar die map en /metrics aggregeert alle processen.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from starlette.responses import Response
+
+from app.core.tracing import span
+from app.db.engine import add_checkout_observer
+from app.db.replica import add_route_observer
+
+NAMESPACE = "verkoop"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests per route en status",
+    ["method", "route", "status"],
+    namespace=NAMESPACE,
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latency van HTTP requests per route",
+    ["method", "route"],
+    namespace=NAMESPACE,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests die momenteel verwerkt worden",
+    namespace=NAMESPACE,
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_IN_USE = Gauge(
+    "db_pool_checked_out",
+    "Uitgeleende connecties uit de pool",
+    ["engine"],
+    namespace=NAMESPACE,
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connecties boven pool_size (overflow)",
+    ["engine"],
+    namespace=NAMESPACE,
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Wachttijd op een vrije connectie bij checkout",
+    namespace=NAMESPACE,
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts die op pool_timeout gestrand zijn",
+    namespace=NAMESPACE,
+)
+DB_READ_ROUTE = Counter(
+    "db_read_route_total",
+    "Read-only sessies per doel (replica/primary) en reden",
+    ["target", "reason"],
+    namespace=NAMESPACE,
+)
+
+OUTBOUND_LATENCY = Histogram(
+    "http_client_request_duration_seconds",
+    "Latency van uitgaande HTTP-calls",
+    ["target", "method", "status"],
+    namespace=NAMESPACE,
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_duration_seconds",
+    "Duur van bcrypt hash / verify",
+    ["operation"],
+    namespace=NAMESPACE,
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+# -----------------------------------------------------
+# HTTP server
+# -----------------------------------------------------
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        return getattr(endpoint, "__name__", "<endpoint>")
+    return "<unmatched>"
+
+
+class PrometheusMiddleware:
+    """Pure ASGI-middleware (geen BaseHTTPMiddleware → geen extra task per request)."""
+
+    def __init__(self, app, skip_paths: tuple = ("/metrics",)) -> None:
+        self.app = app
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # route-template i.p.v. het echte pad → begrensde cardinaliteit
+            route_label = _route_label(scope)
+            method = scope["method"]
+            HTTP_LATENCY.labels(method, route_label).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route_label, str(status_code)).inc()
+
+
+# -----------------------------------------------------
+# DB pool
+# -----------------------------------------------------
+def _observe_checkout(waited: float, timed_out: bool) -> None:
+    if timed_out:
+        DB_POOL_TIMEOUTS.inc()
+    else:
+        DB_POOL_WAIT.observe(waited)
+
+
+def _observe_read_route(target: str, reason: str) -> None:
+    DB_READ_ROUTE.labels(target, reason).inc()
+
+
+def _overflow(engine) -> int:
+    # NullPool (transaction-pooler-modus) kent geen overflow
+    overflow = getattr(engine.pool, "overflow", None)
+    return max(overflow(), 0) if overflow is not None else 0
+
+
+def instrument_engine(engine, name: str = "primary") -> None:
+    """`name` als label `engine` op de pool-gauges (primary/replica apart)."""
+    from sqlalchemy import event
+
+    in_use, overflow = DB_POOL_IN_USE.labels(name), DB_POOL_OVERFLOW.labels(name)
+    add_checkout_observer(_observe_checkout)
+    add_route_observer(_observe_read_route)
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(_dbapi_conn, _record, _proxy):
+        in_use.inc()
+        overflow.set(_overflow(engine))
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(_dbapi_conn, _record):
+        in_use.dec()
+        overflow.set(_overflow(engine))
+
+
+# -----------------------------------------------------
+# Uitgaande calls / hashing
+# -----------------------------------------------------
+class _Outbound:
+    status: Optional[int] = None
+
+
+@contextmanager
+def track_outbound(target: str, method: str) -> Iterator[_Outbound]:
+    """Meet een uitgaande HTTP-call; zet `.status` na het antwoord.
+
+        with track_outbound("website", "GET") as call:
+            response = await client.get(url)
+            call.status = response.status_code
+    """
+    call = _Outbound()
+    started = time.perf_counter()
+    try:
+        yield call
+    finally:
+        status = str(call.status) if call.status is not None else "error"
+        OUTBOUND_LATENCY.labels(target, method, status).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def track_password_hash(operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        with span(f"password.{operation}"):
+            yield
+    finally:
+        PASSWORD_HASH_SECONDS.labels(operation).observe(time.perf_counter() - started)
+
+
+# -----------------------------------------------------
+# Exposition
+# -----------------------------------------------------
+def metrics_response() -> Response:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
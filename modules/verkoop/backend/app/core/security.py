@@ -1,23 +1,303 @@
-from fastapi import Request
-from typing import List
+"""
+Scope-gebaseerde beveiliging voor de verkoop-module.
+
+Tokens worden uitgegeven door Casuse-Core (HS256, claims sub/email/role/type/exp)
+en hier lokaal geverifieerd — geen netwerk-call naar core per request.
+
+- KeyRing      : signing keys per `kid` (env + optioneel JSON-bestand), met
+                 rotatie: onbekende kid → keyring herladen, hoogstens één
+                 keer per refresh_seconds
+- token-cache  : geparste UserContext per token (begrensde LRU) tot `exp`
+- intrekking   : wordt hier niet gecontroleerd; een logout of ingetrokken
+                 family in core blijft geldig tot de access token verloopt
+                 (core ACCESS_TOKEN_EXPIRE_MINUTES, kort gehouden)
+- scopes       : frozenset, check = set-lookups ("*", "verkoop:*", exacte scope)
+
+Met AUTH_ENABLED=false (default, lokale dev) levert require_scope een
+dev-gebruiker met scope "*".
+"""
+
+import hmac
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+import jwt
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+
+# Rol (uit core users.role) → scopes binnen verkoop
+ROLE_SCOPES: Dict[str, FrozenSet[str]] = {
+    "admin": frozenset({"*"}),
+    "manager": frozenset({"verkoop:read", "verkoop:write", "verkoop:admin"}),
+    "seller": frozenset({"verkoop:read", "verkoop:write"}),
+    "website": frozenset({"verkoop:read"}),
+    "warehouse": frozenset({"verkoop:read"}),
+}
 
 
 class UserContext:
-    def __init__(self, sub: str, roles: List[str] | None = None, scopes: List[str] | None = None) -> None:
+    __slots__ = ("sub", "roles", "scopes", "exp")
+
+    def __init__(
+        self,
+        sub: str,
+        roles: List[str] | None = None,
+        scopes: Iterable[str] | None = None,
+        exp: float | None = None,
+    ) -> None:
         self.sub = sub
         self.roles = roles or []
-        self.scopes = scopes or []
+        self.scopes: FrozenSet[str] = frozenset(scopes or ())
+        self.exp = exp
 
+    def has_scope(self, required: str) -> bool:
+        scopes = self.scopes
+        if "*" in scopes or required in scopes:
+            return True
+        prefix, sep, _ = required.partition(":")
+        return bool(sep) and f"{prefix}:*" in scopes
 
-def require_scope(request: Request, required: str) -> UserContext:
-    """Very lightweight placeholder security.
 
-    For now we don't enforce real auth in the verkoop-module.
-    This function exists so the rest of the code can already depend
-    on a future scope-based security model.
+class AuthError(Exception):
+    pass
+
 
-    In the future you can replace this with proper JWT validation that
-    fills UserContext based on the Authorization header.
+# -----------------------------------------------------
+# Signing keys
+# -----------------------------------------------------
+class KeyRing:
+    """Verzameling HMAC-keys per kid.
+
+    Bronnen (samengevoegd):
+      - CORE_JWT_SECRET onder kid CORE_JWT_KID (huidige key)
+      - CORE_JWT_KEYS   "kid1:secret1,kid2:secret2" (vorige keys tijdens rotatie)
+      - CORE_JWT_KEYS_FILE  JSON {"kid": "secret", ...}; herladen bij gewijzigde mtime
     """
-    # TODO: integrate with Casuse-Core auth / JWT in a later phase.
-    return UserContext(sub="dev-user", roles=["admin"], scopes=["*"])
+
+    def __init__(self, refresh_seconds: int) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._keys: Dict[str, str] = {}
+        self._file_mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._unknown_kid_at = float("-inf")
+        self.reload()
+
+    def _load(self) -> Dict[str, str]:
+        keys: Dict[str, str] = {}
+        if settings.CORE_JWT_SECRET:
+            keys[settings.CORE_JWT_KID] = settings.CORE_JWT_SECRET
+        for item in settings.CORE_JWT_KEYS.split(","):
+            kid, sep, secret = item.strip().partition(":")
+            if sep and kid and secret:
+                keys.setdefault(kid, secret)
+
+        path = settings.CORE_JWT_KEYS_FILE
+        self._file_mtime = None
+        if path and os.path.exists(path):
+            self._file_mtime = os.path.getmtime(path)
+            with open(path, encoding="utf-8") as fh:
+                for kid, secret in json.load(fh).items():
+                    keys.setdefault(str(kid), str(secret))
+        return keys
+
+    def reload(self) -> None:
+        keys = self._load()
+        with self._lock:
+            self._keys = keys
+            self._checked_at = time.monotonic()
+
+    def _maybe_reload(self) -> None:
+        if time.monotonic() - self._checked_at < self.refresh_seconds:
+            return
+        path = settings.CORE_JWT_KEYS_FILE
+        mtime = os.path.getmtime(path) if path and os.path.exists(path) else None
+        if mtime != self._file_mtime:
+            self.reload()
+        else:
+            self._checked_at = time.monotonic()
+
+    def _reload_for_unknown_kid(self) -> None:
+        # tokens met willekeurige kids mogen niet elke request een reload
+        # (bestand lezen) veroorzaken: zelfde interval als _maybe_reload
+        now = time.monotonic()
+        with self._lock:
+            if now - self._unknown_kid_at < self.refresh_seconds:
+                return
+            self._unknown_kid_at = now
+        self.reload()
+
+    def candidates(self, kid: Optional[str]) -> List[str]:
+        """Keys om een token mee te proberen; bij onbekende kid (begrensd) een reload."""
+        self._maybe_reload()
+        if kid is None:
+            current = self._keys.get(settings.CORE_JWT_KID)
+            others = [k for key_id, k in self._keys.items() if key_id != settings.CORE_JWT_KID]
+            return ([current] if current else []) + others
+        if kid not in self._keys:
+            self._reload_for_unknown_kid()
+        key = self._keys.get(kid)
+        return [key] if key else []
+
+
+# -----------------------------------------------------
+# Token cache (LRU, begrensd)
+# -----------------------------------------------------
+class TokenCache:
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._items: "OrderedDict[str, UserContext]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str, now: float) -> Optional[UserContext]:
+        with self._lock:
+            ctx = self._items.get(token)
+            if ctx is None:
+                return None
+            if ctx.exp is not None and ctx.exp <= now:
+                del self._items[token]
+                return None
+            self._items.move_to_end(token)
+            return ctx
+
+    def put(self, token: str, ctx: UserContext) -> None:
+        with self._lock:
+            self._items[token] = ctx
+            self._items.move_to_end(token)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+_keyring: Optional[KeyRing] = None
+_token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+
+def get_keyring() -> KeyRing:
+    global _keyring
+    if _keyring is None:
+        _keyring = KeyRing(settings.AUTH_KEYS_REFRESH_SECONDS)
+    return _keyring
+
+
+def _context_from_claims(claims: dict) -> UserContext:
+    roles = [claims["role"]] if claims.get("role") else list(claims.get("roles") or [])
+    scopes = set()
+    for role in roles:
+        scopes |= ROLE_SCOPES.get(role, frozenset())
+    raw_scopes = claims.get("scope") or claims.get("scopes") or []
+    if isinstance(raw_scopes, str):
+        raw_scopes = raw_scopes.split()
+    scopes.update(raw_scopes)
+    return UserContext(sub=str(claims["sub"]), roles=roles, scopes=scopes, exp=float(claims["exp"]))
+
+
+def verify_token(token: str) -> UserContext:
+    """Verifieer een core access token; resultaat wordt gecachet tot `exp`."""
+    now = time.time()
+    cached = _token_cache.get(token, now)
+    if cached is not None:
+        return cached
+
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.InvalidTokenError as exc:
+        raise AuthError("Ongeldig token") from exc
+
+    algorithm = header.get("alg")
+    if algorithm not in settings.core_jwt_algorithms:
+        raise AuthError("Niet-toegelaten algoritme")
+
+    keys = get_keyring().candidates(header.get("kid"))
+    if not keys:
+        raise AuthError("Onbekende signing key")
+
+    claims = None
+    for key in keys:
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                leeway=settings.AUTH_LEEWAY_SECONDS,
+                options={"require": ["exp", "sub"]},
+            )
+            break
+        except jwt.InvalidSignatureError:
+            continue
+        except jwt.InvalidTokenError as exc:
+            raise AuthError(str(exc)) from exc
+    if claims is None:
+        raise AuthError("Ongeldige handtekening")
+    if claims.get("type", "access") != "access":
+        raise AuthError("Geen access token")
+
+    ctx = _context_from_claims(claims)
+    _token_cache.put(token, ctx)
+    return ctx
+
+
+def _bearer_token(request: Request) -> Optional[str]:
+    header = request.headers.get("authorization")
+    if not header:
+        return None
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token.strip()
+
+
+_DEV_USER = UserContext(sub="dev-user", roles=["admin"], scopes=["*"])
+
+
+def require_scope(request: Request, required: str) -> UserContext:
+    """Geef de UserContext terug als het token de vereiste scope heeft.
+
+    401 bij ontbrekend/ongeldig token, 403 bij onvoldoende scope.
+    """
+    if not settings.AUTH_ENABLED:
+        return _DEV_USER
+
+    token = _bearer_token(request)
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing bearer token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        ctx = verify_token(token)
+    except AuthError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Invalid token: {exc}",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if not ctx.has_scope(required):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"Missing scope {required}")
+
+    request.state.user = ctx
+    return ctx
+
+
+def require_debug_key(request: Request) -> None:
+    """Dependency voor /debug/*: 404 zolang DEBUG_ENDPOINTS_KEY leeg is,
+    anders 401 zonder de juiste X-Debug-Key header."""
+    expected = settings.DEBUG_ENDPOINTS_KEY
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    given = request.headers.get("X-Debug-Key", "")
+    if not hmac.compare_digest(given.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid debug key")
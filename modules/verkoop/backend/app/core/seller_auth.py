@@ -10,6 +10,8 @@ from __future__ import annotations
 
 import bcrypt
 
+from app.core.metrics import track_password_hash
+
 
 def hash_seller_password(plain_password: str) -> str:
     """
@@ -23,7 +25,8 @@ def hash_seller_password(plain_password: str) -> str:
 
     # 12 rounds is een goede balans tussen veiligheid en performance
     salt = bcrypt.gensalt(rounds=12)
-    hashed = bcrypt.hashpw(plain_password.encode("utf-8"), salt)
+    with track_password_hash("hash"):
+        hashed = bcrypt.hashpw(plain_password.encode("utf-8"), salt)
     return hashed.decode("utf-8")
 
 
@@ -38,10 +41,11 @@ def verify_seller_password(plain_password: str, password_hash: str | None) -> bo
         return False
 
     try:
-        return bcrypt.checkpw(
-            plain_password.encode("utf-8"),
-            password_hash.encode("utf-8"),
-        )
+        with track_password_hash("verify"):
+            return bcrypt.checkpw(
+                plain_password.encode("utf-8"),
+                password_hash.encode("utf-8"),
+            )
     except Exception:
         # Bij een ongeldige hash/format: niet crashen, gewoon False
         return False
@@ -0,0 +1,72 @@
+# verkoop/backend/app/core/serialization.py
+"""
+Snelle serialisatie voor lijst-endpoints.
+
+Standaard valideert FastAPI een ORM-object eerst via response_model en
+encodeert het daarna nog eens via jsonable_encoder + json.dumps. Hier:
+
+- rijen komen als tuples uit een select() met precies de kolommen van het
+  schema (columns_for), zonder ORM-objecten of lazy loads
+- één validatie via een gecachte TypeAdapter (from_attributes: Row-attributen)
+- encodering met orjson; UTC als "Z" (OPT_UTC_Z), net als pydantic v2 /
+  jsonable_encoder, zodat de output identiek blijft
+- het endpoint geeft een kant-en-klare Response terug, zodat FastAPI
+  response_model niet opnieuw valideert (response_model blijft voor OpenAPI)
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, List, Type
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+@lru_cache(maxsize=None)
+def _adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def columns_for(model: Type[BaseModel], entity: Any, **extra: Any) -> list:
+    """
+    Kolommen van `entity` voor elk veld van `model`, in veldvolgorde.
+    Velden zonder gelijknamige kolom moeten via `extra` (gelabelde expressies)
+    aangeleverd worden.
+    """
+    columns = []
+    for name in model.model_fields:
+        if name in extra:
+            columns.append(extra[name].label(name))
+        else:
+            columns.append(getattr(entity, name))
+    return columns
+
+
+def dump_rows(model: Type[BaseModel], rows: Iterable[Any]) -> bytes:
+    """JSON-array van rijen (tuples/objecten met attributen) via `model`."""
+    adapter = _list_adapter(model)
+    return orjson.dumps(
+        adapter.dump_python(adapter.validate_python(list(rows), from_attributes=True)),
+        option=_ORJSON_OPTIONS,
+    )
+
+
+def iter_dump_rows(model: Type[BaseModel], rows: Iterable[Any]) -> Iterator[bytes]:
+    """Zelfde als dump_rows, maar één JSON-object per rij (voor streaming)."""
+    adapter = _adapter(model)
+    for row in rows:
+        yield orjson.dumps(
+            adapter.dump_python(adapter.validate_python(row, from_attributes=True)),
+            option=_ORJSON_OPTIONS,
+        )
+
+
+def rows_response(model: Type[BaseModel], rows: Iterable[Any], status_code: int = 200) -> Response:
+    return Response(dump_rows(model, rows), status_code=status_code, media_type="application/json")
@@ -0,0 +1,55 @@
+# verkoop/backend/app/core/streaming.py
+"""
+Grote lijsten als gestreamde JSON: {"items": [...], "total": N}.
+
+- rijen komen uit een server-side cursor (Query.execution_options(yield_per=...)),
+  dus nooit de volledige lijst in het geheugen
+- de items worden per CHUNK_ROWS samen doorgestuurd (samen met
+  CompressionMiddleware: één gecomprimeerde flush per chunk)
+- de generator opent en sluit zijn eigen sessie: dependencies met yield zijn
+  al afgesloten voor een StreamingResponse zijn body verstuurt
+- fouten halverwege kunnen de status niet meer wijzigen: ze worden gelogd en
+  de verbinding breekt af (de client krijgt onvolledige JSON)
+"""
+
+import logging
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ROWS = 200
+YIELD_PER = 1000
+
+# produce(db) → (total of None = aantal gestreamde items, iterator van JSON-bytes per item)
+Producer = Callable[[Session], Tuple[Optional[int], Iterable[bytes]]]
+
+
+def iter_json_list(open_session: Callable[[], Session], produce: Producer, chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    db = open_session()
+    try:
+        total, items = produce(db)
+        yield b'{"items":['
+        count = 0
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_rows:
+                yield (b"," if count else b"") + b",".join(chunk)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            yield (b"," if count else b"") + b",".join(chunk)
+            count += len(chunk)
+        yield b'],"total":' + str(count if total is None else total).encode("ascii") + b"}"
+    except Exception:
+        logger.exception("Fout tijdens streamen van een JSON-lijst")
+        raise
+    finally:
+        db.close()
+
+
+def stream_json_list(open_session: Callable[[], Session], produce: Producer, chunk_rows: int = CHUNK_ROWS) -> StreamingResponse:
+    return StreamingResponse(iter_json_list(open_session, produce, chunk_rows), media_type="application/json")
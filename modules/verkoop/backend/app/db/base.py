@@ -5,3 +5,6 @@ from app.db.base_class import Base  # noqa
 from app.models.seller import Seller  # noqa
 from app.models.customer import CustomerShadow, CustomerSellerAssignment  # noqa
 from app.models.domain_event import DomainEvent  # noqa
+from app.models.region import Region, City, TerritoryRule  # noqa
+from app.models.sales_aggregate import SellerSalesAggregate  # noqa
+from app.models.audit import AuditLog  # noqa
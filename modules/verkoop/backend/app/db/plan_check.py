@@ -0,0 +1,182 @@
+# verkoop/backend/app/db/plan_check.py
+"""
+Query-plan-regressiecheck voor hot paths.
+
+Een HotPath roept de echte servicecode op in een transactie die achteraf
+teruggedraaid wordt (commit() in de code sluit enkel een savepoint). De
+uitgevoerde SQL wordt via een cursor-event opgevangen en met
+`EXPLAIN (FORMAT JSON)` (zonder ANALYZE) tegen dezelfde, geseede database
+gepland. check_plans() meldt:
+
+- een Seq Scan op een tabel met meer dan min_rows rijen, tenzij de hot path
+  die scan voor dat statement expliciet toelaat (bv. een GROUP BY over alles)
+- een geschatte kost boven cost_factor × de baseline (en min_cost_delta erboven)
+
+De hot paths en de CLI staan in app/scripts/check_query_plans.py.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+_EXPLAINABLE = ("select", "with", "update", "delete", "insert")
+
+
+@dataclass(frozen=True)
+class HotPath:
+    name: str
+    # sample(db) → argument voor run (bv. bestaande klanten), buiten de capture
+    sample: Callable[[Session], Any]
+    run: Callable[[Session, Any], Any]
+    # (tabel, fragment): Seq Scan op `tabel` toegelaten in statements die `fragment` bevatten
+    allow_seq_scan: Tuple[Tuple[str, str], ...] = ()
+
+
+@dataclass
+class PlannedStatement:
+    hot_path: str
+    index: int
+    statement: str
+    plan: Dict[str, Any]
+
+    @property
+    def key(self) -> str:
+        return f"{self.hot_path}#{self.index}"
+
+    @property
+    def total_cost(self) -> float:
+        return float(self.plan.get("Total Cost", 0.0))
+
+
+@dataclass
+class Violation:
+    key: str
+    kind: str
+    detail: str
+    statement: str = field(repr=False, default="")
+
+
+# -----------------------------------------------------
+# Plananalyse
+# -----------------------------------------------------
+def iter_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from iter_nodes(child)
+
+
+def seq_scanned_tables(plan: Dict[str, Any]) -> List[str]:
+    return [
+        node.get("Relation Name", "?")
+        for node in iter_nodes(plan)
+        if node.get("Node Type") == "Seq Scan"
+    ]
+
+
+def check_plans(
+    planned: Sequence[PlannedStatement],
+    hot_paths: Dict[str, HotPath],
+    table_rows: Dict[str, float],
+    baseline: Optional[Dict[str, float]] = None,
+    min_rows: int = 5000,
+    cost_factor: float = 2.0,
+    min_cost_delta: float = 100.0,
+) -> List[Violation]:
+    violations = []
+    for item in planned:
+        allowed = hot_paths[item.hot_path].allow_seq_scan
+        lowered = item.statement.lower()
+        for table in seq_scanned_tables(item.plan):
+            if table_rows.get(table, 0) < min_rows:
+                continue  # kleine tabel: seq scan is daar de goedkoopste keuze
+            if any(table == t and fragment.lower() in lowered for t, fragment in allowed):
+                continue
+            violations.append(
+                Violation(item.key, "seq_scan", f"Seq Scan op {table} (~{int(table_rows[table])} rijen)", item.statement)
+            )
+
+        reference = (baseline or {}).get(item.key)
+        if reference is not None and item.total_cost > reference * cost_factor and item.total_cost - reference > min_cost_delta:
+            violations.append(
+                Violation(item.key, "cost", f"kost {item.total_cost:.0f} > {cost_factor}× baseline {reference:.0f}", item.statement)
+            )
+    return violations
+
+
+# -----------------------------------------------------
+# SQL opvangen en plannen
+# -----------------------------------------------------
+def _explain(conn: Connection, statement: str, parameters: Any) -> Dict[str, Any]:
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        raw = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    if isinstance(raw, str):
+        raw = json.loads(raw)
+    return raw[0]["Plan"]
+
+
+def plan_hot_path(engine: Engine, hot_path: HotPath) -> List[PlannedStatement]:
+    """Voer de hot path uit in een teruggedraaide transactie en plan elke statement."""
+    captured: List[Tuple[str, Any]] = []
+
+    def _capture(_conn, _cursor, statement, parameters, _context, executemany):
+        if statement.lstrip().lower().startswith(_EXPLAINABLE):
+            captured.append((statement, parameters[0] if executemany and parameters else parameters))
+
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        db = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            argument = hot_path.sample(db)
+            event.listen(conn, "before_cursor_execute", _capture)
+            try:
+                hot_path.run(db, argument)
+                db.flush()
+            finally:
+                event.remove(conn, "before_cursor_execute", _capture)
+            return [
+                PlannedStatement(hot_path.name, index, statement, _explain(conn, statement, parameters))
+                for index, (statement, parameters) in enumerate(captured)
+            ]
+        finally:
+            db.close()
+            transaction.rollback()
+
+
+def table_sizes(engine: Engine) -> Dict[str, float]:
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT relname, reltuples FROM pg_class "
+            "WHERE relkind IN ('r', 'p') AND relnamespace = 'public'::regnamespace"
+        ).all()
+    return {name: float(tuples) for name, tuples in rows}
+
+
+def run_checks(
+    engine: Engine,
+    hot_paths: Sequence[HotPath],
+    baseline: Optional[Dict[str, float]] = None,
+    **limits: Any,
+) -> Tuple[List[PlannedStatement], List[Violation]]:
+    planned: List[PlannedStatement] = []
+    for hot_path in hot_paths:
+        planned.extend(plan_hot_path(engine, hot_path))
+    violations = check_plans(planned, {h.name: h for h in hot_paths}, table_sizes(engine), baseline, **limits)
+    return planned, violations
+
+
+def report(planned: Sequence[PlannedStatement], violations: Sequence[Violation]) -> str:
+    lines = []
+    for item in planned:
+        scans = ", ".join(seq_scanned_tables(item.plan)) or "-"
+        lines.append(f"{item.key:36s} kost {item.total_cost:>10.1f}  seq scans: {scans}")
+    for violation in violations:
+        lines.append(f"FOUT {violation.key}: {violation.detail}\n    {violation.statement.strip()[:300]}")
+    return "\n".join(lines)
@@ -1,14 +1,47 @@
+import math
 from typing import Generator
 
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.core.config import settings
+from app.db.engine import build_engine
+from app.db.replica import ReplicaRouter, is_sticky
 
-# Maak de SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
+
+def _build(url: str, **kwargs):
+    # pool-instellingen: zie DB_POOL_* in config (per engine)
+    return build_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
+        transaction_pooler=settings.DB_TRANSACTION_POOLER,
+        **kwargs,
+    )
+
+
+# Maak de SQLAlchemy engine(s); de replica is optioneel
+engine = _build(settings.DATABASE_URL)
+replica_engine = (
+    # een hangende replica mag een connectie niet eindeloos laten wachten (libpq: min. 2s)
+    _build(
+        settings.DATABASE_REPLICA_URL,
+        connect_args={"connect_timeout": max(2, math.ceil(settings.DB_REPLICA_PROBE_TIMEOUT))},
+    )
+    if settings.DATABASE_REPLICA_URL
+    else None
+)
+
+read_router = ReplicaRouter(
+    engine,
+    replica_engine,
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DB_REPLICA_CHECK_INTERVAL,
+    probe_timeout=settings.DB_REPLICA_PROBE_TIMEOUT,
 )
 
 # Session factory
@@ -38,6 +71,40 @@ def get_session() -> Generator[Session, None, None]:
     yield from _session_generator()
 
 
+def read_engine(request: Request) -> Engine:
+    """
+    Replica of primary, één keer gekozen per request: alle leessessies van
+    het request (bv. eerst de ETag-versie, dan de gestreamde rijen) lezen
+    zo van dezelfde database, en de rijen zijn nooit ouder dan de versie.
+    """
+    chosen = getattr(request.state, "read_engine", None)
+    if chosen is None:
+        sticky = is_sticky(request.cookies, request.headers, settings.DB_REPLICA_STICKY_COOKIE)
+        chosen = request.state.read_engine = read_router.engine_for(sticky)
+    return chosen
+
+
+def open_read_session(request: Request) -> Session:
+    """
+    Sessie voor read-only werk: replica als die gezond en bij is,
+    anders (of vlak na een eigen schrijfactie) de primary (zie read_engine).
+    De caller sluit de sessie (bv. een streaming response).
+    """
+    return SessionLocal(bind=read_engine(request))
+
+
+def get_read_session(request: Request) -> Generator[Session, None, None]:
+    """
+    Dependency voor read-only routes (zie open_read_session).
+    Nooit gebruiken in routes die schrijven.
+    """
+    db = open_read_session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def get_db() -> Generator[Session, None, None]:
     """
     Oude naam die nog in bestaande endpoints/routers gebruikt wordt.
@@ -1,12 +1,27 @@
-from fastapi import FastAPI
+import httpx
+from fastapi import Depends, FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.sellers import router as sellers_router
 from app.api.v1.customers import router as customers_router
 from app.api.v1.customers_sync import router as customers_sync_router
+from app.api.v1.dashboard import router as dashboard_router
 from app.core.config import settings
+from app.core import tracing
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import PrometheusMiddleware, instrument_engine, metrics_response
+from app.core.readiness import Readiness, http_check, smtp_check
+from app.core.security import require_debug_key
+from app.db import query_stats
+from app.db.engine import ping_check, pool_stats
+from app.db.replica import ReadYourWritesMiddleware
+from app.db.session import engine, read_router, replica_engine
+from app.services.partitions import partition_check
 
 
+tracing.configure_logging(settings.LOG_LEVEL)
+tracing.configure_tracing("verkoop", settings.TRACE_EXPORT_FILE, settings.TRACE_OTLP_ENDPOINT)
+
 app = FastAPI(title=settings.APP_NAME)
 
 app.add_middleware(
@@ -15,7 +30,58 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # read-your-writes voor clients zonder cookies (zie app/db/replica.py)
+    expose_headers=["X-Read-Your-Writes"],
+)
+if settings.RESPONSE_COMPRESSION_MIN_BYTES > 0:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES)
+app.add_middleware(PrometheusMiddleware)
+app.add_middleware(query_stats.QueryStatsMiddleware)
+app.add_middleware(
+    ReadYourWritesMiddleware,
+    cookie_name=settings.DB_REPLICA_STICKY_COOKIE,
+    sticky_seconds=settings.DB_REPLICA_STICKY_SECONDS,
+    enabled=replica_engine is not None,
+)
+# als laatste toegevoegd = buitenste laag: trace-context staat klaar voor alles erna
+app.add_middleware(tracing.TracingMiddleware)
+for _name, _engine in (("primary", engine), ("replica", replica_engine)):
+    if _engine is None:
+        continue
+    instrument_engine(_engine, _name)
+    tracing.instrument_engine(_engine)
+    query_stats.instrument_engine(
+        _engine,
+        slow_ms=settings.SLOW_QUERY_MS,
+        explain=settings.SLOW_QUERY_EXPLAIN,
+    )
+
+readiness = Readiness(
+    interval=settings.READINESS_INTERVAL_SECONDS,
+    timeout=settings.READINESS_TIMEOUT_SECONDS,
+    stale_after=settings.READINESS_STALE_AFTER_SECONDS,
 )
+readiness.register("database", ping_check(engine))
+if replica_engine is not None:
+    # reads vallen terug op de primary (read_router), dus niet kritiek
+    readiness.register("database_replica", ping_check(replica_engine), critical=False)
+# rijen in een DEFAULT-partitie of geen partitie voor volgende maand: maintain_partitions liep niet
+readiness.register("partitions", partition_check(engine), critical=False)
+_downstream = httpx.AsyncClient(timeout=settings.READINESS_TIMEOUT_SECONDS)
+readiness.register("website", http_check(_downstream, f"{settings.WEBSITE_API_BASE_URL}/health"), critical=False)
+if getattr(settings, "SMTP_HOST", None):
+    readiness.register("smtp", smtp_check(settings.SMTP_HOST, int(getattr(settings, "SMTP_PORT", 465))), critical=False)
+
+@app.on_event("startup")
+async def start_readiness():
+    await read_router.start()
+    await readiness.start()
+
+@app.on_event("shutdown")
+async def stop_readiness():
+    await readiness.stop()
+    await read_router.stop()
+    await _downstream.aclose()
 
 @app.get("/healthz")
 def healthz():
@@ -23,9 +89,30 @@ def healthz():
 
 @app.get("/readyz")
 def readyz():
-    return {"ready": True}
+    return readiness.response()
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
+@app.get("/debug/pool", dependencies=[Depends(require_debug_key)])
+def debug_pool():
+    if replica_engine is None:
+        return pool_stats(engine)
+    return {
+        **pool_stats(engine),
+        "replica": {**pool_stats(replica_engine), **read_router.status()},
+    }
+
+@app.get("/debug/queries", dependencies=[Depends(require_debug_key)])
+def debug_queries(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: str = Query("total_ms", pattern="^(total_ms|count|mean_ms|max_ms|p95_ms|p99_ms)$"),
+):
+    return query_stats.stats.snapshot(limit=limit, order_by=order_by)
 
 # API v1
 app.include_router(sellers_router, prefix="/api/v1")
 app.include_router(customers_router, prefix="/api/v1")
 app.include_router(customers_sync_router, prefix="/api/v1")
+app.include_router(dashboard_router, prefix="/api/v1")
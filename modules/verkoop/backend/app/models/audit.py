@@ -1,14 +1,27 @@
 
-from sqlalchemy import Integer, String, DateTime, JSON
+from datetime import datetime
+
+from sqlalchemy import Integer, String, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column
-from app.db.session import Base
+from app.db.base_class import Base
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy import text
 
 class AuditLog(Base):
+    """Audit-trail, maandelijks gepartitioneerd op `when`.
+
+    Partities worden aangemaakt / opgeruimd door app.services.partitions;
+    daarom zit `when` mee in de primaire sleutel.
+    """
     __tablename__ = "audit_log"
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    when: Mapped[str] = mapped_column(DateTime)
+    __table_args__ = (
+        Index("ix_audit_log_entity_when", "entity", "entity_id", "when"),
+        {"postgresql_partition_by": 'RANGE ("when")'},
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    when: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, server_default=text("now()")
+    )
     actor: Mapped[str | None] = mapped_column(String(100), nullable=True)
     action: Mapped[str] = mapped_column(String(50))
     entity: Mapped[str | None] = mapped_column(String(50), nullable=True)
@@ -8,12 +8,13 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
 )
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from app.db.base_class import Base
 
@@ -106,6 +107,21 @@ class CustomerSellerAssignment(Base):
     """
 
     __tablename__ = "customer_seller_assignments"
+    __table_args__ = (
+        # Hoogstens één actieve assignment per klant; ook de snelle lookup
+        Index(
+            "ix_csa_active_customer",
+            "customer_id",
+            unique=True,
+            postgresql_where=text("unassigned_at IS NULL"),
+        ),
+        # Load per verkoper
+        Index(
+            "ix_csa_active_seller",
+            "seller_id",
+            postgresql_where=text("unassigned_at IS NULL"),
+        ),
+    )
 
     id: int = Column(Integer, primary_key=True, index=True)
     customer_id: int = Column(
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import Column, DateTime, Index, Integer, String
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func, text as sa_text
 
@@ -14,11 +14,19 @@ class DomainEvent(Base):
 
     Dit is geen volledige outbox-implementatie, maar laat toe om later
     events asynchroon naar andere systemen te sturen.
+
+    De tabel is maandelijks gepartitioneerd op created_at (zie
+    app.services.partitions); created_at zit daarom mee in de primaire sleutel.
     """
 
     __tablename__ = "domain_events"
+    __table_args__ = (
+        Index("ix_domain_events_entity_created", "entity_type", "entity_id", "created_at"),
+        Index("ix_domain_events_type_created", "event_type", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id: int = Column(Integer, primary_key=True, index=True)
+    id: int = Column(Integer, primary_key=True, autoincrement=True)
     event_type: str = Column(String(100), nullable=False)
     entity_type: str = Column(String(50), nullable=False)
     entity_id: str | None = Column(String(100), nullable=True)
@@ -32,6 +40,7 @@ class DomainEvent(Base):
 
     created_at: datetime = Column(
         DateTime(timezone=True),
+        primary_key=True,
         nullable=False,
         server_default=func.now(),
     )
@@ -1,10 +1,14 @@
 
-from sqlalchemy import Integer, String, ForeignKey, Numeric
+from datetime import datetime
+
+from sqlalchemy import Integer, String, ForeignKey, Numeric, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.session import Base
 
 class SalesOrder(Base):
     __tablename__ = "sales_orders"
+    # seller_sales_aggregates herberekent per (verkoper, maand)
+    __table_args__ = (Index("ix_sales_orders_seller_created", "seller_id", "created_at"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     order_no: Mapped[str | None] = mapped_column(String(30), unique=True, nullable=True)
     customer_id: Mapped[int | None] = mapped_column(ForeignKey("customer_shadow.id", ondelete="SET NULL"))
@@ -15,9 +19,11 @@ class SalesOrder(Base):
     vat: Mapped[float] = mapped_column(Numeric(14,2), default=0)
     total: Mapped[float] = mapped_column(Numeric(14,2), default=0)
     status: Mapped[str] = mapped_column(String(20), default="created")
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 class SalesOrderLine(Base):
     __tablename__ = "sales_order_lines"
+    __table_args__ = (Index("ix_sales_order_lines_order", "order_id"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     order_id: Mapped[int] = mapped_column(ForeignKey("sales_orders.id", ondelete="CASCADE"))
     product_id: Mapped[int] = mapped_column(ForeignKey("product_catalog.id", ondelete="RESTRICT"))
@@ -1,14 +1,17 @@
 
+from datetime import datetime
 from typing import Optional, List, Dict
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy import text
 
-from sqlalchemy import Integer, String, ForeignKey, Numeric, DateTime, Text
+from sqlalchemy import Integer, String, ForeignKey, Numeric, DateTime, Text, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.session import Base
 
 class Quote(Base):
     __tablename__ = "quotes"
+    # seller_sales_aggregates herberekent per (verkoper, maand)
+    __table_args__ = (Index("ix_quotes_seller_created", "seller_id", "created_at"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     quote_no: Mapped[str | None] = mapped_column(String(30), unique=True, nullable=True)
     version: Mapped[int] = mapped_column(Integer, default=1)
@@ -19,6 +22,7 @@ class Quote(Base):
     vat: Mapped[float] = mapped_column(Numeric(14,2), default=0)
     total: Mapped[float] = mapped_column(Numeric(14,2), default=0)
     status: Mapped[str] = mapped_column(String(20), default="draft")
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 class QuoteLine(Base):
     __tablename__ = "quote_lines"
@@ -1,14 +1,21 @@
 
-from sqlalchemy import Integer, String, ForeignKey
+from sqlalchemy import Index, Integer, String, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.db.session import Base
+from app.db.base_class import Base
 
 class Region(Base):
     __tablename__ = "regions"
+    __table_args__ = (
+        # Zelfde naam als in migrate_002 (ADD COLUMN op een bestaande tabel)
+        Index("uq_regions_code", "code", unique=True),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Zelfde waarde als Seller.region_code (bv. MX-CMX)
+    code: Mapped[str | None] = mapped_column(String(50), nullable=True)
     name: Mapped[str] = mapped_column(String(100), unique=True)
 
     cities: Mapped[list["City"]] = relationship(back_populates="region")
+    rules: Mapped[list["TerritoryRule"]] = relationship(back_populates="region")
 
 class City(Base):
     __tablename__ = "cities"
@@ -16,3 +23,21 @@ class City(Base):
     name: Mapped[str] = mapped_column(String(100))
     region_id: Mapped[int] = mapped_column(ForeignKey("regions.id", ondelete="CASCADE"))
     region: Mapped[Region] = relationship(back_populates="cities")
+
+class TerritoryRule(Base):
+    """Koppelt een postcode-prefix of staat aan een regio.
+
+    match_type:
+        - "postal_prefix" : pattern = begin van de postcode (bv. "06" of "440")
+        - "state"         : pattern = naam van de staat (bv. "Jalisco")
+        - "city"          : pattern = naam van de stad (aanvulling op City)
+    """
+    __tablename__ = "territory_rules"
+    __table_args__ = (
+        UniqueConstraint("match_type", "pattern", name="uq_territory_rules_match"),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    region_id: Mapped[int] = mapped_column(ForeignKey("regions.id", ondelete="CASCADE"))
+    match_type: Mapped[str] = mapped_column(String(20))
+    pattern: Mapped[str] = mapped_column(String(100))
+    region: Mapped[Region] = relationship(back_populates="rules")
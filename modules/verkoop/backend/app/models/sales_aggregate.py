@@ -0,0 +1,63 @@
+# verkoop/backend/app/models/sales_aggregate.py
+
+from datetime import date, datetime
+
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, Numeric
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class SellerSalesAggregate(Base):
+    """Voorberekende verkoopcijfers per verkoper per maand.
+
+    Wordt bijgewerkt door triggers op quotes / sales_orders / sales_order_lines
+    (zie app.services.sales_aggregates) en kan volledig herberekend
+    worden met `python -m app.scripts.rebuild_sales_aggregates`.
+    Een dashboard leest hier één rij per verkoper, los van het ordervolume.
+    """
+
+    __tablename__ = "seller_sales_aggregates"
+
+    seller_id: int = Column(
+        Integer,
+        ForeignKey("sellers.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Eerste dag van de maand (UTC)
+    period_start: date = Column(Date, primary_key=True)
+
+    quote_count: int = Column(Integer, nullable=False, server_default="0")
+    quotes_converted: int = Column(Integer, nullable=False, server_default="0")
+
+    order_count: int = Column(Integer, nullable=False, server_default="0")
+    order_revenue = Column(Numeric(16, 2), nullable=False, server_default="0")
+
+    # Som + aantal (over orderlijnen) i.p.v. een gemiddelde, zodat maanden optelbaar blijven
+    discount_sum = Column(Numeric(14, 2), nullable=False, server_default="0")
+    discount_count: int = Column(Integer, nullable=False, server_default="0")
+
+    updated_at: datetime = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    @property
+    def conversion_rate(self) -> float:
+        if not self.quote_count:
+            return 0.0
+        return self.quotes_converted / self.quote_count
+
+    @property
+    def average_discount_percent(self) -> float:
+        if not self.discount_count:
+            return 0.0
+        return float(self.discount_sum) / self.discount_count
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return (
+            f"<SellerSalesAggregate seller_id={self.seller_id} period={self.period_start} "
+            f"quotes={self.quote_count} orders={self.order_count}>"
+        )
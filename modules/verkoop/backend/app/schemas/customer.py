@@ -48,7 +48,9 @@ class CustomerShadowOut(CustomerShadowBase):
 class CustomerListItem(BaseModel):
     id: int
     website_customer_id: str
-    email: EmailStr
+    # str i.p.v. EmailStr: de lijst wordt gestreamd en een afwijkend adres in
+    # de database mag de JSON niet halverwege afbreken (validatie gebeurt bij schrijven)
+    email: str
     first_name: str
     last_name: str
     customer_type: str
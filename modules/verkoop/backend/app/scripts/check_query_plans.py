@@ -0,0 +1,128 @@
+"""
+Query-plan-regressiecheck voor de hot paths van verkoop (zie app/db/plan_check.py).
+
+Draai tegen een database geseed met benchmarks/datagen:
+
+    python -m app.scripts.check_query_plans                    # exit 1 bij regressie
+    python -m app.scripts.check_query_plans --update-baseline  # kosten vastleggen
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.plan_check import HotPath, report, run_checks
+from app.db.session import engine
+from app.models.customer import CustomerSellerAssignment, CustomerShadow
+from app.services.assignments import list_assignments
+from app.services.customer_sync import sync_customers_into_verkoop
+from app.services.territory import assign_customers, get_territory_index
+
+SYNC_BATCH = 50
+
+_SHADOW_FIELDS = (
+    "email", "first_name", "last_name", "phone_number", "customer_type", "description",
+    "company_name", "tax_id", "address_street", "address_ext_number", "address_int_number",
+    "address_neighborhood", "address_city", "address_state", "address_postal_code",
+    "address_country", "is_active",
+)
+
+
+def _require(rows: List[Any], what: str) -> List[Any]:
+    if not rows:
+        raise RuntimeError(f"Geen sample-data voor {what} (database niet geseed?)")
+    return rows
+
+
+def _sync_payload(db: Session) -> List[Dict[str, Any]]:
+    get_territory_index(db)  # cache opwarmen: niet meten
+    shadows = _require(
+        db.execute(select(CustomerShadow).order_by(CustomerShadow.id.desc()).limit(SYNC_BATCH)).scalars().all(),
+        "customer_shadows",
+    )
+    payload = [
+        {"id": s.website_customer_id, **{name: getattr(s, name) for name in _SHADOW_FIELDS}}
+        for s in shadows
+    ]
+    # één nieuwe klant → ook het toewijzingspad (balancer + bulk insert)
+    payload.append({**payload[0], "id": "plan-check-new", "email": "plan-check@example.mx", "is_active": True})
+    return payload
+
+
+def _sample_seller(db: Session) -> int:
+    return _require(
+        db.execute(
+            select(CustomerSellerAssignment.seller_id)
+            .where(CustomerSellerAssignment.unassigned_at.is_(None))
+            .limit(1)
+        ).scalars().all(),
+        "customer_seller_assignments",
+    )[0]
+
+
+def _assigned_shadows(db: Session) -> List[CustomerShadow]:
+    get_territory_index(db)
+    return _require(
+        db.execute(
+            select(CustomerShadow)
+            .join(CustomerSellerAssignment, CustomerSellerAssignment.customer_id == CustomerShadow.id)
+            .where(CustomerSellerAssignment.unassigned_at.is_(None), CustomerShadow.is_active.is_(True))
+            .limit(SYNC_BATCH)
+        ).scalars().all(),
+        "actieve assignments",
+    )
+
+
+# load_seller_balancer telt de actieve assignments van álle verkopers
+_BALANCER = ("customer_seller_assignments", "group by")
+
+HOT_PATHS = (
+    HotPath("shadow_upsert", _sync_payload, sync_customers_into_verkoop, (_BALANCER,)),
+    HotPath(
+        "assignment_lookup_seller",
+        _sample_seller,
+        lambda db, seller_id: list_assignments(db, seller_id=seller_id, status="active"),
+    ),
+    HotPath(
+        "assignment_lookup_customers",
+        _assigned_shadows,
+        lambda db, shadows: assign_customers(db, shadows, assigned_by="plan-check"),
+        (_BALANCER,),
+    ),
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default="plan_baseline.json", help="JSON met kost per statement")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--min-rows", type=int, default=5000)
+    parser.add_argument("--cost-factor", type=float, default=2.0)
+    parser.add_argument("--only", help="komma-lijst van hot paths")
+    args = parser.parse_args()
+
+    selected = [h for h in HOT_PATHS if not args.only or h.name in args.only.split(",")]
+    baseline_path = Path(args.baseline)
+    baseline = None
+    if baseline_path.exists() and not args.update_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+
+    planned, violations = run_checks(
+        engine, selected, baseline, min_rows=args.min_rows, cost_factor=args.cost_factor
+    )
+    if args.update_baseline:
+        baseline_path.write_text(
+            json.dumps({item.key: round(item.total_cost, 2) for item in planned}, indent=2, sort_keys=True),
+            encoding="utf-8",
+        )
+    print(report(planned, violations))
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
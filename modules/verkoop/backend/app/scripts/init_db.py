@@ -3,7 +3,10 @@ from sqlalchemy.orm import Session
 
 from app.db.base import Base  # noqa: F401
 from app.db.session import engine, SessionLocal
+from app.db.versions import ensure_table_versions
 from app.models.seller import Seller
+from app.services.sales_aggregates import ensure_sales_aggregate_triggers
+from app.services.partitions import PARTITIONED_TABLES, ensure_partitions, is_partitioned
 
 
 def ensure_internal_number_column() -> None:
@@ -32,6 +35,47 @@ def ensure_internal_number_column() -> None:
         db.close()
 
 
+def ensure_monthly_partitions() -> None:
+    """
+    Zorg dat audit_log / domain_events partities hebben voor deze maand en
+    de komende PARTITION_MONTHS_AHEAD maanden.
+
+    Oude (niet-gepartitioneerde) tabellen worden hier niet omgezet;
+    daarvoor dient app.scripts.migrate_003_partition_audit_and_events.
+    """
+    try:
+        with engine.begin() as conn:
+            for table in PARTITIONED_TABLES:
+                if is_partitioned(conn, table):
+                    ensure_partitions(conn, table)
+    except Exception as exc:
+        print("[init_db] Warning: kon partities niet garanderen:", exc)
+
+
+def ensure_version_triggers() -> None:
+    """
+    Zorg voor table_versions + triggers (ETags van de read-endpoints).
+    Zonder deze tabel antwoorden de endpoints gewoon zonder ETag.
+    """
+    try:
+        with engine.begin() as conn:
+            ensure_table_versions(conn)
+    except Exception as exc:
+        print("[init_db] Warning: kon table_versions niet garanderen:", exc)
+
+
+def ensure_sales_triggers() -> None:
+    """
+    Zorg voor de triggers die seller_sales_aggregates bijhouden
+    (zie app.services.sales_aggregates).
+    """
+    try:
+        with engine.begin() as conn:
+            ensure_sales_aggregate_triggers(conn)
+    except Exception as exc:
+        print("[init_db] Warning: kon de verkoopcijfer-triggers niet garanderen:", exc)
+
+
 def seed_sellers(db: Session) -> None:
     # als er al verkopers zijn, doe niets
     if db.query(Seller).count() > 0:
@@ -91,6 +135,15 @@ def main() -> None:
     # 2. zorg dat de kolom 'internal_number' zeker aanwezig is
     ensure_internal_number_column()
 
+    # 2b. maandpartities voor audit_log / domain_events
+    ensure_monthly_partitions()
+
+    # 2c. versietellers voor conditional GET (ETag / 304)
+    ensure_version_triggers()
+
+    # 2d. triggers voor de verkoopcijfers per verkoper
+    ensure_sales_triggers()
+
     # 3. seed demo-data als er nog geen verkopers zijn
     db = SessionLocal()
     try:
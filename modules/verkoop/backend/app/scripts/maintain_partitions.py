@@ -0,0 +1,29 @@
+"""
+Dagelijks onderhoud van de maandpartities (audit_log, domain_events):
+toekomstige partities aanmaken en oude partities loskoppelen of verwijderen
+volgens AUDIT_LOG_RETENTION_MONTHS / DOMAIN_EVENTS_RETENTION_MONTHS. Rijen die
+in de DEFAULT-partitie belandden (onderhoud gemist) krijgen alsnog hun maand.
+
+Uitvoeren met (bv. via cron / k8s CronJob):
+
+    docker compose -f docker-compose.verkoop.yml run --rm verkoop-backend ^
+        python -m app.scripts.maintain_partitions
+"""
+
+from app.db.session import engine
+from app.services.partitions import maintain_partitions
+
+
+def main() -> None:
+    with engine.begin() as conn:
+        report = maintain_partitions(conn)
+
+    for table, changes in report.items():
+        print(
+            f"[partitions] {table}: aangemaakt={changes['created'] or '-'} "
+            f"opgeruimd={changes['removed'] or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+from sqlalchemy import text
+
+from app.db.session import engine
+from app.models.region import City, Region, TerritoryRule
+
+
+def run_migration() -> None:
+    """
+    Voorziet de tabellen voor de territory-engine.
+
+    - regions / cities / territory_rules worden aangemaakt indien ze nog niet bestaan
+    - regions.code: koppeling met sellers.region_code (bv. MX-CMX)
+    - partiële indexen op de actieve customer_seller_assignments; die op
+      customer_id is uniek (hoogstens één actieve verkoper per klant). Een
+      bestaande niet-unieke versie wordt vervangen; dubbele actieve
+      assignments worden eerst afgesloten, de recentste blijft staan.
+
+    De migratie is idempotent: bestaande tabellen, kolommen en indexen blijven behouden.
+    """
+    Region.metadata.create_all(
+        bind=engine,
+        tables=[Region.__table__, City.__table__, TerritoryRule.__table__],
+    )
+
+    statements = [
+        """
+        ALTER TABLE IF EXISTS regions
+        ADD COLUMN IF NOT EXISTS code VARCHAR(50);
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_regions_code
+        ON regions (code);
+        """,
+        """
+        UPDATE customer_seller_assignments a
+        SET unassigned_at = now()
+        WHERE a.unassigned_at IS NULL
+          AND EXISTS (
+              SELECT 1 FROM customer_seller_assignments b
+              WHERE b.customer_id = a.customer_id
+                AND b.unassigned_at IS NULL
+                AND b.id > a.id
+          );
+        """,
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = 'ix_csa_active_customer' AND NOT i.indisunique
+            ) THEN
+                DROP INDEX ix_csa_active_customer;
+            END IF;
+        END $$;
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS ix_csa_active_customer
+        ON customer_seller_assignments (customer_id)
+        WHERE unassigned_at IS NULL;
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_csa_active_seller
+        ON customer_seller_assignments (seller_id)
+        WHERE unassigned_at IS NULL;
+        """,
+    ]
+
+    with engine.begin() as conn:
+        for stmt in statements:
+            conn.execute(text(stmt))
+
+
+def main() -> None:
+    print("[migration] Start: territory tabellen")
+    run_migration()
+    print("[migration] Klaar: regions.code, territory_rules en assignment-indexen (actieve klant uniek) zijn aanwezig.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import sys
+
+from sqlalchemy import text
+
+from app.db.base import Base
+from app.db.session import engine
+from app.services.partitions import (
+    PARTITIONED_TABLES,
+    convert_to_partitioned,
+    ensure_partitions,
+    is_partitioned,
+)
+
+
+def run_migration(keep_legacy: bool = False) -> None:
+    """
+    Zet audit_log en domain_events om naar maandelijks gepartitioneerde tabellen.
+
+    - bestaat de tabel nog niet: gepartitioneerde tabel + partities aanmaken
+    - bestaat ze als gewone tabel: omzetten met data-kopie (zie convert_to_partitioned)
+    - is ze al gepartitioneerd: enkel ontbrekende toekomstige partities aanmaken
+
+    Elke tabel wordt in een eigen transactie omgezet. De migratie is idempotent.
+    """
+    for table in PARTITIONED_TABLES:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT to_regclass(:t) IS NOT NULL"), {"t": f"public.{table}"}
+            ).scalar()
+
+            if not exists:
+                Base.metadata.tables[table].create(bind=conn)
+                ensure_partitions(conn, table)
+                print(f"[migration] {table}: gepartitioneerd aangemaakt")
+            elif not is_partitioned(conn, table):
+                copied = convert_to_partitioned(conn, table, keep_legacy=keep_legacy)
+                print(f"[migration] {table}: omgezet, {copied} rijen gekopieerd")
+            else:
+                ensure_partitions(conn, table)
+                print(f"[migration] {table}: was al gepartitioneerd")
+
+
+def main() -> None:
+    print("[migration] Start: partitionering audit_log / domain_events")
+    run_migration(keep_legacy="--keep-legacy" in sys.argv[1:])
+    print("[migration] Klaar.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from app.db.session import engine
+from app.db.versions import VERSIONED_TABLES, ensure_table_versions
+
+
+def run_migration() -> None:
+    """
+    Voorziet table_versions + triggers voor de ETags van de read-endpoints.
+
+    - table_version_log (één rij per schrijvende transactie en tabel) en
+      table_versions (epoch per tabel, verhoogd bij het opruimen van de log)
+    - statement-level triggers op sellers, customer_shadows en
+      customer_seller_assignments die bij elke write een logrij toevoegen
+
+    De migratie is idempotent: bestaande tabel en triggers blijven behouden.
+    """
+    with engine.begin() as conn:
+        ensure_table_versions(conn)
+
+
+def main() -> None:
+    print("[migration] Start: table_versions")
+    run_migration()
+    print(f"[migration] Klaar: versietriggers op {', '.join(VERSIONED_TABLES)}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+from app.db.session import SessionLocal, engine
+from app.services.sales_aggregates import ensure_sales_aggregate_triggers, rebuild_sales_aggregates
+
+
+def run_migration() -> int:
+    """
+    Laat seller_sales_aggregates bijhouden door triggers op de brontabellen.
+
+    - quotes.created_at en sales_orders.created_at; bestaande rijen krijgen
+      het tijdstip van hun eerste domain event (zonder event blijven ze NULL
+      en tellen ze niet mee)
+    - indexen op (seller_id, created_at) voor de rebuild per maand
+    - statement-level triggers op quotes, sales_orders en sales_order_lines
+      die enkel de deltas van de gewijzigde rijen optellen
+    - daarna een volledige rebuild uit de bestaande offertes en orders
+
+    De migratie is idempotent. Geeft het aantal aggregaat-rijen terug.
+    """
+    with engine.begin() as conn:
+        ensure_sales_aggregate_triggers(conn)
+
+    db = SessionLocal()
+    try:
+        return rebuild_sales_aggregates(db)
+    finally:
+        db.close()
+
+
+def main() -> None:
+    print("[migration] Start: triggers voor seller_sales_aggregates")
+    rows = run_migration()
+    print(f"[migration] Klaar: triggers actief, {rows} aggregaat-rijen herberekend.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Herverdeel alle actieve klanten over de verkopers na een wijziging
+aan regio's, territory_rules of Seller.region_code.
+
+Uitvoeren met:
+
+    docker compose -f docker-compose.verkoop.yml run --rm verkoop-backend ^
+        python -m app.scripts.rebalance_territories [--dry-run]
+"""
+
+import sys
+
+from app.db.session import SessionLocal
+from app.services.territory import rebalance_territories
+
+
+def main() -> None:
+    dry_run = "--dry-run" in sys.argv[1:]
+
+    db = SessionLocal()
+    try:
+        stats = rebalance_territories(db, dry_run=dry_run)
+    finally:
+        db.close()
+
+    prefix = "[rebalance] (dry-run)" if dry_run else "[rebalance]"
+    print(
+        f"{prefix} klanten={stats['customers']} behouden={stats['kept']} "
+        f"verplaatst={stats['moved']} zonder-verkoper={stats['unmatched']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
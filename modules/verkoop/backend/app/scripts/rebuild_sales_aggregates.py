@@ -0,0 +1,38 @@
+"""
+Herbereken seller_sales_aggregates uit quotes / sales_orders (backfill).
+
+Uitvoeren met:
+
+    docker compose -f docker-compose.verkoop.yml run --rm verkoop-backend ^
+        python -m app.scripts.rebuild_sales_aggregates [--since YYYY-MM]
+"""
+
+import argparse
+from datetime import datetime
+
+from app.db.session import SessionLocal
+from app.services.sales_aggregates import rebuild_sales_aggregates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--since",
+        help="Enkel maanden vanaf YYYY-MM herberekenen (default: alles)",
+    )
+    args = parser.parse_args()
+
+    since = datetime.strptime(args.since, "%Y-%m").date() if args.since else None
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_sales_aggregates(db, since=since)
+    finally:
+        db.close()
+
+    scope = f"vanaf {args.since}" if args.since else "volledig"
+    print(f"[aggregates] Rebuild {scope} klaar: {rows} rijen")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,10 @@ import httpx
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.metrics import track_outbound
+from app.core.tracing import AsyncTracingTransport
 from app.models.customer import CustomerShadow
+from app.services.territory import assign_customers
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +21,10 @@ async def fetch_customers_from_website() -> List[Dict[str, Any]]:
 
     logger.info(f"Fetching customers FROM website: {url}")
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(url)
+    with track_outbound("website", "GET") as call:
+        async with httpx.AsyncClient(timeout=10.0, transport=AsyncTracingTransport()) as client:
+            response = await client.get(url)
+        call.status = response.status_code
 
     if response.status_code != 200:
         raise RuntimeError(
@@ -40,6 +45,7 @@ async def fetch_customers_from_website() -> List[Dict[str, Any]]:
 def sync_customers_into_verkoop(db: Session, customers: List[Dict[str, Any]]):
     created = 0
     updated = 0
+    new_shadows: List[CustomerShadow] = []
 
     for c in customers:
         website_is_active = c.get("is_active", True)
@@ -77,6 +83,7 @@ def sync_customers_into_verkoop(db: Session, customers: List[Dict[str, Any]]):
                 source="website-sync",
             )
             db.add(shadow)
+            new_shadows.append(shadow)
             created += 1
 
         else:
@@ -104,6 +111,15 @@ def sync_customers_into_verkoop(db: Session, customers: List[Dict[str, Any]]):
 
             updated += 1
 
+    # --------- NIEUWE KLANTEN TOEWIJZEN (territory-engine) ---------
+    assigned = 0
+    unassigned = 0
+    if new_shadows and settings.TERRITORY_AUTO_ASSIGN:
+        db.flush()  # ids nodig voor de assignments
+        assignment = assign_customers(db, new_shadows, assigned_by="sync")
+        assigned = assignment.assigned
+        unassigned = assignment.unmatched
+
     db.commit()
 
     return {
@@ -111,4 +127,6 @@ def sync_customers_into_verkoop(db: Session, customers: List[Dict[str, Any]]):
         "created": created,
         "updated": updated,
         "total": created + updated,
+        "assigned": assigned,
+        "unassigned": unassigned,
     }
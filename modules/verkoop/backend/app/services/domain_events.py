@@ -0,0 +1,33 @@
+# verkoop/backend/app/services/domain_events.py
+
+from datetime import datetime
+from typing import Any, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.domain_event import DomainEvent
+
+
+def list_entity_events(
+    db: Session,
+    entity_type: str,
+    entity_id: Any,
+    start: datetime,
+    end: Optional[datetime] = None,
+    limit: int = 500,
+) -> List[DomainEvent]:
+    """Events van één entiteit binnen [start, end).
+
+    De grenzen op created_at zijn verplicht zodat Postgres enkel de
+    betrokken maandpartities leest (partition pruning).
+    """
+    stmt = select(DomainEvent).where(
+        DomainEvent.entity_type == entity_type,
+        DomainEvent.entity_id == str(entity_id),
+        DomainEvent.created_at >= start,
+    )
+    if end is not None:
+        stmt = stmt.where(DomainEvent.created_at < end)
+    stmt = stmt.order_by(DomainEvent.created_at.desc()).limit(limit)
+    return list(db.execute(stmt).scalars())
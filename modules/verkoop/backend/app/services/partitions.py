@@ -0,0 +1,334 @@
+# verkoop/backend/app/services/partitions.py
+"""
+Beheer van de maandelijkse partities van audit_log en domain_events.
+
+- ensure_partitions : maakt de partities aan voor de huidige maand + N maanden vooruit,
+                      plus een DEFAULT-partitie als vangnet
+- apply_retention   : oude partities loskoppelen (DETACH) of verwijderen (DROP),
+                      i.p.v. rijen te DELETEn
+- convert_to_partitioned : eenmalige omzetting van een bestaande heap-tabel
+
+Partitienaam: <tabel>_pYYYYMM, bereik [eerste dag maand, eerste dag volgende maand).
+
+Loopt het onderhoud achter, dan komen inserts in <tabel>_default terecht i.p.v.
+te falen. maintain_partitions maakt de ontbrekende maanden nadien aan en
+verhuist die rijen; partition_check meldt het in /readyz (niet kritiek).
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    name: str
+    # gequote kolomnaam zoals in SQL ("when" is een gereserveerd woord)
+    column: str
+    retention_setting: str
+
+
+PARTITIONED_TABLES: Dict[str, PartitionedTable] = {
+    "audit_log": PartitionedTable("audit_log", '"when"', "AUDIT_LOG_RETENTION_MONTHS"),
+    "domain_events": PartitionedTable("domain_events", "created_at", "DOMAIN_EVENTS_RETENTION_MONTHS"),
+}
+
+_PARTITION_RE = re.compile(r"^(?P<table>.+)_p(?P<year>\d{4})(?P<month>\d{2})$")
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + (month.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_of(moment: Optional[datetime] = None) -> date:
+    moment = moment or datetime.now(timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    return bool(
+        conn.execute(
+            text(
+                """
+                SELECT 1 FROM pg_partitioned_table pt
+                JOIN pg_class c ON c.oid = pt.partrelid
+                WHERE c.relname = :table AND c.relnamespace = 'public'::regnamespace
+                """
+            ),
+            {"table": table},
+        ).scalar()
+    )
+
+
+def list_partitions(conn: Connection, table: str) -> List[date]:
+    """Maanden waarvoor `table` een (aangekoppelde) partitie heeft, oplopend."""
+    names = conn.execute(
+        text(
+            """
+            SELECT child.relname
+            FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE parent.relname = :table
+              AND parent.relnamespace = 'public'::regnamespace
+            """
+        ),
+        {"table": table},
+    ).scalars()
+
+    months = []
+    for name in names:
+        match = _PARTITION_RE.match(name)
+        if match and match.group("table") == table:
+            months.append(date(int(match.group("year")), int(match.group("month")), 1))
+    return sorted(months)
+
+
+def has_default_partition(conn: Connection, table: str) -> bool:
+    return bool(
+        conn.execute(
+            text(
+                """
+                SELECT pt.partdefid <> 0 FROM pg_partitioned_table pt
+                JOIN pg_class c ON c.oid = pt.partrelid
+                WHERE c.relname = :table AND c.relnamespace = 'public'::regnamespace
+                """
+            ),
+            {"table": table},
+        ).scalar()
+    )
+
+
+def ensure_default_partition(conn: Connection, table: str) -> None:
+    if not has_default_partition(conn, table):
+        conn.execute(
+            text(f"CREATE TABLE IF NOT EXISTS {default_partition_name(table)} PARTITION OF {table} DEFAULT")
+        )
+
+
+def default_partition_months(conn: Connection, table: str) -> List[date]:
+    """Maanden waarvoor er rijen in de DEFAULT-partitie staan (normaal: geen)."""
+    if not has_default_partition(conn, table):
+        return []
+    column = PARTITIONED_TABLES[table].column
+    return list(
+        conn.execute(
+            text(
+                f"SELECT DISTINCT date_trunc('month', {column})::date "
+                f"FROM {default_partition_name(table)} ORDER BY 1"
+            )
+        ).scalars()
+    )
+
+
+def create_partition(conn: Connection, table: str, month: date) -> str:
+    name = partition_name(table, month)
+    create = text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+    )
+    if month not in default_partition_months(conn, table):
+        conn.execute(create)
+        return name
+
+    # Postgres weigert een nieuwe partitie zolang de DEFAULT rijen uit dat
+    # bereik bevat: DEFAULT even loskoppelen en die rijen verhuizen
+    default = default_partition_name(table)
+    column = PARTITIONED_TABLES[table].column
+    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    conn.execute(create)
+    moved = conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default} WHERE {column} >= :lo AND {column} < :hi RETURNING *) "
+            f"INSERT INTO {table} SELECT * FROM moved"
+        ),
+        {"lo": month, "hi": _add_months(month, 1)},
+    ).rowcount
+    conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    logger.warning("%s: %s rijen uit %s verhuisd naar %s", table, moved, default, name)
+    return name
+
+
+def ensure_partitions(
+    conn: Connection,
+    table: str,
+    months_ahead: Optional[int] = None,
+    start: Optional[date] = None,
+) -> List[str]:
+    """Zorg dat er partities zijn van `start` (default: deze maand) t.e.m. N maanden vooruit."""
+    if months_ahead is None:
+        months_ahead = settings.PARTITION_MONTHS_AHEAD
+
+    ensure_default_partition(conn, table)
+    existing = set(list_partitions(conn, table))
+    month = start or _month_of()
+    last = _add_months(_month_of(), months_ahead)
+
+    created = []
+    while month <= last:
+        if month not in existing:
+            created.append(create_partition(conn, table, month))
+        month = _add_months(month, 1)
+
+    if created:
+        logger.info("Partities aangemaakt voor %s: %s", table, ", ".join(created))
+    return created
+
+
+def apply_retention(
+    conn: Connection,
+    table: str,
+    keep_months: int,
+    mode: Optional[str] = None,
+) -> List[str]:
+    """Koppel partities los die volledig ouder zijn dan `keep_months` maanden.
+
+    mode="detach": partitie blijft als losse tabel bestaan (archief / export)
+    mode="drop"  : partitie wordt verwijderd
+    keep_months <= 0 betekent: niets opruimen.
+    """
+    if keep_months <= 0:
+        return []
+    mode = mode or settings.PARTITION_RETENTION_MODE
+    if mode not in ("detach", "drop"):
+        raise ValueError(f"Ongeldige retention mode: {mode!r}")
+
+    cutoff = _add_months(_month_of(), -keep_months)
+    removed = []
+    for month in list_partitions(conn, table):
+        if month >= cutoff:
+            break
+        name = partition_name(table, month)
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if mode == "drop":
+            conn.execute(text(f"DROP TABLE {name}"))
+        removed.append(name)
+
+    if removed:
+        logger.info("Retention (%s) voor %s: %s", mode, table, ", ".join(removed))
+    return removed
+
+
+def maintain_partitions(conn: Connection) -> Dict[str, Dict[str, List[str]]]:
+    """Dagelijkse onderhoudstaak: vooruit aanmaken + retention, voor alle tabellen."""
+    report = {}
+    for table in PARTITIONED_TABLES.values():
+        if not is_partitioned(conn, table.name):
+            logger.warning("%s is nog niet gepartitioneerd; draai migrate_003", table.name)
+            continue
+        # gemiste maanden (onderhoud liep achter): alsnog aanmaken en de rijen verhuizen
+        stranded = default_partition_months(conn, table.name)
+        if stranded:
+            logger.warning(
+                "%s bevat rijen voor %s",
+                default_partition_name(table.name),
+                ", ".join(m.isoformat() for m in stranded),
+            )
+        report[table.name] = {
+            "created": [create_partition(conn, table.name, m) for m in stranded]
+            + ensure_partitions(conn, table.name),
+            "removed": apply_retention(
+                conn, table.name, getattr(settings, table.retention_setting)
+            ),
+        }
+    return report
+
+
+def partition_check(engine: Engine) -> Callable[[], Dict[str, Any]]:
+    """Readiness-check (niet kritiek): faalt als er rijen in een DEFAULT-partitie
+    staan of de partitie voor volgende maand ontbreekt (onderhoud loopt niet)."""
+
+    def check() -> Dict[str, Any]:
+        problems = []
+        next_month = _add_months(_month_of(), 1)
+        with engine.connect() as conn:
+            for table in PARTITIONED_TABLES:
+                if not is_partitioned(conn, table):
+                    continue
+                if next_month not in list_partitions(conn, table):
+                    problems.append(f"{partition_name(table, next_month)} ontbreekt")
+                if has_default_partition(conn, table) and conn.execute(
+                    text(f"SELECT EXISTS (SELECT 1 FROM {default_partition_name(table)})")
+                ).scalar():
+                    problems.append(f"{default_partition_name(table)} bevat rijen")
+        if problems:
+            raise RuntimeError("; ".join(problems) + " (draai maintain_partitions)")
+        return {"next_month": next_month.isoformat()}
+
+    return check
+
+
+# -----------------------------------------------------
+# Eenmalige omzetting heap-tabel → gepartitioneerde tabel
+# -----------------------------------------------------
+def convert_to_partitioned(conn: Connection, table: str, keep_legacy: bool = False) -> int:
+    """Zet een bestaande tabel om naar de gepartitioneerde versie uit de modellen.
+
+    1. bestaande tabel, sequence en indexen hernoemen naar *_legacy
+    2. gepartitioneerde tabel aanmaken (via de SQLAlchemy-metadata)
+    3. partities aanmaken vanaf de oudste rij
+    4. data kopiëren en de sequence verderzetten
+    Moet binnen één transactie draaien. Geeft het aantal gekopieerde rijen terug.
+    """
+    from app.db.base import Base  # importeert alle modellen in de metadata
+
+    spec = PARTITIONED_TABLES[table]
+    if is_partitioned(conn, table):
+        return 0
+
+    legacy = f"{table}_legacy"
+    conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+    conn.execute(text(f"ALTER SEQUENCE IF EXISTS {table}_id_seq RENAME TO {legacy}_id_seq"))
+    index_names = conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = :t AND schemaname = 'public'"),
+        {"t": legacy},
+    ).scalars().all()
+    for index_name in index_names:
+        conn.execute(text(f'ALTER INDEX "{index_name}" RENAME TO "{index_name}_legacy"'))
+
+    Base.metadata.tables[table].create(bind=conn)
+
+    oldest = conn.execute(text(f"SELECT min({spec.column}) FROM {legacy}")).scalar()
+    ensure_partitions(conn, table, start=_month_of(oldest) if oldest else None)
+
+    columns = [c.name for c in Base.metadata.tables[table].columns]
+    target_cols = ", ".join(f'"{c}"' for c in columns)
+    partition_column = spec.column.strip('"')
+    source_cols = ", ".join(
+        f'coalesce("{c}", now())' if c == partition_column else f'"{c}"'
+        for c in columns
+    )
+    copied = conn.execute(
+        text(f"INSERT INTO {table} ({target_cols}) SELECT {source_cols} FROM {legacy}")
+    ).rowcount
+
+    conn.execute(
+        text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"coalesce((SELECT max(id) FROM {table}), 0) + 1, false)"
+        )
+    )
+
+    if not keep_legacy:
+        conn.execute(text(f"DROP TABLE {legacy}"))
+
+    logger.info("%s omgezet naar gepartitioneerde tabel (%s rijen)", table, copied)
+    return copied
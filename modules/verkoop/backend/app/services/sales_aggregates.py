@@ -0,0 +1,383 @@
+# verkoop/backend/app/services/sales_aggregates.py
+"""
+Incrementeel bijgehouden verkoopcijfers per verkoper per maand.
+
+Bron zijn de brontabellen zelf, niet de applicatiecode:
+
+    quotes              quote_count, quotes_converted (status 'accepted')
+    sales_orders        order_count, order_revenue (total)
+    sales_order_lines   discount_sum / discount_count (discount_percent per lijn)
+
+De maand is altijd die van `created_at` van de offerte/order (UTC). Een
+aanvaarde offerte telt dus mee in de maand waarin ze aangemaakt is, zodat
+conversion_rate per maand nooit boven 1 gaat. Rijen zonder created_at
+(oude data zonder domain event, zie _BACKFILL) tellen niet mee.
+
+- statement-level triggers (met transition tables) op de drie tabellen
+  rekenen enkel de bijdrage van de geraakte rijen uit (oude rij eraf,
+  nieuwe erbij) en tellen die per (verkoper, maand) op; de kost hangt af
+  van het aantal gewijzigde rijen, niet van de historiek van de maand
+- de upsert telt op (kolom = kolom + delta): gelijktijdige schrijvers op
+  dezelfde sleutel wachten op elkaars rijlock en verliezen niets; de
+  sleutels worden in vaste volgorde geschreven, zodat ze niet deadlocken
+- lijnen van een verwijderde order: de cascade loopt pas als de order al
+  weg is, dus zonder verkoper/maand; een BEFORE DELETE-rijtrigger op
+  sales_orders boekt die lijnen vooraf af
+- rebuild_sales_aggregates() herberekent alles set-based uit dezelfde
+  tabellen, bv. na een bulkimport of een TRUNCATE (die triggeren niet)
+"""
+
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.sales_aggregate import SellerSalesAggregate
+from app.models.seller import Seller
+
+ACCEPTED_QUOTE_STATUS = "accepted"
+
+_MONTH = "date_trunc('month', {t}.created_at AT TIME ZONE 'UTC')::date"
+
+_MEASURES = (
+    "quote_count", "quotes_converted",
+    "order_count", "order_revenue",
+    "discount_sum", "discount_count",
+)
+
+# Bijdrage per bronrij: (seller_id, period_start, *_MEASURES). {rows} is de
+# tabel zelf, een transition table of een subquery met dezelfde kolommen.
+_QUOTE_ROWS = f"""
+    SELECT r.seller_id, {_MONTH.format(t="r")} AS period_start,
+           1 AS quote_count, (r.status = '{ACCEPTED_QUOTE_STATUS}')::int AS quotes_converted,
+           0 AS order_count, 0::numeric AS order_revenue,
+           0::numeric AS discount_sum, 0 AS discount_count
+    FROM {{rows}} r
+    WHERE r.seller_id IS NOT NULL AND r.created_at IS NOT NULL
+"""
+
+_ORDER_ROWS = f"""
+    SELECT r.seller_id, {_MONTH.format(t="r")}, 0, 0, 1, coalesce(r.total, 0), 0, 0
+    FROM {{rows}} r
+    WHERE r.seller_id IS NOT NULL AND r.created_at IS NOT NULL
+"""
+
+# de lijnen van de orders in {rows}, met de verkoper/maand van die orders
+_ORDER_LINE_ROWS = f"""
+    SELECT r.seller_id, {_MONTH.format(t="r")}, 0, 0, 0, 0, coalesce(l.discount_percent, 0), 1
+    FROM {{rows}} r
+    JOIN sales_order_lines l ON l.order_id = r.id
+    WHERE r.seller_id IS NOT NULL AND r.created_at IS NOT NULL
+"""
+
+# lijnen in {rows}, met de verkoper/maand van hun (huidige) order
+_LINE_ROWS = f"""
+    SELECT o.seller_id, {_MONTH.format(t="o")}, 0, 0, 0, 0, coalesce(r.discount_percent, 0), 1
+    FROM {{rows}} r
+    JOIN sales_orders o ON o.id = r.order_id
+    WHERE o.seller_id IS NOT NULL AND o.created_at IS NOT NULL
+"""
+
+# tabel -> (kolommen die de aggregaten beïnvloeden, bijdrage van de rij zelf,
+#           (bijdrage die meeverhuist met de rij, sleutelkolommen) of None)
+_SOURCES = {
+    "quotes": (("seller_id", "created_at", "status"), _QUOTE_ROWS, None),
+    # verandert de verkoper of datum van een order, dan verhuizen haar lijnen mee
+    "sales_orders": (
+        ("seller_id", "created_at", "total"),
+        _ORDER_ROWS,
+        (_ORDER_LINE_ROWS, ("seller_id", "created_at")),
+    ),
+    "sales_order_lines": (("order_id", "discount_percent"), _LINE_ROWS, None),
+}
+
+# Deltas optellen bij seller_sales_aggregates; {parts} levert (sign, seller_id, period_start, *_MEASURES)
+_APPLY = """
+    INSERT INTO seller_sales_aggregates (seller_id, period_start, {columns})
+    SELECT d.seller_id, d.period_start, {sums}
+    FROM ({parts}) d
+    -- verkoper kan in dezelfde transactie verwijderd zijn (SET NULL-cascade)
+    JOIN sellers s ON s.id = d.seller_id
+    GROUP BY d.seller_id, d.period_start
+    HAVING {nonzero}
+    -- vaste volgorde: twee schrijvers op dezelfde sleutels deadlocken niet
+    ORDER BY d.seller_id, d.period_start
+    ON CONFLICT (seller_id, period_start) DO UPDATE SET
+        {additions},
+        updated_at = now();
+"""
+
+
+def _apply_deltas(parts: Sequence[Tuple[int, str]]) -> str:
+    """INSERT ... ON CONFLICT die de bijdragen in `parts` (teken, SELECT) optelt."""
+    columns = ", ".join(_MEASURES)
+    union = "\n    UNION ALL\n".join(
+        f"SELECT {sign} AS sign, c.* FROM ({contribution}) AS c(seller_id, period_start, {columns})"
+        for sign, contribution in parts
+    )
+    return _APPLY.format(
+        columns=columns,
+        sums=", ".join(f"sum(d.sign * d.{m})" for m in _MEASURES),
+        parts=union,
+        nonzero=" OR ".join(f"sum(d.sign * d.{m}) <> 0" for m in _MEASURES),
+        additions=",\n        ".join(f"{m} = seller_sales_aggregates.{m} + EXCLUDED.{m}" for m in _MEASURES),
+    )
+
+
+# -----------------------------------------------------
+# Triggers
+# -----------------------------------------------------
+# Oudere databanken: created_at ontbrak. De kolom komt er zonder default bij,
+# zodat bestaande rijen niet de datum van de migratie krijgen; ze worden
+# gedateerd met hun eerste domain event. NOT NULL pas als niets ongedateerd blijft.
+_BACKFILL = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = '{table}'
+          AND column_name = 'created_at' AND is_nullable = 'YES'
+    ) THEN
+        UPDATE {table} t SET created_at = e.first_at
+        FROM (
+            SELECT entity_id, min(created_at) AS first_at
+            FROM domain_events
+            WHERE entity_type = '{entity_type}'
+            GROUP BY entity_id
+        ) e
+        WHERE t.created_at IS NULL AND e.entity_id = t.id::text;
+
+        IF NOT EXISTS (SELECT 1 FROM {table} WHERE created_at IS NULL) THEN
+            ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL;
+        END IF;
+    END IF;
+END;
+$$;
+"""
+
+# tabel -> entity_type van haar domain events
+_DATED_TABLES = {"quotes": "quote", "sales_orders": "sales_order"}
+
+_SETUP = [
+    # vervangen door de deltas in de triggerfuncties
+    "DROP FUNCTION IF EXISTS refresh_seller_sales_aggregates(int[], date[]);",
+    *(
+        statement
+        for table, entity_type in _DATED_TABLES.items()
+        for statement in (
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ;",
+            f"ALTER TABLE {table} ALTER COLUMN created_at SET DEFAULT now();",
+            _BACKFILL.format(table=table, entity_type=entity_type),
+        )
+    ),
+    "CREATE INDEX IF NOT EXISTS ix_quotes_seller_created ON quotes (seller_id, created_at);",
+    "CREATE INDEX IF NOT EXISTS ix_sales_orders_seller_created ON sales_orders (seller_id, created_at);",
+    "CREATE INDEX IF NOT EXISTS ix_sales_order_lines_order ON sales_order_lines (order_id);",
+]
+
+# transition tables kunnen niet op triggers met meerdere events: één per event
+_TRIGGER_EVENTS = {
+    "ins": "INSERT REFERENCING NEW TABLE AS new_rows",
+    "upd": "UPDATE REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "del": "DELETE REFERENCING OLD TABLE AS old_rows",
+}
+
+_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION seller_sales_refresh_{table}() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {on_insert}
+    ELSIF TG_OP = 'DELETE' THEN
+        {on_delete}
+    ELSE
+        -- enkel rijen waarvan een relevante kolom wijzigde: oude bijdrage eraf, nieuwe erbij
+        {on_update}
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+_TRIGGER = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_seller_sales_{table}_{suffix}') THEN
+        CREATE TRIGGER trg_seller_sales_{table}_{suffix}
+        AFTER {event} ON {table}
+        FOR EACH STATEMENT EXECUTE FUNCTION seller_sales_refresh_{table}();
+    END IF;
+END;
+$$;
+"""
+
+# De ON DELETE CASCADE op sales_order_lines loopt na de delete van de order;
+# de lijnentrigger vindt dan geen verkoper/maand meer en slaat ze over.
+_OLD_ORDER = "(SELECT OLD.id AS id, OLD.seller_id AS seller_id, OLD.created_at AS created_at)"
+
+_ORDER_LINES_GONE = f"""
+CREATE OR REPLACE FUNCTION seller_sales_order_lines_gone() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    {_apply_deltas([(-1, _ORDER_LINE_ROWS.format(rows=_OLD_ORDER))])}
+    RETURN OLD;
+END;
+$$;
+"""
+
+_ORDER_LINES_GONE_TRIGGER = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_seller_sales_sales_orders_lines_gone') THEN
+        CREATE TRIGGER trg_seller_sales_sales_orders_lines_gone
+        BEFORE DELETE ON sales_orders
+        FOR EACH ROW EXECUTE FUNCTION seller_sales_order_lines_gone();
+    END IF;
+END;
+$$;
+"""
+
+
+def _changed(side: str, columns: Sequence[str]) -> str:
+    """Rijen (oude of nieuwe versie) waarvan een van `columns` wijzigde."""
+    old = ", ".join(f"o.{c}" for c in columns)
+    new = ", ".join(f"n.{c}" for c in columns)
+    return (
+        f"(SELECT {side}.* FROM old_rows o JOIN new_rows n USING (id) "
+        f"WHERE ({old}) IS DISTINCT FROM ({new}))"
+    )
+
+
+def _trigger_function(table: str) -> str:
+    columns, own, follows = _SOURCES[table]
+    on_update = [
+        (-1, own.format(rows=_changed("o", columns))),
+        (1, own.format(rows=_changed("n", columns))),
+    ]
+    if follows is not None:
+        dependent, keys = follows
+        on_update += [
+            (-1, dependent.format(rows=_changed("o", keys))),
+            (1, dependent.format(rows=_changed("n", keys))),
+        ]
+    return _TRIGGER_FUNCTION.format(
+        table=table,
+        on_insert=_apply_deltas([(1, own.format(rows="new_rows"))]),
+        on_delete=_apply_deltas([(-1, own.format(rows="old_rows"))]),
+        on_update=_apply_deltas(on_update),
+    )
+
+
+def trigger_ddl() -> List[str]:
+    """Alle DDL voor de triggers, in uitvoeringsvolgorde (idempotent)."""
+    statements = list(_SETUP)
+    for table in _SOURCES:
+        statements.append(_trigger_function(table))
+        for suffix, event in _TRIGGER_EVENTS.items():
+            statements.append(_TRIGGER.format(table=table, suffix=suffix, event=event))
+    statements += [_ORDER_LINES_GONE, _ORDER_LINES_GONE_TRIGGER]
+    return statements
+
+
+def ensure_sales_aggregate_triggers(conn: Connection) -> None:
+    """Idempotent: kolommen, indexen, functies en triggers aanmaken waar ze ontbreken."""
+    # meerdere workers/containers tegelijk: DDL op pg_proc/pg_trigger serialiseren
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('seller_sales_aggregates'))"))
+    for statement in trigger_ddl():
+        conn.execute(text(statement))
+
+
+def period_start_for(moment: datetime) -> date:
+    """Eerste dag van de maand (UTC) waarin `moment` valt."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+# -----------------------------------------------------
+# Rebuild (backfill)
+# -----------------------------------------------------
+_SINCE = "(SELECT x.* FROM {table} x, bounds b WHERE b.lo IS NULL OR x.created_at >= b.lo)"
+
+_REBUILD_SQL = text(
+    f"""
+    WITH bounds AS (
+        SELECT CAST(:since AS date)::timestamp AT TIME ZONE 'UTC' AS lo
+    ),
+    contributions AS (
+        {_QUOTE_ROWS.format(rows=_SINCE.format(table="quotes"))}
+        UNION ALL
+        {_ORDER_ROWS.format(rows=_SINCE.format(table="sales_orders"))}
+        UNION ALL
+        {_ORDER_LINE_ROWS.format(rows=_SINCE.format(table="sales_orders"))}
+    )
+    INSERT INTO seller_sales_aggregates (seller_id, period_start, {", ".join(_MEASURES)})
+    SELECT c.seller_id, c.period_start, {", ".join(f"sum(c.{m})" for m in _MEASURES)}
+    FROM contributions c
+    GROUP BY c.seller_id, c.period_start
+    """
+)
+
+
+def rebuild_sales_aggregates(db: Session, since: Optional[date] = None) -> int:
+    """Herbereken de aggregaten uit quotes / sales_orders (alles, of vanaf `since`).
+
+    DELETE + één INSERT ... SELECT ... GROUP BY in één transactie.
+    `since` wordt afgerond naar het begin van de maand.
+    Geeft het aantal aangemaakte aggregaat-rijen terug.
+    """
+    if since is not None:
+        since = date(since.year, since.month, 1)
+
+    # een schrijver die al een delta boekte, wordt eerst afgewacht (zijn rijen
+    # zitten dan in de herberekening); de rest wacht met zijn delta tot na de
+    # commit en telt die op bij de herberekende rijen
+    db.execute(text("LOCK TABLE seller_sales_aggregates IN EXCLUSIVE MODE"))
+
+    stmt = SellerSalesAggregate.__table__.delete()
+    if since is not None:
+        stmt = stmt.where(SellerSalesAggregate.period_start >= since)
+    db.execute(stmt)
+
+    result = db.execute(_REBUILD_SQL, {"since": since})
+    db.commit()
+    return result.rowcount or 0
+
+
+# -----------------------------------------------------
+# Dashboard
+# -----------------------------------------------------
+def seller_dashboard(db: Session, period_start: date) -> List[Dict[str, Any]]:
+    """Eén rij per actieve verkoper voor de gegeven maand (O(#verkopers))."""
+    rows = db.execute(
+        select(Seller.id, Seller.seller_code, Seller.first_name, Seller.last_name, SellerSalesAggregate)
+        .outerjoin(
+            SellerSalesAggregate,
+            (SellerSalesAggregate.seller_id == Seller.id)
+            & (SellerSalesAggregate.period_start == period_start),
+        )
+        .where(Seller.is_active.is_(True))
+        .order_by(Seller.seller_code.asc())
+    ).all()
+
+    items = []
+    for seller_id, seller_code, first_name, last_name, agg in rows:
+        items.append(
+            {
+                "seller_id": seller_id,
+                "seller_code": seller_code,
+                "seller_name": f"{first_name} {last_name}",
+                "period_start": period_start.isoformat(),
+                "quote_count": agg.quote_count if agg else 0,
+                "quotes_converted": agg.quotes_converted if agg else 0,
+                "conversion_rate": round(agg.conversion_rate, 4) if agg else 0.0,
+                "order_count": agg.order_count if agg else 0,
+                "order_revenue": float(agg.order_revenue) if agg else 0.0,
+                "average_discount_percent": (
+                    round(agg.average_discount_percent, 2) if agg else 0.0
+                ),
+            }
+        )
+    return items
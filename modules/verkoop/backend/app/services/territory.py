@@ -0,0 +1,414 @@
+# verkoop/backend/app/services/territory.py
+"""
+Territory-engine: klanten automatisch aan een verkoper koppelen.
+
+- TerritoryIndex     : in-memory index postcode-prefix / stad / staat → regiocode
+- SellerLoadBalancer : per regio een heap op (aantal actieve assignments, seller_id)
+- assign_customers   : nieuwe CustomerShadows in bulk toewijzen (tijdens sync)
+- rebalance_territories : alle actieve klanten herverdelen na een territory-wijziging
+
+De regiocode is dezelfde waarde als Seller.region_code (bv. MX-CMX).
+"""
+
+import heapq
+import logging
+import time
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, insert, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.customer import CustomerSellerAssignment, CustomerShadow
+from app.models.region import City, Region, TerritoryRule
+from app.models.seller import Seller
+
+logger = logging.getLogger(__name__)
+
+# Grootte van de chunks voor bulk UPDATE / INSERT bij rebalancing
+_BATCH_SIZE = 5000
+
+
+def _normalize_name(value: Optional[str]) -> str:
+    """Lowercase, accenten weg, dubbele spaties weg ("Ciudad de México" → "ciudad de mexico")."""
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    return " ".join(value.lower().split())
+
+
+def _normalize_postal(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    return "".join(ch for ch in value if ch.isalnum()).upper()
+
+
+# -----------------------------------------------------
+# In-memory index
+# -----------------------------------------------------
+class TerritoryIndex:
+    """Zoekt de regio van een adres.
+
+    Volgorde: langste postcode-prefix → stad (binnen de staat, indien gekend)
+    → staat. Postcode-prefixen zitten in een dict per prefix; een lookup
+    probeert enkel de prefix-lengtes die effectief voorkomen (O(#lengtes)).
+    """
+
+    def __init__(self) -> None:
+        self._prefixes: Dict[str, str] = {}
+        self._prefix_lengths: List[int] = []
+        self._cities: Dict[str, str] = {}
+        self._states: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._prefixes) + len(self._cities) + len(self._states)
+
+    def add_postal_prefix(self, prefix: str, region_code: str) -> None:
+        prefix = _normalize_postal(prefix)
+        if not prefix:
+            return
+        self._prefixes[prefix] = region_code
+        if len(prefix) not in self._prefix_lengths:
+            self._prefix_lengths.append(len(prefix))
+            self._prefix_lengths.sort(reverse=True)
+
+    def add_city(self, city: str, region_code: str, state: Optional[str] = None) -> None:
+        key = _normalize_name(city)
+        if not key:
+            return
+        if state:
+            self._cities[f"{key}|{_normalize_name(state)}"] = region_code
+        # Zonder staat: eerste registratie wint (dubbele stadsnamen bestaan)
+        self._cities.setdefault(key, region_code)
+
+    def add_state(self, state: str, region_code: str) -> None:
+        key = _normalize_name(state)
+        if key:
+            self._states[key] = region_code
+
+    def resolve(
+        self,
+        postal_code: Optional[str] = None,
+        city: Optional[str] = None,
+        state: Optional[str] = None,
+    ) -> Optional[str]:
+        postal = _normalize_postal(postal_code)
+        if postal:
+            for length in self._prefix_lengths:
+                if length <= len(postal):
+                    region = self._prefixes.get(postal[:length])
+                    if region is not None:
+                        return region
+
+        state_key = _normalize_name(state)
+        city_key = _normalize_name(city)
+        if city_key:
+            region = None
+            if state_key:
+                region = self._cities.get(f"{city_key}|{state_key}")
+            if region is None:
+                region = self._cities.get(city_key)
+            if region is not None:
+                return region
+
+        if state_key:
+            return self._states.get(state_key)
+        return None
+
+
+def load_territory_index(db: Session) -> TerritoryIndex:
+    """Bouw de index op uit regions / territory_rules / cities (2 queries)."""
+    index = TerritoryIndex()
+
+    rules = db.execute(
+        select(TerritoryRule.match_type, TerritoryRule.pattern, Region.code)
+        .join(Region, Region.id == TerritoryRule.region_id)
+        .where(Region.code.is_not(None))
+    ).all()
+    for match_type, pattern, region_code in rules:
+        if match_type == "postal_prefix":
+            index.add_postal_prefix(pattern, region_code)
+        elif match_type == "city":
+            index.add_city(pattern, region_code)
+        elif match_type == "state":
+            index.add_state(pattern, region_code)
+        else:
+            logger.warning("Onbekend territory match_type %r genegeerd", match_type)
+
+    cities = db.execute(
+        select(City.name, Region.code)
+        .join(Region, Region.id == City.region_id)
+        .where(Region.code.is_not(None))
+    ).all()
+    for city_name, region_code in cities:
+        index.add_city(city_name, region_code)
+
+    return index
+
+
+_index_cache: Tuple[float, Optional[TerritoryIndex]] = (0.0, None)
+
+
+def get_territory_index(db: Session) -> TerritoryIndex:
+    """Gecachte index; wordt na TERRITORY_INDEX_TTL_SECONDS opnieuw geladen."""
+    global _index_cache
+    loaded_at, index = _index_cache
+    now = time.monotonic()
+    if index is None or now - loaded_at > settings.TERRITORY_INDEX_TTL_SECONDS:
+        index = load_territory_index(db)
+        _index_cache = (now, index)
+    return index
+
+
+def invalidate_territory_index() -> None:
+    """Oproepen na een wijziging aan regions / territory_rules / cities."""
+    global _index_cache
+    _index_cache = (0.0, None)
+
+
+# -----------------------------------------------------
+# Load balancing
+# -----------------------------------------------------
+class SellerLoadBalancer:
+    """Per regio een min-heap op (actieve assignments, seller_id).
+
+    pick() geeft de minst belaste verkoper en verhoogt zijn teller,
+    zodat een reeks toewijzingen gelijkmatig verdeeld wordt.
+    """
+
+    def __init__(self) -> None:
+        self._heaps: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+    def add_seller(self, seller_id: int, region_code: str, load: int = 0) -> None:
+        heapq.heappush(self._heaps[region_code], (load, seller_id))
+
+    def pick(self, region_code: str) -> Optional[int]:
+        heap = self._heaps.get(region_code)
+        if not heap:
+            return None
+        load, seller_id = heap[0]
+        heapq.heapreplace(heap, (load + 1, seller_id))
+        return seller_id
+
+
+def _active_sellers(db: Session) -> List[Tuple[int, str]]:
+    return db.execute(
+        select(Seller.id, Seller.region_code).where(
+            Seller.is_active.is_(True),
+            Seller.region_code.is_not(None),
+        )
+    ).all()
+
+
+def load_seller_balancer(db: Session) -> SellerLoadBalancer:
+    """Actieve verkopers met hun huidige load (1 query met GROUP BY)."""
+    active_count = func.count(CustomerSellerAssignment.id)
+    rows = db.execute(
+        select(Seller.id, Seller.region_code, active_count)
+        .outerjoin(
+            CustomerSellerAssignment,
+            and_(
+                CustomerSellerAssignment.seller_id == Seller.id,
+                CustomerSellerAssignment.unassigned_at.is_(None),
+            ),
+        )
+        .where(Seller.is_active.is_(True), Seller.region_code.is_not(None))
+        .group_by(Seller.id, Seller.region_code)
+    ).all()
+
+    balancer = SellerLoadBalancer()
+    for seller_id, region_code, load in rows:
+        balancer.add_seller(seller_id, region_code, load)
+    return balancer
+
+
+# -----------------------------------------------------
+# Toewijzen tijdens sync
+# -----------------------------------------------------
+@dataclass
+class AssignmentResult:
+    assigned: int = 0
+    unmatched: int = 0
+
+
+def assign_customers(
+    db: Session,
+    customers: Iterable[CustomerShadow],
+    assigned_by: str = "territory",
+) -> AssignmentResult:
+    """Wijs klanten zonder actieve assignment toe aan een verkoper in hun regio.
+
+    De klanten moeten al een id hebben (db.flush()). De assignments worden
+    in één bulk INSERT geschreven; commit gebeurt door de caller.
+
+    ix_csa_active_customer is uniek: kreeg een klant intussen toch een
+    actieve assignment (parallelle sync, manuele toewijzing), dan slaat
+    ON CONFLICT DO NOTHING die rij over en telt ze niet mee in `assigned`.
+    """
+    result = AssignmentResult()
+    customers = [c for c in customers if c.is_active]
+    if not customers:
+        return result
+
+    index = get_territory_index(db)
+    balancer = load_seller_balancer(db)
+
+    already_assigned = set(
+        db.execute(
+            select(CustomerSellerAssignment.customer_id).where(
+                CustomerSellerAssignment.customer_id.in_([c.id for c in customers]),
+                CustomerSellerAssignment.unassigned_at.is_(None),
+            )
+        ).scalars()
+    )
+
+    rows = []
+    for customer in customers:
+        if customer.id in already_assigned:
+            continue
+        region = index.resolve(
+            customer.address_postal_code,
+            customer.address_city,
+            customer.address_state,
+        )
+        seller_id = balancer.pick(region) if region else None
+        if seller_id is None:
+            result.unmatched += 1
+            continue
+        rows.append(
+            {
+                "customer_id": customer.id,
+                "seller_id": seller_id,
+                "assigned_by": assigned_by,
+            }
+        )
+
+    if rows:
+        stmt = (
+            pg_insert(CustomerSellerAssignment)
+            .on_conflict_do_nothing(
+                index_elements=["customer_id"],
+                index_where=text("unassigned_at IS NULL"),
+            )
+            .returning(CustomerSellerAssignment.id)
+        )
+        result.assigned = len(db.execute(stmt, rows).all())
+
+    return result
+
+
+# -----------------------------------------------------
+# Rebalancing (batch job)
+# -----------------------------------------------------
+def rebalance_territories(
+    db: Session,
+    assigned_by: str = "rebalance",
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """Herverdeel alle actieve klanten na een wijziging aan de territoria.
+
+    Eén pass over (klant, adres, actieve assignment) als tuples:
+    - klant zit al bij een actieve verkoper van zijn regio → blijft
+    - anders → oude assignment afsluiten, nieuwe verkoper via de heap
+    Klanten zonder gekende regio behouden hun huidige verkoper.
+
+    Alles gebeurt in één transactie met UPDATE/INSERT in chunks.
+    """
+    invalidate_territory_index()
+    index = get_territory_index(db)
+
+    seller_region: Dict[int, str] = dict(_active_sellers(db))
+
+    stmt = (
+        select(
+            CustomerShadow.id,
+            CustomerShadow.address_postal_code,
+            CustomerShadow.address_city,
+            CustomerShadow.address_state,
+            CustomerSellerAssignment.id,
+            CustomerSellerAssignment.seller_id,
+        )
+        .outerjoin(
+            CustomerSellerAssignment,
+            and_(
+                CustomerSellerAssignment.customer_id == CustomerShadow.id,
+                CustomerSellerAssignment.unassigned_at.is_(None),
+            ),
+        )
+        .where(CustomerShadow.is_active.is_(True))
+        .execution_options(yield_per=_BATCH_SIZE)
+    )
+
+    kept_load: Dict[int, int] = defaultdict(int)
+    movers: List[Tuple[int, str, Optional[int]]] = []
+    stats = {"customers": 0, "kept": 0, "moved": 0, "unmatched": 0}
+
+    for customer_id, postal, city, state, assignment_id, seller_id in db.execute(stmt):
+        stats["customers"] += 1
+        region = index.resolve(postal, city, state)
+
+        if region is None:
+            if seller_id is not None:
+                kept_load[seller_id] += 1
+                stats["kept"] += 1
+            else:
+                stats["unmatched"] += 1
+            continue
+
+        if seller_id is not None and seller_region.get(seller_id) == region:
+            kept_load[seller_id] += 1
+            stats["kept"] += 1
+            continue
+
+        movers.append((customer_id, region, assignment_id))
+
+    # Heap vertrekt van de load die na de herverdeling blijft staan
+    balancer = SellerLoadBalancer()
+    for seller_id, region_code in seller_region.items():
+        balancer.add_seller(seller_id, region_code, kept_load.get(seller_id, 0))
+
+    new_rows = []
+    to_close: List[int] = []
+    for customer_id, region, assignment_id in movers:
+        seller_id = balancer.pick(region)
+        if seller_id is None:
+            # Geen actieve verkoper in de regio: huidige koppeling behouden
+            stats["unmatched"] += 1
+            continue
+        if assignment_id is not None:
+            to_close.append(assignment_id)
+        new_rows.append(
+            {
+                "customer_id": customer_id,
+                "seller_id": seller_id,
+                "assigned_by": assigned_by,
+            }
+        )
+    stats["moved"] = len(new_rows)
+    stats["closed"] = len(to_close)
+
+    if dry_run:
+        db.rollback()
+        return stats
+
+    now = datetime.now(timezone.utc)
+    for start in range(0, len(to_close), _BATCH_SIZE):
+        chunk = to_close[start:start + _BATCH_SIZE]
+        db.execute(
+            update(CustomerSellerAssignment)
+            .where(CustomerSellerAssignment.id.in_(chunk))
+            .values(unassigned_at=now),
+            execution_options={"synchronize_session": False},
+        )
+    for start in range(0, len(new_rows), _BATCH_SIZE):
+        db.execute(insert(CustomerSellerAssignment), new_rows[start:start + _BATCH_SIZE])
+
+    db.commit()
+    logger.info("Territory rebalance klaar: %s", stats)
+    return stats
@@ -0,0 +1,74 @@
+import gzip
+import json
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.core.compression import CompressionMiddleware, negotiate
+from app.core.streaming import iter_json_list, stream_json_list
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("klein")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((b"x" * 60 for _ in range(10)), media_type="text/plain")
+
+    return TestClient(app)
+
+
+def test_negotiate_respects_q_values():
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("gzip;q=0, deflate") is None
+    assert negotiate("identity") is None
+    assert negotiate("*") in ("br", "gzip")
+
+
+def test_small_responses_are_not_compressed():
+    response = _client().get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == "klein"
+
+
+def test_streamed_response_is_gzipped_incrementally():
+    client = _client()
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in response.headers["vary"].lower()
+        assert "content-length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw) == b"x" * 600
+
+
+def _produce(db: Session):
+    rows = db.execute(text("SELECT value FROM (SELECT 1 AS value UNION ALL SELECT 2 UNION ALL SELECT 3)"))
+    return None, (json.dumps({"value": value}).encode() for (value,) in rows)
+
+
+def test_streamed_json_list_is_valid_json_and_closes_session():
+    engine = create_engine("sqlite://")
+    sessions = []
+
+    def open_session():
+        sessions.append(Session(engine))
+        return sessions[-1]
+
+    body = b"".join(iter_json_list(open_session, _produce, chunk_rows=2))
+    assert json.loads(body) == {"items": [{"value": 1}, {"value": 2}, {"value": 3}], "total": 3}
+    assert sessions[0].get_bind() is engine
+
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1)
+    app.get("/items")(lambda: stream_json_list(open_session, lambda db: (0, iter(()))))
+    response = TestClient(app).get("/items", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == {"items": [], "total": 0}
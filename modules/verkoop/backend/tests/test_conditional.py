@@ -0,0 +1,74 @@
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.core.conditional import conditional_response, etag_matches
+from app.db.versions import table_version
+
+
+def test_etag_matching_is_weak_and_handles_lists():
+    etag = 'W/"abc"'
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"x", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abd"', etag)
+    assert not etag_matches(None, etag)
+
+
+def _client(state: dict) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/items")
+    def items(request: Request):
+        def build():
+            state["builds"] += 1
+            return JSONResponse({"items": [1, 2, 3]})
+
+        return conditional_response(request, state["version"], build)
+
+    return TestClient(app)
+
+
+def test_not_modified_skips_building_the_payload():
+    state = {"version": "sellers:1", "builds": 0}
+    client = _client(state)
+
+    first = client.get("/items")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    again = client.get("/items", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert again.content == b""
+    assert state["builds"] == 1
+
+    # andere query-string of nieuwe versie → andere ETag
+    assert client.get("/items?page=2").headers["etag"] != etag
+    state["version"] = "sellers:2"
+    assert client.get("/items", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_without_version_there_is_no_etag():
+    state = {"version": None, "builds": 0}
+    response = _client(state).get("/items", headers={"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+def test_table_version_reads_counters_and_degrades_gracefully():
+    engine = create_engine("sqlite://")
+    with Session(engine) as db:
+        assert table_version(db, ["sellers"]) is None
+
+        db.execute(text("CREATE TABLE table_versions (table_name TEXT PRIMARY KEY, version INTEGER)"))
+        db.execute(text("CREATE TABLE table_version_log (table_name TEXT, xact_id INTEGER, PRIMARY KEY (table_name, xact_id))"))
+        db.execute(text("INSERT INTO table_versions VALUES ('sellers', 7)"))
+        db.execute(text("INSERT INTO table_version_log VALUES ('sellers', 100), ('sellers', 101), ('customer_shadows', 102)"))
+        assert table_version(db, ["sellers", "customer_shadows", "customer_seller_assignments"]) == (
+            "sellers:7.2;customer_shadows:0.1;customer_seller_assignments:0.0"
+        )
@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.pool import NullPool
+
+from app.db.engine import InstrumentedQueuePool, _statement_timeout_ms, build_engine, pool_stats, statement_timeout
+
+
+def _engine():
+    return build_engine(
+        "sqlite://",
+        pool_size=2,
+        max_overflow=1,
+        pool_recycle=60,
+        pool_timeout=1,
+    )
+
+
+def test_pool_stats_counts_checkouts():
+    engine = _engine()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert pool_stats(engine)["checked_out"] == 1
+
+    stats = pool_stats(engine)
+    assert stats["checkouts"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["checkout_timeouts"] == 0
+
+
+def test_dispose_keeps_instrumented_pool():
+    engine = _engine()
+    engine.dispose()
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+
+
+def test_statement_timeout_is_scoped():
+    assert _statement_timeout_ms.get() is None
+    with statement_timeout(30_000):
+        assert _statement_timeout_ms.get() == 30_000
+    assert _statement_timeout_ms.get() is None
+
+
+class _Captured(Exception):
+    pass
+
+
+def _connect_params(engine):
+    captured = {}
+
+    @event.listens_for(engine, "do_connect")
+    def _capture(_dialect, _record, _cargs, cparams):
+        captured.update(cparams)
+        raise _Captured()
+
+    with pytest.raises(_Captured):
+        engine.connect()
+    return captured
+
+
+def test_transaction_pooler_mode_uses_nullpool_without_session_state():
+    engine = build_engine(
+        "postgresql+psycopg://u:p@localhost:6432/db",
+        pool_size=0,
+        max_overflow=0,
+        pool_recycle=60,
+        pool_timeout=1,
+        statement_timeout_ms=15000,
+        transaction_pooler=True,
+    )
+    assert isinstance(engine.pool, NullPool)
+    params = _connect_params(engine)
+    assert params["prepare_threshold"] is None
+    assert "options" not in params
+
+
+def test_direct_mode_sets_statement_timeout_as_startup_option():
+    engine = build_engine(
+        "postgresql+psycopg://u:p@localhost:5432/db",
+        pool_size=2,
+        max_overflow=0,
+        pool_recycle=60,
+        pool_timeout=1,
+        statement_timeout_ms=15000,
+    )
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    params = _connect_params(engine)
+    assert params["options"] == "-c statement_timeout=15000"
+    assert "prepare_threshold" not in params
@@ -0,0 +1,47 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import HTTP_REQUESTS, PrometheusMiddleware, metrics_response
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/metrics")
+    def metrics():
+        return metrics_response()
+
+    return app
+
+
+def test_requests_are_labelled_by_route_template():
+    client = TestClient(_app())
+    before = HTTP_REQUESTS.labels("GET", "/items/{item_id}", "200")._value.get()
+    client.get("/items/1")
+    client.get("/items/2")
+    assert HTTP_REQUESTS.labels("GET", "/items/{item_id}", "200")._value.get() == before + 2
+
+    body = client.get("/metrics").text
+    assert 'verkoop_http_requests_total{method="GET",route="/items/{item_id}",status="200"}' in body
+
+
+def test_pool_gauges_are_labelled_per_engine():
+    from sqlalchemy import create_engine, text
+
+    from app.core.metrics import DB_POOL_IN_USE, instrument_engine
+
+    primary, replica = create_engine("sqlite://"), create_engine("sqlite://")
+    instrument_engine(primary, "primary")
+    instrument_engine(replica, "replica")
+    before = {name: DB_POOL_IN_USE.labels(name)._value.get() for name in ("primary", "replica")}
+
+    with replica.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert DB_POOL_IN_USE.labels("replica")._value.get() == before["replica"] + 1
+        assert DB_POOL_IN_USE.labels("primary")._value.get() == before["primary"]
+    assert DB_POOL_IN_USE.labels("replica")._value.get() == before["replica"]
@@ -0,0 +1,108 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.services.partitions import (
+    _add_months,
+    _month_of,
+    apply_retention,
+    create_partition,
+    partition_check,
+    partition_name,
+)
+
+
+def test_add_months_crosses_year_boundaries():
+    assert _add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert _add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert _add_months(date(2024, 5, 1), -24) == date(2022, 5, 1)
+
+
+def test_month_of_truncates_to_first_day():
+    assert _month_of(datetime(2024, 7, 31, 23, 59, tzinfo=timezone.utc)) == date(2024, 7, 1)
+
+
+def test_partition_name():
+    assert partition_name("audit_log", date(2024, 3, 1)) == "audit_log_p202403"
+
+
+def test_apply_retention_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        apply_retention(None, "audit_log", keep_months=12, mode="truncate")
+
+
+class _Result:
+    def __init__(self, value=None, rowcount=0):
+        self._value = value
+        self.rowcount = rowcount
+
+    def scalar(self):
+        return self._value
+
+    def scalars(self):
+        return iter(self._value or [])
+
+
+class _FakeConn:
+    """Antwoordt op catalogus-queries; onthoudt de DDL/DML in volgorde."""
+
+    def __init__(self, default_months=(), partitions=()):
+        self.default_months = list(default_months)
+        self.partitions = list(partitions)
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "partdefid" in sql:
+            return _Result(True)
+        if "date_trunc('month'" in sql:
+            return _Result(self.default_months)
+        if "pg_partitioned_table" in sql:
+            return _Result(1)
+        if "pg_inherits" in sql:
+            return _Result(self.partitions)
+        if "SELECT EXISTS" in sql:
+            return _Result(bool(self.default_months))
+        self.statements.append(sql)
+        return _Result(rowcount=7)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_create_partition_without_stranded_rows_is_plain_create():
+    conn = _FakeConn()
+    assert create_partition(conn, "domain_events", date(2025, 3, 1)) == "domain_events_p202503"
+    assert len(conn.statements) == 1
+    assert "PARTITION OF domain_events FOR VALUES FROM ('2025-03-01') TO ('2025-04-01')" in conn.statements[0]
+
+
+def test_create_partition_moves_rows_out_of_default():
+    conn = _FakeConn(default_months=[date(2025, 3, 1)])
+    create_partition(conn, "audit_log", date(2025, 3, 1))
+    detach, create, move, attach = conn.statements
+    assert detach == "ALTER TABLE audit_log DETACH PARTITION audit_log_default"
+    assert "CREATE TABLE IF NOT EXISTS audit_log_p202503" in create
+    assert 'DELETE FROM audit_log_default WHERE "when" >= :lo' in move
+    assert attach == "ALTER TABLE audit_log ATTACH PARTITION audit_log_default DEFAULT"
+
+
+def test_partition_check_reports_missing_month_and_default_rows():
+    class _Engine:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def connect(self):
+            return self.conn
+
+    next_month = _add_months(_month_of(), 1)
+    healthy = [partition_name("audit_log", next_month), partition_name("domain_events", next_month)]
+    assert partition_check(_Engine(_FakeConn(partitions=healthy)))() == {"next_month": next_month.isoformat()}
+
+    with pytest.raises(RuntimeError, match="audit_log_default bevat rijen"):
+        partition_check(_Engine(_FakeConn(default_months=[date(2020, 1, 1)], partitions=healthy)))()
+    with pytest.raises(RuntimeError, match="ontbreekt"):
+        partition_check(_Engine(_FakeConn()))()
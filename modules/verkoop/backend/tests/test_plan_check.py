@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from app.db.plan_check import HotPath, PlannedStatement, check_plans, seq_scanned_tables
+
+
+def _plan(*children, node="Limit", cost=10.0, relation=None):
+    plan = {"Node Type": node, "Total Cost": cost, "Plans": list(children)}
+    if relation:
+        plan["Relation Name"] = relation
+    return plan
+
+
+SEQ_ASSIGNMENTS = _plan(_plan(node="Seq Scan", relation="customer_seller_assignments"), cost=900.0)
+INDEX_SHADOWS = _plan(_plan(node="Index Scan", relation="customer_shadows"), cost=8.0)
+
+HOT_PATHS = {
+    "lookup": HotPath("lookup", lambda db: None, lambda db, arg: None),
+    "balancer": HotPath(
+        "balancer", lambda db: None, lambda db, arg: None, (("customer_seller_assignments", "group by"),)
+    ),
+}
+ROWS = {"customer_seller_assignments": 200_000, "customer_shadows": 100_000, "sellers": 50}
+
+
+def test_seq_scanned_tables_walks_nested_plans():
+    plan = _plan(_plan(_plan(node="Seq Scan", relation="sellers"), INDEX_SHADOWS))
+    assert seq_scanned_tables(plan) == ["sellers"]
+
+
+def test_seq_scan_on_large_table_is_a_violation():
+    planned = [PlannedStatement("lookup", 0, "SELECT * FROM customer_seller_assignments WHERE x = 1", SEQ_ASSIGNMENTS)]
+    violations = check_plans(planned, HOT_PATHS, ROWS)
+    assert [(v.key, v.kind) for v in violations] == [("lookup#0", "seq_scan")]
+
+
+def test_allowlist_matches_statement_fragment_and_small_tables_pass():
+    allowed = PlannedStatement("balancer", 0, "SELECT count(id) FROM customer_seller_assignments GROUP BY seller_id", SEQ_ASSIGNMENTS)
+    other = PlannedStatement("balancer", 1, "SELECT * FROM customer_seller_assignments", SEQ_ASSIGNMENTS)
+    small = PlannedStatement("lookup", 0, "SELECT * FROM sellers", _plan(node="Seq Scan", relation="sellers"))
+    violations = check_plans([allowed, other, small], HOT_PATHS, ROWS)
+    assert [v.key for v in violations] == ["balancer#1"]
+
+
+def test_cost_jump_against_baseline():
+    planned = [PlannedStatement("lookup", 0, "SELECT 1", _plan(cost=900.0))]
+    assert check_plans(planned, HOT_PATHS, ROWS, baseline={"lookup#0": 500.0}) == []
+    jumped = check_plans(planned, HOT_PATHS, ROWS, baseline={"lookup#0": 400.0})
+    assert [v.kind for v in jumped] == ["cost"]
+    # kleine absolute verschillen tellen niet (8 → 20 is ruis)
+    tiny = [PlannedStatement("lookup", 0, "SELECT 1", _plan(cost=20.0))]
+    assert check_plans(tiny, HOT_PATHS, ROWS, baseline={"lookup#0": 8.0}) == []
+
+
+@pytest.mark.skipif(
+    not os.getenv("PLAN_CHECK_DATABASE_URL"),
+    reason="PLAN_CHECK_DATABASE_URL (geseede Postgres, zie benchmarks/README.md) niet gezet",
+)
+def test_hot_paths_have_no_unexpected_seq_scans():
+    from sqlalchemy import create_engine
+
+    from app.db.plan_check import report, run_checks
+    from app.scripts.check_query_plans import HOT_PATHS as VERKOOP_HOT_PATHS
+
+    engine = create_engine(os.environ["PLAN_CHECK_DATABASE_URL"])
+    planned, violations = run_checks(engine, VERKOOP_HOT_PATHS)
+    assert planned
+    assert not violations, report(planned, violations)
@@ -0,0 +1,45 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.db import query_stats
+from app.db.query_stats import QueryStats, fingerprint
+
+
+def test_fingerprint_normalises_literals_and_params():
+    a = fingerprint("SELECT * FROM customers WHERE lower(email) = 'A@x.mx' AND id IN (1, 2, 3)")
+    b = fingerprint("select *  from customers where lower(email) = %(email_1)s and id in (%(id_1)s)")
+    assert a == b == "select * from customers where lower(email) = ? and id in (...)"
+    assert fingerprint("SELECT x::int FROM t LIMIT :limit") == "select x::int from t limit ?"
+
+
+def test_percentiles_per_fingerprint():
+    stats = QueryStats(window=100)
+    for ms in range(1, 101):
+        stats.record(f"SELECT * FROM sellers WHERE id = {ms}", "GET /sellers", float(ms))
+
+    top = stats.snapshot()["fingerprints"][0]
+    assert top["count"] == 100
+    assert top["p50_ms"] == 51.0
+    assert top["p99_ms"] == 99.0
+    assert stats.snapshot()["routes"][0]["route"] == "GET /sellers"
+
+
+def test_engine_hook_records_route(monkeypatch):
+    stats = QueryStats()
+    monkeypatch.setattr(query_stats, "stats", stats)
+    engine = create_engine("sqlite://")
+    query_stats.instrument_engine(engine, slow_ms=0)
+
+    app = FastAPI()
+    app.add_middleware(query_stats.QueryStatsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        with engine.connect() as conn:
+            return {"value": conn.execute(text("SELECT :v"), {"v": item_id}).scalar()}
+
+    TestClient(app).get("/items/3")
+    routes = stats.snapshot()["routes"]
+    assert routes[0]["route"] == "GET /items/{item_id}"
+    assert routes[0]["fingerprint"] == "select ?"
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+from app.core.readiness import Readiness
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_readyz_serves_cached_aggregate_with_durations():
+    calls = {"db": 0}
+
+    def database():
+        calls["db"] += 1
+        return {"checked_out": 0}
+
+    def smtp():
+        raise ConnectionError("geen smtp")
+
+    readiness = Readiness()
+    readiness.register("database", database)
+    readiness.register("smtp", smtp, critical=False)
+
+    ready, body = readiness.status()
+    assert not ready and body["checks"] == {}
+
+    asyncio.run(readiness.refresh())
+    for _ in range(3):
+        response = readiness.response(module="verkoop")
+    assert response.status_code == 200
+    # probes lezen enkel de cache
+    assert calls["db"] == 1
+
+    ready, body = readiness.status()
+    assert ready and body["status"] == "ready"
+    assert body["checks"]["database"]["detail"] == {"checked_out": 0}
+    assert body["checks"]["smtp"]["ok"] is False
+    assert "geen smtp" in body["checks"]["smtp"]["error"]
+    assert body["checks"]["smtp"]["duration_ms"] >= 0
+
+
+def test_critical_failure_timeout_and_staleness():
+    release = threading.Event()
+    clock = _Clock()
+
+    def hanging():
+        release.wait(5)
+
+    async def slow_async():
+        await asyncio.sleep(5)
+
+    readiness = Readiness(timeout=0.05, stale_after=30, clock=clock)
+    readiness.register("database", hanging)
+    readiness.register("downstream", slow_async, critical=False)
+
+    async def scenario():
+        await readiness.refresh()
+        first = readiness.status()
+        # de vorige thread hangt nog: geen tweede starten
+        await readiness.refresh()
+        second = readiness.status()
+        release.set()
+        return first, second
+
+    (ready, body), (_, again) = asyncio.run(scenario())
+    assert not ready
+    assert body["checks"]["database"]["error"] == "timeout na 0.05s"
+    assert body["checks"]["downstream"]["error"] == "timeout na 0.05s"
+    assert again["checks"]["database"]["error"] == "vorige check loopt nog"
+    assert readiness.response().status_code == 503
+
+    ok = Readiness(stale_after=30, clock=clock)
+    ok.register("database", lambda: None)
+    asyncio.run(ok.refresh())
+    assert ok.status()[0]
+    clock.now = 31
+    ready, body = ok.status()
+    assert not ready and body["stale"]
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.db.replica import STICKY_HEADER, ReadYourWritesMiddleware, ReplicaRouter, is_sticky
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _router(lags, **kwargs):
+    clock = FakeClock()
+    router = ReplicaRouter(create_engine("sqlite://"), create_engine("sqlite://"), clock=clock, **kwargs)
+    measured = iter(lags)
+
+    def _measure():
+        value = next(measured)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    router._measure = _measure
+    return router, clock
+
+
+def test_without_replica_everything_goes_to_primary():
+    primary = create_engine("sqlite://")
+    router = ReplicaRouter(primary)
+    assert router.route() == (primary, "no_replica")
+
+
+def test_lag_aware_fallback_uses_last_background_measurement():
+    router, clock = _router([0.5, 30.0, OSError("down")], max_lag_seconds=5.0, check_interval=2.0)
+
+    # nog geen meting: primary
+    assert router.route() == (router.primary, "replica_down")
+
+    router.refresh()
+    assert router.route() == (router.replica, "replica")
+    clock.now += 1.0  # route() meet zelf nooit
+    assert router.route() == (router.replica, "replica")
+
+    router.refresh()
+    assert router.route() == (router.primary, "lag")
+
+    router.refresh()
+    assert router.route() == (router.primary, "replica_down")
+
+
+def test_stale_measurement_falls_back_to_primary():
+    router, clock = _router([0.0], check_interval=2.0, probe_timeout=2.0)
+    router.refresh()
+    assert router.route() == (router.replica, "replica")
+
+    clock.now += router.stale_after + 0.1  # achtergrondtaak hangt of loopt niet
+    assert router.route() == (router.primary, "replica_down")
+
+
+def test_background_probe_is_bounded_and_not_duplicated():
+    router, _ = _router([], check_interval=60.0, probe_timeout=0.05)
+    release = threading.Event()
+    calls = []
+
+    def _hanging_measure():
+        calls.append(1)
+        release.wait(5)
+        return 0.0
+
+    router._measure = _hanging_measure
+
+    async def scenario():
+        await router.start()  # hangt niet langer dan probe_timeout
+        await router._probe_once()  # vorige meting loopt nog: geen tweede thread
+        assert router.route() == (router.primary, "replica_down")
+        await router.stop()
+        release.set()
+
+    asyncio.run(scenario())
+    assert calls == [1]
+
+
+def test_sticky_reads_skip_the_replica():
+    router, _ = _router([0.0])
+    assert router.route(sticky=True) == (router.primary, "sticky")
+
+
+def test_is_sticky_checks_expiry_from_cookie_or_header():
+    assert is_sticky({"rw": "200"}, {}, "rw", now=100.0)
+    assert is_sticky({}, {STICKY_HEADER: "200"}, "rw", now=100.0)
+    assert not is_sticky({"rw": "50"}, {}, "rw", now=100.0)
+    assert not is_sticky({"rw": "garbage"}, {}, "rw", now=100.0)
+    assert not is_sticky({}, {}, "rw", now=100.0)
+
+
+def test_write_request_sets_read_your_writes_cookie():
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, cookie_name="verkoop_rw", sticky_seconds=10)
+
+    @app.get("/items")
+    def read_items():
+        return []
+
+    @app.post("/items")
+    def create_item():
+        return {"id": 1}
+
+    @app.delete("/items")
+    def delete_item():
+        from fastapi import HTTPException
+
+        raise HTTPException(status_code=404)
+
+    client = TestClient(app)
+    assert "verkoop_rw" not in client.get("/items").cookies
+    assert "verkoop_rw" not in client.delete("/items").cookies
+
+    response = client.post("/items")
+    assert is_sticky(response.cookies, {}, "verkoop_rw")
+    assert response.headers[STICKY_HEADER] == response.cookies["verkoop_rw"]
+    assert float(response.cookies["verkoop_rw"]) <= time.time() + 10
+
+
+def test_read_engine_is_chosen_once_per_request(monkeypatch):
+    from starlette.requests import Request
+
+    from app.db import session
+
+    choices = iter([session.engine, create_engine("sqlite://")])
+    monkeypatch.setattr(session.read_router, "engine_for", lambda sticky: next(choices))
+    request = Request({"type": "http", "headers": [], "query_string": b""})
+
+    # versie en rijen uit dezelfde database, ook als de router intussen wisselt
+    first = session.open_read_session(request)
+    second = session.open_read_session(request)
+    assert first.get_bind() is second.get_bind() is session.engine
+    first.close()
+    second.close()
@@ -0,0 +1,196 @@
+import os
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app.services.sales_aggregates import _trigger_function, period_start_for, trigger_ddl
+
+
+def test_period_start_is_utc_month():
+    mexico = timezone(timedelta(hours=-6))
+    # 31 jan 20:00 in Mexico-Stad = 1 feb 02:00 UTC
+    assert period_start_for(datetime(2025, 1, 31, 20, 0, tzinfo=mexico)) == date(2025, 2, 1)
+
+
+def test_one_statement_trigger_per_event_and_source_table():
+    ddl = "\n".join(trigger_ddl())
+    for table in ("quotes", "sales_orders", "sales_order_lines"):
+        for suffix in ("ins", "upd", "del"):
+            assert f"CREATE TRIGGER trg_seller_sales_{table}_{suffix}" in ddl
+    assert ddl.count("FOR EACH STATEMENT") == 9
+    # enkel de lijnen van een verwijderde order, vóór de cascade
+    assert ddl.count("FOR EACH ROW") == 1
+    assert "BEFORE DELETE ON sales_orders" in ddl
+
+
+def test_triggers_add_deltas_instead_of_recomputing():
+    body = _trigger_function("quotes")
+    # quote_count en quotes_converted komen uit dezelfde rij, met dezelfde maand
+    assert "1 AS quote_count, (r.status = 'accepted')::int AS quotes_converted" in body
+    assert "quote_count = seller_sales_aggregates.quote_count + EXCLUDED.quote_count" in body
+    assert "refresh_seller_sales_aggregates" not in body
+    assert "FROM quotes" not in body
+
+
+def test_created_at_is_backfilled_not_stamped():
+    ddl = "\n".join(trigger_ddl())
+    assert "ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ;" in ddl
+    assert "NOT NULL DEFAULT now()" not in ddl
+    assert "WHERE entity_type = 'sales_order'" in ddl
+
+
+def test_update_trigger_only_reacts_to_relevant_columns():
+    body = _trigger_function("sales_order_lines")
+    assert "(o.order_id, o.discount_percent) IS DISTINCT FROM (n.order_id, n.discount_percent)" in body
+    # lijnen hangen aan de verkoper/maand van hun order
+    assert "JOIN sales_orders o ON o.id = r.order_id" in body
+
+
+def test_order_lines_follow_a_changed_order_key():
+    body = _trigger_function("sales_orders")
+    assert "WHERE (o.seller_id, o.created_at) IS DISTINCT FROM (n.seller_id, n.created_at)) r\n    JOIN sales_order_lines l" in body
+
+
+# -------------------------------
+# Tegen PostgreSQL
+# -------------------------------
+needs_postgres = pytest.mark.skipif(
+    not os.getenv("VERKOOP_TEST_DATABASE_URL"),
+    reason="VERKOOP_TEST_DATABASE_URL (PostgreSQL) niet gezet",
+)
+
+# bronnen zoals op een oudere databank: quotes / sales_orders nog zonder created_at
+_LEGACY_TABLES = [
+    "CREATE TABLE sellers (id int PRIMARY KEY)",
+    "CREATE TABLE quotes (id serial PRIMARY KEY, seller_id int REFERENCES sellers (id) ON DELETE SET NULL,"
+    " status varchar(20) NOT NULL DEFAULT 'draft')",
+    "CREATE TABLE sales_orders (id serial PRIMARY KEY, seller_id int REFERENCES sellers (id) ON DELETE SET NULL,"
+    " total numeric(14, 2) NOT NULL DEFAULT 0)",
+    "CREATE TABLE sales_order_lines (id serial PRIMARY KEY,"
+    " order_id int NOT NULL REFERENCES sales_orders (id) ON DELETE CASCADE, discount_percent numeric(5, 2))",
+    "CREATE TABLE domain_events (id serial PRIMARY KEY, event_type varchar(100) NOT NULL,"
+    " entity_type varchar(50) NOT NULL, entity_id varchar(100), created_at timestamptz NOT NULL)",
+    "INSERT INTO sellers VALUES (1), (2)",
+    "INSERT INTO quotes (seller_id, status) VALUES (1, 'accepted'), (1, 'draft')",
+    "INSERT INTO sales_orders (seller_id, total) VALUES (1, 100)",
+    "INSERT INTO sales_order_lines (order_id, discount_percent) VALUES (1, 10)",
+    "INSERT INTO domain_events (event_type, entity_type, entity_id, created_at) VALUES"
+    " ('quote.created', 'quote', '1', '2024-03-10T12:00Z'),"
+    " ('quote.converted', 'quote', '1', '2024-03-12T08:00Z'),"
+    " ('order.created', 'sales_order', '1', '2024-03-12T09:00Z')",
+]
+
+_MARCH = date(2024, 3, 1)
+
+
+@pytest.fixture
+def engine():
+    from sqlalchemy import create_engine
+
+    from app.models.sales_aggregate import SellerSalesAggregate
+    from app.models.seller import Seller  # noqa: F401  (doel van de foreign key)
+    from app.services.sales_aggregates import ensure_sales_aggregate_triggers
+
+    schema = f"sales_agg_{uuid.uuid4().hex[:8]}"
+    engine = create_engine(
+        os.environ["VERKOOP_TEST_DATABASE_URL"],
+        connect_args={"options": f"-csearch_path={schema}"},
+    )
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+        for statement in _LEGACY_TABLES:
+            conn.execute(text(statement))
+        SellerSalesAggregate.__table__.create(conn)
+    with engine.begin() as conn:
+        ensure_sales_aggregate_triggers(conn)
+    _rebuild(engine)
+
+    yield engine
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    engine.dispose()
+
+
+def _rebuild(engine):
+    from sqlalchemy.orm import Session
+
+    from app.services.sales_aggregates import rebuild_sales_aggregates
+
+    with Session(engine) as db:
+        rebuild_sales_aggregates(db)
+
+
+def _run(engine, *statements):
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+
+
+def _aggregates(engine):
+    """(verkoper, maand) -> cijfers; rijen die door deltas op nul uitkomen tellen niet."""
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT seller_id, period_start, quote_count, quotes_converted, order_count,"
+            " order_revenue, discount_sum, discount_count FROM seller_sales_aggregates"
+        )).all()
+    return {(r[0], r[1]): tuple(r[2:]) for r in rows if any(r[2:])}
+
+
+@needs_postgres
+def test_history_is_dated_from_domain_events(engine):
+    with engine.connect() as conn:
+        created = dict(conn.execute(text("SELECT id, created_at FROM quotes")).all())
+        nullable = dict(conn.execute(text(
+            "SELECT table_name, is_nullable FROM information_schema.columns"
+            " WHERE table_schema = current_schema() AND column_name = 'created_at'"
+            " AND table_name IN ('quotes', 'sales_orders')"
+        )).all())
+
+    assert created[1] == datetime(2024, 3, 10, 12, tzinfo=timezone.utc)
+    # geen event: geen verzonnen datum, en de kolom blijft nullable
+    assert created[2] is None
+    assert nullable == {"quotes": "YES", "sales_orders": "NO"}
+    assert _aggregates(engine) == {(1, _MARCH): (1, 1, 1, 100, 10, 1)}
+
+
+@needs_postgres
+def test_trigger_deltas_match_a_full_rebuild(engine):
+    april = "'2024-04-02T10:00Z'"
+    _run(
+        engine,
+        # meerdere rijen per statement, over twee verkopers en maanden
+        f"INSERT INTO quotes (seller_id, status, created_at) VALUES (1, 'sent', {april}), (2, 'sent', {april}),"
+        " (2, 'accepted', '2024-03-20T10:00Z')",
+        f"INSERT INTO sales_orders (seller_id, total, created_at) VALUES (2, 50, {april}), (1, 70, {april})",
+        "INSERT INTO sales_order_lines (order_id, discount_percent) VALUES (2, 5), (2, NULL), (3, 20)",
+        "UPDATE quotes SET status = 'accepted' WHERE status = 'sent' AND seller_id = 1",
+        "UPDATE quotes SET created_at = '2024-03-15T10:00Z' WHERE created_at IS NULL",
+    )
+    after_inserts = _aggregates(engine)
+    assert after_inserts[(1, _MARCH)] == (2, 1, 1, 100, 10, 1)
+    assert after_inserts[(1, date(2024, 4, 1))] == (1, 1, 1, 70, 20, 1)
+
+    _run(
+        engine,
+        # order met lijnen naar een andere verkoper en maand: lijnen verhuizen mee
+        f"UPDATE sales_orders SET seller_id = 2, created_at = {april} WHERE id = 1",
+        "UPDATE sales_order_lines SET discount_percent = 8 WHERE order_id = 2 AND discount_percent = 5",
+        "UPDATE sales_order_lines SET order_id = 1 WHERE order_id = 3",
+        "UPDATE sales_orders SET total = total + 1",
+        # cascade: de lijnen verdwijnen na de order
+        "DELETE FROM sales_orders WHERE id = 2",
+        "DELETE FROM quotes WHERE status = 'draft'",
+    )
+    by_triggers = _aggregates(engine)
+    _rebuild(engine)
+    assert _aggregates(engine) == by_triggers
+
+    # verkoper weg: zijn rijen verdwijnen (cascade), SET NULL op de bronnen boekt niets
+    _run(engine, "DELETE FROM sellers WHERE id = 2")
+    by_triggers = _aggregates(engine)
+    assert {seller for seller, _ in by_triggers} == {1}
+    _rebuild(engine)
+    assert _aggregates(engine) == by_triggers
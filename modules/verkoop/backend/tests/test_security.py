@@ -0,0 +1,108 @@
+import time
+
+import jwt
+import pytest
+
+from app.core import security
+from app.core.config import settings
+from app.core.security import AuthError, KeyRing, UserContext, verify_token
+
+
+@pytest.fixture(autouse=True)
+def _fresh_keyring(monkeypatch):
+    monkeypatch.setattr(settings, "CORE_JWT_SECRET", "current-secret-0123456789abcdef0123")
+    monkeypatch.setattr(settings, "CORE_JWT_KID", "k2")
+    monkeypatch.setattr(settings, "CORE_JWT_KEYS", "k1:previous-secret-0123456789abcdef012")
+    monkeypatch.setattr(security, "_keyring", KeyRing(refresh_seconds=60))
+    security._token_cache.clear()
+    yield
+    security._token_cache.clear()
+
+
+def _token(secret="current-secret-0123456789abcdef0123", kid="k2", **claims):
+    payload = {"sub": "7", "role": "seller", "type": "access", "exp": int(time.time()) + 300}
+    payload.update(claims)
+    headers = {"kid": kid} if kid else None
+    return jwt.encode(payload, secret, algorithm="HS256", headers=headers)
+
+
+def test_scope_check_uses_wildcards():
+    ctx = UserContext(sub="1", scopes=["verkoop:*"])
+    assert ctx.has_scope("verkoop:admin")
+    assert not ctx.has_scope("magazijn:read")
+    assert UserContext(sub="1", scopes=["*"]).has_scope("magazijn:read")
+
+
+def test_role_maps_to_scopes_and_is_cached():
+    token = _token()
+    ctx = verify_token(token)
+    assert ctx.sub == "7"
+    assert ctx.has_scope("verkoop:read")
+    assert not ctx.has_scope("verkoop:admin")
+    assert verify_token(token) is ctx
+
+
+def test_rotated_keys_are_accepted():
+    assert verify_token(_token(secret="previous-secret-0123456789abcdef012", kid="k1")).sub == "7"
+    # oude tokens zonder kid: alle keys proberen
+    assert verify_token(_token(secret="previous-secret-0123456789abcdef012", kid=None)).sub == "7"
+
+
+def test_rejects_bad_tokens():
+    with pytest.raises(AuthError):
+        verify_token(_token(secret="wrong-secret-0123456789abcdef0123456"))
+    with pytest.raises(AuthError):
+        verify_token(_token(kid="unknown"))
+    with pytest.raises(AuthError):
+        verify_token(_token(type="refresh"))
+    with pytest.raises(AuthError):
+        verify_token(_token(exp=int(time.time()) - 3600))
+
+
+def test_unknown_kids_reload_at_most_once_per_interval(monkeypatch):
+    keyring = security.get_keyring()
+    reloads = []
+    monkeypatch.setattr(keyring, "reload", lambda: reloads.append(1))
+
+    for i in range(5):
+        assert keyring.candidates(f"random-{i}") == []
+    assert len(reloads) == 1
+
+    # na refresh_seconds mag een nieuwe (geroteerde) kid opnieuw een reload vragen
+    keyring._unknown_kid_at -= keyring.refresh_seconds
+    keyring.candidates("k3")
+    assert len(reloads) == 2
+
+
+def test_cache_is_bounded():
+    cache = security.TokenCache(max_size=2)
+    for i in range(3):
+        cache.put(str(i), UserContext(sub=str(i)))
+    assert len(cache) == 2
+    assert cache.get("0", time.time()) is None
+
+
+def _request(headers=None):
+    from starlette.requests import Request
+
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/debug/pool", "headers": raw})
+
+
+def test_debug_endpoints_are_off_without_key(monkeypatch):
+    from fastapi import HTTPException
+
+    monkeypatch.setattr(settings, "DEBUG_ENDPOINTS_KEY", "")
+    with pytest.raises(HTTPException) as exc:
+        security.require_debug_key(_request({"X-Debug-Key": ""}))
+    assert exc.value.status_code == 404
+
+
+def test_debug_endpoints_require_matching_header(monkeypatch):
+    from fastapi import HTTPException
+
+    monkeypatch.setattr(settings, "DEBUG_ENDPOINTS_KEY", "s3cret")
+    with pytest.raises(HTTPException) as exc:
+        security.require_debug_key(_request({"X-Debug-Key": "wrong"}))
+    assert exc.value.status_code == 401
+    security.require_debug_key(_request({"X-Debug-Key": "s3cret"}))
@@ -0,0 +1,60 @@
+import json
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import literal, select
+
+from app.core.serialization import columns_for, dump_rows, iter_dump_rows
+from app.models.customer import CustomerShadow
+from app.schemas.customer import CustomerListItem
+
+_NOW = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+_VALUES = {
+    "id": 1,
+    "website_customer_id": "abc",
+    "email": "klant@example.com",
+    "first_name": "Marie",
+    "last_name": "Janssens",
+    "customer_type": "particulier",
+    "company_name": None,
+    "is_active": True,
+    "source": None,
+    "current_seller_id": None,
+    "current_seller_code": None,
+    "current_seller_name": None,
+    "created_at": _NOW,
+}
+
+
+def test_columns_follow_schema_fields_with_labelled_extras():
+    columns = columns_for(
+        CustomerListItem,
+        CustomerShadow,
+        current_seller_id=literal(1),
+        current_seller_code=literal("S-0001"),
+        current_seller_name=literal("Jan Peeters"),
+    )
+    assert list(select(*columns).selected_columns.keys()) == list(CustomerListItem.model_fields)
+
+
+def test_dump_rows_matches_fastapi_output():
+    Row = namedtuple("Row", list(_VALUES))
+    row = Row(**_VALUES)
+
+    adapter = TypeAdapter(List[CustomerListItem])
+    expected = json.dumps(jsonable_encoder(adapter.validate_python([row], from_attributes=True)))
+
+    assert json.loads(dump_rows(CustomerListItem, [row])) == json.loads(expected)
+    assert b'"created_at":"2026-01-01T12:00:00Z"' in dump_rows(CustomerListItem, [row])
+    assert [json.loads(item) for item in iter_dump_rows(CustomerListItem, [row])] == json.loads(expected)
+
+
+def test_streamed_list_tolerates_stored_emails_that_fail_validation():
+    # een ongeldig adres in de database mag de gestreamde lijst niet afbreken
+    Row = namedtuple("Row", list(_VALUES))
+    row = Row(**{**_VALUES, "email": "geen-adres"})
+    assert [json.loads(item)["email"] for item in iter_dump_rows(CustomerListItem, [row])] == ["geen-adres"]
@@ -0,0 +1,50 @@
+from app.services.territory import SellerLoadBalancer, TerritoryIndex
+
+
+def _index() -> TerritoryIndex:
+    index = TerritoryIndex()
+    index.add_postal_prefix("44", "MX-JAL")
+    index.add_postal_prefix("441", "MX-GDL-CENTRO")
+    index.add_city("Ciudad de México", "MX-CMX")
+    index.add_city("San Pedro", "MX-NL", state="Nuevo León")
+    index.add_state("Jalisco", "MX-JAL")
+    return index
+
+
+def test_longest_postal_prefix_wins():
+    index = _index()
+    assert index.resolve("44160") == "MX-GDL-CENTRO"
+    assert index.resolve("44520") == "MX-JAL"
+
+
+def test_city_and_state_fallback():
+    index = _index()
+    assert index.resolve(None, "CIUDAD DE MEXICO", None) == "MX-CMX"
+    assert index.resolve("99999", "San Pedro", "nuevo leon") == "MX-NL"
+    assert index.resolve(None, "Zapopan", "Jalisco") == "MX-JAL"
+    assert index.resolve(None, "Mérida", "Yucatán") is None
+
+
+def test_balancer_picks_least_loaded_seller():
+    balancer = SellerLoadBalancer()
+    balancer.add_seller(1, "MX-CMX", load=3)
+    balancer.add_seller(2, "MX-CMX", load=0)
+    balancer.add_seller(3, "MX-JAL", load=0)
+
+    picks = [balancer.pick("MX-CMX") for _ in range(5)]
+    assert picks[:3] == [2, 2, 2]
+    assert sorted(picks[3:]) == [1, 2]
+    assert balancer.pick("MX-YUC") is None
+
+
+def test_one_active_assignment_and_one_region_code_index():
+    from app.models.customer import CustomerSellerAssignment
+    from app.models.region import Region
+
+    indexes = {i.name: i for i in CustomerSellerAssignment.__table__.indexes}
+    assert indexes["ix_csa_active_customer"].unique
+    assert not indexes["ix_csa_active_seller"].unique
+
+    # enkel de benoemde index uit migrate_002, geen tweede UNIQUE-constraint
+    assert [i.name for i in Region.__table__.indexes if i.unique] == ["uq_regions_code"]
+    assert not Region.__table__.c.code.unique
@@ -0,0 +1,69 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import tracing
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+class _CollectingExporter:
+    def __init__(self):
+        self.spans = []
+
+    def submit(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    collector = _CollectingExporter()
+    monkeypatch.setattr(tracing, "_exporter", collector)
+    return collector
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(tracing.TracingMiddleware)
+
+    @app.get("/ping/{item_id}")
+    def ping(item_id: int):
+        with tracing.span("password.verify"):
+            pass
+        return tracing.outgoing_headers()
+
+    return app
+
+
+def test_incoming_traceparent_is_continued(exporter):
+    client = TestClient(_app())
+    response = client.get(
+        "/ping/1",
+        headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01", "X-Correlation-ID": "reg-42"},
+    )
+
+    assert response.headers["x-correlation-id"] == "reg-42"
+    assert response.headers["x-trace-id"] == TRACE_ID
+    # doorgegeven aan een volgende hop binnen dezelfde trace
+    assert response.json()["traceparent"].startswith(f"00-{TRACE_ID}-")
+    assert response.json()["x-correlation-id"] == "reg-42"
+
+    inner, server = exporter.spans
+    assert server.name == "GET /ping/{item_id}"
+    assert server.parent_id == "00f067aa0ba902b7"
+    assert inner.parent_id == server.span_id
+    assert server.attributes["http.status_code"] == 200
+
+
+def test_new_trace_without_headers(exporter):
+    response = TestClient(_app()).get("/ping/1")
+    assert len(response.headers["x-trace-id"]) == 32
+    assert response.headers["x-correlation-id"] == response.headers["x-trace-id"]
+
+
+def test_log_records_carry_ids():
+    record = logging.LogRecord("x", logging.INFO, __file__, 1, "msg", None, None)
+    tracing.CorrelationIdFilter().filter(record)
+    assert record.correlation_id == "-"
@@ -3,6 +3,7 @@ from fastapi import (
     Depends,
     HTTPException,
     Query,
+    Request,
     status,
     Body,
 )
@@ -10,10 +11,15 @@ from sqlalchemy.orm import Session
 from typing import Optional
 import uuid
 
-from deps import get_db, get_current_admin_user
+from deps import get_db, get_read_db, get_current_admin_user, open_read_db
 from models import Customer, CustomerType
 import crud
+from conditional import conditional_response
+from db_versions import table_version
+from serialization import encode_row, json_response
+from streaming import YIELD_PER, stream_json_list
 from schemas import (
+    CustomerListItem,
     CustomersListResponse,
     CustomerResponse,
     CustomerUpdate,
@@ -24,6 +30,9 @@ router = APIRouter(
     tags=["Admin Customers"],
 )
 
+# portal_status hangt ook van de registratietokens af
+_VERSION_TABLES = ["customers", "registration_tokens"]
+
 # =====================================================
 # LIST
 # =====================================================
@@ -34,7 +43,7 @@ router = APIRouter(
     summary="Admin – lijst alle klanten",
 )
 def admin_list_customers(
-    db: Session = Depends(get_db),
+    request: Request,
     admin: Customer = Depends(get_current_admin_user),
 
     skip: int = Query(0, ge=0),
@@ -47,21 +56,33 @@ def admin_list_customers(
     sort_by: str = Query("created_at", pattern="^(created_at|name)$"),
     sort_dir: str = Query("desc", pattern="^(asc|desc)$"),
 ):
-    items, total = crud.list_customers(
-        db=db,
-        skip=skip,
-        limit=limit,
-        search=search,
-        customer_type=customer_type,
-        status=status,
-        sort_by=sort_by,
-        sort_dir=sort_dir,
-        visibility="admin",
-    )
+    # Gestreamd (zelfde JSON als CustomersListResponse), rechtstreeks uit
+    # rijen met het laatste token voor portal_status (zie serialization.py)
+    def produce(db: Session):
+        query = crud.filter_customers_query(
+            db,
+            search=search,
+            customer_type=customer_type,
+            status=status,
+            visibility="admin",
+        )
+        total = query.count()
+        rows = (
+            crud.with_list_item_columns(crud.order_customers_query(query, sort_by, sort_dir))
+            .offset(skip)
+            .limit(limit)
+            .execution_options(yield_per=YIELD_PER)
+        )
+        return total, (encode_row(CustomerListItem, crud.customer_list_item(r)) for r in rows)
+
+    # admin-UI pollt: ongewijzigd → 304 na één PK-lookup
+    with open_read_db(request) as db:
+        version = table_version(db, _VERSION_TABLES)
 
-    return CustomersListResponse(
-        items=items,
-        total=total,
+    return conditional_response(
+        request,
+        version,
+        lambda: stream_json_list(lambda: open_read_db(request), produce),
     )
 
 # =====================================================
@@ -75,16 +96,20 @@ def admin_list_customers(
 )
 def admin_get_customer(
     customer_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     admin: Customer = Depends(get_current_admin_user),
 ):
-    customer = crud.get_customer(db, customer_id)
-    if not customer:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Customer not found",
-        )
-    return customer
+    def build():
+        customer = crud.get_customer(db, customer_id)
+        if not customer:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Customer not found",
+            )
+        return json_response(CustomerResponse.from_orm(customer).dict())
+
+    return conditional_response(request, table_version(db, _VERSION_TABLES), build)
 
 # =====================================================
 # UPDATE
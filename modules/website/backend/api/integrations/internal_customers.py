@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from deps import get_db
+from deps import get_read_db, open_read_db
 from models import Customer
 from schemas import CustomersListResponse, CustomerListItem
 from config import settings
 import crud
+from conditional import conditional_response
+from db_versions import table_version
+from serialization import encode_row, json_response
+from streaming import YIELD_PER, stream_json_list
 
 router = APIRouter(
     prefix="/api/internal/customers",
@@ -14,6 +18,10 @@ router = APIRouter(
 )
 
 
+# portal_status hangt ook van de registratietokens af
+_VERSION_TABLES = ["customers", "registration_tokens"]
+
+
 def verify_internal_key(internal_key: Optional[str]):
     """Beveiliging: verplicht 'X-Internal-Key' header."""
     if internal_key != settings.INTERNAL_API_KEY:
@@ -22,38 +30,47 @@ def verify_internal_key(internal_key: Optional[str]):
 
 @router.get("/", response_model=CustomersListResponse)
 def internal_list_customers(
-    db: Session = Depends(get_db),
+    request: Request,
     internal_key: str = Header(None, alias="X-Internal-Key"),
 ):
     verify_internal_key(internal_key)
 
-    items, total = crud.list_customers(
-        db=db,
-        search=None,
-        customer_type=None,
-        skip=0,
-        limit=5000,
-        status="active",
-        sort_by="created_at",
-        sort_dir="desc",
-    )
+    # Tot 5000 klanten: gestreamd uit een server-side cursor
+    def produce(db: Session):
+        query = crud.filter_customers_query(db, status="active")
+        total = query.count()
+        rows = (
+            crud.with_list_item_columns(crud.order_customers_query(query, "created_at", "desc"))
+            .limit(5000)
+            .execution_options(yield_per=YIELD_PER)
+        )
+        return total, (encode_row(CustomerListItem, crud.customer_list_item(r)) for r in rows)
 
-    return CustomersListResponse(
-        items=[CustomerListItem.from_orm(c) for c in items],
-        total=total,
+    # verkoop pollt deze lijst: ongewijzigd → 304 na één PK-lookup
+    with open_read_db(request) as db:
+        version = table_version(db, _VERSION_TABLES)
+
+    return conditional_response(
+        request,
+        version,
+        lambda: stream_json_list(lambda: open_read_db(request), produce),
     )
 
 
 @router.get("/{customer_id}", response_model=CustomerListItem)
 def internal_get_customer(
     customer_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     internal_key: str = Header(None, alias="X-Internal-Key"),
 ):
     verify_internal_key(internal_key)
 
-    customer: Customer = crud.get_customer(db, customer_id)
-    if not customer:
-        raise HTTPException(status_code=404, detail="Not found")
+    def build():
+        customer: Customer = crud.get_customer(db, customer_id)
+        if not customer:
+            raise HTTPException(status_code=404, detail="Not found")
+
+        return json_response(CustomerListItem.from_orm(customer).dict())
 
-    return CustomerListItem.from_orm(customer)
+    return conditional_response(request, table_version(db, _VERSION_TABLES), build)
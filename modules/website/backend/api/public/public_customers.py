@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
 
-from deps import get_db
+from conditional import conditional_response
+from db_versions import table_version
+from deps import get_read_db
 import crud
 from schemas import CustomersListResponse, CustomerListItem
+from serialization import json_response, validated
 
 router = APIRouter(
     prefix="/api/public/customers",
@@ -13,7 +16,8 @@ router = APIRouter(
 
 @router.get("/", response_model=CustomersListResponse)
 def public_list_customers(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     search: str | None = Query(None),
     customer_type: str | None = Query(None),
     skip: int = 0,
@@ -27,27 +31,41 @@ def public_list_customers(
     - = actief + wachtwoord ingesteld
     """
 
-    items, _ = crud.list_customers(
-        db=db,
-        search=search,
-        customer_type=customer_type,
-        skip=skip,
-        limit=limit,
-        status="active",
-        sort_by="created_at",
-        sort_dir="desc",
-    )
+    def build():
+        query = crud.filter_customers_query(
+            db,
+            search=search,
+            customer_type=customer_type,
+            status="active",
+        )
+        rows = (
+            crud.with_list_item_columns(
+                crud.order_customers_query(query, "created_at", "desc")
+            )
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+        # 🔒 KRITIEKE FILTER:
+        # enkel klanten die effectief kunnen inloggen
+        completed_customers = [
+            validated(CustomerListItem, crud.customer_list_item(row))
+            for row in rows
+            if row.has_login
+        ]
+
+        # Rechtstreeks als JSON: geen tweede validatie via response_model
+        return json_response(
+            {
+                "items": completed_customers,
+                "total": len(completed_customers),
+            }
+        )
 
-    # 🔒 KRITIEKE FILTER:
-    # enkel klanten die effectief kunnen inloggen
-    completed_customers = [
-        customer for customer in items if customer.has_login
-    ]
-
-    return CustomersListResponse(
-        items=[
-            CustomerListItem.from_orm(customer)
-            for customer in completed_customers
-        ],
-        total=len(completed_customers),
+    # verkoop pollt deze lijst bij elke sync: ongewijzigd → 304
+    return conditional_response(
+        request,
+        table_version(db, ["customers", "registration_tokens"]),
+        build,
     )
@@ -1,11 +1,19 @@
 import logging
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import settings
-from database import Base, engine
-from initial_data import init_db
+from database import engine, read_router, replica_engine
+from db_engine import ping_check, pool_stats
+from compression import CompressionMiddleware
+from db_replica import ReadYourWritesMiddleware
+from deps import require_debug_key
+from metrics import PrometheusMiddleware, instrument_engine, metrics_response
+from readiness import Readiness, smtp_check
+import query_stats
+import tracing
+from initial_data import ensure_schema, init_db
 
 # ========================
 # ROUTERS
@@ -27,6 +35,13 @@ from documents.router import router as documents_router
 from relations.router import router as relations_router
 
 
+tracing.configure_logging(settings.WEBSITE_LOG_LEVEL)
+tracing.configure_tracing(
+    "website",
+    settings.WEBSITE_TRACE_EXPORT_FILE or None,
+    settings.WEBSITE_TRACE_OTLP_ENDPOINT or None,
+)
+
 logger = logging.getLogger("website-backend")
 
 app = FastAPI(
@@ -50,7 +65,34 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    # read-your-writes zonder cookies (allow_credentials=False), zie db_replica.py
+    expose_headers=["X-Read-Your-Writes"],
 )
+if settings.WEBSITE_RESPONSE_COMPRESSION_MIN_BYTES > 0:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.WEBSITE_RESPONSE_COMPRESSION_MIN_BYTES,
+    )
+app.add_middleware(PrometheusMiddleware)
+app.add_middleware(query_stats.QueryStatsMiddleware)
+app.add_middleware(
+    ReadYourWritesMiddleware,
+    cookie_name=settings.WEBSITE_DB_REPLICA_STICKY_COOKIE,
+    sticky_seconds=settings.WEBSITE_DB_REPLICA_STICKY_SECONDS,
+    enabled=replica_engine is not None,
+)
+# als laatste toegevoegd = buitenste laag: trace-context staat klaar voor alles erna
+app.add_middleware(tracing.TracingMiddleware)
+for _name, _engine in (("primary", engine), ("replica", replica_engine)):
+    if _engine is None:
+        continue
+    instrument_engine(_engine, _name)
+    tracing.instrument_engine(_engine)
+    query_stats.instrument_engine(
+        _engine,
+        slow_ms=settings.WEBSITE_SLOW_QUERY_MS,
+        explain=settings.WEBSITE_SLOW_QUERY_EXPLAIN,
+    )
 
 # ========================
 # REGISTER ROUTERS
@@ -77,10 +119,39 @@ app.include_router(relations_router)
 
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
+    ensure_schema()
     init_db()
     logger.info("Website backend started, DB initialized.")
 
+
+readiness = Readiness(
+    interval=settings.WEBSITE_READINESS_INTERVAL_SECONDS,
+    timeout=settings.WEBSITE_READINESS_TIMEOUT_SECONDS,
+    stale_after=settings.WEBSITE_READINESS_STALE_AFTER_SECONDS,
+)
+readiness.register("database", ping_check(engine))
+if replica_engine is not None:
+    # reads vallen terug op de primary (read_router), dus niet kritiek
+    readiness.register("database_replica", ping_check(replica_engine), critical=False)
+if settings.WEBSITE_EMAIL_ENABLED:
+    readiness.register(
+        "smtp",
+        smtp_check(settings.WEBSITE_SMTP_HOST, settings.WEBSITE_SMTP_PORT),
+        critical=False,
+    )
+
+
+@app.on_event("startup")
+async def start_readiness():
+    await read_router.start()
+    await readiness.start()
+
+
+@app.on_event("shutdown")
+async def stop_readiness():
+    await readiness.stop()
+    await read_router.stop()
+
 # ========================
 # HEALTH
 # ========================
@@ -88,3 +159,31 @@ def on_startup():
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    return readiness.response()
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
+
+@app.get("/debug/pool", dependencies=[Depends(require_debug_key)])
+def debug_pool():
+    if replica_engine is None:
+        return pool_stats(engine)
+    return {
+        **pool_stats(engine),
+        "replica": {**pool_stats(replica_engine), **read_router.status()},
+    }
+
+
+@app.get("/debug/queries", dependencies=[Depends(require_debug_key)])
+def debug_queries(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: str = Query("total_ms", regex="^(total_ms|count|mean_ms|max_ms|p95_ms|p99_ms)$"),
+):
+    return query_stats.stats.snapshot(limit=limit, order_by=order_by)
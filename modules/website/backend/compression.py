@@ -0,0 +1,176 @@
+# website/backend/compression.py
+"""
+Response-compressie (gzip / br) als pure ASGI-middleware.
+
+- encoding via Accept-Encoding (q-waarden gerespecteerd); br enkel als het
+  optionele pakket `brotli` geïnstalleerd is, anders gzip
+- responses kleiner dan minimum_size blijven ongecomprimeerd: de body wordt
+  gebufferd tot de drempel bereikt is of de response eindigt
+- streaming responses worden chunk per chunk gecomprimeerd en na elke chunk
+  geflusht, zodat de client meteen data krijgt (time to first byte)
+- responses met een eigen Content-Encoding, 204/304 en al gecomprimeerde
+  content-types (afbeeldingen, zip, ...) worden ongemoeid gelaten
+"""
+
+import zlib
+from typing import List, Optional, Tuple
+
+try:  # optioneel: zonder brotli enkel gzip
+    import brotli
+except ImportError:  # pragma: no cover - afhankelijk van de installatie
+    brotli = None
+
+_SKIP_CONTENT_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "font/woff")
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Kies "br" of "gzip" uit een Accept-Encoding-header (None = niet comprimeren)."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+
+    candidates = ["gzip"] if brotli is None else ["br", "gzip"]
+    best, best_q = None, 0.0
+    for name in candidates:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._br = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31 = gzip-header
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self._br is not None:
+            out = self._br.process(data)
+            return out + (self._br.finish() if final else self._br.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        skip_paths: tuple = ("/metrics",),
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for key, value in scope.get("headers", ()):
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[dict] = None
+        buffered: List[bytes] = []
+        size = 0
+        # compressor None = nog aan het bufferen tot de drempel
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message) -> None:
+            nonlocal start, size, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                if not _compressible(message):
+                    passthrough = True
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+
+            if compressor is None:
+                buffered.append(body)
+                size += len(body)
+                if size < self.minimum_size and more:
+                    return
+                data = b"".join(buffered)
+                buffered.clear()
+                if size < self.minimum_size:
+                    # klein en volledig: ongecomprimeerd doorsturen
+                    await send(start)
+                    await send({"type": "http.response.body", "body": data, "more_body": False})
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                await send({**start, "headers": _compressed_headers(start, encoding)})
+                body = data
+
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": compressor.compress(body, final=not more),
+                    "more_body": more,
+                }
+            )
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _compressible(start: dict) -> bool:
+    if start["status"] in (204, 304) or start["status"] < 200:
+        return False
+    for key, value in start.get("headers", ()):
+        if key == b"content-encoding":
+            return False
+        if key == b"content-type" and value.decode("latin-1").startswith(_SKIP_CONTENT_TYPES):
+            return False
+    return True
+
+
+def _compressed_headers(start: dict, encoding: str) -> List[Tuple[bytes, bytes]]:
+    headers = []
+    vary = None
+    for key, value in start.get("headers", ()):
+        if key == b"content-length":
+            continue
+        if key == b"vary":
+            vary = value
+            continue
+        headers.append((key, value))
+    headers.append((b"content-encoding", encoding.encode("latin-1")))
+    if vary is None:
+        headers.append((b"vary", b"Accept-Encoding"))
+    elif b"accept-encoding" not in vary.lower():
+        headers.append((b"vary", vary + b", Accept-Encoding"))
+    else:
+        headers.append((b"vary", vary))
+    return headers
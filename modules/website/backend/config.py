@@ -12,6 +12,72 @@ class Settings(BaseSettings):
     WEBSITE_DB_USER: str = os.getenv("WEBSITE_DB_USER", "website_user")
     WEBSITE_DB_PASSWORD: str = os.getenv("WEBSITE_DB_PASSWORD", "website_password")
 
+    # Connection pool (per worker-proces); liveness via recycle i.p.v. pre-ping
+    WEBSITE_DB_POOL_SIZE: int = int(os.getenv("WEBSITE_DB_POOL_SIZE", "10"))
+    WEBSITE_DB_MAX_OVERFLOW: int = int(os.getenv("WEBSITE_DB_MAX_OVERFLOW", "10"))
+    WEBSITE_DB_POOL_RECYCLE: int = int(os.getenv("WEBSITE_DB_POOL_RECYCLE", "1800"))
+    WEBSITE_DB_POOL_TIMEOUT: float = float(os.getenv("WEBSITE_DB_POOL_TIMEOUT", "10"))
+    # Default statement_timeout (ms); 0 = geen limiet
+    WEBSITE_DB_STATEMENT_TIMEOUT_MS: int = int(
+        os.getenv("WEBSITE_DB_STATEMENT_TIMEOUT_MS", "15000")
+    )
+    # true = via PgBouncer in pool_mode=transaction (met WEBSITE_DB_POOL_SIZE=0 → NullPool)
+    WEBSITE_DB_TRANSACTION_POOLER: bool = os.getenv(
+        "WEBSITE_DB_TRANSACTION_POOLER",
+        "false",
+    ).lower() == "true"
+    # /debug/*: leeg = uit (404); anders enkel met header X-Debug-Key = deze waarde
+    WEBSITE_DEBUG_ENDPOINTS_KEY: str = os.getenv("WEBSITE_DEBUG_ENDPOINTS_KEY", "")
+    # Queries trager dan dit (ms) worden gelogd met EXPLAIN-plan; 0 = uit
+    WEBSITE_SLOW_QUERY_MS: float = float(os.getenv("WEBSITE_SLOW_QUERY_MS", "200"))
+    WEBSITE_SLOW_QUERY_EXPLAIN: bool = os.getenv(
+        "WEBSITE_SLOW_QUERY_EXPLAIN",
+        "true",
+    ).lower() == "true"
+
+    # Optionele leesreplica (zelfde db/user/wachtwoord); leeg = uit (zie db_replica.py)
+    WEBSITE_DB_REPLICA_HOST: str = os.getenv("WEBSITE_DB_REPLICA_HOST", "")
+    WEBSITE_DB_REPLICA_PORT: str = os.getenv("WEBSITE_DB_REPLICA_PORT", "5432")
+    # Boven deze replicatievertraging (seconden) lezen we van de primary
+    WEBSITE_DB_REPLICA_MAX_LAG_SECONDS: float = float(
+        os.getenv("WEBSITE_DB_REPLICA_MAX_LAG_SECONDS", "5")
+    )
+    WEBSITE_DB_REPLICA_CHECK_INTERVAL: float = float(
+        os.getenv("WEBSITE_DB_REPLICA_CHECK_INTERVAL", "2")
+    )
+    # Bovengrens (seconden) voor één meting: connect_timeout + statement_timeout
+    WEBSITE_DB_REPLICA_PROBE_TIMEOUT: float = float(
+        os.getenv("WEBSITE_DB_REPLICA_PROBE_TIMEOUT", "2")
+    )
+    # Read-your-writes: zo lang na een schrijf-request leest de client van de primary
+    WEBSITE_DB_REPLICA_STICKY_SECONDS: int = int(
+        os.getenv("WEBSITE_DB_REPLICA_STICKY_SECONDS", "10")
+    )
+    WEBSITE_DB_REPLICA_STICKY_COOKIE: str = os.getenv(
+        "WEBSITE_DB_REPLICA_STICKY_COOKIE",
+        "website_rw",
+    )
+
+    # Response-compressie (gzip / br): kleinere responses gaan
+    # ongecomprimeerd; 0 = compressie uit
+    WEBSITE_RESPONSE_COMPRESSION_MIN_BYTES: int = int(
+        os.getenv("WEBSITE_RESPONSE_COMPRESSION_MIN_BYTES", "1024")
+    )
+
+    # ============================================================
+    # READINESS (/readyz, zie readiness.py)
+    # ============================================================
+    # Checks lopen op de achtergrond; /readyz leest enkel het laatste resultaat
+    WEBSITE_READINESS_INTERVAL_SECONDS: float = float(
+        os.getenv("WEBSITE_READINESS_INTERVAL_SECONDS", "5")
+    )
+    WEBSITE_READINESS_TIMEOUT_SECONDS: float = float(
+        os.getenv("WEBSITE_READINESS_TIMEOUT_SECONDS", "2")
+    )
+    WEBSITE_READINESS_STALE_AFTER_SECONDS: float = float(
+        os.getenv("WEBSITE_READINESS_STALE_AFTER_SECONDS", "30")
+    )
+
     # ============================================================
     # BACKEND / AUTH
     # ============================================================
@@ -77,6 +143,14 @@ class Settings(BaseSettings):
     # ============================================================
     WEBSITE_ENV: str = os.getenv("WEBSITE_ENV", "local")
 
+    # ============================================================
+    # LOGGING / TRACING
+    # ============================================================
+    WEBSITE_LOG_LEVEL: str = os.getenv("WEBSITE_LOG_LEVEL", "INFO")
+    # Spans als JSON-lines naar dit bestand en/of naar een OTLP/HTTP-collector
+    WEBSITE_TRACE_EXPORT_FILE: str = os.getenv("WEBSITE_TRACE_EXPORT_FILE", "")
+    WEBSITE_TRACE_OTLP_ENDPOINT: str = os.getenv("WEBSITE_TRACE_OTLP_ENDPOINT", "")
+
     # ❌ NIET gebruiken voor klant-links
     # (blijft bestaan voor interne/admin context)
     WEBSITE_PUBLIC_BASE_URL: str = os.getenv(
@@ -110,6 +184,17 @@ class Settings(BaseSettings):
             f"{self.WEBSITE_DB_NAME}"
         )
 
+    @property
+    def SQLALCHEMY_REPLICA_URI(self) -> str | None:
+        if not self.WEBSITE_DB_REPLICA_HOST:
+            return None
+        return (
+            f"postgresql+psycopg2://{self.WEBSITE_DB_USER}:"
+            f"{self.WEBSITE_DB_PASSWORD}@"
+            f"{self.WEBSITE_DB_REPLICA_HOST}:{self.WEBSITE_DB_REPLICA_PORT}/"
+            f"{self.WEBSITE_DB_NAME}"
+        )
+
 
 # Singleton
 settings = Settings()
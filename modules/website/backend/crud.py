@@ -3,10 +3,10 @@ import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Optional, List, Tuple, Literal
 
-from sqlalchemy import func, or_
+from sqlalchemy import func, or_, select, true
 from sqlalchemy.orm import Session
 
-from models import Customer, CustomerType, RegistrationToken
+from models import Customer, CustomerType, RegistrationToken, portal_status_for
 from schemas import RegistrationRequest, CustomerUpdate
 from config import settings
 from security import verify_password, get_password_hash
@@ -69,19 +69,16 @@ def create_customer(
 # LIST (CENTRAAL)
 # =====================================================
 
-def list_customers(
+def filter_customers_query(
     db: Session,
     search: Optional[str] = None,
     customer_type: Optional[CustomerType] = None,
-    skip: int = 0,
-    limit: int = 100,
     status: str = "active",
-    sort_by: str = "created_at",
-    sort_dir: str = "desc",
     visibility: Literal["admin", "public"] = "admin",
-) -> Tuple[List[Customer], int]:
+):
     """
-    Centrale klantenlijst.
+    Gefilterde klantenquery zonder sortering/paginering
+    (ook bruikbaar voor count(*) en voor gestreamde lijsten).
 
     visibility:
     - admin  -> alle klanten (ook zonder login)
@@ -127,32 +124,94 @@ def list_customers(
     if customer_type:
         query = query.filter(Customer.customer_type == customer_type)
 
-    total = query.count()
+    return query
 
-    # -----------------------
-    # SORTING
-    # -----------------------
+
+def order_customers_query(query, sort_by: str = "created_at", sort_dir: str = "desc"):
     if sort_by == "name":
         if sort_dir == "asc":
-            query = query.order_by(
+            return query.order_by(
                 Customer.last_name.asc(),
                 Customer.first_name.asc(),
             )
-        else:
-            query = query.order_by(
-                Customer.last_name.desc(),
-                Customer.first_name.desc(),
-            )
-    else:  # created_at
-        if sort_dir == "asc":
-            query = query.order_by(Customer.created_at.asc())
-        else:
-            query = query.order_by(Customer.created_at.desc())
+        return query.order_by(
+            Customer.last_name.desc(),
+            Customer.first_name.desc(),
+        )
+    # created_at
+    if sort_dir == "asc":
+        return query.order_by(Customer.created_at.asc())
+    return query.order_by(Customer.created_at.desc())
+
+
+def list_customers(
+    db: Session,
+    search: Optional[str] = None,
+    customer_type: Optional[CustomerType] = None,
+    skip: int = 0,
+    limit: int = 100,
+    status: str = "active",
+    sort_by: str = "created_at",
+    sort_dir: str = "desc",
+    visibility: Literal["admin", "public"] = "admin",
+) -> Tuple[List[Customer], int]:
+    """
+    Centrale klantenlijst (zie filter_customers_query voor visibility).
+    """
+
+    query = filter_customers_query(db, search, customer_type, status, visibility)
+    total = query.count()
 
+    query = order_customers_query(query, sort_by, sort_dir)
     items = query.offset(skip).limit(limit).all()
     return items, total
 
 
+def with_list_item_columns(query):
+    """
+    Zelfde klantenquery, maar als rijen met enkel de kolommen van
+    CustomerListItem + het laatste registratietoken (LATERAL, via
+    ix_registration_tokens_customer_id). Geen ORM-objecten, geen selectinload.
+    """
+    latest_token = (
+        select(RegistrationToken.used, RegistrationToken.expires_at)
+        .where(RegistrationToken.customer_id == Customer.id)
+        .order_by(RegistrationToken.created_at.desc())
+        .limit(1)
+        .lateral("latest_token")
+    )
+    return query.with_entities(
+        Customer.id,
+        Customer.customer_uuid,
+        Customer.email,
+        Customer.first_name,
+        Customer.last_name,
+        Customer.customer_type,
+        Customer.is_active,
+        Customer.created_at,
+        Customer.company_name,
+        Customer.address_city,
+        Customer.address_state,
+        Customer.hashed_password.isnot(None).label("has_login"),
+        latest_token.c.used.label("token_used"),
+        latest_token.c.expires_at.label("token_expires_at"),
+    ).outerjoin(latest_token, true())
+
+
+def customer_list_item(row) -> dict:
+    """Rij uit with_list_item_columns -> velden van CustomerListItem."""
+    item = dict(row._mapping)
+    token_used = item.pop("token_used")
+    token_expires_at = item.pop("token_expires_at")
+    item["portal_status"] = portal_status_for(
+        item["has_login"],
+        item["is_active"],
+        token_used,
+        token_expires_at,
+    )
+    return item
+
+
 # =====================================================
 # REGISTRATION TOKENS
 # =====================================================
@@ -1,12 +1,44 @@
-from sqlalchemy import create_engine
+import math
+
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from config import settings
+from db_engine import build_engine
+from db_replica import ReplicaRouter
 
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    future=True,
-    pool_pre_ping=True,
+
+def _build(url: str, **kwargs):
+    return build_engine(
+        url,
+        pool_size=settings.WEBSITE_DB_POOL_SIZE,
+        max_overflow=settings.WEBSITE_DB_MAX_OVERFLOW,
+        pool_recycle=settings.WEBSITE_DB_POOL_RECYCLE,
+        pool_timeout=settings.WEBSITE_DB_POOL_TIMEOUT,
+        statement_timeout_ms=settings.WEBSITE_DB_STATEMENT_TIMEOUT_MS,
+        transaction_pooler=settings.WEBSITE_DB_TRANSACTION_POOLER,
+        future=True,
+        **kwargs,
+    )
+
+
+engine = _build(settings.SQLALCHEMY_DATABASE_URI)
+
+# Optionele leesreplica voor read-only routes (deps.get_read_db)
+replica_engine = (
+    # een hangende replica mag een connectie niet eindeloos laten wachten (libpq: min. 2s)
+    _build(
+        settings.SQLALCHEMY_REPLICA_URI,
+        connect_args={"connect_timeout": max(2, math.ceil(settings.WEBSITE_DB_REPLICA_PROBE_TIMEOUT))},
+    )
+    if settings.SQLALCHEMY_REPLICA_URI
+    else None
+)
+read_router = ReplicaRouter(
+    engine,
+    replica_engine,
+    max_lag_seconds=settings.WEBSITE_DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.WEBSITE_DB_REPLICA_CHECK_INTERVAL,
+    probe_timeout=settings.WEBSITE_DB_REPLICA_PROBE_TIMEOUT,
 )
 
 SessionLocal = sessionmaker(
@@ -0,0 +1,199 @@
+# website/backend/db_engine.py
+"""
+Engine-factory met pool-instellingen uit de environment en pool-statistieken.
+
+- pool_size / max_overflow / pool_recycle / pool_timeout via WEBSITE_DB_POOL_* settings
+- geen pool_pre_ping meer (extra round trip per checkout); liveness via
+  pool_recycle: connecties ouder dan WEBSITE_DB_POOL_RECYCLE seconden worden vervangen
+- statement_timeout per connectie (WEBSITE_DB_STATEMENT_TIMEOUT_MS, als startup-optie)
+  en per request overschrijfbaar met `statement_timeout(ms)` → SET LOCAL
+  bij het begin van de transactie
+- WEBSITE_DB_TRANSACTION_POOLER: modus voor PgBouncer (pool_mode=transaction), zie build_engine
+- InstrumentedQueuePool meet hoe lang een checkout op een vrije connectie wacht;
+  `pool_stats()` geeft in-use / overflow / wachttijden terug
+- ping_check(): readiness-check (SELECT 1 via de pool, met pool-statistieken)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+# Per-request statement_timeout (ms); None = de connectie-default gebruiken
+_statement_timeout_ms: ContextVar[Optional[int]] = ContextVar("statement_timeout_ms", default=None)
+
+# Callbacks (wachttijd in seconden, timed_out) na elke checkout, bv. voor metrics
+_checkout_observers: List[Callable[[float, bool], None]] = []
+
+
+def add_checkout_observer(callback: Callable[[float, bool], None]) -> None:
+    if callback not in _checkout_observers:
+        _checkout_observers.append(callback)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool die checkout-wachttijden en timeouts bijhoudt."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.overflow_max = 0
+
+    def _do_get(self):  # type: ignore[override]
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            with self._stats_lock:
+                self.checkout_timeouts += 1
+            for callback in _checkout_observers:
+                callback(time.perf_counter() - started, True)
+            raise
+        waited = time.perf_counter() - started
+        for callback in _checkout_observers:
+            callback(waited, False)
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            if waited > self.wait_seconds_max:
+                self.wait_seconds_max = waited
+            if self.overflow() > self.overflow_max:
+                self.overflow_max = self.overflow()
+        return conn
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        # Zelfde klasse + instellingen (gebruikt door engine.dispose())
+        return self.__class__(
+            self._creator,
+            pool_size=self._pool.maxsize,
+            max_overflow=self._max_overflow,
+            timeout=self._timeout,
+            recycle=self._recycle,
+            echo=self.echo,
+            logging_name=self._orig_logging_name,
+            reset_on_return=self._reset_on_return,
+            _dispatch=self.dispatch,
+            dialect=self._dialect,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "pool_size": self.size(),
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                "overflow": max(self.overflow(), 0),
+                "overflow_max": self.overflow_max,
+                "max_overflow": self._max_overflow,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": (
+                    round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0
+                ),
+            }
+
+
+def build_engine(
+    url: str,
+    *,
+    pool_size: int,
+    max_overflow: int,
+    pool_recycle: int,
+    pool_timeout: float,
+    statement_timeout_ms: int = 0,
+    transaction_pooler: bool = False,
+    **kwargs: Any,
+) -> Engine:
+    """Maak een engine met InstrumentedQueuePool en statement_timeout-hooks.
+
+    transaction_pooler=True: de engine praat met PgBouncer in pool_mode=transaction.
+    Elke transactie kan dan op een andere serverconnectie lopen, dus:
+    - pool_size 0 → NullPool (PgBouncer is de pool), anders een kleine eigen pool
+    - geen startup-opties (PgBouncer weigert `options`); statement_timeout
+      wordt per transactie met SET LOCAL gezet
+    - psycopg 3: prepare_threshold=None (geen server-side prepared statements,
+      die bestaan enkel op één serverconnectie); psycopg2 prepareert nooit
+    """
+    is_postgres = url.startswith("postgresql")
+    connect_args = dict(kwargs.pop("connect_args", {}))
+
+    if transaction_pooler:
+        if make_url(url).get_driver_name() == "psycopg":
+            connect_args["prepare_threshold"] = None
+    elif statement_timeout_ms > 0 and is_postgres:
+        # Als startup-optie: geen extra SET-round trip per nieuwe connectie
+        options = connect_args.get("options", "")
+        connect_args["options"] = f"{options} -c statement_timeout={int(statement_timeout_ms)}".strip()
+    if connect_args:
+        kwargs["connect_args"] = connect_args
+
+    if transaction_pooler and pool_size <= 0:
+        pool_kwargs: Dict[str, Any] = {"poolclass": NullPool}
+    else:
+        pool_kwargs = {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_recycle": pool_recycle,
+            "pool_timeout": pool_timeout,
+        }
+
+    engine = create_engine(url, pool_pre_ping=False, **pool_kwargs, **kwargs)
+
+    # Achter een transaction pooler geldt de default niet per connectie
+    default_timeout = statement_timeout_ms if transaction_pooler and is_postgres and statement_timeout_ms > 0 else None
+
+    @event.listens_for(engine, "begin")
+    def _apply_request_timeout(conn):
+        timeout = _statement_timeout_ms.get()
+        if timeout is None:
+            timeout = default_timeout
+        if timeout is not None:
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+    return engine
+
+
+@contextmanager
+def statement_timeout(ms: int) -> Iterator[None]:
+    """Overschrijf statement_timeout voor transacties die binnen dit blok starten.
+
+    Voorbeeld (rapport-endpoint dat langer mag duren):
+
+        with statement_timeout(30_000):
+            rows = db.execute(...).all()
+    """
+    token = _statement_timeout_ms.set(ms)
+    try:
+        yield
+    finally:
+        _statement_timeout_ms.reset(token)
+
+
+def pool_stats(engine: Engine) -> Dict[str, Any]:
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.stats()
+    return {"pool": pool.status()}
+
+
+def ping_check(engine: Engine) -> Callable[[], Dict[str, Any]]:
+    """Voor readiness.py: draait op de achtergrond, niet per probe."""
+
+    def check() -> Dict[str, Any]:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return pool_stats(engine)
+
+    return check
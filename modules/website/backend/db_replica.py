@@ -0,0 +1,224 @@
+# website/backend/db_replica.py
+"""
+Leesreplica-routing (optioneel: enkel actief met WEBSITE_DB_REPLICA_HOST).
+
+- ReplicaRouter.engine_for(sticky) kiest per read-only request de replica of
+  de primary: primary als er geen replica is, als de client net geschreven
+  heeft (sticky), als de replica onbereikbaar is of als de replicatievertraging
+  boven WEBSITE_DB_REPLICA_MAX_LAG_SECONDS ligt
+- de vertraging wordt per proces door een achtergrondtaak gemeten (start()/
+  stop(), elke WEBSITE_DB_REPLICA_CHECK_INTERVAL seconden, één query in een
+  thread met connect_timeout en statement_timeout); requests lezen enkel de
+  laatste meting en wachten nooit op de replica. Is die meting ouder dan
+  stale_after (probe hangt of taak loopt niet), dan lezen we van de primary.
+  Een disconnect-fout op de replica markeert ze meteen als onbereikbaar
+- read-your-writes: ReadYourWritesMiddleware zet na een geslaagde schrijf-request
+  (POST/PUT/PATCH/DELETE met status < 400) een cookie en een
+  X-Read-Your-Writes-header met een vervaltijd; zolang die loopt leest die
+  client van de primary (is_sticky). Clients zonder cookies (cross-origin
+  zonder credentials) sturen de header terug
+"""
+
+import asyncio
+import logging
+import time
+from http.cookies import SimpleCookie
+from typing import Callable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# 0 op de primary en op een replica die alle ontvangen WAL afgespeeld heeft
+# (anders groeit now() - laatste replay ook zonder schrijfverkeer)
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+STICKY_HEADER = "x-read-your-writes"
+
+# Callbacks (target, reason) na elke routeringsbeslissing, bv. voor metrics
+_route_observers: List[Callable[[str, str], None]] = []
+
+
+def add_route_observer(callback: Callable[[str, str], None]) -> None:
+    if callback not in _route_observers:
+        _route_observers.append(callback)
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary: Engine,
+        replica: Optional[Engine] = None,
+        max_lag_seconds: float = 5.0,
+        check_interval: float = 2.0,
+        probe_timeout: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.primary = primary
+        self.replica = replica
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.probe_timeout = probe_timeout
+        # ouder dan dit: de meting hangt of loopt niet → replica niet gebruiken
+        self.stale_after = max(3 * check_interval, check_interval + probe_timeout)
+        self._clock = clock
+        self._checked_at = float("-inf")
+        self._lag: Optional[float] = None  # None = onbereikbaar
+        self._task: Optional[asyncio.Task] = None
+        self._probe: Optional[asyncio.Future] = None
+
+        if replica is not None:
+            event.listen(replica, "handle_error", self._on_replica_error)
+
+    def _measure(self) -> float:
+        # connect_timeout zit op de replica-engine (zie database-setup)
+        with self.replica.connect() as conn, conn.begin():
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(self.probe_timeout * 1000)}")
+            return float(conn.exec_driver_sql(LAG_SQL).scalar() or 0.0)
+
+    def _on_replica_error(self, context) -> None:
+        if context.is_disconnect:
+            self.mark_down()
+
+    def mark_down(self) -> None:
+        self._lag = None
+        self._checked_at = self._clock()
+
+    def lag_seconds(self) -> Optional[float]:
+        """Laatst gemeten vertraging in seconden; None als de replica onbereikbaar
+        is of de laatste meting verouderd is. Meet zelf nooit."""
+        if self._clock() - self._checked_at > self.stale_after:
+            return None
+        return self._lag
+
+    def refresh(self) -> Optional[float]:
+        """Eén meting (blokkerend); draait in een thread van de achtergrondtaak."""
+        try:
+            lag: Optional[float] = self._measure()
+        except Exception as exc:
+            logger.warning("Replica niet bereikbaar, lezen van primary: %s", exc)
+            lag = None
+        self._lag, self._checked_at = lag, self._clock()
+        return lag
+
+    # -------------------------------
+    # Achtergrondtaak
+    # -------------------------------
+    async def start(self) -> None:
+        """Eerste meting meteen (begrensd door probe_timeout), daarna op de achtergrond."""
+        if self.replica is None or self._task is not None:
+            return
+        await self._probe_once()
+        self._task = asyncio.create_task(self._run(), name="replica-lag")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self._probe_once()
+            except Exception:  # pragma: no cover - de lus mag nooit stoppen
+                logger.exception("Replica-lagmeting mislukt")
+
+    async def _probe_once(self) -> None:
+        if self._probe is not None and not self._probe.done():
+            # vorige thread hangt nog: geen tweede starten; via stale_after
+            # valt de routering intussen terug op de primary
+            return
+        self._probe = asyncio.ensure_future(asyncio.to_thread(self.refresh))
+        await asyncio.wait({self._probe}, timeout=self.probe_timeout)
+
+    def route(self, sticky: bool = False) -> Tuple[Engine, str]:
+        """(engine, reden) voor een read-only request."""
+        if self.replica is None:
+            return self.primary, "no_replica"
+        if sticky:
+            return self.primary, "sticky"
+        lag = self.lag_seconds()
+        if lag is None:
+            return self.primary, "replica_down"
+        if lag > self.max_lag_seconds:
+            return self.primary, "lag"
+        return self.replica, "replica"
+
+    def engine_for(self, sticky: bool = False) -> Engine:
+        engine, reason = self.route(sticky)
+        target = "replica" if engine is self.replica else "primary"
+        for callback in _route_observers:
+            callback(target, reason)
+        return engine
+
+    def status(self) -> dict:
+        return {
+            "configured": self.replica is not None,
+            "lag_seconds": self._lag,
+            "max_lag_seconds": self.max_lag_seconds,
+        }
+
+
+# -----------------------------------------------------
+# Read-your-writes
+# -----------------------------------------------------
+def is_sticky(
+    cookies: Mapping[str, str],
+    headers: Mapping[str, str],
+    cookie_name: str,
+    now: Optional[float] = None,
+) -> bool:
+    raw = cookies.get(cookie_name) or headers.get(STICKY_HEADER)
+    if not raw:
+        return False
+    try:
+        return float(raw) > (time.time() if now is None else now)
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI-middleware: na een geslaagde schrijf-request leest de client even van de primary."""
+
+    def __init__(self, app, cookie_name: str, sticky_seconds: int, enabled: bool = True) -> None:
+        self.app = app
+        self.cookie_name = cookie_name
+        self.sticky_seconds = sticky_seconds
+        self.enabled = enabled and sticky_seconds > 0
+
+    async def __call__(self, scope, receive, send) -> None:
+        if not self.enabled or scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = str(int(time.time()) + self.sticky_seconds)
+                cookie = SimpleCookie()
+                cookie[self.cookie_name] = until
+                morsel = cookie[self.cookie_name]
+                morsel["path"] = "/"
+                morsel["max-age"] = self.sticky_seconds
+                morsel["httponly"] = True
+                morsel["samesite"] = "Lax"
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", morsel.OutputString().encode("latin-1")))
+                headers.append((STICKY_HEADER.encode("latin-1"), until.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
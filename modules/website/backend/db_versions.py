@@ -0,0 +1,118 @@
+# website/backend/db_versions.py
+"""
+Versie per tabel, als goedkope bron voor ETags (zie conditional.py).
+
+- een statement-level trigger schrijft bij elke INSERT / UPDATE / DELETE /
+  TRUNCATE één rij (tabel, pg_current_xact_id()) in table_version_log, ook
+  voor writes buiten de ORM (cron_cleanup, COPY, psql)
+- enkel INSERTs met een eigen sleutel per transactie: schrijvers nemen geen
+  gedeelde rij-lock, dus geen serialisatie en geen deadlocks tussen
+  transacties die meerdere tabellen in een andere volgorde wijzigen
+- versie = "<epoch>.<aantal logrijen>": het aantal stijgt bij elke commit.
+  Af en toe (kans 1/COMPACT_EVERY per statement) ruimt een schrijver de
+  log van die tabel op en verhoogt hij de epoch in table_versions, in één
+  transactie; pg_try_advisory_xact_lock → compacties wachten nooit op
+  elkaar en schrijvers raken die rijen niet aan
+- transactioneel: lezers zien de nieuwe versie pas samen met de gewijzigde
+  data, en de tabellen repliceren mee naar de leesreplica
+- kostprijs lezen: een PK-lookup plus een index-only count over gemiddeld
+  ~COMPACT_EVERY logrijen
+"""
+
+import logging
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+VERSIONED_TABLES = ("customers", "registration_tokens")
+
+COMPACT_EVERY = 500
+
+_SETUP = [
+    """
+    CREATE TABLE IF NOT EXISTS table_versions (
+        table_name TEXT PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS table_version_log (
+        table_name TEXT NOT NULL,
+        xact_id BIGINT NOT NULL,
+        PRIMARY KEY (table_name, xact_id)
+    );
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        -- eigen sleutel per transactie: botst enkel met zichzelf, nooit met anderen
+        INSERT INTO table_version_log (table_name, xact_id)
+        VALUES (TG_TABLE_NAME, pg_current_xact_id()::text::bigint)
+        ON CONFLICT DO NOTHING;
+
+        IF random() < 1.0 / {COMPACT_EVERY}
+           AND pg_try_advisory_xact_lock(hashtext('table_version_log'), hashtext(TG_TABLE_NAME)) THEN
+            DELETE FROM table_version_log WHERE table_name = TG_TABLE_NAME;
+            INSERT INTO table_versions (table_name, version)
+            VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1;
+        END IF;
+        RETURN NULL;
+    END;
+    $$;
+    """,
+]
+
+_TRIGGER = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_version_{table}') THEN
+        CREATE TRIGGER trg_version_{table}
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+    END IF;
+END;
+$$;
+"""
+
+_SELECT_EPOCHS = text(
+    "SELECT table_name, version FROM table_versions WHERE table_name IN :names"
+).bindparams(bindparam("names", expanding=True))
+
+_SELECT_COUNTS = text(
+    "SELECT table_name, count(*) FROM table_version_log WHERE table_name IN :names GROUP BY table_name"
+).bindparams(bindparam("names", expanding=True))
+
+
+def ensure_table_versions(conn: Connection, tables: Iterable[str] = VERSIONED_TABLES) -> None:
+    """Idempotent: tabel, triggerfunctie en triggers aanmaken waar ze ontbreken."""
+    # meerdere workers/containers tegelijk: DDL op pg_proc/pg_trigger serialiseren
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('table_versions'))"))
+    for statement in _SETUP:
+        conn.execute(text(statement))
+    for table in tables:
+        conn.execute(text(_TRIGGER.format(table=table)))
+
+
+def table_version(db: Session, tables: Iterable[str]) -> Optional[str]:
+    """
+    Samengestelde versie van `tables`, bv. "customers:3.120". Een tabel zonder
+    rijen telt als 0.0 (nog niet gewijzigd sinds de triggers er staan).
+    None als de versietabellen niet leesbaar zijn: de caller stuurt dan
+    gewoon een volledige response zonder ETag.
+    """
+    names = list(tables)
+    try:
+        epochs = dict(db.execute(_SELECT_EPOCHS, {"names": names}).all())
+        counts = dict(db.execute(_SELECT_COUNTS, {"names": names}).all())
+    except SQLAlchemyError:
+        logger.warning("table_versions niet leesbaar; geen ETag", exc_info=True)
+        db.rollback()
+        return None
+    return ";".join(f"{name}:{epochs.get(name, 0)}.{counts.get(name, 0)}" for name in names)
@@ -1,12 +1,16 @@
+import hmac
 from typing import Generator
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
-from database import SessionLocal
+from config import settings
+from database import SessionLocal, read_router
+from db_replica import is_sticky
 from security import decode_access_token
 from schemas import TokenData
 from crud import get_customer_by_email
@@ -36,6 +40,44 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def read_engine(request: Request) -> Engine:
+    """
+    Leesreplica of primary, één keer gekozen per request: alle leessessies
+    van het request (bv. eerst de ETag-versie, dan de gestreamde rijen) lezen
+    zo van dezelfde database, en de rijen zijn nooit ouder dan de versie.
+    """
+    chosen = getattr(request.state, "read_engine", None)
+    if chosen is None:
+        sticky = is_sticky(
+            request.cookies,
+            request.headers,
+            settings.WEBSITE_DB_REPLICA_STICKY_COOKIE,
+        )
+        chosen = request.state.read_engine = read_router.engine_for(sticky)
+    return chosen
+
+
+def open_read_db(request: Request) -> Session:
+    """
+    Sessie voor read-only werk: leesreplica als die gezond en bij is,
+    anders (of vlak na een eigen schrijfactie) de primary (zie read_engine).
+    De caller sluit de sessie (bv. een streaming response).
+    """
+    return SessionLocal(bind=read_engine(request))
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Dependency voor read-only routes (zie open_read_db).
+    ⚠️ Nooit gebruiken in routes die schrijven.
+    """
+    db = open_read_db(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 # =========================================================
 # Current user (GENERIC)
 # =========================================================
@@ -99,3 +141,19 @@ def get_current_admin_user(
         )
 
     return current_user
+
+
+# =========================================================
+# Debug-endpoints (/debug/*)
+# =========================================================
+# - uit (404) zolang WEBSITE_DEBUG_ENDPOINTS_KEY leeg is
+# - anders enkel met header X-Debug-Key
+# =========================================================
+
+def require_debug_key(request: Request) -> None:
+    expected = settings.WEBSITE_DEBUG_ENDPOINTS_KEY
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    given = request.headers.get("X-Debug-Key", "")
+    if not hmac.compare_digest(given.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid debug key")
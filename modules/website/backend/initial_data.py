@@ -1,12 +1,30 @@
 from sqlalchemy.orm import Session
 
-from database import SessionLocal
+from database import Base, SessionLocal, engine
+from db_versions import ensure_table_versions
 from models import CustomerType, Customer
 from schemas import RegistrationRequest
 from crud import create_customer, get_customer_by_email
 from security import get_password_hash
 
 
+def ensure_schema() -> None:
+    """
+    Tabellen én indexen aanmaken.
+
+    create_all slaat bestaande tabellen volledig over, dus nieuwe indexen op
+    een bestaande tabel (bv. ix_customers_email_lower) komen er zo niet bij;
+    daarom worden de indexen apart met checkfirst aangemaakt.
+    Daarna table_versions + triggers voor de ETags (zie db_versions.py).
+    """
+    Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        ensure_table_versions(conn)
+
+
 def init_db() -> None:
     db: Session = SessionLocal()
     try:
@@ -10,6 +10,7 @@ from sqlalchemy import (
     Text,
     Enum,
     ForeignKey,
+    Index,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -41,6 +42,11 @@ class CustomerType(str, enum.Enum):
 
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (
+        # admin-lijst: filter op is_active + sortering per sorteermodus
+        Index("ix_customers_active_created", "is_active", "created_at"),
+        Index("ix_customers_active_name", "is_active", "last_name", "first_name"),
+    )
 
     # -------------------------------------------------
     # Interne technische primary key
@@ -172,20 +178,44 @@ class Customer(Base):
         - invitation_expired
         - no_invitation
         """
-        if self.has_portal_password and self.is_active:
-            return "active"
-
         token = self.latest_registration_token
-        if token is None:
-            return "no_invitation"
+        return portal_status_for(
+            self.has_portal_password,
+            self.is_active,
+            token.used if token is not None else None,
+            token.expires_at if token is not None else None,
+        )
+
+
+def portal_status_for(
+    has_password: bool,
+    is_active: bool,
+    token_used,
+    token_expires_at,
+) -> str:
+    """
+    Zelfde logica als Customer.portal_status, maar op losse waarden
+    (bv. uit een select met het laatste registratietoken).
+    token_used / token_expires_at zijn None als er geen token is.
+    """
+    if has_password and is_active:
+        return "active"
 
-        if token.used:
-            return "no_invitation"
+    if token_expires_at is None:
+        return "no_invitation"
 
-        if token.expires_at < utcnow():
-            return "invitation_expired"
+    if token_used:
+        return "no_invitation"
 
-        return "invited"
+    if token_expires_at < utcnow():
+        return "invitation_expired"
+
+    return "invited"
+
+
+# login: crud.get_customer_by_email filtert op lower(email); de unieke index
+# op email zelf wordt daardoor niet gebruikt
+Index("ix_customers_email_lower", func.lower(Customer.email))
 
 
 # =====================================================
@@ -205,6 +235,7 @@ class RegistrationToken(Base):
         UUID(as_uuid=True),
         ForeignKey("customers.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
 
     token = Column(String(255), unique=True, nullable=False, index=True)
@@ -0,0 +1,305 @@
+# website/backend/plan_check.py
+"""
+Query-plan-regressiecheck voor de hot paths van de website-backend.
+
+Elke hot path roept de echte code op (crud-functies) in een transactie die
+achteraf teruggedraaid wordt; de uitgevoerde SQL wordt via een
+cursor-event opgevangen en met `EXPLAIN (FORMAT JSON)` (zonder ANALYZE)
+tegen dezelfde, geseede database gepland. Fout wanneer:
+
+- een plan een Seq Scan bevat op een tabel met meer dan --min-rows rijen
+  (tenzij de hot path die scan expliciet toelaat, bv. count(*) of LIKE '%x%')
+- de geschatte kost meer dan --cost-factor keer de baseline bedraagt
+
+Gebruik (tegen een database geseed met benchmarks/datagen):
+
+    python plan_check.py --create-schema        # schema + indexen (lege database)
+    python plan_check.py                        # check, exit 1 bij regressie
+    python plan_check.py --update-baseline      # kosten vastleggen in --baseline
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+_EXPLAINABLE = ("select", "with", "update", "delete", "insert")
+
+
+@dataclass(frozen=True)
+class HotPath:
+    name: str
+    # sample(db) → argument voor run (bv. een bestaand e-mailadres), buiten de capture
+    sample: Callable[[Session], Any]
+    run: Callable[[Session, Any], Any]
+    # (tabel, fragment): Seq Scan op `tabel` toegelaten in statements die `fragment` bevatten
+    allow_seq_scan: Tuple[Tuple[str, str], ...] = ()
+
+
+@dataclass
+class PlannedStatement:
+    hot_path: str
+    index: int
+    statement: str
+    plan: Dict[str, Any]
+
+    @property
+    def key(self) -> str:
+        return f"{self.hot_path}#{self.index}"
+
+    @property
+    def total_cost(self) -> float:
+        return float(self.plan.get("Total Cost", 0.0))
+
+
+@dataclass
+class Violation:
+    key: str
+    kind: str
+    detail: str
+    statement: str = field(repr=False, default="")
+
+
+# -----------------------------------------------------
+# Plananalyse
+# -----------------------------------------------------
+def iter_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from iter_nodes(child)
+
+
+def seq_scanned_tables(plan: Dict[str, Any]) -> List[str]:
+    return [
+        node.get("Relation Name", "?")
+        for node in iter_nodes(plan)
+        if node.get("Node Type") == "Seq Scan"
+    ]
+
+
+def check_plans(
+    planned: Sequence[PlannedStatement],
+    hot_paths: Dict[str, HotPath],
+    table_rows: Dict[str, float],
+    baseline: Optional[Dict[str, float]] = None,
+    min_rows: int = 5000,
+    cost_factor: float = 2.0,
+    min_cost_delta: float = 100.0,
+) -> List[Violation]:
+    violations = []
+    for item in planned:
+        allowed = hot_paths[item.hot_path].allow_seq_scan
+        lowered = item.statement.lower()
+        for table in seq_scanned_tables(item.plan):
+            if table_rows.get(table, 0) < min_rows:
+                continue  # kleine tabel: seq scan is daar de goedkoopste keuze
+            if any(table == t and fragment.lower() in lowered for t, fragment in allowed):
+                continue
+            violations.append(
+                Violation(item.key, "seq_scan", f"Seq Scan op {table} (~{int(table_rows[table])} rijen)", item.statement)
+            )
+
+        reference = (baseline or {}).get(item.key)
+        if reference is not None and item.total_cost > reference * cost_factor and item.total_cost - reference > min_cost_delta:
+            violations.append(
+                Violation(item.key, "cost", f"kost {item.total_cost:.0f} > {cost_factor}× baseline {reference:.0f}", item.statement)
+            )
+    return violations
+
+
+# -----------------------------------------------------
+# SQL opvangen en plannen
+# -----------------------------------------------------
+def _explain(conn: Connection, statement: str, parameters: Any) -> Dict[str, Any]:
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        raw = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    if isinstance(raw, str):
+        raw = json.loads(raw)
+    return raw[0]["Plan"]
+
+
+def plan_hot_path(engine: Engine, hot_path: HotPath) -> List[PlannedStatement]:
+    """Voer de hot path uit in een teruggedraaide transactie en plan elke statement."""
+    captured: List[Tuple[str, Any]] = []
+
+    def _capture(_conn, _cursor, statement, parameters, _context, executemany):
+        if statement.lstrip().lower().startswith(_EXPLAINABLE):
+            captured.append((statement, parameters[0] if executemany and parameters else parameters))
+
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        # commit() in de code sluit enkel een savepoint; alles wordt teruggedraaid
+        db = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            argument = hot_path.sample(db)
+            event.listen(conn, "before_cursor_execute", _capture)
+            try:
+                hot_path.run(db, argument)
+                db.flush()
+            finally:
+                event.remove(conn, "before_cursor_execute", _capture)
+            return [
+                PlannedStatement(hot_path.name, index, statement, _explain(conn, statement, parameters))
+                for index, (statement, parameters) in enumerate(captured)
+            ]
+        finally:
+            db.close()
+            transaction.rollback()
+
+
+def table_sizes(engine: Engine) -> Dict[str, float]:
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT relname, reltuples FROM pg_class "
+            "WHERE relkind IN ('r', 'p') AND relnamespace = 'public'::regnamespace"
+        ).all()
+    return {name: float(tuples) for name, tuples in rows}
+
+
+def run_checks(
+    engine: Engine,
+    hot_paths: Sequence[HotPath],
+    baseline: Optional[Dict[str, float]] = None,
+    **limits: Any,
+) -> Tuple[List[PlannedStatement], List[Violation]]:
+    planned: List[PlannedStatement] = []
+    for hot_path in hot_paths:
+        planned.extend(plan_hot_path(engine, hot_path))
+    violations = check_plans(planned, {h.name: h for h in hot_paths}, table_sizes(engine), baseline, **limits)
+    return planned, violations
+
+
+# -----------------------------------------------------
+# Hot paths van de website
+# -----------------------------------------------------
+def _scalar(db: Session, sql: str) -> Any:
+    from sqlalchemy import text
+
+    value = db.execute(text(sql)).scalar()
+    if value is None:
+        raise RuntimeError(f"Geen sample-data voor: {sql} (database niet geseed?)")
+    return value
+
+
+def _admin_listing(sort_by: str, sort_dir: str) -> Callable[[Session, Any], Any]:
+    def run(db: Session, _argument: Any) -> Any:
+        import crud
+
+        # zelfde queries als admin_list_customers: count + rijen met het
+        # laatste registratietoken (LATERAL) voor portal_status
+        query = crud.filter_customers_query(db)
+        query.count()
+        rows = (
+            crud.with_list_item_columns(crud.order_customers_query(query, sort_by, sort_dir))
+            .offset(500)
+            .limit(50)
+            .all()
+        )
+        return [crud.customer_list_item(row) for row in rows]
+
+    return run
+
+
+def _login_lookup(db: Session, email: str) -> Any:
+    import crud
+
+    return crud.get_customer_by_email(db, email.upper())
+
+
+def _token_lookup(db: Session, token: str) -> Any:
+    import crud
+
+    return crud.get_registration_token(db, token)
+
+
+def _admin_search(db: Session, _argument: Any) -> Any:
+    import crud
+
+    return crud.list_customers(db, search="ramirez", limit=50, sort_by="name", sort_dir="asc")
+
+
+# count(*) over de actieve klanten leest (bijna) de hele tabel, dat is verwacht
+_COUNT = ("customers", "count(*)")
+
+HOT_PATHS: Tuple[HotPath, ...] = (
+    HotPath(
+        "login_lookup",
+        lambda db: _scalar(db, "SELECT email FROM customers WHERE hashed_password IS NOT NULL LIMIT 1"),
+        _login_lookup,
+    ),
+    HotPath("admin_list_created_desc", lambda db: None, _admin_listing("created_at", "desc"), (_COUNT,)),
+    HotPath("admin_list_created_asc", lambda db: None, _admin_listing("created_at", "asc"), (_COUNT,)),
+    HotPath("admin_list_name_asc", lambda db: None, _admin_listing("name", "asc"), (_COUNT,)),
+    HotPath("admin_list_name_desc", lambda db: None, _admin_listing("name", "desc"), (_COUNT,)),
+    # LIKE '%term%' kan geen b-tree gebruiken; enkel de kost wordt bewaakt
+    HotPath("admin_search", lambda db: None, _admin_search, (("customers", "like"),)),
+    HotPath(
+        "token_lookup",
+        lambda db: _scalar(db, "SELECT token FROM registration_tokens LIMIT 1"),
+        _token_lookup,
+    ),
+)
+
+
+# -----------------------------------------------------
+# CLI
+# -----------------------------------------------------
+def report(planned: Sequence[PlannedStatement], violations: Sequence[Violation]) -> str:
+    lines = []
+    for item in planned:
+        scans = ", ".join(seq_scanned_tables(item.plan)) or "-"
+        lines.append(f"{item.key:36s} kost {item.total_cost:>10.1f}  seq scans: {scans}")
+    for violation in violations:
+        lines.append(f"FOUT {violation.key}: {violation.detail}\n    {violation.statement.strip()[:300]}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default="plan_baseline.json", help="JSON met kost per statement")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--create-schema", action="store_true", help="enkel schema + indexen aanmaken")
+    parser.add_argument("--min-rows", type=int, default=5000)
+    parser.add_argument("--cost-factor", type=float, default=2.0)
+    parser.add_argument("--only", help="komma-lijst van hot paths")
+    args = parser.parse_args(argv)
+
+    from database import engine
+    import models  # noqa: F401  (tabellen registreren)
+
+    if args.create_schema:
+        from initial_data import ensure_schema
+
+        ensure_schema()
+        return 0
+
+    selected = [h for h in HOT_PATHS if not args.only or h.name in args.only.split(",")]
+    baseline_path = Path(args.baseline)
+    baseline = None
+    if baseline_path.exists() and not args.update_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+
+    planned, violations = run_checks(
+        engine, selected, baseline, min_rows=args.min_rows, cost_factor=args.cost_factor
+    )
+    if args.update_baseline:
+        baseline_path.write_text(
+            json.dumps({item.key: round(item.total_cost, 2) for item in planned}, indent=2, sort_keys=True),
+            encoding="utf-8",
+        )
+    print(report(planned, violations))
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
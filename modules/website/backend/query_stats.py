@@ -0,0 +1,244 @@
+# website/backend/query_stats.py
+"""
+Query-statistieken per statement-fingerprint en per route.
+
+instrument_engine() hangt SQLAlchemy cursor-events aan de engine:
+- elke statement wordt getimed en genormaliseerd tot een fingerprint
+  (literals/parameters → ?, IN-lijsten samengevouwen, whitespace genormaliseerd)
+- per fingerprint en per (route, fingerprint): aantal, totaal, max en
+  p50/p95/p99 over een begrensd venster van recente metingen
+- statements boven de drempel worden gelogd met hun EXPLAIN-plan
+  (max. één keer per fingerprint per explain-interval)
+
+QueryStatsMiddleware onthoudt de ASGI-scope van het request zodat de
+route-template bij elke query gekend is. snapshot() levert de top-lijst
+voor het debug-endpoint.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_scope: ContextVar[Optional[dict]] = ContextVar("query_stats_scope", default=None)
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+|\?")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bin\s*\((?:\s*\?\s*,?)+\)")
+_VALUES_RE = re.compile(r"\bvalues\s*(\((?:\s*\?\s*,?)+\)\s*,?\s*)+")
+_WS_RE = re.compile(r"\s+")
+
+OTHER = "<other>"
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Normaliseer een SQL-statement zodat varianten met andere waarden samenvallen."""
+    sql = _COMMENT_RE.sub(" ", statement)
+    sql = _STRING_RE.sub("?", sql)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _WS_RE.sub(" ", sql).strip().lower()
+    sql = _IN_LIST_RE.sub("in (...)", sql)
+    sql = _VALUES_RE.sub("values (...) ", sql).strip()
+    return sql
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _Stat:
+    __slots__ = ("count", "total_ms", "max_ms", "samples")
+
+    def __init__(self, window: int) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        self.samples.append(elapsed_ms)
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": round(_percentile(ordered, 50), 3),
+            "p95_ms": round(_percentile(ordered, 95), 3),
+            "p99_ms": round(_percentile(ordered, 99), 3),
+        }
+
+
+class QueryStats:
+    def __init__(self, window: int = 1000, max_fingerprints: int = 2000) -> None:
+        self.window = window
+        self.max_fingerprints = max_fingerprints
+        self._lock = threading.Lock()
+        self._by_fingerprint: Dict[str, _Stat] = {}
+        self._by_route: Dict[Tuple[str, str], _Stat] = {}
+        self._examples: Dict[str, str] = {}
+
+    def record(self, statement: str, route: str, elapsed_ms: float) -> str:
+        fp = fingerprint(statement)
+        with self._lock:
+            stat = self._by_fingerprint.get(fp)
+            if stat is None:
+                if len(self._by_fingerprint) >= self.max_fingerprints:
+                    fp = OTHER
+                    stat = self._by_fingerprint.get(fp)
+                if stat is None:
+                    stat = self._by_fingerprint[fp] = _Stat(self.window)
+                    self._examples[fp] = statement[:1000]
+            stat.add(elapsed_ms)
+
+            key = (route, fp)
+            route_stat = self._by_route.get(key)
+            if route_stat is None:
+                route_stat = self._by_route[key] = _Stat(self.window)
+            route_stat.add(elapsed_ms)
+        return fp
+
+    def reset(self) -> None:
+        with self._lock:
+            self._by_fingerprint.clear()
+            self._by_route.clear()
+            self._examples.clear()
+
+    def snapshot(self, limit: int = 20, order_by: str = "total_ms") -> Dict[str, Any]:
+        with self._lock:
+            fingerprints = [
+                {"fingerprint": fp, "example": self._examples.get(fp), **stat.summary()}
+                for fp, stat in self._by_fingerprint.items()
+            ]
+            routes = [
+                {"route": route, "fingerprint": fp, **stat.summary()}
+                for (route, fp), stat in self._by_route.items()
+            ]
+        fingerprints.sort(key=lambda item: item.get(order_by, 0), reverse=True)
+        routes.sort(key=lambda item: item.get(order_by, 0), reverse=True)
+        return {"order_by": order_by, "fingerprints": fingerprints[:limit], "routes": routes[:limit]}
+
+
+stats = QueryStats()
+
+
+def _current_route() -> str:
+    scope = _scope.get()
+    if scope is None:
+        return "<no-request>"
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {getattr(route, 'path', None) or '<unmatched>'}"
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI-middleware die de request-scope beschikbaar maakt voor de query-hooks."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _scope.reset(token)
+
+
+# -----------------------------------------------------
+# EXPLAIN voor trage statements
+# -----------------------------------------------------
+_EXPLAINABLE = ("select", "with", "update", "delete", "insert")
+_last_explain: Dict[str, float] = {}
+
+
+def _explain(cursor, statement: str, parameters) -> Optional[str]:
+    """EXPLAIN (zonder ANALYZE) binnen een savepoint, zodat een fout de
+    transactie van de applicatie niet afbreekt."""
+    try:
+        cursor.execute("SAVEPOINT query_stats_explain")
+    except Exception:
+        return None
+    try:
+        cursor.execute("EXPLAIN " + statement, parameters)
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+        cursor.execute("RELEASE SAVEPOINT query_stats_explain")
+        return plan
+    except Exception as exc:
+        try:
+            cursor.execute("ROLLBACK TO SAVEPOINT query_stats_explain")
+        except Exception:
+            pass
+        return f"<explain mislukt: {exc}>"
+
+
+def instrument_engine(
+    engine,
+    slow_ms: float = 200.0,
+    explain: bool = True,
+    explain_interval_seconds: float = 300.0,
+) -> None:
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, _cursor, _statement, _parameters, _exec_context, _executemany):
+        conn.info.setdefault("_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, _exec_context, executemany):
+        started_stack = conn.info.get("_query_started")
+        if not started_stack:
+            return
+        elapsed_ms = (time.perf_counter() - started_stack.pop()) * 1000.0
+        fp = stats.record(statement, _current_route(), elapsed_ms)
+
+        if slow_ms <= 0 or elapsed_ms < slow_ms:
+            return
+
+        plan = None
+        if (
+            explain
+            and not executemany
+            and engine.dialect.name == "postgresql"
+            and statement.lstrip().lower().startswith(_EXPLAINABLE)
+        ):
+            now = time.monotonic()
+            if now - _last_explain.get(fp, -explain_interval_seconds) >= explain_interval_seconds:
+                _last_explain[fp] = now
+                plan = _explain(conn.connection.cursor(), statement, parameters)
+
+        logger.warning(
+            "Trage query (%.1f ms, route %s): %s%s",
+            elapsed_ms,
+            _current_route(),
+            fp,
+            f"\n{plan}" if plan else "",
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        started_stack = conn.info.get("_query_started") if conn is not None else None
+        if started_stack:
+            started_stack.pop()
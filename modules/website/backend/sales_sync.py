@@ -12,6 +12,8 @@ from sqlalchemy.orm import Session
 from config import settings
 from crud import create_customer, get_customer_by_email
 from deps import get_db
+from metrics import track_outbound
+from tracing import TracingTransport
 from models import Customer
 from schemas import RegistrationRequest
 
@@ -101,12 +103,14 @@ def sync_customer_to_sales(customer: Customer, seller_code: Optional[str]) -> bo
         headers["Authorization"] = f"Bearer {token}"
 
     try:
-        resp = httpx.post(
-            f"{base_url.rstrip('/')}/api/v1/admin/customers/sync",
-            json=payload,
-            headers=headers,
-            timeout=5.0,
-        )
+        with track_outbound("verkoop", "POST") as call:
+            with httpx.Client(transport=TracingTransport(), timeout=5.0) as client:
+                resp = client.post(
+                    f"{base_url.rstrip('/')}/api/v1/admin/customers/sync",
+                    json=payload,
+                    headers=headers,
+                )
+            call.status = resp.status_code
         resp.raise_for_status()
         return True
     except Exception as exc:  # pragma: no cover - netwerk
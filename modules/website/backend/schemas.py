@@ -163,7 +163,9 @@ class CustomerListItem(BaseModel):
     id: UUID                          # intern
     customer_uuid: UUID               # 🔐 extern (COMMIT 2)
 
-    email: EmailStr
+    # str i.p.v. EmailStr: de lijsten worden gestreamd en een afwijkend adres in
+    # de database mag de JSON niet halverwege afbreken (validatie gebeurt bij schrijven)
+    email: str
     first_name: str
     last_name: str
     customer_type: CustomerType
@@ -5,6 +5,7 @@ from jose import jwt
 from passlib.context import CryptContext
 
 from config import settings
+from metrics import track_password_hash
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -14,11 +15,13 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # =====================================================
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with track_password_hash("verify"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    with track_password_hash("hash"):
+        return pwd_context.hash(password)
 
 
 # =====================================================
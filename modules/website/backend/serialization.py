@@ -0,0 +1,36 @@
+# website/backend/serialization.py
+"""
+Snelle serialisatie voor lijst-endpoints.
+
+Standaard doen we per rij CustomerListItem.from_orm(...) en valideert FastAPI
+het response_model daarna nog eens, gevolgd door jsonable_encoder + json.dumps.
+Hier:
+
+- rijen komen als tuples uit een select met enkel de nodige kolommen
+  (bv. crud.with_list_item_columns), zonder ORM-objecten of lazy loads
+- één validatie per rij via het schema (pydantic 1.x: parse_obj; FastAPI
+  0.103 draait hier nog op pydantic v1, dus geen TypeAdapter)
+- encodering met orjson (UUID, datetime, Enum native; zelfde output als
+  jsonable_encoder)
+- endpoints geven een kant-en-klare Response terug zodat response_model niet
+  opnieuw gevalideerd wordt (response_model blijft voor OpenAPI)
+"""
+
+from typing import Any, Mapping, Type
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+def validated(schema: Type[BaseModel], values: Mapping[str, Any]) -> dict:
+    return schema.parse_obj(values).dict()
+
+
+def encode_row(schema: Type[BaseModel], values: Mapping[str, Any]) -> bytes:
+    """Eén gevalideerd object als JSON (voor streaming)."""
+    return orjson.dumps(validated(schema, values))
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    return Response(orjson.dumps(content), status_code=status_code, media_type="application/json")
@@ -0,0 +1,419 @@
+# website/backend/tracing.py
+"""
+Lichtgewicht tracing over module-grenzen heen.
+
+- TracingMiddleware : leest `traceparent` (W3C) / `X-Correlation-ID` van het
+                      inkomende request, start een server-span en zet beide
+                      headers op de response
+- TracingTransport / AsyncTracingTransport : httpx-transport die een
+                      client-span maakt en de headers doorgeeft aan de volgende hop
+- instrument_engine : span per DB-query (SQLAlchemy cursor-events)
+- span()            : handmatige spans (bv. password hashing)
+- CorrelationIdFilter : trace_id / correlation_id op elke log record
+
+Spans worden in een achtergrondthread gebatcht en weggeschreven naar een
+JSONL-bestand en/of gepost naar een OTLP/HTTP-collector (`/v1/traces`, JSON).
+Zonder export-doel worden enkel de ids doorgegeven (geen spans).
+"""
+
+import json
+import logging
+import queue
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+CORRELATION_HEADER = "x-correlation-id"
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_KIND_CODES = {"internal": 1, "server": 2, "client": 3}
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    kind: str = "internal"
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+@dataclass
+class TraceContext:
+    trace_id: str
+    correlation_id: str
+    span_id: Optional[str] = None
+
+
+_context: ContextVar[Optional[TraceContext]] = ContextVar("trace_context", default=None)
+
+
+def _new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+
+def _new_span_id() -> str:
+    return secrets.token_hex(8)
+
+
+def current_context() -> Optional[TraceContext]:
+    return _context.get()
+
+
+def current_trace_id() -> Optional[str]:
+    ctx = _context.get()
+    return ctx.trace_id if ctx else None
+
+
+def outgoing_headers() -> Dict[str, str]:
+    """Headers voor een uitgaande call binnen de huidige trace."""
+    ctx = _context.get()
+    if ctx is None:
+        return {}
+    parent = ctx.span_id or _new_span_id()
+    return {
+        TRACEPARENT_HEADER: f"00-{ctx.trace_id}-{parent}-01",
+        CORRELATION_HEADER: ctx.correlation_id,
+    }
+
+
+# -----------------------------------------------------
+# Export
+# -----------------------------------------------------
+class SpanExporter:
+    """Batcht afgewerkte spans in een achtergrondthread (requests wachten niet)."""
+
+    def __init__(
+        self,
+        service_name: str,
+        export_file: Optional[str] = None,
+        otlp_endpoint: Optional[str] = None,
+        batch_size: int = 256,
+        flush_interval: float = 2.0,
+        max_queue: int = 10000,
+    ) -> None:
+        self.service_name = service_name
+        self.export_file = export_file
+        self.otlp_endpoint = otlp_endpoint.rstrip("/") if otlp_endpoint else None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if batch:
+                self.export(batch)
+
+    def export(self, batch: List[Span]) -> None:
+        try:
+            if self.export_file:
+                with open(self.export_file, "a", encoding="utf-8") as fh:
+                    for span in batch:
+                        record = span.to_dict()
+                        record["service"] = self.service_name
+                        fh.write(json.dumps(record, default=str) + "\n")
+            if self.otlp_endpoint:
+                # Gewone httpx-client: de exporter zelf niet tracen
+                httpx.post(f"{self.otlp_endpoint}/v1/traces", json=self._otlp_payload(batch), timeout=5.0)
+        except Exception as exc:  # pragma: no cover - export mag requests nooit breken
+            logger.warning("Span-export mislukt (%s spans): %s", len(batch), exc)
+
+    def _otlp_payload(self, batch: List[Span]) -> Dict[str, Any]:
+        def attr(key: str, value: Any) -> Dict[str, Any]:
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            if isinstance(value, float):
+                return {"key": key, "value": {"doubleValue": value}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        spans = []
+        for span in batch:
+            item = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": _KIND_CODES.get(span.kind, 1),
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [attr(k, v) for k, v in span.attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_id:
+                item["parentSpanId"] = span.parent_id
+            spans.append(item)
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [attr("service.name", self.service_name)]},
+                    "scopeSpans": [{"scope": {"name": "casuse.tracing"}, "spans": spans}],
+                }
+            ]
+        }
+
+
+_exporter: Optional[SpanExporter] = None
+
+
+def configure_tracing(
+    service_name: str,
+    export_file: Optional[str] = None,
+    otlp_endpoint: Optional[str] = None,
+) -> None:
+    """Spans exporteren naar bestand en/of collector; zonder doel: enkel ids doorgeven."""
+    global _exporter
+    if export_file or otlp_endpoint:
+        _exporter = SpanExporter(service_name, export_file, otlp_endpoint)
+    else:
+        _exporter = None
+
+
+def tracing_enabled() -> bool:
+    return _exporter is not None
+
+
+# -----------------------------------------------------
+# Spans
+# -----------------------------------------------------
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Optional[Span]]:
+    """Span binnen de huidige trace; no-op buiten een trace of zonder exporter."""
+    ctx = _context.get()
+    if ctx is None or _exporter is None:
+        yield None
+        return
+
+    current = Span(
+        trace_id=ctx.trace_id,
+        span_id=_new_span_id(),
+        parent_id=ctx.span_id,
+        name=name,
+        kind=kind,
+        attributes=attributes,
+    )
+    token = _context.set(TraceContext(ctx.trace_id, ctx.correlation_id, current.span_id))
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        _context.reset(token)
+        current.end_ns = time.time_ns()
+        _exporter.submit(current)
+
+
+def _context_from_headers(headers: Dict[str, str]) -> TraceContext:
+    trace_id = None
+    parent_id = None
+    match = _TRACEPARENT_RE.match(headers.get(TRACEPARENT_HEADER, "").strip().lower())
+    if match and match.group(1) != "0" * 32:
+        trace_id, parent_id = match.group(1), match.group(2)
+
+    correlation_id = headers.get(CORRELATION_HEADER) or headers.get("x-request-id")
+    trace_id = trace_id or _new_trace_id()
+    return TraceContext(trace_id=trace_id, correlation_id=correlation_id or trace_id, span_id=parent_id)
+
+
+class TracingMiddleware:
+    """Pure ASGI-middleware: trace-context per request + server-span."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        ctx = _context_from_headers(headers)
+        token = _context.set(ctx)
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (CORRELATION_HEADER.encode(), ctx.correlation_id.encode("latin-1")),
+                    (b"x-trace-id", ctx.trace_id.encode()),
+                ]
+            await send(message)
+
+        try:
+            with span(f"{scope['method']} {scope['path']}", kind="server") as server_span:
+                await self.app(scope, receive, send_wrapper)
+                if server_span is not None:
+                    route = scope.get("route")
+                    server_span.name = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+                    server_span.attributes.update(
+                        {"http.method": scope["method"], "http.status_code": status_code}
+                    )
+        finally:
+            _context.reset(token)
+
+
+# -----------------------------------------------------
+# httpx
+# -----------------------------------------------------
+def _start_client_span(request: httpx.Request):
+    cm = span(
+        f"HTTP {request.method} {request.url.host}",
+        kind="client",
+        **{"http.method": request.method, "http.url": str(request.url.copy_with(query=None))},
+    )
+    current = cm.__enter__()
+    # na __enter__ is de client-span de parent voor de volgende hop
+    request.headers.update(outgoing_headers())
+    return cm, current
+
+
+def _finish_client_span(cm, current, response: Optional[httpx.Response], exc: Optional[BaseException]) -> None:
+    if current is not None and response is not None:
+        current.attributes["http.status_code"] = response.status_code
+    if exc is not None:
+        cm.__exit__(type(exc), exc, exc.__traceback__)
+    else:
+        cm.__exit__(None, None, None)
+
+
+class TracingTransport(httpx.HTTPTransport):
+    """httpx.Client(transport=TracingTransport(), ...)"""
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        cm, current = _start_client_span(request)
+        try:
+            response = super().handle_request(request)
+        except BaseException as exc:
+            _finish_client_span(cm, current, None, exc)
+            raise
+        _finish_client_span(cm, current, response, None)
+        return response
+
+
+class AsyncTracingTransport(httpx.AsyncHTTPTransport):
+    """httpx.AsyncClient(transport=AsyncTracingTransport(), ...)"""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        cm, current = _start_client_span(request)
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException as exc:
+            _finish_client_span(cm, current, None, exc)
+            raise
+        _finish_client_span(cm, current, response, None)
+        return response
+
+
+# -----------------------------------------------------
+# SQLAlchemy
+# -----------------------------------------------------
+def instrument_engine(engine, max_statement_length: int = 500) -> None:
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, _cursor, statement, _params, _exec_context, _executemany):
+        if _exporter is None or _context.get() is None:
+            return
+        cm = span("db.query", kind="client", **{"db.statement": statement[:max_statement_length]})
+        conn.info.setdefault("_trace_spans", []).append((cm, cm.__enter__()))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, _cursor, _statement, _params, _exec_context, _executemany):
+        stack = conn.info.get("_trace_spans")
+        if stack:
+            cm, _ = stack.pop()
+            cm.__exit__(None, None, None)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        stack = conn.info.get("_trace_spans") if conn is not None else None
+        if stack:
+            cm, _ = stack.pop()
+            exc = exception_context.original_exception
+            cm.__exit__(type(exc), exc, exc.__traceback__)
+
+
+# -----------------------------------------------------
+# Logging
+# -----------------------------------------------------
+class CorrelationIdFilter(logging.Filter):
+    """Voegt trace_id / correlation_id toe aan elke log record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        ctx = _context.get()
+        record.trace_id = ctx.trace_id if ctx else "-"
+        record.correlation_id = ctx.correlation_id if ctx else "-"
+        return True
+
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(correlation_id)s %(trace_id)s] %(name)s: %(message)s"
+
+
+def configure_logging(level: str = "INFO") -> None:
+    """Root-logger met correlation ids; bestaande handlers krijgen de filter erbij."""
+    root = logging.getLogger()
+    if not root.handlers:
+        logging.basicConfig(level=level, format=LOG_FORMAT)
+    else:
+        root.setLevel(level)
+    for handler in root.handlers:
+        if not any(isinstance(f, CorrelationIdFilter) for f in handler.filters):
+            handler.addFilter(CorrelationIdFilter())
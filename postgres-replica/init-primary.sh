@@ -0,0 +1,12 @@
+#!/bin/bash
+# Eenmalig bij de eerste start van replica-primary (docker-entrypoint-initdb.d):
+# replicatie-gebruiker + pg_hba-regel, en de databases van website en verkoop.
+set -euo pipefail
+
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-SQL
+    CREATE ROLE replicator WITH REPLICATION LOGIN PASSWORD 'replicator';
+    CREATE DATABASE website;
+    CREATE DATABASE verkoop;
+SQL
+
+echo "host replication replicator all scram-sha-256" >> "$PGDATA/pg_hba.conf"